@@ -0,0 +1,73 @@
+-- =====================================================
+-- Migration 025: Signal Daily Rollups
+-- =====================================================
+-- Pre-aggregated per-day tables read by /api/admin/analytics/*
+-- Maintained by demand-engine/services/signal_rollups.py
+-- (run after each scraper batch and on a schedule)
+-- =====================================================
+
+-- =====================================================
+-- SIGNAL DAILY ROLLUPS (signals + reddit_signals)
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS signal_daily_rollups (
+    day DATE NOT NULL,
+    source VARCHAR(100) NOT NULL,           -- signals.source or 'reddit'
+    intent VARCHAR(100) NOT NULL DEFAULT '', -- signals.signal_type / reddit_signals.intent ('' = none)
+
+    signal_count INTEGER NOT NULL DEFAULT 0,
+    score_sum NUMERIC NOT NULL DEFAULT 0,
+    hot_count INTEGER NOT NULL DEFAULT 0,
+    converted_count INTEGER NOT NULL DEFAULT 0,
+
+    -- Score histogram
+    bucket_0_49 INTEGER NOT NULL DEFAULT 0,
+    bucket_50_69 INTEGER NOT NULL DEFAULT 0,
+    bucket_70_84 INTEGER NOT NULL DEFAULT 0,
+    bucket_85_100 INTEGER NOT NULL DEFAULT 0,
+
+    refreshed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (day, source, intent)
+);
+
+CREATE INDEX IF NOT EXISTS idx_signal_daily_rollups_day ON signal_daily_rollups(day DESC);
+
+-- =====================================================
+-- AI SIGNAL DAILY ROLLUPS (unified_signals_with_ai)
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS ai_signal_daily_rollups (
+    day DATE NOT NULL,
+    intent VARCHAR(100) NOT NULL DEFAULT '',    -- '' = intent IS NULL
+    sentiment VARCHAR(50) NOT NULL DEFAULT 'unknown',
+    score_bucket VARCHAR(10) NOT NULL,          -- 0-49, 50-69, 70-84, 85-100 (combined_score)
+
+    signal_count INTEGER NOT NULL DEFAULT 0,
+    combined_score_sum NUMERIC NOT NULL DEFAULT 0,
+    converted_count INTEGER NOT NULL DEFAULT 0,
+
+    -- Subset with ai_total IS NOT NULL (score correlation)
+    ai_scored_count INTEGER NOT NULL DEFAULT 0,
+    ai_scored_keyword_sum NUMERIC NOT NULL DEFAULT 0,
+    ai_scored_ai_sum NUMERIC NOT NULL DEFAULT 0,
+    ai_scored_converted INTEGER NOT NULL DEFAULT 0,
+
+    refreshed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (day, intent, sentiment, score_bucket)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ai_signal_daily_rollups_day ON ai_signal_daily_rollups(day DESC);
+
+-- =====================================================
+-- ROLLUP WATERMARKS
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS rollup_state (
+    name VARCHAR(100) PRIMARY KEY,
+    watermark TIMESTAMP WITH TIME ZONE,
+    last_run_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    last_run_stats JSONB DEFAULT '{}'::jsonb
+);
+
+-- Source scans are range reads on created_at
+CREATE INDEX IF NOT EXISTS idx_signals_created_at ON signals(created_at DESC);
@@ -0,0 +1,33 @@
+-- =====================================================
+-- Migration 026: Twilio Call Cache
+-- =====================================================
+-- Local copy of Twilio call + recording metadata read by
+-- /api/twilio/insights/*
+-- Maintained by demand-engine/services/twilio_insights_sync.py
+-- (incremental; cursor stored in rollup_state, see migration 025)
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS twilio_calls (
+    call_sid VARCHAR(64) PRIMARY KEY,
+    from_number VARCHAR(50),
+    to_number VARCHAR(50),
+    from_formatted VARCHAR(50),
+    to_formatted VARCHAR(50),
+    status VARCHAR(30),
+    direction VARCHAR(30),
+    answered_by VARCHAR(30),
+    duration INTEGER NOT NULL DEFAULT 0,      -- seconds
+    start_time TIMESTAMP WITH TIME ZONE,
+    end_time TIMESTAMP WITH TIME ZONE,
+    price NUMERIC,                            -- as reported by Twilio (negative = charge)
+    price_unit VARCHAR(10),
+
+    -- Joined from the recordings listing for the same time range
+    recording_sid VARCHAR(64),
+    recording_url TEXT,
+
+    synced_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_twilio_calls_start_time ON twilio_calls(start_time DESC);
+CREATE INDEX IF NOT EXISTS idx_twilio_calls_to_start_time ON twilio_calls(to_number, start_time DESC);
@@ -0,0 +1,26 @@
+-- =====================================================
+-- Migration 027: Scraper Upsert Keys
+-- =====================================================
+-- Content-hash conflict targets for batched scraper upserts
+-- (demand-engine/services/ingestion_sink.py).
+-- reddit_signals and job_board_signals already have a
+-- UNIQUE content_hash (migrations 021 / 023).
+-- =====================================================
+
+ALTER TABLE signals ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_signals_content_hash ON signals(content_hash);
+
+ALTER TABLE business_contacts ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_business_contacts_content_hash ON business_contacts(content_hash);
+
+ALTER TABLE bbb_signals ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_bbb_signals_content_hash ON bbb_signals(content_hash);
+
+ALTER TABLE licensing_signals ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_licensing_signals_content_hash ON licensing_signals(content_hash);
+
+ALTER TABLE local_business_signals ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_local_business_signals_content_hash ON local_business_signals(content_hash);
+
+-- Recent-hash warm-up reads (content_hash where created_at >= cutoff)
+CREATE INDEX IF NOT EXISTS idx_job_board_signals_created ON job_board_signals(created_at DESC);
@@ -0,0 +1,27 @@
+-- =====================================================
+-- Migration 028: Scrape Cursors
+-- =====================================================
+-- Per-source, per-job high-water marks for incremental scraping
+-- Maintained by demand-engine/scrapers/cursors.py
+-- (scope = scheduler job key, e.g. "indeed:Texas:HVAC installer")
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS scrape_cursors (
+    source VARCHAR(100) NOT NULL,
+    scope VARCHAR(255) NOT NULL,
+
+    -- Newest item seen so far, and every item id sharing that timestamp
+    last_seen_at TIMESTAMP WITH TIME ZONE,
+    last_seen_id VARCHAR(255),
+    last_seen_ids JSONB DEFAULT '[]'::jsonb,
+
+    -- HTTP validators from the last 200 response
+    etag TEXT,
+    last_modified TEXT,
+
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (source, scope)
+);
+
+-- Tables created before last_seen_ids existed
+ALTER TABLE scrape_cursors ADD COLUMN IF NOT EXISTS last_seen_ids JSONB DEFAULT '[]'::jsonb;
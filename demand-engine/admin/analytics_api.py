@@ -1,18 +1,25 @@
 """
 Analytics API
 Advanced analytics for pain signals and lead conversion
+
+Endpoints read the pre-aggregated daily rollups maintained by
+services/signal_rollups.py, so latency does not grow with the signal tables.
+
+Also ingests the voice agent's latency spans into performance_measurements.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import List, Dict, Optional
-from datetime import datetime, timedelta
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.supabase_config import get_supabase
+from config.supabase_config import get_supabase, run_blocking
+from services.signal_rollups import SCORE_BUCKETS, SignalRollupMaterializer, SignalRollupReader
+from analytics.latency_performance_engine import LatencyPerformanceEngine
+from analytics.span_ingest import measurements_from_spans
 
 router = APIRouter(prefix="/api/admin/analytics", tags=["Analytics"])
 
@@ -53,57 +60,19 @@ async def get_source_performance(days: int = 30):
     Get performance metrics by signal source from both signals and reddit_signals tables
     """
     try:
-        supabase = get_supabase()
-        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
+        rollups = await run_blocking(SignalRollupReader(get_supabase()).signal_rollups, days, label="signal_rollups")
         
         source_stats = {}
+        for rollup in rollups:
+            stats = source_stats.setdefault(rollup["source"], {"total": 0, "score_sum": 0, "converted": 0, "hot": 0})
+            stats["total"] += rollup["signal_count"]
+            stats["score_sum"] += float(rollup["score_sum"])
+            stats["converted"] += rollup["converted_count"]
+            stats["hot"] += rollup["hot_count"]
         
-        # Try to get from signals table (scraped business data)
-        try:
-            signals_response = supabase.table("signals").select("*").gte(
-                "created_at", cutoff_date
-            ).execute()
-            
-            for signal in signals_response.data or []:
-                source = signal.get("source", "scraped")
-                if source not in source_stats:
-                    source_stats[source] = {"total": 0, "scores": [], "converted": 0, "hot": 0}
-                
-                source_stats[source]["total"] += 1
-                pain_score = signal.get("pain_score", 0)
-                source_stats[source]["scores"].append(pain_score)
-                if signal.get("status") == "contacted":
-                    source_stats[source]["converted"] += 1
-                if pain_score >= 70:
-                    source_stats[source]["hot"] += 1
-        except Exception as e:
-            print(f"Error fetching signals: {e}")
-        
-        # Try to get from reddit_signals table
-        try:
-            reddit_response = supabase.table("reddit_signals").select("*").gte(
-                "created_at", cutoff_date
-            ).execute()
-            
-            for signal in reddit_response.data or []:
-                source = "reddit"
-                if source not in source_stats:
-                    source_stats[source] = {"total": 0, "scores": [], "converted": 0, "hot": 0}
-                
-                source_stats[source]["total"] += 1
-                score = signal.get("total_score", 0)
-                source_stats[source]["scores"].append(score)
-                if signal.get("alerted"):
-                    source_stats[source]["converted"] += 1
-                if signal.get("ai_tier") == "hot" or score >= 70:
-                    source_stats[source]["hot"] += 1
-        except Exception as e:
-            print(f"Error fetching reddit signals: {e}")
-        
-        # Build result
         result = []
         for source, stats in source_stats.items():
-            avg_score = sum(stats["scores"]) / len(stats["scores"]) if stats["scores"] else 0
+            avg_score = stats["score_sum"] / stats["total"] if stats["total"] > 0 else 0
             conversion_rate = (stats["converted"] / stats["total"] * 100) if stats["total"] > 0 else 0
             
             result.append(SourcePerformance(
@@ -133,44 +102,16 @@ async def get_score_correlation(days: int = 30):
         Score correlation data by ranges
     """
     try:
-        supabase = get_supabase()
-        
-        # Get signals with both keyword and AI scores
-        response = supabase.table("unified_signals_with_ai").select(
-            "keyword_total, ai_total, combined_score, converted_to_lead"
-        ).gte(
-            "created_at",
-            (datetime.now() - timedelta(days=days)).isoformat()
-        ).not_.is_("ai_total", "null").execute()
+        rollups = await run_blocking(SignalRollupReader(get_supabase()).ai_signal_rollups, days, label="ai_signal_rollups")
         
-        if not response.data:
-            return []
-        
-        # Group by score ranges
-        ranges = {
-            "0-49": {"scores": [], "keyword": [], "ai": [], "converted": 0, "total": 0},
-            "50-69": {"scores": [], "keyword": [], "ai": [], "converted": 0, "total": 0},
-            "70-84": {"scores": [], "keyword": [], "ai": [], "converted": 0, "total": 0},
-            "85-100": {"scores": [], "keyword": [], "ai": [], "converted": 0, "total": 0}
-        }
-        
-        for signal in response.data:
-            score = signal["combined_score"]
-            
-            if score < 50:
-                range_key = "0-49"
-            elif score < 70:
-                range_key = "50-69"
-            elif score < 85:
-                range_key = "70-84"
-            else:
-                range_key = "85-100"
-            
-            ranges[range_key]["total"] += 1
-            ranges[range_key]["keyword"].append(signal["keyword_total"])
-            ranges[range_key]["ai"].append(signal["ai_total"])
-            if signal.get("converted_to_lead"):
-                ranges[range_key]["converted"] += 1
+        # Group by score ranges (signals with an AI score only)
+        ranges = {label: {"keyword": 0, "ai": 0, "converted": 0, "total": 0} for label, _, _ in SCORE_BUCKETS}
+        for rollup in rollups:
+            data = ranges[rollup["score_bucket"]]
+            data["total"] += rollup["ai_scored_count"]
+            data["keyword"] += float(rollup["ai_scored_keyword_sum"])
+            data["ai"] += float(rollup["ai_scored_ai_sum"])
+            data["converted"] += rollup["ai_scored_converted"]
         
         result = []
         for range_key, data in ranges.items():
@@ -178,8 +119,8 @@ async def get_score_correlation(days: int = 30):
                 result.append(ScoreCorrelation(
                     score_range=range_key,
                     count=data["total"],
-                    avg_keyword_score=round(sum(data["keyword"]) / len(data["keyword"]), 2) if data["keyword"] else 0,
-                    avg_ai_score=round(sum(data["ai"]) / len(data["ai"]), 2) if data["ai"] else 0,
+                    avg_keyword_score=round(data["keyword"] / data["total"], 2),
+                    avg_ai_score=round(data["ai"] / data["total"], 2),
                     conversion_rate=round((data["converted"] / data["total"] * 100), 2)
                 ))
         
@@ -201,41 +142,25 @@ async def get_intent_analysis(days: int = 30):
         Intent analysis with conversion rates
     """
     try:
-        supabase = get_supabase()
-        
-        response = supabase.table("unified_signals_with_ai").select(
-            "intent, combined_score, sentiment, converted_to_lead"
-        ).gte(
-            "created_at",
-            (datetime.now() - timedelta(days=days)).isoformat()
-        ).not_.is_("intent", "null").execute()
-        
-        if not response.data:
-            return []
+        rollups = await run_blocking(SignalRollupReader(get_supabase()).ai_signal_rollups, days, label="ai_signal_rollups")
         
         # Aggregate by intent
         intent_stats = {}
-        for signal in response.data:
-            intent = signal["intent"]
-            if intent not in intent_stats:
-                intent_stats[intent] = {
-                    "count": 0,
-                    "scores": [],
-                    "converted": 0,
-                    "sentiments": {}
-                }
-            
-            intent_stats[intent]["count"] += 1
-            intent_stats[intent]["scores"].append(signal["combined_score"])
-            if signal.get("converted_to_lead"):
-                intent_stats[intent]["converted"] += 1
+        for rollup in rollups:
+            intent = rollup["intent"]
+            if not intent:
+                continue
+            stats = intent_stats.setdefault(intent, {"count": 0, "score_sum": 0, "converted": 0, "sentiments": {}})
+            stats["count"] += rollup["signal_count"]
+            stats["score_sum"] += float(rollup["combined_score_sum"])
+            stats["converted"] += rollup["converted_count"]
             
-            sentiment = signal.get("sentiment", "unknown")
-            intent_stats[intent]["sentiments"][sentiment] = intent_stats[intent]["sentiments"].get(sentiment, 0) + 1
+            sentiment = rollup["sentiment"]
+            stats["sentiments"][sentiment] = stats["sentiments"].get(sentiment, 0) + rollup["signal_count"]
         
         result = []
         for intent, stats in intent_stats.items():
-            avg_score = sum(stats["scores"]) / len(stats["scores"]) if stats["scores"] else 0
+            avg_score = stats["score_sum"] / stats["count"] if stats["count"] > 0 else 0
             conversion_rate = (stats["converted"] / stats["count"] * 100) if stats["count"] > 0 else 0
             top_sentiment = max(stats["sentiments"].items(), key=lambda x: x[1])[0] if stats["sentiments"] else "unknown"
             
@@ -259,56 +184,19 @@ async def get_trends(days: int = 30):
     Get daily trends for signals and conversions from both signals and reddit_signals tables
     """
     try:
-        supabase = get_supabase()
-        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
+        rollups = await run_blocking(SignalRollupReader(get_supabase()).signal_rollups, days, label="signal_rollups")
         
         daily_stats = {}
-        
-        # Get from signals table (scraped business data)
-        try:
-            signals_response = supabase.table("signals").select(
-                "created_at, pain_score, status"
-            ).gte("created_at", cutoff_date).execute()
-            
-            for signal in signals_response.data or []:
-                date = signal["created_at"][:10]
-                if date not in daily_stats:
-                    daily_stats[date] = {"total": 0, "scores": [], "hot": 0, "converted": 0}
-                
-                daily_stats[date]["total"] += 1
-                pain_score = signal.get("pain_score", 0)
-                daily_stats[date]["scores"].append(pain_score)
-                if pain_score >= 70:
-                    daily_stats[date]["hot"] += 1
-                if signal.get("status") == "contacted":
-                    daily_stats[date]["converted"] += 1
-        except Exception as e:
-            print(f"Error fetching signals trends: {e}")
-        
-        # Get from reddit_signals table
-        try:
-            reddit_response = supabase.table("reddit_signals").select(
-                "created_at, total_score, ai_tier, alerted"
-            ).gte("created_at", cutoff_date).execute()
-            
-            for signal in reddit_response.data or []:
-                date = signal["created_at"][:10]
-                if date not in daily_stats:
-                    daily_stats[date] = {"total": 0, "scores": [], "hot": 0, "converted": 0}
-                
-                daily_stats[date]["total"] += 1
-                score = signal.get("total_score", 0)
-                daily_stats[date]["scores"].append(score)
-                if signal.get("ai_tier") == "hot" or score >= 70:
-                    daily_stats[date]["hot"] += 1
-                if signal.get("alerted"):
-                    daily_stats[date]["converted"] += 1
-        except Exception as e:
-            print(f"Error fetching reddit trends: {e}")
+        for rollup in rollups:
+            stats = daily_stats.setdefault(rollup["day"], {"total": 0, "score_sum": 0, "hot": 0, "converted": 0})
+            stats["total"] += rollup["signal_count"]
+            stats["score_sum"] += float(rollup["score_sum"])
+            stats["hot"] += rollup["hot_count"]
+            stats["converted"] += rollup["converted_count"]
         
         result = []
         for date, stats in sorted(daily_stats.items(), reverse=True):
-            avg_score = sum(stats["scores"]) / len(stats["scores"]) if stats["scores"] else 0
+            avg_score = stats["score_sum"] / stats["total"] if stats["total"] > 0 else 0
             
             result.append(TrendData(
                 date=date,
@@ -330,63 +218,27 @@ async def get_analytics_summary(days: int = 7):
     Get comprehensive analytics summary from both signals and reddit_signals tables
     """
     try:
-        supabase = get_supabase()
-        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
+        rollups = await run_blocking(SignalRollupReader(get_supabase()).signal_rollups, days, label="signal_rollups")
         
-        all_scores = []
+        total = 0
+        score_sum = 0.0
         sources = {}
         intents = {}
         converted = 0
         hot_leads = 0
         
-        # Get from signals table (scraped business data)
-        try:
-            signals_response = supabase.table("signals").select("*").gte(
-                "created_at", cutoff_date
-            ).execute()
+        for rollup in rollups:
+            count = rollup["signal_count"]
+            total += count
+            score_sum += float(rollup["score_sum"])
+            converted += rollup["converted_count"]
+            hot_leads += rollup["hot_count"]
             
-            for signal in signals_response.data or []:
-                pain_score = signal.get("pain_score", 0)
-                all_scores.append(pain_score)
-                
-                source = signal.get("source", "scraped")
-                sources[source] = sources.get(source, 0) + 1
-                
-                intent = signal.get("signal_type", "business_signal")
-                intents[intent] = intents.get(intent, 0) + 1
-                
-                if signal.get("status") == "contacted":
-                    converted += 1
-                if pain_score >= 70:
-                    hot_leads += 1
-        except Exception as e:
-            print(f"Error fetching signals summary: {e}")
+            sources[rollup["source"]] = sources.get(rollup["source"], 0) + count
+            if rollup["intent"]:
+                intents[rollup["intent"]] = intents.get(rollup["intent"], 0) + count
         
-        # Get from reddit_signals table
-        try:
-            reddit_response = supabase.table("reddit_signals").select("*").gte(
-                "created_at", cutoff_date
-            ).execute()
-            
-            for signal in reddit_response.data or []:
-                score = signal.get("total_score", 0)
-                all_scores.append(score)
-                
-                sources["reddit"] = sources.get("reddit", 0) + 1
-                
-                intent = signal.get("intent", "unknown")
-                if intent:
-                    intents[intent] = intents.get(intent, 0) + 1
-                
-                if signal.get("alerted"):
-                    converted += 1
-                if signal.get("ai_tier") == "hot" or score >= 70:
-                    hot_leads += 1
-        except Exception as e:
-            print(f"Error fetching reddit summary: {e}")
-        
-        total = len(all_scores)
-        avg_score = sum(all_scores) / total if total > 0 else 0
+        avg_score = score_sum / total if total > 0 else 0
         conversion_rate = (converted / total * 100) if total > 0 else 0
         
         top_source = max(sources.items(), key=lambda x: x[1])[0] if sources else None
@@ -406,3 +258,42 @@ async def get_analytics_summary(days: int = 7):
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/rollups/refresh")
+async def refresh_rollups(full_days: Optional[int] = None):
+    """
+    Refresh the daily rollups behind these endpoints.
+    Incremental by default; pass full_days to rebuild that many days.
+    """
+    try:
+        materializer = SignalRollupMaterializer(get_supabase())
+        if full_days:
+            return await run_blocking(materializer.rebuild, full_days, timeout=300, label="rollups_rebuild")
+        return await run_blocking(materializer.refresh, timeout=300, label="rollups_refresh")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/latency/spans")
+async def ingest_latency_spans(request: Request, pilot_id: Optional[str] = None):
+    """
+    Record voice agent latency spans as performance measurements.
+    Point the agent's OTLP exporter (TRACE_OTLP_ENDPOINT) here, or post a
+    JSON list of its JSONL span records.
+    """
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Expected OTLP JSON or a list of span records")
+    if not isinstance(payload, (dict, list)):
+        raise HTTPException(status_code=400, detail="Expected OTLP JSON or a list of span records")
+    
+    try:
+        # Record without a connection, then insert the batch in one request
+        measurements = measurements_from_spans(payload, LatencyPerformanceEngine(), pilot_id=pilot_id)
+        engine = LatencyPerformanceEngine(get_supabase())
+        stored = await run_blocking(engine.store_measurements, measurements, label="latency_ingest")
+        return {"received": len(measurements), "stored": stored}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
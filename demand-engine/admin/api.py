@@ -8,7 +8,7 @@ from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
-from config.supabase_config import get_supabase
+from config.supabase_config import get_supabase, run_query, query_stats
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
@@ -90,7 +90,7 @@ async def get_dashboard_stats():
         supabase = get_supabase()
         
         # Get all leads
-        response = supabase.table("calculator_submissions").select("*").execute()
+        response = await run_query(supabase.table("calculator_submissions").select("*"))
         leads = response.data
         
         if not leads:
@@ -193,7 +193,7 @@ async def get_leads(
         # Order and paginate
         query = query.order("submitted_at", desc=True).range(offset, offset + limit - 1)
         
-        response = query.execute()
+        response = await run_query(query)
         leads = response.data
         
         # Convert to response model
@@ -237,7 +237,7 @@ async def get_lead_detail(session_id: str):
     try:
         supabase = get_supabase()
         
-        response = supabase.table("calculator_submissions").select("*").eq("session_id", session_id).execute()
+        response = await run_query(supabase.table("calculator_submissions").select("*").eq("session_id", session_id))
         
         if not response.data:
             raise HTTPException(status_code=404, detail="Lead not found")
@@ -287,10 +287,9 @@ async def get_timeline_analytics(days: int = Query(30, le=365, description="Days
         
         cutoff = datetime.now(timezone.utc) - timedelta(days=days)
         
-        response = supabase.table("calculator_submissions")\
-            .select("submitted_at, lead_tier, monthly_loss")\
-            .gte("submitted_at", cutoff.isoformat())\
-            .execute()
+        response = await run_query(supabase.table("calculator_submissions")
+            .select("submitted_at, lead_tier, monthly_loss")
+            .gte("submitted_at", cutoff.isoformat()))
         
         leads = response.data
         
@@ -339,9 +338,8 @@ async def get_source_analytics():
     try:
         supabase = get_supabase()
         
-        response = supabase.table("calculator_submissions")\
-            .select("referral_source, lead_tier, monthly_loss")\
-            .execute()
+        response = await run_query(supabase.table("calculator_submissions")
+            .select("referral_source, lead_tier, monthly_loss"))
         
         leads = response.data
         
@@ -404,7 +402,7 @@ async def export_leads_csv(
             cutoff = datetime.now(timezone.utc) - timedelta(days=days)
             query = query.gte("submitted_at", cutoff.isoformat())
         
-        response = query.execute()
+        response = await run_query(query)
         leads = response.data
         
         # Generate CSV
@@ -455,3 +453,14 @@ async def export_leads_csv(
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to export CSV: {str(e)}")
+
+
+@router.get("/db/query-stats")
+async def get_query_stats():
+    """
+    Per-query timing for this worker (count, avg/max ms, timeouts, errors)
+    """
+    return {
+        "stats": query_stats.snapshot(),
+        "generated_at": datetime.now(timezone.utc).isoformat()
+    }
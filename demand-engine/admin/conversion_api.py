@@ -160,13 +160,13 @@ async def get_conversion_timeline(days: int = 30):
         converter = LeadConverter()
         
         # Get timeline data from database
-        from config.supabase_config import get_supabase
+        from config.supabase_config import get_supabase, run_query
         supabase = get_supabase()
         
-        response = supabase.rpc(
+        response = await run_query(supabase.rpc(
             "get_conversion_timeline",
             {"days_back": days}
-        ).execute()
+        ))
         
         if not response.data:
             return []
@@ -199,13 +199,13 @@ async def get_eligible_signals(min_score: int = 70, limit: int = 50):
         List of eligible signals
     """
     try:
-        from config.supabase_config import get_supabase
+        from config.supabase_config import get_supabase, run_query
         supabase = get_supabase()
         
-        response = supabase.rpc(
+        response = await run_query(supabase.rpc(
             "get_high_value_pending_signals",
             {"min_score": min_score, "max_results": limit}
-        ).execute()
+        ))
         
         return {
             "count": len(response.data) if response.data else 0,
@@ -9,19 +9,28 @@ from datetime import datetime, timedelta
 import logging
 import os
 
+from config.supabase_config import run_query
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/scraped-leads", tags=["scraped-leads"])
 
+_supabase_client = None
+
+
 def get_supabase_client():
-    """Get Supabase client"""
+    """Get Supabase client (created once and reused across requests)"""
+    global _supabase_client
+    if _supabase_client is not None:
+        return _supabase_client
     try:
         from supabase import create_client
         url = os.getenv("SUPABASE_URL", "https://soudakcdmpcfavticrxd.supabase.co")
         key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
         if not key:
             return None
-        return create_client(url, key)
+        _supabase_client = create_client(url, key)
+        return _supabase_client
     except Exception as e:
         logger.error(f"Failed to create Supabase client: {e}")
         return None
@@ -54,7 +63,7 @@ async def get_scraped_leads(
                 elif priority == "low":
                     signals_query = signals_query.lt("pain_score", 40)
                 
-                signals_result = signals_query.execute()
+                signals_result = await run_query(signals_query)
                 
                 for signal in signals_result.data:
                     pain_score = signal.get("pain_score", 0) or 0
@@ -77,7 +86,7 @@ async def get_scraped_leads(
             # Fetch from job_board_signals if exists
             if not source or source == "job_board":
                 try:
-                    job_result = supabase.table("job_board_signals").select("*").order("created_at", desc=True).limit(limit).execute()
+                    job_result = await run_query(supabase.table("job_board_signals").select("*").order("created_at", desc=True).limit(limit))
                     for job in job_result.data:
                         score = job.get("score", 0) or 0
                         all_leads.append({
@@ -99,7 +108,7 @@ async def get_scraped_leads(
             # Fetch from bbb_signals if exists
             if not source or source == "bbb":
                 try:
-                    bbb_result = supabase.table("bbb_signals").select("*").order("created_at", desc=True).limit(limit).execute()
+                    bbb_result = await run_query(supabase.table("bbb_signals").select("*").order("created_at", desc=True).limit(limit))
                     for bbb in bbb_result.data:
                         score = bbb.get("score", 0) or 0
                         all_leads.append({
@@ -121,7 +130,7 @@ async def get_scraped_leads(
             # Fetch from licensing_signals if exists
             if not source or source == "licensing":
                 try:
-                    lic_result = supabase.table("licensing_signals").select("*").order("created_at", desc=True).limit(limit).execute()
+                    lic_result = await run_query(supabase.table("licensing_signals").select("*").order("created_at", desc=True).limit(limit))
                     for lic in lic_result.data:
                         score = lic.get("score", 0) or 0
                         all_leads.append({
@@ -143,7 +152,7 @@ async def get_scraped_leads(
             # Fetch from local_business_signals if exists
             if not source or source == "local_business":
                 try:
-                    local_result = supabase.table("local_business_signals").select("*").order("created_at", desc=True).limit(limit).execute()
+                    local_result = await run_query(supabase.table("local_business_signals").select("*").order("created_at", desc=True).limit(limit))
                     for local in local_result.data:
                         score = local.get("score", 0) or 0
                         all_leads.append({
@@ -8,7 +8,7 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 
-from config.supabase_config import get_supabase
+from config.supabase_config import get_supabase, run_query
 
 router = APIRouter(prefix="/api/admin/signals", tags=["Pain Signals"])
 
@@ -100,10 +100,10 @@ async def get_signal_stats(
         
         # Try to get from unified view first
         try:
-            result = supabase.rpc(
+            result = await run_query(supabase.rpc(
                 'get_signal_stats',
                 {'days_back': days}
-            ).execute()
+            ))
             
             if result.data:
                 return result.data[0]
@@ -115,19 +115,17 @@ async def get_signal_stats(
         scraped_signals = []
         
         try:
-            reddit_result = supabase.table("reddit_signals")\
-                .select("*")\
-                .gte("created_at", cutoff_date)\
-                .execute()
+            reddit_result = await run_query(supabase.table("reddit_signals")
+                .select("*")
+                .gte("created_at", cutoff_date))
             reddit_signals = reddit_result.data or []
         except:
             pass
         
         try:
-            scraped_result = supabase.table("signals")\
-                .select("*")\
-                .gte("created_at", cutoff_date)\
-                .execute()
+            scraped_result = await run_query(supabase.table("signals")
+                .select("*")
+                .gte("created_at", cutoff_date))
             scraped_signals = scraped_result.data or []
         except:
             pass
@@ -238,9 +236,8 @@ async def list_signals(
                 if alerted is not None:
                     query = query.eq("alerted", alerted)
                 
-                result = query.order("created_at", desc=True)\
-                    .range(offset, offset + limit - 1)\
-                    .execute()
+                result = await run_query(query.order("created_at", desc=True)
+                    .range(offset, offset + limit - 1))
                 
                 for signal in result.data:
                     signals.append(SignalSummary(
@@ -281,9 +278,8 @@ async def list_signals(
                     else:
                         query = query.neq("status", "contacted")
                 
-                result = query.order("created_at", desc=True)\
-                    .range(offset, offset + limit - 1)\
-                    .execute()
+                result = await run_query(query.order("created_at", desc=True)
+                    .range(offset, offset + limit - 1))
                 
                 for signal in result.data:
                     pain_score = signal.get('pain_score', 0)
@@ -330,10 +326,9 @@ async def get_signal_detail(signal_id: str):
         supabase = get_supabase()
         
         # Try to find in reddit_signals
-        result = supabase.table("reddit_signals")\
-            .select("*")\
-            .eq("id", signal_id)\
-            .execute()
+        result = await run_query(supabase.table("reddit_signals")
+            .select("*")
+            .eq("id", signal_id))
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Signal not found")
@@ -401,10 +396,9 @@ async def mark_signal_alerted(signal_id: str):
     try:
         supabase = get_supabase()
         
-        result = supabase.table("reddit_signals")\
-            .update({"alerted": True})\
-            .eq("id", signal_id)\
-            .execute()
+        result = await run_query(supabase.table("reddit_signals")
+            .update({"alerted": True})
+            .eq("id", signal_id))
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Signal not found")
@@ -426,13 +420,12 @@ async def get_pending_high_value_signals(
     try:
         supabase = get_supabase()
         
-        result = supabase.table("reddit_signals")\
-            .select("*")\
-            .eq("alerted", False)\
-            .gte("total_score", min_score)\
-            .order("total_score", desc=True)\
-            .limit(limit)\
-            .execute()
+        result = await run_query(supabase.table("reddit_signals")
+            .select("*")
+            .eq("alerted", False)
+            .gte("total_score", min_score)
+            .order("total_score", desc=True)
+            .limit(limit))
         
         signals = []
         for signal in result.data:
@@ -4,13 +4,21 @@ Handles joining Daily rooms, audio streaming, and OpenAI integration
 """
 
 import asyncio
+import io
 import os
 import logging
-from typing import Optional, Dict, Any
+import time
+import wave
+from collections import deque
+from typing import AsyncIterator, Deque, Optional, Dict, Any
 from datetime import datetime
 import httpx
 from services.openai_service import get_openai_service
 from ai_agent.sales_flow import PhaseManager, Phase, PHASE_CONFIGS, qualify_icp, CTA_OPTIONS
+from ai_agent.vad import Endpointer, VADConfig, VADEvent
+
+# Daily delivers participant audio as 16-bit PCM
+DAILY_SAMPLE_RATE = 16000
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +45,15 @@ class DailyAIBot:
         self.conversation_history = []
         self.discovery_answers = {}
         
+        # Customer audio from the room (PCM16 chunks); set once the WebRTC
+        # connection is up. listen() endpoints it with the shared VAD.
+        self.audio_frames: Optional[AsyncIterator[bytes]] = None
+        self.endpointer = Endpointer(VADConfig(sample_rate=DAILY_SAMPLE_RATE, encoding="pcm16"))
+        self._next_frame: Optional[asyncio.Future] = None
+        # Events that followed the last returned utterance in its chunk; None
+        # when the next listen() should start the endpointer afresh
+        self._leftover_events: Optional[Deque[VADEvent]] = None
+        
     async def join_room(self):
         """
         Join Daily.co room as AI bot
@@ -297,21 +314,72 @@ class DailyAIBot:
             
             logger.info("AI listening for customer response...")
             
-            # In production: Capture audio from Daily.co room via WebRTC
-            # For now, simulate with placeholder
-            await asyncio.sleep(timeout)
+            if self.audio_frames is None:
+                # No room audio yet (WebRTC connection is a placeholder)
+                await asyncio.sleep(timeout)
+                return None
             
-            # Placeholder: In production, this would be real audio
-            # audio_data = await self.capture_audio_from_daily()
-            # stt_result = await self.openai_service.transcribe_audio(audio_data)
+            utterance = await self.capture_utterance(timeout)
+            if not utterance:
+                return None
             
-            # For testing, return None (no audio captured)
-            return None
+            stt_result = await self.openai_service.transcribe_audio(self._to_wav(utterance))
+            self.total_cost += stt_result.get("cost", 0)
+            return stt_result.get("text") or None
             
         except Exception as e:
             logger.error(f"Error listening: {e}")
             return None
     
+    async def capture_utterance(self, timeout: float) -> Optional[bytes]:
+        """
+        Read room audio until the endpointer closes an utterance.
+        
+        Waits up to `timeout` seconds for the customer to start talking; once
+        they have, waits for them to finish (up to the VAD's max utterance).
+        """
+        deadline = time.monotonic() + timeout
+        events, self._leftover_events = self._leftover_events, None
+        if events is None:
+            self.endpointer.reset()
+            events = deque()
+        while True:
+            # A chunk can close one utterance and open the next: keep the rest
+            # (and the endpointer's state) for the next call
+            while events:
+                event = events.popleft()
+                if event.kind == "end":
+                    self._leftover_events = events
+                    return event.audio
+            remaining = None if self.endpointer.in_speech else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            # Keep an unfinished read for the next call rather than cancelling
+            # it, which would close the room's audio stream
+            if self._next_frame is None:
+                self._next_frame = asyncio.ensure_future(self.audio_frames.__anext__())
+            done, _ = await asyncio.wait({self._next_frame}, timeout=remaining)
+            if not done:
+                return None
+            read, self._next_frame = self._next_frame, None
+            try:
+                chunk = read.result()
+            except StopAsyncIteration:
+                event = self.endpointer.flush()
+                return event.audio if event and event.kind == "end" else None
+            events.extend(self.endpointer.feed(chunk))
+    
+    @staticmethod
+    def _to_wav(pcm: bytes) -> bytes:
+        """Wrap PCM16 mono room audio in a WAV container for Whisper."""
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(DAILY_SAMPLE_RATE)
+            wav.writeframes(pcm)
+        return buffer.getvalue()
+    
     async def generate_follow_up(self, question: str, answer: str) -> Optional[str]:
         """
         Generate intelligent follow-up question using LLM
@@ -0,0 +1,57 @@
+"""
+Test streaming transcription through OpenAIService with a fake Whisper client
+"""
+
+import asyncio
+import sys
+import wave
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ai_agent.test_vad import RATE, _noise, _pcm, _voice
+
+
+class FakeTranscriptions:
+    def __init__(self):
+        self.requests = []
+
+    async def create(self, **kwargs):
+        with wave.open(kwargs["file"]) as wav:
+            seconds = wav.getnframes() / wav.getframerate()
+            self.requests.append((wav.getframerate(), seconds, kwargs))
+        text = f"utterance {len(self.requests)}"
+        words = [SimpleNamespace(word=w, start=0.1 + i * 0.3, end=0.3 + i * 0.3) for i, w in enumerate(text.split())]
+        return SimpleNamespace(text=text, words=words)
+
+
+def test_transcribe_streaming_yields_one_text_per_utterance(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    from services.openai_service import OpenAIService
+
+    service = OpenAIService()
+    fake = FakeTranscriptions()
+    service.client = SimpleNamespace(audio=SimpleNamespace(transcriptions=fake))
+
+    rng = np.random.default_rng(5)
+    audio = _pcm(np.concatenate([
+        _noise(1.0, rng), _voice(1.0, rng), _noise(1.5, rng), _voice(1.4, rng, f0=200), _noise(0.3, rng),
+    ]))
+
+    async def stream():
+        for i in range(0, len(audio), 640):  # 20ms chunks
+            yield audio[i:i + 640]
+
+    async def collect():
+        return [text async for text in service.transcribe_streaming(stream())]
+
+    texts = asyncio.run(collect())
+
+    # The second utterance is cut off by the end of the stream and flushed
+    assert texts == ["utterance 1", "utterance 2"]
+    assert [rate for rate, _, _ in fake.requests] == [RATE, RATE]
+    assert all(kwargs["timestamp_granularities"] == ["word"] for _, _, kwargs in fake.requests)
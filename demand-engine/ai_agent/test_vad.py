@@ -0,0 +1,93 @@
+"""
+Test the Daily bot's VAD endpointing on synthetic 16kHz PCM
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ai_agent.daily_bot import DailyAIBot
+from ai_agent.vad import Endpointer, VADConfig
+
+RATE = 16000
+
+
+def _voice(seconds, rng, f0=140.0):
+    # Harmonics under a couple of formant bumps, slightly wobbly pitch
+    t = np.arange(int(seconds * RATE)) / RATE
+    pitch = f0 * (1 + 0.03 * np.sin(2 * np.pi * 3 * t))
+    phase = 2 * np.pi * np.cumsum(pitch) / RATE
+    signal = sum(
+        np.sin(k * phase) * (np.exp(-((k * f0 - 500) / 300) ** 2) + 0.6 * np.exp(-((k * f0 - 1500) / 400) ** 2))
+        for k in range(1, 25)
+    )
+    # Syllables: ~4/s loudness swings (a steady tone would read as a fan)
+    syllables = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * t) ** 2
+    envelope = np.minimum(1, np.minimum(t, t[-1] - t) / 0.03) * syllables
+    return signal * envelope * 3000 + rng.normal(0, 30, t.size)
+
+
+def _noise(seconds, rng):
+    return rng.normal(0, 30, int(seconds * RATE))
+
+
+def _pcm(samples):
+    return np.clip(samples, -32768, 32767).astype("<i2").tobytes()
+
+
+def test_endpointer_returns_each_utterance():
+    rng = np.random.default_rng(7)
+    audio = np.concatenate([
+        _noise(1.0, rng), _voice(1.2, rng), _noise(1.5, rng),
+        _voice(0.8, rng, f0=210), _noise(1.5, rng),
+    ])
+    endpointer = Endpointer(VADConfig(sample_rate=RATE, encoding="pcm16"))
+
+    events = []
+    data = _pcm(audio)
+    for i in range(0, len(data), 1234):  # chunk sizes that don't align with frames
+        events.extend(endpointer.feed(data[i:i + 1234]))
+
+    ends = [e for e in events if e.kind == "end"]
+    assert [e.kind for e in events] == ["start", "end", "start", "end"]
+    assert abs(ends[0].start_ms - 1000) <= 300
+    assert abs(ends[1].start_ms - 3700) <= 300
+    # Utterance audio spans the speech plus preroll and kept trailing silence
+    assert len(ends[0].audio) >= 1.2 * RATE * 2
+
+
+def test_noise_only_produces_no_utterance():
+    rng = np.random.default_rng(3)
+    endpointer = Endpointer(VADConfig(sample_rate=RATE, encoding="pcm16"))
+    events = endpointer.feed(_pcm(_noise(5.0, rng) * 5))
+    assert not [e for e in events if e.kind == "end"]
+
+
+def test_listen_keeps_the_utterance_after_a_returned_one():
+    rng = np.random.default_rng(11)
+    # Both utterances arrive in one chunk
+    audio = _pcm(np.concatenate([
+        _noise(1.0, rng), _voice(1.2, rng), _noise(1.5, rng), _voice(0.8, rng, f0=210), _noise(1.5, rng),
+    ]))
+
+    async def room():
+        yield audio
+
+    # Just the audio path; the rest of the bot needs OpenAI and Daily
+    bot = object.__new__(DailyAIBot)
+    bot.audio_frames = room()
+    bot.endpointer = Endpointer(VADConfig(sample_rate=RATE, encoding="pcm16"))
+    bot._next_frame = None
+    bot._leftover_events = None
+
+    async def two_turns():
+        return await bot.capture_utterance(1.0), await bot.capture_utterance(1.0)
+
+    first, second = asyncio.run(two_turns())
+    assert first and second and first != second
+    assert len(first) >= 1.2 * RATE * 2 and 0.8 * RATE * 2 <= len(second) < 1.2 * RATE * 2
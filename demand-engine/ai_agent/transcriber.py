@@ -0,0 +1,390 @@
+# Vendored from hvac_agent/app/services/audio/transcriber.py by scripts/sync_shared_modules.py.
+# Do not edit here: change the original and re-run the script.
+"""
+Streaming speech-to-text on top of the VAD endpointer.
+
+Transcribing a whole utterance after the caller stops talking puts the full
+STT round trip (which grows with the utterance length) on the turn's
+critical path. Instead, while the caller is still speaking, audio is sent
+in overlapping windows as soon as each one fills:
+
+    window 0: [0.0s ........ 3.0s]
+    window 1:           [2.0s ........ 5.0s]
+    tail:                         [4.0s .... end]
+
+Requests run concurrently (up to max_in_flight per call). When the
+endpointer closes the utterance only the tail is left to transcribe, so
+the wait is one short request instead of one long one.
+
+Windows are stitched using word timestamps: each word is kept by the
+window in which its midpoint falls inside the middle of the window (more
+than overlap/2 from a cut edge), so words cut at a window boundary come
+from the neighbouring window that heard them whole and are never doubled.
+If a window fails, the utterance falls back to one request for all of it.
+
+Usage:
+    transcriber = StreamingTranscriber(WhisperBackend(), Endpointer())
+    for event in transcriber.feed(ulaw_bytes):
+        if event.kind == "start":
+            ...                               # barge-in
+        elif event.kind == "end":
+            text = await event.transcript.text()
+
+Backends are pluggable: WhisperBackend (OpenAI API), LocalBackend
+(faster-whisper on the box, optional dependency) or anything implementing
+TranscriptionBackend.transcribe().
+
+Like vad.py, this file is the original; demand-engine/ai_agent/ gets a
+generated copy from demand-engine/scripts/sync_shared_modules.py.
+"""
+
+import asyncio
+import io
+import logging
+import os
+import time
+import wave
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional
+
+import numpy as np
+
+from .vad import Endpointer, ulaw_to_pcm16
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+STT_WINDOW_MS = int(os.getenv("STT_WINDOW_MS", "3000"))
+STT_OVERLAP_MS = int(os.getenv("STT_OVERLAP_MS", "1000"))
+STT_MAX_IN_FLIGHT = int(os.getenv("STT_MAX_IN_FLIGHT", "3"))
+
+
+def pcm16_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    """Wrap mono PCM16 in a WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+@dataclass
+class Word:
+    text: str
+    start: float  # Seconds from the start of the audio sent
+    end: float
+
+
+@dataclass
+class WindowResult:
+    text: str
+    words: List[Word] = field(default_factory=list)
+
+
+class TranscriptionBackend:
+    """Transcribes one chunk of mono PCM16 audio, with word timings."""
+
+    name = "base"
+
+    async def transcribe(self, pcm: bytes, sample_rate: int) -> WindowResult:
+        raise NotImplementedError
+
+
+class WhisperBackend(TranscriptionBackend):
+    """OpenAI transcription API (whisper-1 with word timestamps)."""
+
+    name = "whisper"
+
+    def __init__(self, client=None, model: str = "whisper-1", language: str = "en"):
+        self._client = client
+        self.model = model
+        self.language = language
+
+    @property
+    def client(self):
+        if self._client is None:
+            import openai
+            self._client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return self._client
+
+    async def transcribe(self, pcm: bytes, sample_rate: int) -> WindowResult:
+        audio_file = io.BytesIO(pcm16_to_wav(pcm, sample_rate))
+        audio_file.name = "audio.wav"
+        response = await self.client.audio.transcriptions.create(
+            model=self.model,
+            file=audio_file,
+            language=self.language,
+            response_format="verbose_json",
+            timestamp_granularities=["word"],
+        )
+        words = [Word(w.word, w.start, w.end) for w in (getattr(response, "words", None) or [])]
+        return WindowResult(response.text, words)
+
+
+class LocalBackend(TranscriptionBackend):
+    """
+    On-box model via faster-whisper (pip install faster-whisper).
+
+    No network round trip; inference runs in worker threads so the event
+    loop keeps serving audio. Size the box for max_in_flight concurrent
+    windows per call.
+    """
+
+    name = "local"
+    MODEL_RATE = 16000
+
+    def __init__(self, model_size: str = "base.en", device: str = "cpu",
+                 compute_type: str = "int8", workers: int = STT_MAX_IN_FLIGHT):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RuntimeError("LocalBackend requires faster-whisper (pip install faster-whisper)") from e
+        self.model = WhisperModel(model_size, device=device, compute_type=compute_type, num_workers=workers)
+
+    async def transcribe(self, pcm: bytes, sample_rate: int) -> WindowResult:
+        samples = np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768
+        if sample_rate != self.MODEL_RATE:
+            positions = np.arange(0, len(samples), sample_rate / self.MODEL_RATE)
+            samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+        return await asyncio.to_thread(self._run, samples)
+
+    def _run(self, samples: np.ndarray) -> WindowResult:
+        segments, _ = self.model.transcribe(samples, language="en", beam_size=1, word_timestamps=True)
+        segments = list(segments)
+        words = [Word(w.word, w.start, w.end) for s in segments for w in (s.words or [])]
+        return WindowResult("".join(s.text for s in segments).strip(), words)
+
+
+# =============================================================================
+# STREAMING TRANSCRIBER
+# =============================================================================
+@dataclass
+class _Window:
+    start_ms: int  # Offsets into the utterance audio
+    end_ms: int
+    task: Optional[asyncio.Task] = None
+    result: Optional[WindowResult] = None
+    failed: bool = False
+
+
+class Transcript:
+    """Text of one utterance, assembled from its window requests."""
+
+    def __init__(self, start_ms: int, overlap_ms: int):
+        self.start_ms = start_ms
+        self.end_ms: Optional[int] = None
+        self.latency_ms: Optional[float] = None  # Utterance end -> final text
+        self.windows: List[_Window] = []
+        self._overlap_s = overlap_ms / 1000
+        self._final: Optional[asyncio.Task] = None
+
+    @property
+    def partial(self) -> str:
+        """Text of the windows finished so far (the end may still change)."""
+        return self._stitch(final=False)
+
+    async def text(self) -> str:
+        """Final text; waits for the remaining windows."""
+        if self._final is None:
+            raise RuntimeError("utterance has not ended")
+        return await self._final
+
+    def cancel(self):
+        for window in self.windows:
+            if window.task and not window.task.done():
+                window.task.cancel()
+        if self._final and not self._final.done():
+            self._final.cancel()
+
+    def _stitch(self, final: bool) -> str:
+        windows = self.windows
+        if final and len(windows) == 1:
+            result = windows[0].result
+            return result.text.strip() if result else ""
+
+        half = self._overlap_s / 2
+        words = []
+        for i, window in enumerate(windows):
+            if window.result is None:
+                continue
+            start_s, end_s = window.start_ms / 1000, window.end_ms / 1000
+            low = start_s + half if i > 0 else float("-inf")
+            high = float("inf") if final and i == len(windows) - 1 else end_s - half
+            for word in window.result.words:
+                middle = start_s + (word.start + word.end) / 2
+                if low <= middle < high and word.text.strip():
+                    words.append(word.text.strip())
+        return " ".join(words)
+
+
+@dataclass
+class SpeechEvent:
+    """Transcriber output. kind: "start", "end" or "noise" (as VADEvent)."""
+    kind: str
+    start_ms: int
+    end_ms: int
+    transcript: Optional[Transcript] = None
+
+
+class StreamingTranscriber:
+    """
+    Endpoints an audio stream and transcribes each utterance incrementally.
+
+    One instance per call: feed() it every inbound chunk from a running
+    event loop; window requests are started in the background.
+    """
+
+    def __init__(
+        self,
+        backend: TranscriptionBackend,
+        endpointer: Optional[Endpointer] = None,
+        window_ms: int = STT_WINDOW_MS,
+        overlap_ms: int = STT_OVERLAP_MS,
+        max_in_flight: int = STT_MAX_IN_FLIGHT,
+    ):
+        if not 0 <= overlap_ms < window_ms:
+            raise ValueError("overlap_ms must be smaller than window_ms")
+        self.backend = backend
+        self.endpointer = endpointer or Endpointer()
+        self.window_ms = window_ms
+        self.overlap_ms = overlap_ms
+        self.step_ms = window_ms - overlap_ms
+        config = self.endpointer.config
+        self.sample_rate = config.sample_rate
+        self._bytes_per_ms = config.frame_bytes / config.frame_ms
+        self._slots = asyncio.Semaphore(max(1, max_in_flight))
+        self._current: Optional[Transcript] = None
+        self._finishing: List[Transcript] = []
+        # Stats
+        self.utterances = 0
+        self.requests = 0
+        self.failures = 0
+        self.fallbacks = 0
+        self.audio_ms_sent = 0
+        self._latencies: Deque[float] = deque(maxlen=200)
+
+    def feed(self, audio: bytes) -> List[SpeechEvent]:
+        """Process a chunk of audio; return any events it completed."""
+        events = []
+        for event in self.endpointer.feed(audio):
+            if event.kind == "start":
+                self._current = Transcript(event.start_ms, self.overlap_ms)
+                events.append(SpeechEvent("start", event.start_ms, event.end_ms, self._current))
+                continue
+            transcript, self._current = self._current, None
+            if transcript is None:
+                continue
+            if event.kind == "end":
+                self._end(transcript, event.audio, event.end_ms)
+            else:
+                transcript.cancel()
+            events.append(SpeechEvent(event.kind, event.start_ms, event.end_ms, transcript))
+
+        if self._current is not None:
+            self._send_due_windows(self._current)
+        return events
+
+    def flush(self) -> Optional[SpeechEvent]:
+        """End the current utterance now (stream stopped mid-sentence)."""
+        event = self.endpointer.flush()
+        transcript, self._current = self._current, None
+        if event is None or transcript is None:
+            return None
+        if event.kind == "end":
+            self._end(transcript, event.audio, event.end_ms)
+        else:
+            transcript.cancel()
+        return SpeechEvent(event.kind, event.start_ms, event.end_ms, transcript)
+
+    def close(self):
+        """Cancel every outstanding request (call ended)."""
+        for transcript in [self._current] + self._finishing:
+            if transcript is not None:
+                transcript.cancel()
+        self._current = None
+        self._finishing.clear()
+        self.endpointer.reset()
+
+    def _send_due_windows(self, transcript: Transcript):
+        length_ms = self.endpointer.utterance_ms
+        start_ms = len(transcript.windows) * self.step_ms
+        if length_ms < start_ms + self.window_ms:
+            return
+        audio = self.endpointer.utterance_audio()
+        while length_ms >= start_ms + self.window_ms:
+            self._send(transcript, audio, start_ms, start_ms + self.window_ms)
+            start_ms += self.step_ms
+
+    def _send(self, transcript: Transcript, audio: bytes, start_ms: int, end_ms: int):
+        chunk = audio[int(start_ms * self._bytes_per_ms):int(end_ms * self._bytes_per_ms)]
+        if self.endpointer.config.encoding == "ulaw":
+            pcm = ulaw_to_pcm16(chunk).tobytes()
+        else:
+            pcm = chunk
+        window = _Window(start_ms, end_ms)
+        window.task = asyncio.ensure_future(self._request(window, pcm))
+        transcript.windows.append(window)
+
+    async def _request(self, window: _Window, pcm: bytes):
+        async with self._slots:
+            self.requests += 1
+            self.audio_ms_sent += window.end_ms - window.start_ms
+            try:
+                window.result = await self.backend.transcribe(pcm, self.sample_rate)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                window.failed = True
+                self.failures += 1
+                logger.warning("%s transcription failed for %d-%dms: %s",
+                               self.backend.name, window.start_ms, window.end_ms, str(e))
+
+    def _end(self, transcript: Transcript, audio: bytes, end_ms: int):
+        transcript.end_ms = end_ms
+        length_ms = int(len(audio) / self._bytes_per_ms)
+        windows = transcript.windows
+        if not windows or length_ms > windows[-1].end_ms:
+            # Tail: everything after the last window's middle
+            start_ms = windows[-1].start_ms + self.step_ms if windows else 0
+            self._send(transcript, audio, start_ms, length_ms)
+        self.utterances += 1
+        self._finishing.append(transcript)
+        transcript._final = asyncio.ensure_future(self._finish(transcript, audio, time.perf_counter()))
+
+    async def _finish(self, transcript: Transcript, audio: bytes, ended_at: float) -> str:
+        try:
+            await asyncio.gather(*(w.task for w in transcript.windows))
+            if len(transcript.windows) > 1 and any(w.failed for w in transcript.windows):
+                # A missing window would drop words mid-sentence; redo it whole
+                self.fallbacks += 1
+                for window in transcript.windows:
+                    window.task = None
+                transcript.windows = []
+                self._send(transcript, audio, 0, int(len(audio) / self._bytes_per_ms))
+                await transcript.windows[0].task
+            text = transcript._stitch(final=True)
+            transcript.latency_ms = (time.perf_counter() - ended_at) * 1000
+            self._latencies.append(transcript.latency_ms)
+            return text
+        finally:
+            if transcript in self._finishing:
+                self._finishing.remove(transcript)
+
+    def get_stats(self) -> dict:
+        latencies = sorted(self._latencies)
+        return {
+            "backend": self.backend.name,
+            "utterances": self.utterances,
+            "requests": self.requests,
+            "failures": self.failures,
+            "fallbacks": self.fallbacks,
+            "audio_seconds_sent": round(self.audio_ms_sent / 1000, 1),
+            "final_latency_p50_ms": round(latencies[len(latencies) // 2]) if latencies else None,
+            "final_latency_p95_ms": round(latencies[int(len(latencies) * 0.95)]) if latencies else None,
+        }
@@ -0,0 +1,364 @@
+# Vendored from hvac_agent/app/services/audio/vad.py by scripts/sync_shared_modules.py.
+# Do not edit here: change the original and re-run the script.
+"""
+Voice activity detection and endpointing for streaming audio.
+
+Frames (20ms) are classified from decoded PCM using:
+- Log energy against an adaptive noise floor (tracks non-speech frames,
+  and steady noise such as a fan switching on is absorbed within a second)
+- Spectral flatness (voiced speech is peaky, noise is flat)
+- Zero-crossing rate (rejects hiss that is only moderately loud)
+
+Features are computed with numpy for all frames of a chunk at once; only the
+small per-frame state machine runs in Python. The Endpointer adds onset and
+hangover timers on top and returns whole utterances.
+
+Usage:
+    endpointer = Endpointer()                 # Twilio: μ-law, 8kHz
+    for event in endpointer.feed(ulaw_bytes):
+        if event.kind == "start":
+            ...                               # caller started talking (barge-in)
+        elif event.kind == "end":
+            transcribe(event.audio)           # utterance, same encoding as input
+
+Only numpy and the standard library are used, so the same file serves
+both apps: this original in hvac_agent/app/services/audio/ (Twilio bridges)
+and a generated copy in demand-engine/ai_agent/ (Daily bot), written by
+demand-engine/scripts/sync_shared_modules.py.
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional
+
+import numpy as np
+
+
+# =============================================================================
+# μ-LAW CODEC (G.711)
+# =============================================================================
+def _ulaw_decode_table() -> np.ndarray:
+    codes = ~np.arange(256, dtype=np.uint8)
+    exponent = (codes >> 4) & 0x07
+    mantissa = (codes & 0x0F).astype(np.int32)
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(codes & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+ULAW_TO_PCM16 = _ulaw_decode_table()
+TONAL_BINS = 6  # Two tones (DTMF) through a Hann window
+
+ULAW_SEGMENT_ENDS = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+
+
+def ulaw_to_pcm16(ulaw: bytes) -> np.ndarray:
+    """Decode μ-law bytes to int16 samples."""
+    return ULAW_TO_PCM16[np.frombuffer(ulaw, dtype=np.uint8)]
+
+
+def pcm16_to_ulaw(pcm: np.ndarray) -> bytes:
+    """Encode int16 samples to μ-law bytes (same output as audioop.lin2ulaw)."""
+    value = np.asarray(pcm, dtype=np.int32) >> 2
+    mask = np.where(value < 0, 0x7F, 0xFF)
+    value = np.minimum(np.abs(value) + 0x21, 0x1FDF)
+    segment = np.searchsorted(ULAW_SEGMENT_ENDS, value)
+    code = (segment << 4) | ((value >> (segment + 1)) & 0x0F)
+    return (code ^ mask).astype(np.uint8).tobytes()
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+@dataclass
+class VADConfig:
+    """Detector and endpointer settings. Defaults suit 8kHz telephone audio."""
+    sample_rate: int = 8000
+    encoding: str = "ulaw"            # "ulaw" or "pcm16" (little-endian)
+    frame_ms: int = 20
+    # Frame classification
+    band_low_hz: float = 250.0        # Speech band; hum and rumble below it are ignored
+    band_high_hz: float = 3500.0
+    snr_db: float = 10.0              # Above noise floor to count as speech...
+    flatness_max: float = 0.35        # ...when the spectrum is also peaky
+    strong_snr_db: float = 20.0       # Loud enough to count regardless of shape
+    strong_flatness_max: float = 0.5
+    zcr_max: float = 0.5              # Crossings per sample; higher is hiss
+    tonality_max: float = 0.9         # Pure tones (DTMF, beeps) are not speech
+    min_energy_db: float = -50.0      # Absolute floor (dBFS)
+    noise_window_ms: int = 3000       # Floor never below this window's minimum
+    noise_floor_min_db: float = -65.0
+    floor_fall: float = 0.3           # Per-frame floor smoothing toward quieter frames...
+    floor_rise: float = 0.05          # ...and toward louder non-speech frames
+    stationary_ms: int = 400          # Energy this steady for this long is noise
+    stationary_db: float = 3.0
+    # Endpointing
+    onset_ms: int = 100               # Speech needed to start an utterance
+    hangover_ms: int = 600            # Silence needed to end it
+    resume_ms: int = 60               # Speech needed to reset the hangover
+    preroll_ms: int = 200             # Audio kept from before the onset
+    min_utterance_ms: int = 250       # Shorter utterances are dropped as noise
+    max_utterance_ms: int = 15000
+
+    @property
+    def frame_samples(self) -> int:
+        return self.sample_rate * self.frame_ms // 1000
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.frame_samples * (1 if self.encoding == "ulaw" else 2)
+
+    def frames(self, ms: int) -> int:
+        return max(1, ms // self.frame_ms)
+
+
+# =============================================================================
+# FRAME CLASSIFIER
+# =============================================================================
+class VoiceActivityDetector:
+    """
+    Per-frame speech/non-speech classifier with an adaptive noise floor.
+
+    The floor follows non-speech frames (fast down, slower up) and never sits
+    below the quietest frame of the last NOISE_WINDOW_MS, so rising noise is
+    absorbed even if it was first taken for speech. A loud but stationary
+    stretch (energy steady for STATIONARY_MS, which speech never is) is
+    treated as the new floor straight away.
+
+    Usage:
+        vad = VoiceActivityDetector()
+        is_speech = vad.classify(pcm_frames)   # (n_frames, frame_samples) int16
+    """
+
+    def __init__(self, config: Optional[VADConfig] = None):
+        self.config = config or VADConfig()
+        # Monotonic deque of (frame index, energy): front is the window minimum
+        self._minima: Deque = deque()
+        self._window = self.config.frames(self.config.noise_window_ms)
+        self._recent: Deque[float] = deque(maxlen=self.config.frames(self.config.stationary_ms))
+        self._index = 0
+        self.noise_floor_db: Optional[float] = None
+        n = self.config.frame_samples
+        self._window_fn = np.hanning(n).astype(np.float32)
+        self._window_power = float(np.sum(self._window_fn ** 2)) * n
+        freqs = np.fft.rfftfreq(n, 1 / self.config.sample_rate)
+        self._band = (freqs >= self.config.band_low_hz) & (freqs <= self.config.band_high_hz)
+
+    def features(self, frames: np.ndarray):
+        """Speech-band energy (dBFS), zero-crossing rate, spectral flatness and tonality per frame."""
+        x = frames.astype(np.float32) / 32768.0
+        zcr = np.mean(np.signbit(x[:, 1:]) != np.signbit(x[:, :-1]), axis=1)
+        power = np.abs(np.fft.rfft(x * self._window_fn, axis=1)) ** 2
+        band = power[:, self._band] + 1e-12
+        # Parseval, corrected for the window: mean power per sample
+        energy_db = 10.0 * np.log10(2 * band.sum(axis=1) / self._window_power + 1e-10)
+        flatness = np.exp(np.mean(np.log(band), axis=1)) / np.mean(band, axis=1)
+        # Share of band power in the strongest few bins: near 1 for tones (DTMF, beeps)
+        top = np.partition(band, -TONAL_BINS, axis=1)[:, -TONAL_BINS:]
+        tonality = top.sum(axis=1) / band.sum(axis=1)
+        return energy_db, zcr, flatness, tonality
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        """Classify a batch of frames, updating the noise floor in order."""
+        cfg = self.config
+        energy_db, zcr, flatness, tonality = self.features(frames)
+        result = np.zeros(len(frames), dtype=bool)
+        for i in range(len(frames)):
+            energy = float(energy_db[i])
+            if self.noise_floor_db is None:
+                self.noise_floor_db = max(energy, cfg.noise_floor_min_db)
+            snr = energy - self.noise_floor_db
+            is_speech = energy > cfg.min_energy_db and zcr[i] < cfg.zcr_max and tonality[i] < cfg.tonality_max and (
+                (snr > cfg.snr_db and flatness[i] < cfg.flatness_max)
+                or (snr > cfg.strong_snr_db and flatness[i] < cfg.strong_flatness_max)
+            )
+            self._track_floor(energy, is_speech)
+            result[i] = is_speech
+        return result
+
+    def _track_floor(self, energy: float, is_speech: bool):
+        cfg = self.config
+        minima = self._minima
+        while minima and minima[-1][1] >= energy:
+            minima.pop()
+        minima.append((self._index, energy))
+        if minima[0][0] <= self._index - self._window:
+            minima.popleft()
+        self._index += 1
+
+        floor = self.noise_floor_db
+        if energy < floor:
+            floor += cfg.floor_fall * (energy - floor)
+        elif not is_speech:
+            floor += cfg.floor_rise * (energy - floor)
+
+        recent = self._recent
+        recent.append(energy)
+        if len(recent) == recent.maxlen and energy - floor > cfg.snr_db:
+            if max(recent) - min(recent) < cfg.stationary_db:
+                floor = min(recent)
+
+        self.noise_floor_db = max(floor, minima[0][1], cfg.noise_floor_min_db)
+
+    def reset(self):
+        self._minima.clear()
+        self._recent.clear()
+        self._index = 0
+        self.noise_floor_db = None
+
+
+# =============================================================================
+# ENDPOINTER
+# =============================================================================
+@dataclass
+class VADEvent:
+    """Endpointer output. kind: "start", "end" (audio set) or "noise" (too short)."""
+    kind: str
+    start_ms: int
+    end_ms: int
+    audio: bytes = b""
+
+
+class Endpointer:
+    """
+    Turns a stream of audio chunks into utterance start/end events.
+
+    Chunks may be any length; partial frames are carried over. Utterances
+    include PREROLL before the onset and are returned in the input encoding.
+    """
+
+    def __init__(self, config: Optional[VADConfig] = None):
+        self.config = config or VADConfig()
+        self.vad = VoiceActivityDetector(self.config)
+        cfg = self.config
+        self._onset = cfg.frames(cfg.onset_ms)
+        self._hangover = cfg.frames(cfg.hangover_ms)
+        self._resume = cfg.frames(cfg.resume_ms)
+        self._min_frames = cfg.frames(cfg.min_utterance_ms)
+        self._max_frames = cfg.frames(cfg.max_utterance_ms)
+        self._preroll: Deque[bytes] = deque(maxlen=max(self._onset, cfg.frames(cfg.preroll_ms)))
+        self._pending = b""
+        self._utterance: List[bytes] = []
+        self._start_frame = 0
+        self._speech_run = 0
+        self._silence_run = 0
+        self._voiced = 0
+        self._frame_index = 0
+        self.in_speech = False
+        # Stats
+        self.frames_processed = 0
+        self.speech_frames = 0
+        self.processing_seconds = 0.0
+        self.utterances = 0
+        self.noise_dropped = 0
+
+    def feed(self, audio: bytes) -> List[VADEvent]:
+        """Process a chunk of audio; return any events it completed."""
+        started = time.perf_counter()
+        cfg = self.config
+        data = self._pending + audio
+        usable = len(data) - len(data) % cfg.frame_bytes
+        self._pending = data[usable:]
+        if not usable:
+            return []
+
+        raw = data[:usable]
+        if cfg.encoding == "ulaw":
+            pcm = ulaw_to_pcm16(raw)
+        else:
+            pcm = np.frombuffer(raw, dtype="<i2")
+        speech = self.vad.classify(pcm.reshape(-1, cfg.frame_samples))
+
+        events = []
+        step = cfg.frame_bytes
+        for i, is_speech in enumerate(speech):
+            event = self._step(raw[i * step:(i + 1) * step], bool(is_speech))
+            if event:
+                events.append(event)
+
+        self.frames_processed += len(speech)
+        self.speech_frames += int(speech.sum())
+        self.processing_seconds += time.perf_counter() - started
+        return events
+
+    def _step(self, frame: bytes, is_speech: bool) -> Optional[VADEvent]:
+        self._frame_index += 1
+        if not self.in_speech:
+            self._preroll.append(frame)
+            self._speech_run = self._speech_run + 1 if is_speech else 0
+            if self._speech_run < self._onset:
+                return None
+            self.in_speech = True
+            self._utterance = list(self._preroll)
+            self._preroll.clear()
+            self._start_frame = self._frame_index - len(self._utterance)
+            self._voiced = self._speech_run
+            self._silence_run = 0
+            return VADEvent("start", self._ms(self._start_frame), self._ms(self._frame_index))
+
+        self._utterance.append(frame)
+        if is_speech:
+            self._voiced += 1
+            self._speech_run += 1
+            # A lone loud frame (click, pop) doesn't hold the utterance open
+            if self._speech_run >= self._resume:
+                self._silence_run = 0
+            else:
+                self._silence_run += 1
+        else:
+            self._speech_run = 0
+            self._silence_run += 1
+        if self._silence_run >= self._hangover or len(self._utterance) >= self._max_frames:
+            return self._finish()
+        return None
+
+    def _finish(self) -> VADEvent:
+        # Keep a little trailing silence; STT handles a clean tail better
+        keep = len(self._utterance) - max(0, self._silence_run - self.config.frames(200))
+        audio = b"".join(self._utterance[:keep])
+        start_ms, end_ms = self._ms(self._start_frame), self._ms(self._start_frame + keep)
+        self.in_speech = False
+        self._utterance = []
+        self._speech_run = 0
+        if self._voiced < self._min_frames:
+            self.noise_dropped += 1
+            return VADEvent("noise", start_ms, end_ms)
+        self.utterances += 1
+        return VADEvent("end", start_ms, end_ms, audio)
+
+    @property
+    def utterance_ms(self) -> int:
+        """Length of the utterance in progress, including preroll (0 between utterances)."""
+        return self._ms(len(self._utterance)) if self.in_speech else 0
+
+    def utterance_audio(self) -> bytes:
+        """Audio of the utterance in progress so far, in the input encoding."""
+        return b"".join(self._utterance) if self.in_speech else b""
+
+    def flush(self) -> Optional[VADEvent]:
+        """End the current utterance (e.g. stream stopped mid-sentence)."""
+        if not self.in_speech:
+            return None
+        return self._finish()
+
+    def _ms(self, frame_index: int) -> int:
+        return frame_index * self.config.frame_ms
+
+    def reset(self):
+        """Forget buffered audio and state (keeps the noise estimate)."""
+        self._pending = b""
+        self._preroll.clear()
+        self._utterance = []
+        self._speech_run = self._silence_run = self._voiced = 0
+        self.in_speech = False
+
+    def get_stats(self) -> dict:
+        audio_seconds = self.frames_processed * self.config.frame_ms / 1000
+        return {
+            "frames": self.frames_processed,
+            "speech_ratio": round(self.speech_frames / self.frames_processed, 3) if self.frames_processed else 0.0,
+            "noise_floor_db": round(self.vad.noise_floor_db, 1) if self.vad.noise_floor_db is not None else None,
+            "utterances": self.utterances,
+            "noise_dropped": self.noise_dropped,
+            "cpu_percent": round(100 * self.processing_seconds / audio_seconds, 3) if audio_seconds else 0.0,
+        }
@@ -13,6 +13,7 @@ from .metric_segregation_engine import (
 from .call_intent_engine import (
     CallIntentEngine, 
     CallClassification, 
+    ClassificationColumns,
     CallIntent, 
     UrgencyLevel
 )
@@ -29,6 +30,12 @@ from .latency_performance_engine import (
     PerformanceMetric,
     PerformanceStatus
 )
+from .columnar import (
+    PilotWorkingSet,
+    CallColumns,
+    TranscriptColumns,
+    LatencyColumns
+)
 
 __all__ = [
     'BaselineEngine',
@@ -45,6 +52,7 @@ __all__ = [
     'ConfidenceBand',
     'CallIntentEngine',
     'CallClassification',
+    'ClassificationColumns',
     'CallIntent',
     'UrgencyLevel',
     'CapacitySaturationEngine',
@@ -56,4 +64,8 @@ __all__ = [
     'PerformanceReport',
     'PerformanceMetric',
     'PerformanceStatus',
+    'PilotWorkingSet',
+    'CallColumns',
+    'TranscriptColumns',
+    'LatencyColumns',
 ]
@@ -0,0 +1,175 @@
+"""
+Benchmark pilot report generation: row-based engines vs columnar working set
+
+Each mode runs in its own subprocess so peak RSS is measured independently.
+
+Usage (from demand-engine/):
+    python -m analytics.benchmark_report                      # columnar @100k, rows @10k
+    python -m analytics.benchmark_report --calls 100000 --row-calls 0
+"""
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+TRANSCRIPTS = [
+    "My AC stopped working and it's 95 degrees in here. I need someone out today.",
+    "I'd like to schedule a maintenance check for my furnace before winter.",
+    "Emergency! There's water leaking from my AC unit all over the floor!",
+    "Can you give me a quote for installing a new HVAC system?",
+    "I have a question about my last invoice.",
+    "The heat pump is intermittent, sometimes works and sometimes not.",
+    "Hi, do you service the north side of town?",
+]
+
+METRICS = ["answer_latency", "speech_to_response", "booking_execution", "llm_response_time"]
+
+
+def build_pilot_data(n_calls: int, days: int = 30, seed: int = 42):
+    """Synthetic pilot with n_calls calls spread over `days` days"""
+    from analytics.report_orchestrator import PilotData
+
+    rng = random.Random(seed)
+    start = datetime(2024, 6, 1, 0, 0, 0)
+    end = start + timedelta(days=days)
+
+    call_events, transcripts, latency = [], [], []
+    for i in range(n_calls):
+        call_id = f"call_{i:07d}"
+        begin = start + timedelta(seconds=rng.randint(0, days * 86400 - 1))
+        duration = rng.randint(30, 900)
+        call_events.append({
+            "call_id": call_id,
+            "start_time": begin,
+            "end_time": begin + timedelta(seconds=duration),
+            "duration_seconds": duration,
+        })
+        transcripts.append({"call_id": call_id, "transcript": rng.choice(TRANSCRIPTS)})
+        latency.append({
+            "metric_type": rng.choice(METRICS),
+            "value_ms": rng.uniform(120, 2400),
+            "call_id": call_id,
+            "time_of_day": begin.hour,
+        })
+
+    return PilotData(
+        pilot_id="BENCH-PILOT",
+        customer_id="bench",
+        customer_name="Benchmark HVAC",
+        baseline_source="customer_reported",
+        baseline_metrics={
+            "answer_rate": 0.62,
+            "booking_delay_hours": 24.0,
+            "average_handle_time_minutes": 5.2,
+            "after_hours_answer_rate": 0.35,
+            "peak_hour_capacity": 3,
+        },
+        baseline_source_details="Synthetic benchmark",
+        total_calls=n_calls,
+        calls_answered=n_calls,
+        calls_with_transcripts=transcripts,
+        call_events=call_events,
+        bookings_created=n_calls // 4,
+        average_booking_delay_minutes=3.2,
+        latency_measurements=latency,
+        declared_capacity=3,
+        average_ticket_value=450,
+        pilot_start_date=start,
+        pilot_end_date=end,
+    )
+
+
+def run_rows(pilot_data) -> None:
+    """The pre-columnar path: per-row Pydantic models into each engine"""
+    from analytics.call_intent_engine import CallIntentEngine
+    from analytics.capacity_saturation_engine import CapacitySaturationEngine, CallEvent
+    from analytics.latency_performance_engine import LatencyPerformanceEngine, PerformanceMetric
+
+    intent_engine = CallIntentEngine()
+    classifications = [
+        intent_engine.classify_call(c["call_id"], c["transcript"])
+        for c in pilot_data.calls_with_transcripts
+    ]
+    intent_engine.get_classification_summary(classifications)
+
+    CapacitySaturationEngine().analyze_capacity_saturation(
+        pilot_id=pilot_data.pilot_id,
+        calls=[CallEvent(**e) for e in pilot_data.call_events],
+        declared_capacity=pilot_data.declared_capacity,
+    )
+
+    latency_engine = LatencyPerformanceEngine()
+    measurements = [
+        latency_engine.record_measurement(
+            metric_type=PerformanceMetric(m["metric_type"]),
+            value_ms=m["value_ms"],
+            call_id=m.get("call_id"),
+            pilot_id=pilot_data.pilot_id,
+            time_of_day=m.get("time_of_day"),
+        )
+        for m in pilot_data.latency_measurements
+    ]
+    latency_engine.generate_performance_report(
+        pilot_data.pilot_id, measurements, pilot_data.pilot_start_date, pilot_data.pilot_end_date
+    )
+
+
+def run_columnar(pilot_data) -> None:
+    """Full report through the orchestrator (columnar working set)"""
+    from analytics.report_orchestrator import ReportOrchestrator
+
+    ReportOrchestrator().generate_pilot_report(pilot_data)
+
+
+def _child(mode: str, n_calls: int) -> None:
+    pilot_data = build_pilot_data(n_calls)
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    started = time.perf_counter()
+    (run_rows if mode == "rows" else run_columnar)(pilot_data)
+    elapsed = time.perf_counter() - started
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "mode": mode,
+        "calls": n_calls,
+        "seconds": round(elapsed, 3),
+        "peak_rss_mb": round(peak_rss / 1024, 1),
+        "report_rss_delta_mb": round((peak_rss - baseline_rss) / 1024, 1),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100_000, help="calls for the columnar run")
+    parser.add_argument("--row-calls", type=int, default=10_000,
+                        help="calls for the row-based run (0 to skip; the window scan is O(windows x calls))")
+    parser.add_argument("--child", choices=["rows", "columnar"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.calls)
+        return
+
+    runs = [("columnar", args.calls)]
+    if args.row_calls:
+        runs = [("rows", args.row_calls), ("columnar", args.row_calls)] + runs
+
+    print(f"{'mode':<10} {'calls':>8} {'seconds':>9} {'peak RSS MB':>12} {'report ΔRSS MB':>15}")
+    for mode, n_calls in runs:
+        out = subprocess.run(
+            [sys.executable, "-m", "analytics.benchmark_report", "--child", mode, "--calls", str(n_calls)],
+            capture_output=True, text=True, check=True,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{result['mode']:<10} {result['calls']:>8} {result['seconds']:>9.3f} "
+              f"{result['peak_rss_mb']:>12.1f} {result['report_rss_delta_mb']:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
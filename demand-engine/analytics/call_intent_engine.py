@@ -9,7 +9,9 @@ Why: Needed for revenue modeling, conversion tracking, and report generation
 from enum import Enum
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+from dataclasses import dataclass
 from pydantic import BaseModel, Field
+import numpy as np
 import json
 
 
@@ -57,6 +59,29 @@ class CallClassification(BaseModel):
     customer_sentiment: Optional[str] = None  # positive, neutral, negative
 
 
+# Stable integer codes for columnar classification results
+INTENT_TYPES: List[CallIntent] = list(CallIntent)
+URGENCY_TYPES: List[UrgencyLevel] = list(UrgencyLevel)
+
+
+@dataclass
+class ClassificationColumns:
+    """Columnar classification results (one entry per call)"""
+    call_ids: np.ndarray        # object
+    intent_codes: np.ndarray    # int8, index into INTENT_TYPES
+    urgency_codes: np.ndarray   # int8, index into URGENCY_TYPES
+    high_intent: np.ndarray     # bool
+    confidence: np.ndarray      # float64
+    method: str = "rule_based"
+    
+    def __len__(self) -> int:
+        return len(self.call_ids)
+    
+    @property
+    def high_intent_count(self) -> int:
+        return int(self.high_intent.sum())
+
+
 class CallIntentEngine:
     """
     Classifies call intent and urgency using LLM-based analysis.
@@ -77,6 +102,12 @@ class CallIntentEngine:
         "before weekend", "intermittent", "sometimes works"
     ]
     
+    # Intent keyword groups, checked in this order
+    INSTALLATION_WORDS = ['install', 'new unit', 'replace', 'quote', 'estimate']
+    MAINTENANCE_WORDS = ['maintenance', 'tune-up', 'service', 'check-up', 'inspection']
+    BILLING_WORDS = ['bill', 'invoice', 'payment', 'charge']
+    REPAIR_WORDS = ['repair', 'fix', 'broken', 'not working', 'problem']
+    
     def __init__(self, llm_client=None):
         """
         Initialize with optional LLM client.
@@ -176,22 +207,22 @@ class CallIntentEngine:
             intent_keywords.extend(urgency_keywords)
         
         # Installation/quote
-        elif any(word in transcript_lower for word in ['install', 'new unit', 'replace', 'quote', 'estimate']):
+        elif any(word in transcript_lower for word in self.INSTALLATION_WORDS):
             intent = CallIntent.INSTALLATION_QUOTE
             intent_keywords = ['installation', 'quote']
         
         # Maintenance
-        elif any(word in transcript_lower for word in ['maintenance', 'tune-up', 'service', 'check-up', 'inspection']):
+        elif any(word in transcript_lower for word in self.MAINTENANCE_WORDS):
             intent = CallIntent.MAINTENANCE
             intent_keywords = ['maintenance']
         
         # Billing
-        elif any(word in transcript_lower for word in ['bill', 'invoice', 'payment', 'charge']):
+        elif any(word in transcript_lower for word in self.BILLING_WORDS):
             intent = CallIntent.BILLING
             intent_keywords = ['billing']
         
         # Repair (default for service calls)
-        elif any(word in transcript_lower for word in ['repair', 'fix', 'broken', 'not working', 'problem']):
+        elif any(word in transcript_lower for word in self.REPAIR_WORDS):
             intent = CallIntent.ROUTINE_REPAIR
             intent_keywords = ['repair']
         
@@ -240,6 +271,129 @@ class CallIntentEngine:
         
         return results
     
+    def classify_columns(self, transcripts, use_llm: bool = True) -> ClassificationColumns:
+        """
+        Classify all calls of a TranscriptColumns working set at once.
+        
+        Rule-based classification runs one keyword pass per keyword over the
+        pre-lowercased transcripts and resolves intent/urgency with array
+        operations; no CallClassification objects are created. When an LLM
+        client is configured, calls are classified per row and packed into
+        the same columnar result.
+        """
+        n = len(transcripts)
+        
+        if use_llm and self.llm_client:
+            rows = [
+                self.classify_call(call_id, transcript)
+                for call_id, transcript in zip(transcripts.call_ids, transcripts.transcripts)
+            ]
+            return ClassificationColumns(
+                call_ids=transcripts.call_ids,
+                intent_codes=np.fromiter((INTENT_TYPES.index(r.intent) for r in rows), dtype=np.int8, count=n),
+                urgency_codes=np.fromiter((URGENCY_TYPES.index(r.urgency_level) for r in rows), dtype=np.int8, count=n),
+                high_intent=np.fromiter((r.high_intent for r in rows), dtype=bool, count=n),
+                confidence=np.fromiter((r.confidence_score for r in rows), dtype=np.float64, count=n),
+                method=rows[0].classification_method if rows else "llm"
+            )
+        
+        lowered = transcripts.lowered
+        
+        def any_of(words: List[str]) -> np.ndarray:
+            mask = np.zeros(n, dtype=bool)
+            for word in words:
+                mask |= np.fromiter((word in t for t in lowered), dtype=bool, count=n)
+            return mask
+        
+        emergency = any_of(self.EMERGENCY_KEYWORDS)
+        priority = ~emergency & any_of(self.PRIORITY_KEYWORDS)
+        
+        urgency_codes = np.select(
+            [emergency, priority],
+            [URGENCY_TYPES.index(UrgencyLevel.EMERGENCY), URGENCY_TYPES.index(UrgencyLevel.PRIORITY)],
+            default=URGENCY_TYPES.index(UrgencyLevel.ROUTINE)
+        ).astype(np.int8)
+        
+        intent_codes = np.select(
+            [
+                emergency,
+                any_of(self.INSTALLATION_WORDS),
+                any_of(self.MAINTENANCE_WORDS),
+                any_of(self.BILLING_WORDS),
+                any_of(self.REPAIR_WORDS),
+            ],
+            [
+                INTENT_TYPES.index(CallIntent.EMERGENCY_REPAIR),
+                INTENT_TYPES.index(CallIntent.INSTALLATION_QUOTE),
+                INTENT_TYPES.index(CallIntent.MAINTENANCE),
+                INTENT_TYPES.index(CallIntent.BILLING),
+                INTENT_TYPES.index(CallIntent.ROUTINE_REPAIR),
+            ],
+            default=INTENT_TYPES.index(CallIntent.GENERAL_INQUIRY)
+        ).astype(np.int8)
+        
+        high_intent_codes = [
+            INTENT_TYPES.index(CallIntent.EMERGENCY_REPAIR),
+            INTENT_TYPES.index(CallIntent.ROUTINE_REPAIR),
+            INTENT_TYPES.index(CallIntent.INSTALLATION_QUOTE),
+        ]
+        
+        # Every rule-based branch yields at least one intent keyword
+        return ClassificationColumns(
+            call_ids=transcripts.call_ids,
+            intent_codes=intent_codes,
+            urgency_codes=urgency_codes,
+            high_intent=np.isin(intent_codes, high_intent_codes),
+            confidence=np.full(n, 0.7),
+        )
+    
+    def to_classifications(self, columns: ClassificationColumns, transcripts) -> List[CallClassification]:
+        """
+        Materialize CallClassification models from columnar results.
+        Only needed when per-call output is required (e.g. exports).
+        """
+        if columns.method != "rule_based":
+            return self.batch_classify([
+                {"call_id": call_id, "transcript": transcript}
+                for call_id, transcript in zip(transcripts.call_ids, transcripts.transcripts)
+            ])
+        return [
+            self._classify_with_rules(call_id, transcript)
+            for call_id, transcript in zip(transcripts.call_ids, transcripts.transcripts)
+        ]
+    
+    def get_classification_summary_columns(self, columns: ClassificationColumns) -> Dict[str, Any]:
+        """Columnar equivalent of get_classification_summary"""
+        total = len(columns)
+        intent_counts = np.bincount(columns.intent_codes, minlength=len(INTENT_TYPES))
+        urgency_counts = np.bincount(columns.urgency_codes, minlength=len(URGENCY_TYPES))
+        
+        by_intent = {
+            intent.value: {
+                "count": int(count),
+                "percentage": int(count) / total if total > 0 else 0
+            }
+            for intent, count in zip(INTENT_TYPES, intent_counts)
+        }
+        by_urgency = {
+            urgency.value: {
+                "count": int(count),
+                "percentage": int(count) / total if total > 0 else 0
+            }
+            for urgency, count in zip(URGENCY_TYPES, urgency_counts)
+        }
+        
+        high_intent_count = columns.high_intent_count
+        
+        return {
+            "total_calls": total,
+            "by_intent": by_intent,
+            "by_urgency": by_urgency,
+            "high_intent_calls": high_intent_count,
+            "high_intent_percentage": high_intent_count / total if total > 0 else 0,
+            "average_confidence": float(columns.confidence.mean()) if total > 0 else 0
+        }
+    
     def get_classification_summary(
         self,
         classifications: List[CallClassification]
@@ -10,6 +10,7 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
 from collections import defaultdict
+import numpy as np
 
 
 class CallEvent(BaseModel):
@@ -176,6 +177,106 @@ class CapacitySaturationEngine:
             estimated_missed_due_to_saturation=estimated_missed
         )
     
+    def analyze_capacity_columns(
+        self,
+        pilot_id: str,
+        calls,
+        declared_capacity: int,
+        window_minutes: int = 5
+    ) -> CapacitySaturationAnalysis:
+        """
+        Vectorized equivalent of analyze_capacity_saturation over CallColumns.
+        
+        Concurrency per window is computed with two binary searches over the
+        sorted start/end columns instead of scanning every call per window:
+        concurrent = #(start < window_end) - #(end <= window_start).
+        Calls whose end precedes their start are treated as zero-length.
+        
+        Args:
+            pilot_id: Pilot identifier
+            calls: CallColumns from the report working set
+            declared_capacity: Max concurrent calls operator can handle
+            window_minutes: Time window for analysis (default 5 min)
+        
+        Returns:
+            Complete capacity saturation analysis
+        """
+        if len(calls) == 0:
+            return self.analyze_capacity_saturation(pilot_id, [], declared_capacity, window_minutes)
+        
+        starts = calls.start_us
+        ends = np.maximum(calls.end_us, starts)
+        span_us = int(calls.end_us.max())
+        window_us = window_minutes * 60 * 1_000_000
+        
+        start_time = calls.origin
+        end_time = calls.to_datetime(span_us)
+        period = f"{start_time.strftime('%Y-%m-%d')} to {end_time.strftime('%Y-%m-%d')}"
+        
+        n_windows = -(-span_us // window_us) if span_us > 0 else 0
+        window_starts = np.arange(n_windows, dtype=np.int64) * window_us
+        window_ends = window_starts + window_us
+        
+        order = np.argsort(starts, kind="stable")
+        sorted_starts = starts[order]
+        sorted_ends = np.sort(ends)
+        
+        concurrent = (
+            np.searchsorted(sorted_starts, window_ends, side="left")
+            - np.searchsorted(sorted_ends, window_starts, side="right")
+        )
+        peak_concurrent = int(concurrent.max()) if n_windows else 0
+        
+        saturated = np.flatnonzero(concurrent >= declared_capacity)
+        
+        # Only saturated windows need call ids; a call overlapping a window must
+        # start after (window_start - longest call), which bounds the slice.
+        max_duration = int((ends - starts).max())
+        lower_bounds = np.searchsorted(sorted_starts, window_starts[saturated] - max_duration, side="right")
+        upper_bounds = np.searchsorted(sorted_starts, window_ends[saturated], side="left")
+        
+        saturation_windows = []
+        for k, lo, hi in zip(saturated, lower_bounds, upper_bounds):
+            candidates = order[lo:hi]
+            overlapping = candidates[ends[candidates] > window_starts[k]]
+            count = int(concurrent[k])
+            saturation_windows.append(CapacityWindow(
+                window_start=calls.to_datetime(window_starts[k]),
+                window_end=calls.to_datetime(window_ends[k]),
+                concurrent_calls=count,
+                declared_capacity=declared_capacity,
+                capacity_exceeded=True,
+                overflow_calls=count - declared_capacity,
+                call_ids=calls.call_ids[overlapping].tolist()
+            ))
+        
+        total_windows = int((span_us / 1_000_000) / (window_minutes * 60))
+        saturation_percentage = (len(saturation_windows) / total_windows * 100) if total_windows > 0 else 0
+        
+        saturation_hours = sorted(set(w.window_start.hour for w in saturation_windows))
+        saturation_days = sorted(set(w.window_start.strftime('%A') for w in saturation_windows))
+        
+        calls_during_saturation = len(set(
+            call_id
+            for window in saturation_windows
+            for call_id in window.call_ids
+        ))
+        estimated_missed = int((concurrent[saturated] - declared_capacity).sum())
+        
+        return CapacitySaturationAnalysis(
+            pilot_id=pilot_id,
+            analysis_period=period,
+            declared_capacity=declared_capacity,
+            total_calls=len(calls),
+            peak_concurrent_calls=peak_concurrent,
+            saturation_windows=saturation_windows,
+            saturation_percentage=saturation_percentage,
+            saturation_hours=saturation_hours,
+            saturation_days=saturation_days,
+            calls_during_saturation=calls_during_saturation,
+            estimated_missed_due_to_saturation=estimated_missed
+        )
+    
     def generate_saturation_report(
         self,
         analysis: CapacitySaturationAnalysis
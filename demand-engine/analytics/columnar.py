@@ -0,0 +1,149 @@
+"""
+Columnar Working Set for Pilot Reports
+
+Purpose: Hold pilot call data as NumPy arrays (one array per field) built once per report
+Priority: PERFORMANCE
+Why: Engines used to re-walk List[Dict] and per-row Pydantic objects; 100k-call pilots
+     spent most of their time allocating models that were thrown away immediately
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .latency_performance_engine import PerformanceMetric
+
+_ONE_US = timedelta(microseconds=1)
+
+# Stable integer codes for metric types (index into list(PerformanceMetric))
+METRIC_TYPES: List[PerformanceMetric] = list(PerformanceMetric)
+METRIC_CODES: Dict[str, int] = {metric.value: code for code, metric in enumerate(METRIC_TYPES)}
+
+# Sentinel for measurements without an hour of day
+NO_HOUR = -1
+
+
+def _to_datetime(value: Any) -> datetime:
+    """Accept datetimes or ISO strings, as CallEvent validation did"""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+@dataclass
+class CallColumns:
+    """Call timing columns. Times are int64 microseconds relative to `origin`."""
+    call_ids: np.ndarray        # object
+    start_us: np.ndarray        # int64
+    end_us: np.ndarray          # int64
+    duration_seconds: np.ndarray  # int64
+    origin: Optional[datetime]
+
+    def __len__(self) -> int:
+        return len(self.call_ids)
+
+    def to_datetime(self, offset_us: int) -> datetime:
+        """Convert a column offset back into a datetime (output only)"""
+        return self.origin + timedelta(microseconds=int(offset_us))
+
+    @classmethod
+    def from_events(cls, events: List[Dict[str, Any]]) -> "CallColumns":
+        n = len(events)
+        if n == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return cls(np.empty(0, dtype=object), empty, empty.copy(), empty.copy(), None)
+
+        starts = [_to_datetime(e["start_time"]) for e in events]
+        ends = [_to_datetime(e["end_time"]) for e in events]
+        origin = min(starts)
+
+        call_ids = np.empty(n, dtype=object)
+        call_ids[:] = [e["call_id"] for e in events]
+
+        start_us = np.fromiter(((s - origin) // _ONE_US for s in starts), dtype=np.int64, count=n)
+        end_us = np.fromiter(((e - origin) // _ONE_US for e in ends), dtype=np.int64, count=n)
+        duration = np.fromiter((e.get("duration_seconds", 0) or 0 for e in events), dtype=np.int64, count=n)
+
+        return cls(call_ids, start_us, end_us, duration, origin)
+
+
+@dataclass
+class TranscriptColumns:
+    """Transcript columns for intent classification"""
+    call_ids: np.ndarray     # object
+    transcripts: List[str]   # original text, kept for LLM fallback / output models
+    lowered: List[str]       # lowercased once, reused by every keyword pass
+
+    def __len__(self) -> int:
+        return len(self.call_ids)
+
+    @classmethod
+    def from_calls(cls, calls: List[Dict[str, Any]]) -> "TranscriptColumns":
+        call_ids = np.empty(len(calls), dtype=object)
+        call_ids[:] = [c.get("call_id") for c in calls]
+        transcripts = [c.get("transcript", "") or "" for c in calls]
+        return cls(call_ids, transcripts, [t.lower() for t in transcripts])
+
+
+@dataclass
+class LatencyColumns:
+    """Latency measurement columns"""
+    metric_codes: np.ndarray  # int8, index into METRIC_TYPES
+    value_ms: np.ndarray      # float64
+    hour: np.ndarray          # int8, NO_HOUR when unknown
+    call_ids: np.ndarray      # object
+
+    def __len__(self) -> int:
+        return len(self.value_ms)
+
+    @classmethod
+    def from_measurements(cls, measurements: List[Dict[str, Any]]) -> "LatencyColumns":
+        n = len(measurements)
+        codes = np.empty(n, dtype=np.int8)
+        values = np.empty(n, dtype=np.float64)
+        hours = np.full(n, NO_HOUR, dtype=np.int8)
+        call_ids = np.empty(n, dtype=object)
+
+        for i, m in enumerate(measurements):
+            metric_type = m["metric_type"]
+            if isinstance(metric_type, PerformanceMetric):
+                metric_type = metric_type.value
+            try:
+                codes[i] = METRIC_CODES[metric_type]
+            except KeyError:
+                raise ValueError(f"'{metric_type}' is not a valid PerformanceMetric")
+            values[i] = m["value_ms"]
+            if m.get("time_of_day") is not None:
+                hours[i] = m["time_of_day"]
+            call_ids[i] = m.get("call_id")
+
+        return cls(codes, values, hours, call_ids)
+
+
+@dataclass
+class PilotWorkingSet:
+    """All columnar inputs for one pilot report"""
+    pilot_id: str
+    calls: CallColumns
+    transcripts: TranscriptColumns
+    latency: LatencyColumns
+
+    @classmethod
+    def from_pilot_data(cls, pilot_data) -> "PilotWorkingSet":
+        """Build the working set once from PilotData (single pass per input list)"""
+        return cls(
+            pilot_id=pilot_data.pilot_id,
+            calls=CallColumns.from_events(pilot_data.call_events),
+            transcripts=TranscriptColumns.from_calls(pilot_data.calls_with_transcripts),
+            latency=LatencyColumns.from_measurements(pilot_data.latency_measurements),
+        )
+
+    def nbytes(self) -> int:
+        """Approximate size of the numeric columns (excludes Python strings)"""
+        arrays = [
+            self.calls.start_us, self.calls.end_us, self.calls.duration_seconds,
+            self.latency.metric_codes, self.latency.value_ms, self.latency.hour,
+        ]
+        return sum(a.nbytes for a in arrays)
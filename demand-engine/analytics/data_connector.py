@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 from supabase import create_client, Client
 import logging
 
+from services.signal_rollups import fetch_pages
+
 logger = logging.getLogger(__name__)
 
 
@@ -64,12 +66,16 @@ class AnalyticsDataConnector:
             # Fetch AI demo call logs (if available)
             ai_demo_logs = self._fetch_ai_demo_logs(start_date, end_date)
             
+            # Fetch measured latencies (ingested from the voice agent's spans)
+            performance_measurements = self._fetch_performance_measurements(pilot_id, start_date, end_date)
+            
             # Combine and structure data
             return self._structure_pilot_data(
                 pilot_id=pilot_id,
                 call_logs=call_logs,
                 appointments=appointments,
                 ai_demo_logs=ai_demo_logs,
+                performance_measurements=performance_measurements,
                 start_date=start_date,
                 end_date=end_date
             )
@@ -132,12 +138,42 @@ class AnalyticsDataConnector:
             logger.error(f"Error fetching AI demo logs: {str(e)}")
             return []
     
+    def _fetch_performance_measurements(
+        self,
+        pilot_id: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> List[Dict]:
+        """
+        Fetch latency measurements from Supabase, page by page
+        
+        Several rows per call turn soon pass PostgREST's row cap. Rows stored
+        for another pilot are skipped; rows ingested without one are kept.
+        """
+        def build_query():
+            return self.client.table("performance_measurements").select(
+                "call_id, metric_type, value_ms, time_of_day"
+            ).gte(
+                "measured_at", start_date.isoformat()
+            ).lte(
+                "measured_at", end_date.isoformat()
+            ).or_(
+                f"pilot_id.eq.{pilot_id},pilot_id.is.null"
+            ).order("measured_at")
+        
+        try:
+            return fetch_pages(build_query)
+        except Exception as e:
+            logger.error(f"Error fetching performance measurements: {str(e)}")
+            return []
+    
     def _structure_pilot_data(
         self,
         pilot_id: str,
         call_logs: List[Dict],
         appointments: List[Dict],
         ai_demo_logs: List[Dict],
+        performance_measurements: List[Dict],
         start_date: datetime,
         end_date: datetime
     ) -> Dict[str, Any]:
@@ -198,17 +234,25 @@ class AnalyticsDataConnector:
             if call.get("start_time") and call.get("end_time")
         ]
         
-        # Extract latency measurements (if available in call metadata)
-        latency_measurements = []
-        for call in all_calls:
-            call_id = call["call_id"]
-            # Add answer latency if available
-            latency_measurements.append({
-                "metric_type": "answer_latency",
-                "value_ms": 200,  # Default, should extract from call metadata
-                "call_id": call_id,
-                "time_of_day": call["start_time"].hour if call.get("start_time") else 12
-            })
+        # Latency measurements recorded from the voice agent's spans
+        latency_measurements = [
+            {
+                "metric_type": m["metric_type"],
+                "value_ms": float(m["value_ms"]),
+                "call_id": m.get("call_id"),
+                "time_of_day": m["time_of_day"] if m.get("time_of_day") is not None else 12
+            }
+            for m in performance_measurements
+        ]
+        if not latency_measurements:
+            # Nothing measured for this period yet: fall back to the nominal answer latency
+            for call in all_calls:
+                latency_measurements.append({
+                    "metric_type": "answer_latency",
+                    "value_ms": 200,
+                    "call_id": call["call_id"],
+                    "time_of_day": call["start_time"].hour if call.get("start_time") else 12
+                })
         
         # Count bookings
         bookings_created = len(appointments)
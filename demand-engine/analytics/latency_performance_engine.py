@@ -12,6 +12,7 @@ from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
 from statistics import mean, median
 import math
+import numpy as np
 
 
 class PerformanceMetric(str, Enum):
@@ -144,8 +145,36 @@ class LatencyPerformanceEngine:
     
     def _store_measurement(self, measurement: LatencyMeasurement) -> None:
         """Store measurement in database"""
-        # Placeholder for actual DB logic
-        pass
+        self.store_measurements([measurement])
+    
+    def store_measurements(self, measurements: List[LatencyMeasurement]) -> int:
+        """
+        Insert measurements into performance_measurements (one request).
+        
+        Args:
+            measurements: Measurements to store
+        
+        Returns:
+            Number of rows inserted
+        """
+        if not self.db or not measurements:
+            return 0
+        rows = [
+            {
+                "call_id": m.call_id,
+                "pilot_id": m.pilot_id,
+                "metric_type": m.metric_type.value,
+                "value_ms": round(m.value_ms, 2),
+                "target_ms": m.target_ms,
+                "within_target": m.within_target,
+                "call_type": m.call_type,
+                "time_of_day": m.time_of_day,
+                "measured_at": m.timestamp.isoformat(),
+            }
+            for m in measurements
+        ]
+        self.db.table("performance_measurements").insert(rows).execute()
+        return len(rows)
     
     def calculate_percentile(self, values: List[float], percentile: int) -> float:
         """
@@ -299,6 +328,130 @@ class LatencyPerformanceEngine:
             by_hour=by_hour_stats
         )
     
+    def generate_performance_report_columns(
+        self,
+        pilot_id: str,
+        latency,
+        period_start: datetime,
+        period_end: datetime
+    ) -> PerformanceReport:
+        """
+        Vectorized equivalent of generate_performance_report over LatencyColumns.
+        
+        No LatencyMeasurement objects are created; grouping is done with one
+        stable sort per key and percentiles with np.percentile (linear
+        interpolation, same as calculate_percentile).
+        
+        Args:
+            pilot_id: Pilot identifier
+            latency: LatencyColumns from the report working set
+            period_start: Start of measurement period
+            period_end: End of measurement period
+        
+        Returns:
+            PerformanceReport with aggregated statistics
+        """
+        if len(latency) == 0:
+            return self.generate_performance_report(pilot_id, [], period_start, period_end)
+        
+        metric_types = list(PerformanceMetric)
+        codes = latency.metric_codes
+        values = latency.value_ms
+        
+        # Per-code target lookup; NaN means "no target" (always within target)
+        targets = np.array(
+            [self.TARGETS.get(metric, np.nan) for metric in metric_types],
+            dtype=np.float64
+        )
+        row_targets = targets[codes]
+        within = np.isnan(row_targets) | (values <= row_targets)
+        within_target = int(within.sum())
+        compliance_rate = (within_target / len(values)) * 100
+        
+        by_type = self._group_columns(codes, values)
+        
+        def stats(metric: PerformanceMetric, default):
+            group = by_type.get(metric_types.index(metric))
+            return group if group is not None else default
+        
+        answer = stats(PerformanceMetric.ANSWER_LATENCY, np.zeros(1))
+        answer_p50, answer_p90, answer_p99 = (float(v) for v in np.percentile(answer, [50, 90, 99]))
+        answer_max = float(answer.max())
+        
+        response = stats(PerformanceMetric.SPEECH_TO_RESPONSE, np.zeros(1))
+        response_p50, response_p90, response_p99 = (float(v) for v in np.percentile(response, [50, 90, 99]))
+        
+        booking = stats(PerformanceMetric.BOOKING_EXECUTION, None)
+        booking_p50 = booking_p90 = None
+        if booking is not None:
+            booking_p50, booking_p90 = (float(v) for v in np.percentile(booking, [50, 90]))
+        
+        if compliance_rate >= 95 and answer_p90 <= self.TARGETS[PerformanceMetric.ANSWER_LATENCY]:
+            health = PerformanceStatus.EXCELLENT
+        elif compliance_rate >= 85 and answer_p90 <= self.TARGETS[PerformanceMetric.ANSWER_LATENCY] * 1.2:
+            health = PerformanceStatus.GOOD
+        elif compliance_rate >= 70:
+            health = PerformanceStatus.DEGRADED
+        else:
+            health = PerformanceStatus.CRITICAL
+        
+        by_metric = {}
+        for code, group in by_type.items():
+            p50, p90, p99 = (float(v) for v in np.percentile(group, [50, 90, 99]))
+            by_metric[metric_types[code].value] = {
+                "p50": p50,
+                "p90": p90,
+                "p99": p99,
+                "max": float(group.max()),
+                "min": float(group.min()),
+                "mean": float(group.mean()),
+                "count": len(group)
+            }
+        
+        has_hour = latency.hour >= 0
+        by_hour_stats = {}
+        for hour, group in self._group_columns(latency.hour[has_hour], values[has_hour]).items():
+            p50, p90 = (float(v) for v in np.percentile(group, [50, 90]))
+            by_hour_stats[hour] = {"p50": p50, "p90": p90, "count": len(group)}
+        
+        return PerformanceReport(
+            pilot_id=pilot_id,
+            period_start=period_start,
+            period_end=period_end,
+            answer_latency_p50=answer_p50,
+            answer_latency_p90=answer_p90,
+            answer_latency_p99=answer_p99,
+            answer_latency_max=answer_max,
+            response_latency_p50=response_p50,
+            response_latency_p90=response_p90,
+            response_latency_p99=response_p99,
+            booking_latency_p50=booking_p50,
+            booking_latency_p90=booking_p90,
+            streaming_health=health,
+            total_measurements=len(values),
+            measurements_within_target=within_target,
+            target_compliance_rate=compliance_rate,
+            by_metric=by_metric,
+            by_hour=by_hour_stats
+        )
+    
+    @staticmethod
+    def _group_columns(keys: np.ndarray, values: np.ndarray) -> Dict[int, np.ndarray]:
+        """Split values by integer key, keyed in order of first appearance"""
+        if len(keys) == 0:
+            return {}
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        unique_keys, first_sorted = np.unique(sorted_keys, return_index=True)
+        groups = np.split(values[order], first_sorted[1:])
+        
+        # First appearance in the original order, to match dict insertion order
+        first_seen = order[first_sorted]
+        return {
+            int(unique_keys[i]): groups[i]
+            for i in np.argsort(first_seen, kind="stable")
+        }
+    
     def generate_report_section(self, report: PerformanceReport) -> str:
         """
         Generate human-readable report section for pilot reports.
@@ -10,12 +10,13 @@ from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
 import logging
 
-from .baseline_counterfactual_engine import BaselineCounterfactualEngine
-from .assumptions_disclosure_engine import AssumptionsDisclosureEngine
-from .metric_segregation_engine import MetricSegregationEngine
+from .baseline_engine import BaselineEngine, BaselineSource
+from .assumptions_engine import AssumptionsEngine
+from .metric_segregation_engine import MetricSegregationEngine, MetricType
 from .call_intent_engine import CallIntentEngine
-from .capacity_saturation_engine import CapacitySaturationEngine, CallEvent
-from .latency_performance_engine import LatencyPerformanceEngine, PerformanceMetric
+from .capacity_saturation_engine import CapacitySaturationEngine
+from .latency_performance_engine import LatencyPerformanceEngine
+from .columnar import PilotWorkingSet
 from .data_connector import AnalyticsDataConnector
 
 logger = logging.getLogger(__name__)
@@ -105,6 +106,9 @@ class ReportOrchestrator:
         """
         logger.info(f"Starting report generation for pilot: {pilot_data.pilot_id}")
         
+        # Build the columnar working set once; engines aggregate over it
+        working_set = PilotWorkingSet.from_pilot_data(pilot_data)
+        
         # 1. Create baseline
         baseline = self._process_baseline(pilot_data)
         
@@ -112,13 +116,13 @@ class ReportOrchestrator:
         assumptions = self._load_assumptions()
         
         # 3. Classify calls
-        classifications = self._classify_calls(pilot_data)
+        classifications = self._classify_calls(working_set)
         
         # 4. Analyze capacity
-        capacity_analysis = self._analyze_capacity(pilot_data)
+        capacity_analysis = self._analyze_capacity(pilot_data, working_set)
         
         # 5. Analyze performance
-        performance_report = self._analyze_performance(pilot_data)
+        performance_report = self._analyze_performance(pilot_data, working_set)
         
         # 6. Record all metrics
         metrics = self._record_metrics(pilot_data, baseline, classifications)
@@ -186,59 +190,28 @@ class ReportOrchestrator:
         logger.info("Loading assumptions")
         return self.assumptions_engine.create_default_assumptions()
     
-    def _classify_calls(self, pilot_data: PilotData):
-        """Classify all calls"""
-        logger.info(f"Classifying {len(pilot_data.calls_with_transcripts)} calls")
-        
-        classifications = []
-        for call_data in pilot_data.calls_with_transcripts:
-            classification = self.intent_engine.classify_call(
-                call_id=call_data.get("call_id"),
-                transcript=call_data.get("transcript", "")
-            )
-            classifications.append(classification)
-        
-        return classifications
+    def _classify_calls(self, working_set: PilotWorkingSet):
+        """Classify all calls (columnar result)"""
+        logger.info(f"Classifying {len(working_set.transcripts)} calls")
+        return self.intent_engine.classify_columns(working_set.transcripts)
     
-    def _analyze_capacity(self, pilot_data: PilotData):
+    def _analyze_capacity(self, pilot_data: PilotData, working_set: PilotWorkingSet):
         """Analyze capacity saturation"""
         logger.info("Analyzing capacity saturation")
         
-        # Convert call events to CallEvent objects
-        call_events = [
-            CallEvent(
-                call_id=event["call_id"],
-                start_time=event["start_time"],
-                end_time=event["end_time"],
-                duration_seconds=event.get("duration_seconds", 0)
-            )
-            for event in pilot_data.call_events
-        ]
-        
-        return self.capacity_engine.analyze_capacity_saturation(
+        return self.capacity_engine.analyze_capacity_columns(
             pilot_id=pilot_data.pilot_id,
-            calls=call_events,
+            calls=working_set.calls,
             declared_capacity=pilot_data.declared_capacity
         )
     
-    def _analyze_performance(self, pilot_data: PilotData):
+    def _analyze_performance(self, pilot_data: PilotData, working_set: PilotWorkingSet):
         """Analyze performance metrics"""
-        logger.info(f"Analyzing {len(pilot_data.latency_measurements)} performance measurements")
-        
-        measurements = []
-        for m in pilot_data.latency_measurements:
-            measurement = self.latency_engine.record_measurement(
-                metric_type=PerformanceMetric(m["metric_type"]),
-                value_ms=m["value_ms"],
-                call_id=m.get("call_id"),
-                pilot_id=pilot_data.pilot_id,
-                time_of_day=m.get("time_of_day")
-            )
-            measurements.append(measurement)
-        
-        return self.latency_engine.generate_performance_report(
+        logger.info(f"Analyzing {len(working_set.latency)} performance measurements")
+        
+        return self.latency_engine.generate_performance_report_columns(
             pilot_id=pilot_data.pilot_id,
-            measurements=measurements,
+            latency=working_set.latency,
             period_start=pilot_data.pilot_start_date,
             period_end=pilot_data.pilot_end_date
         )
@@ -278,7 +251,7 @@ class ReportOrchestrator:
         ))
         
         # Derived metrics
-        high_intent_calls = sum(1 for c in classifications if c.high_intent)
+        high_intent_calls = classifications.high_intent_count
         conversion_rate = pilot_data.bookings_created / high_intent_calls if high_intent_calls > 0 else 0
         
         metrics.append(self.metric_engine.record_derived_metric(
@@ -286,6 +259,7 @@ class ReportOrchestrator:
             value=conversion_rate,
             description="Booking conversion rate from high-intent calls",
             calculation=f"{pilot_data.bookings_created} bookings / {high_intent_calls} high-intent calls",
+            source_metrics=["bookings_created", "high_intent_calls"],
             pilot_id=pilot_data.pilot_id
         ))
         
@@ -293,7 +267,7 @@ class ReportOrchestrator:
     
     def _generate_executive_summary(self, pilot_data, baseline, classifications, capacity_analysis):
         """Generate executive summary section"""
-        high_intent_calls = sum(1 for c in classifications if c.high_intent)
+        high_intent_calls = classifications.high_intent_count
         
         # Calculate improvement
         baseline_answer_rate = baseline.metrics.answer_rate
@@ -314,7 +288,7 @@ class ReportOrchestrator:
     
     def _generate_pilot_snapshot(self, pilot_data, performance_report, classifications):
         """Generate pilot snapshot with 8 key metrics"""
-        high_intent_calls = sum(1 for c in classifications if c.high_intent)
+        high_intent_calls = classifications.high_intent_count
         
         return {
             "answer_rate": f"{(pilot_data.calls_answered / pilot_data.total_calls * 100) if pilot_data.total_calls > 0 else 0:.1f}%",
@@ -354,7 +328,7 @@ class ReportOrchestrator:
     
     def _generate_qualification_metrics(self, classifications):
         """Generate qualification metrics section"""
-        summary = self.intent_engine.get_classification_summary(classifications)
+        summary = self.intent_engine.get_classification_summary_columns(classifications)
         
         return {
             "total_classified": summary["total_calls"],
@@ -368,7 +342,7 @@ class ReportOrchestrator:
         """Generate financial model section"""
         # Get key assumptions
         conversion_improvement = self.assumptions_engine.get_assumption(assumptions, "conversion_rate_improvement")
-        capture_rate = self.assumptions_engine.get_assumption(assumptions, "capture_rate_conservative")
+        capture_rate = self.assumptions_engine.get_assumption(assumptions, "pilot_to_full_capture_rate")
         
         # Calculate opportunity
         weeks_in_year = 52
@@ -435,7 +409,9 @@ if __name__ == "__main__":
         baseline_metrics={
             "answer_rate": 0.62,
             "booking_delay_hours": 24.0,
-            "average_handle_time_minutes": 5.2
+            "average_handle_time_minutes": 5.2,
+            "after_hours_answer_rate": 0.35,
+            "peak_hour_capacity": 3
         },
         baseline_source_details="Owner-reported average over last 90 days",
         total_calls=127,
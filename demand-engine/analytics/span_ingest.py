@@ -0,0 +1,99 @@
+"""
+Span Ingest
+Turns latency spans exported by the voice agent into LatencyPerformanceEngine
+measurements.
+
+Accepts either format the agent's tracer writes (hvac_agent/app/utils/tracing.py):
+- OTLP/HTTP JSON (TRACE_EXPORT=otlp, posted to /api/admin/analytics/latency/spans)
+- JSONL span records (TRACE_EXPORT=jsonl), as a list of dicts
+
+Only spans carrying a `metric` attribute naming a PerformanceMetric are
+measurements; other spans (db, tool, tts_first_byte...) and failed spans are
+skipped.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from .latency_performance_engine import LatencyMeasurement, LatencyPerformanceEngine, PerformanceMetric
+
+METRICS = {m.value: m for m in PerformanceMetric}
+
+
+def _otlp_attribute(value: Dict[str, Any]) -> Any:
+    for key in ("stringValue", "doubleValue", "boolValue"):
+        if key in value:
+            return value[key]
+    if "intValue" in value:
+        return int(value["intValue"])
+    return None
+
+
+def _otlp_records(payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Flatten an ExportTraceServiceRequest into JSONL-style span records."""
+    for resource_spans in payload.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for span in scope_spans.get("spans", []):
+                attrs = {a["key"]: _otlp_attribute(a.get("value", {})) for a in span.get("attributes", [])}
+                start_ns = int(span.get("startTimeUnixNano", 0))
+                end_ns = int(span.get("endTimeUnixNano", 0))
+                yield {
+                    "name": span.get("name"),
+                    "call_sid": attrs.get("call_sid"),
+                    "metric": attrs.get("metric"),
+                    "start": datetime.fromtimestamp(start_ns / 1e9, timezone.utc),
+                    "duration_ms": (end_ns - start_ns) / 1e6,
+                    "error": (span.get("status") or {}).get("code") == 2,
+                }
+
+
+def _parse_start(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+def measurements_from_spans(
+    payload: Union[Dict[str, Any], List[Dict[str, Any]]],
+    engine: LatencyPerformanceEngine,
+    pilot_id: Optional[str] = None,
+) -> List[LatencyMeasurement]:
+    """
+    Record every measurable span with engine.record_measurement().
+
+    Args:
+        payload: OTLP JSON request body, or a list of JSONL span records
+        engine: Engine receiving the measurements
+        pilot_id: Pilot the spans belong to, if known
+
+    Returns:
+        The recorded measurements
+    """
+    records = _otlp_records(payload) if isinstance(payload, dict) else payload
+
+    measurements = []
+    for record in records:
+        metric = METRICS.get(record.get("metric") or "")
+        duration_ms = record.get("duration_ms")
+        if metric is None or duration_ms is None or record.get("error"):
+            continue
+
+        start = _parse_start(record.get("start"))
+        kwargs = {}
+        if start is not None:
+            kwargs["timestamp"] = start
+            kwargs["time_of_day"] = start.hour
+
+        measurements.append(engine.record_measurement(
+            metric,
+            float(duration_ms),
+            call_id=record.get("call_sid"),
+            pilot_id=pilot_id,
+            **kwargs
+        ))
+    return measurements
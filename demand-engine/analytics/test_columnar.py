@@ -0,0 +1,145 @@
+"""
+Test columnar engine paths against the original row-based engines
+"""
+
+import sys
+import random
+from pathlib import Path
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from analytics.columnar import CallColumns, LatencyColumns, TranscriptColumns
+from analytics.call_intent_engine import CallIntentEngine
+from analytics.capacity_saturation_engine import CapacitySaturationEngine, CallEvent
+from analytics.latency_performance_engine import LatencyPerformanceEngine, PerformanceMetric
+
+
+TRANSCRIPTS = [
+    "My AC stopped working and it's 95 degrees. Need someone today.",
+    "I'd like to schedule a maintenance check for my furnace.",
+    "Emergency! Water leaking from my AC unit all over the floor!",
+    "Can you give me a quote for installing a new HVAC system?",
+    "I have a question about my last invoice.",
+    "The heat pump is intermittent, sometimes works.",
+    "Do you service the north side of town?",
+    "Thermostat problem, can you fix it?",
+    "Hello, just checking your hours.",
+]
+
+
+def _call_events(n, seed=7):
+    rng = random.Random(seed)
+    base = datetime(2024, 6, 15, 8, 0, 0)
+    events = []
+    for i in range(n):
+        start = base + timedelta(seconds=rng.randint(0, 3 * 86400))
+        duration = rng.randint(30, 900)
+        events.append({
+            "call_id": f"call_{i:05d}",
+            "start_time": start,
+            "end_time": start + timedelta(seconds=duration),
+            "duration_seconds": duration,
+        })
+    return events
+
+
+def test_capacity_columns_match_rows():
+    """Vectorized capacity analysis matches the window-scan implementation"""
+    events = _call_events(400)
+    engine = CapacitySaturationEngine()
+
+    rows = engine.analyze_capacity_saturation("P1", [CallEvent(**e) for e in events], declared_capacity=3)
+    cols = engine.analyze_capacity_columns("P1", CallColumns.from_events(events), declared_capacity=3)
+
+    assert rows.model_dump(exclude={"analyzed_at"}) == cols.model_dump(exclude={"analyzed_at"})
+    assert cols.saturation_windows, "fixture should produce saturation"
+
+
+def test_capacity_columns_empty():
+    engine = CapacitySaturationEngine()
+    analysis = engine.analyze_capacity_columns("P1", CallColumns.from_events([]), declared_capacity=3)
+    assert analysis.total_calls == 0
+    assert analysis.analysis_period == "No calls"
+
+
+def test_intent_columns_match_rows():
+    """Columnar rule-based classification matches per-call classification"""
+    calls = [{"call_id": f"c{i}", "transcript": t} for i, t in enumerate(TRANSCRIPTS * 5)]
+    engine = CallIntentEngine()
+
+    rows = engine.batch_classify(calls)
+    transcripts = TranscriptColumns.from_calls(calls)
+    cols = engine.classify_columns(transcripts)
+
+    row_summary = engine.get_classification_summary(rows)
+    col_summary = engine.get_classification_summary_columns(cols)
+    assert col_summary.pop("average_confidence") == pytest.approx(row_summary.pop("average_confidence"))
+    assert col_summary == row_summary
+    assert cols.high_intent_count == sum(1 for c in rows if c.high_intent)
+
+    materialized = engine.to_classifications(cols, transcripts)
+    assert [c.intent for c in materialized] == [c.intent for c in rows]
+
+
+def test_latency_columns_match_rows():
+    """Columnar performance report matches the LatencyMeasurement path"""
+    rng = random.Random(3)
+    metric_types = [
+        PerformanceMetric.ANSWER_LATENCY,
+        PerformanceMetric.SPEECH_TO_RESPONSE,
+        PerformanceMetric.BOOKING_EXECUTION,
+        PerformanceMetric.LLM_RESPONSE_TIME,
+    ]
+    raw = [
+        {
+            "metric_type": rng.choice(metric_types).value,
+            "value_ms": rng.uniform(100, 2500),
+            "call_id": f"call_{i}",
+            "time_of_day": rng.choice([None, 9, 10, 14, 20]),
+        }
+        for i in range(1000)
+    ]
+    engine = LatencyPerformanceEngine()
+    start, end = datetime(2024, 6, 1), datetime(2024, 6, 8)
+
+    measurements = [
+        engine.record_measurement(
+            metric_type=PerformanceMetric(m["metric_type"]),
+            value_ms=m["value_ms"],
+            call_id=m["call_id"],
+            time_of_day=m["time_of_day"],
+        )
+        for m in raw
+    ]
+    rows = engine.generate_performance_report("P1", measurements, start, end)
+    cols = engine.generate_performance_report_columns("P1", LatencyColumns.from_measurements(raw), start, end)
+
+    assert cols.streaming_health == rows.streaming_health
+    assert cols.measurements_within_target == rows.measurements_within_target
+    assert cols.answer_latency_p90 == pytest.approx(rows.answer_latency_p90)
+    assert cols.response_latency_p99 == pytest.approx(rows.response_latency_p99)
+    assert cols.booking_latency_p50 == pytest.approx(rows.booking_latency_p50)
+    assert list(cols.by_metric) == list(rows.by_metric)
+    assert list(cols.by_hour) == list(rows.by_hour)
+    for key, stats in rows.by_metric.items():
+        assert cols.by_metric[key] == pytest.approx(stats)
+    for hour, stats in rows.by_hour.items():
+        assert cols.by_hour[hour] == pytest.approx(stats)
+
+
+def test_latency_columns_rejects_unknown_metric():
+    with pytest.raises(ValueError):
+        LatencyColumns.from_measurements([{"metric_type": "bogus", "value_ms": 1}])
+
+
+if __name__ == "__main__":
+    test_capacity_columns_match_rows()
+    test_capacity_columns_empty()
+    test_intent_columns_match_rows()
+    test_latency_columns_match_rows()
+    test_latency_columns_rejects_unknown_metric()
+    print("✅ Columnar engine paths match row-based engines")
@@ -0,0 +1,125 @@
+"""
+Test ingesting voice agent latency spans into the latency engine
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime, timezone
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from analytics.latency_performance_engine import LatencyPerformanceEngine, PerformanceMetric
+from analytics.span_ingest import measurements_from_spans
+from analytics.data_connector import AnalyticsDataConnector
+from tests import fakes
+
+START_NS = int(datetime(2024, 6, 15, 14, 30, tzinfo=timezone.utc).timestamp() * 1e9)
+
+
+def _otlp_span(name, duration_ms, metric=None, call_sid="CA123", error=False):
+    attributes = [
+        {"key": "call_sid", "value": {"stringValue": call_sid}},
+        {"key": "router", "value": {"stringValue": "elevenlabs"}},
+    ]
+    if metric:
+        attributes.append({"key": "metric", "value": {"stringValue": metric}})
+    span = {
+        "traceId": "0" * 32,
+        "spanId": "0000000000000001",
+        "name": name,
+        "startTimeUnixNano": str(START_NS),
+        "endTimeUnixNano": str(START_NS + int(duration_ms * 1e6)),
+        "attributes": attributes,
+    }
+    if error:
+        span["status"] = {"code": 2, "message": "TimeoutError"}
+    return span
+
+
+def _otlp(spans):
+    return {"resourceSpans": [{"scopeSpans": [{"spans": spans}]}]}
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.inserted = []
+
+    def table(self, name):
+        assert name == "performance_measurements"
+        return self
+
+    def insert(self, rows):
+        self.inserted.extend(rows)
+        return self
+
+    def execute(self):
+        return self
+
+
+def test_otlp_spans_become_measurements():
+    payload = _otlp([
+        _otlp_span("turn", 280, "speech_to_response"),
+        _otlp_span("stt", 120, "transcription_latency"),
+        _otlp_span("tool", 1500, "booking_execution"),
+        _otlp_span("llm", 900, "llm_response_time", error=True),  # Failed: not a latency
+        _otlp_span("db", 3),                                       # No metric
+        _otlp_span("tts_first_byte", 180),
+    ])
+
+    measurements = measurements_from_spans(payload, LatencyPerformanceEngine(), pilot_id="pilot_1")
+
+    assert [m.metric_type for m in measurements] == [
+        PerformanceMetric.SPEECH_TO_RESPONSE,
+        PerformanceMetric.TRANSCRIPTION_LATENCY,
+        PerformanceMetric.BOOKING_EXECUTION,
+    ]
+    turn = measurements[0]
+    assert abs(turn.value_ms - 280) < 0.01
+    assert turn.call_id == "CA123" and turn.pilot_id == "pilot_1"
+    assert turn.time_of_day == 14
+    assert turn.within_target
+    assert measurements[2].within_target  # 1500ms booking vs 2000ms target
+
+
+def test_jsonl_records_and_storage():
+    records = [
+        {"name": "answer", "call_sid": "CA9", "metric": "answer_latency", "duration_ms": 240.5,
+         "start": "2024-06-15T09:00:00+00:00", "error": None},
+        {"name": "twilio_send", "call_sid": "CA9", "metric": None, "duration_ms": 0.4,
+         "start": "2024-06-15T09:00:01+00:00", "error": None},
+    ]
+    measurements = measurements_from_spans(records, LatencyPerformanceEngine())
+    assert len(measurements) == 1
+    assert measurements[0].metric_type == PerformanceMetric.ANSWER_LATENCY
+    assert not measurements[0].within_target  # 240.5ms > 200ms target
+
+    db = FakeSupabase()
+    assert LatencyPerformanceEngine(db).store_measurements(measurements) == 1
+    row = db.inserted[0]
+    assert row["metric_type"] == "answer_latency"
+    assert row["value_ms"] == 240.5
+    assert row["call_id"] == "CA9" and row["time_of_day"] == 9
+    assert row["measured_at"].startswith("2024-06-15T09:00:00")
+
+
+def test_connector_pages_measurements_for_the_pilot(monkeypatch):
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+    monkeypatch.delenv("NEXT_PUBLIC_SUPABASE_URL", raising=False)
+    rows = [
+        {"call_id": f"CA{i // 4}", "metric_type": "answer_latency", "value_ms": 200 + i % 50,
+         "time_of_day": 9, "measured_at": f"2024-06-{1 + i % 28:02d}T09:00:00",
+         "pilot_id": "other" if i % 10 == 0 else ("pilot-1" if i % 3 else None)}
+        for i in range(2500)
+    ]
+    db = fakes.FakeSupabase({"performance_measurements": rows})
+    connector = AnalyticsDataConnector()
+    connector.client = db
+
+    fetched = connector._fetch_performance_measurements(
+        "pilot-1", datetime(2024, 6, 1), datetime(2024, 6, 30, 23, 59)
+    )
+
+    # Past the 1000-row cap, without the other pilot's rows
+    assert len(fetched) == sum(r["pilot_id"] != "other" for r in rows) == 2250
+    assert db.db["_calls"] == 3
@@ -5,9 +5,11 @@ Includes calculator and PDF generation services
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 import logging
 from middleware.rate_limiter import rate_limit_middleware
 from middleware.request_id import RequestIDMiddleware
+from utils.metrics import CONTENT_TYPE, render_metrics
 
 from calculator.api import router as calculator_router
 from pdf_generator.router import router as pdf_router
@@ -119,6 +121,7 @@ async def root():
             "calculator": "/api/calculator",
             "pdf": "/api/pdf",
             "admin": "/api/admin",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
@@ -135,6 +138,11 @@ async def health_check():
         }
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
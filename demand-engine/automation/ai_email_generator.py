@@ -7,6 +7,11 @@ import os
 from typing import Dict, Optional
 import openai
 
+from services.llm_cache import Completion, get_llm_cache, prompt_version, usage_cost
+
+EMAIL_SYSTEM_PROMPT = "You are an expert email copywriter for HVAC/Plumbing service companies. Write professional, personalized emails that drive engagement."
+EMAIL_MODEL = "gpt-4o-mini"
+
 class AIEmailGenerator:
     """
     Generates personalized emails using AI
@@ -39,13 +44,13 @@ class AIEmailGenerator:
         
         prompt = self._build_prompt(lead, trigger, template_type)
         
-        try:
+        def complete() -> Completion:
             response = openai.ChatCompletion.create(
-                model="gpt-4o-mini",
+                model=EMAIL_MODEL,
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are an expert email copywriter for HVAC/Plumbing service companies. Write professional, personalized emails that drive engagement."
+                        "content": EMAIL_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -63,12 +68,19 @@ class AIEmailGenerator:
             subject = lines[0].replace('Subject:', '').strip()
             body = '\n'.join(lines[2:]).strip()
             
-            return {
+            usage = usage_cost(EMAIL_MODEL, getattr(response, "usage", None))
+            return Completion({
                 "subject": subject,
                 "body": body,
                 "generated_by": "ai",
-                "model": "gpt-4o-mini"
-            }
+                "model": EMAIL_MODEL
+            }, usage.tokens, usage.cost)
+        
+        try:
+            # The prompt holds every lead/trigger field the copy depends on
+            return get_llm_cache().get_or_call(
+                "email_generation", EMAIL_MODEL, prompt_version(EMAIL_SYSTEM_PROMPT), prompt, complete,
+            )
         
         except Exception as e:
             print(f"AI generation failed: {e}")
@@ -2,12 +2,15 @@
 Calculator module for ROI calculations and lead generation
 """
 
-from .engine import calculate_missed_call_tax, calculate_roi
-from .models import CalculatorInput, CalculatorResult
+from .engine import calculate_missed_call_tax, calculate_roi, compare_industries, sweep_missed_call_tax
+from .models import CalculatorInput, CalculatorResult, SweepInput
 
 __all__ = [
     "calculate_missed_call_tax",
     "calculate_roi",
+    "compare_industries",
+    "sweep_missed_call_tax",
     "CalculatorInput",
     "CalculatorResult",
+    "SweepInput",
 ]
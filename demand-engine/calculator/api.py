@@ -8,14 +8,23 @@ import uuid
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from fastapi.responses import JSONResponse
 
-from .engine import calculate_missed_call_tax, calculate_roi, update_lead_score
-from .models import CalculatorInput, CalculatorResult, LeadSubmission
+from .engine import (
+    calculate_missed_call_tax,
+    calculate_roi,
+    compare_industries,
+    sweep_missed_call_tax,
+    update_lead_score,
+)
+from .models import CalculatorInput, CalculatorResult, LeadSubmission, SweepInput
 from .storage import save_lead_submission, get_lead_by_session, update_lead_engagement
 from config.supabase_config import get_supabase
 
 
 router = APIRouter(prefix="/calculator", tags=["calculator"])
 
+# Largest grid one /sweep request may return (response size, not compute, is the limit)
+MAX_SWEEP_SCENARIOS = 100_000
+
 
 @router.post("/calculate", response_model=CalculatorResult)
 async def calculate_endpoint(input_data: CalculatorInput):
@@ -244,13 +253,93 @@ async def roi_projection(
         raise HTTPException(status_code=500, detail=f"ROI calculation error: {str(e)}")
 
 
+@router.post("/sweep")
+async def sweep_endpoint(sweep_input: SweepInput):
+    """
+    What-if sensitivity grid over any combination of inputs
+    
+    POST /calculator/sweep
+    
+    Body (every field is a list; omitted fields use one default value):
+    {
+        "business_type": ["HVAC", "Plumbing"],
+        "current_answer_rate": [50, 60, 70, 80],
+        "conversion_rate": [20, 30, 40],
+        "avg_ticket_value": [500, 1500, 2500],
+        "metrics": ["monthly_loss", "additional_revenue"]
+    }
+    
+    Returns: axes, grid shape and one nested array per metric
+    (indexed in axis order), plus scenarios/sec
+    """
+    inputs = sweep_input.dict(exclude={"metrics"})
+    scenarios = 1
+    for values in inputs.values():
+        scenarios *= len(values)
+    if scenarios > MAX_SWEEP_SCENARIOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sweep has {scenarios} scenarios; the limit is {MAX_SWEEP_SCENARIOS}",
+        )
+    
+    try:
+        sweep = sweep_missed_call_tax(**inputs)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Sweep error: {str(e)}")
+    
+    requested = sweep_input.metrics or list(sweep["metrics"])
+    unknown = [name for name in requested if name not in sweep["metrics"]]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown metrics: {', '.join(unknown)}")
+    
+    return {
+        "success": True,
+        "axes": sweep["axes"],
+        "shape": sweep["shape"],
+        "scenarios": sweep["scenarios"],
+        "metrics": {name: sweep["metrics"][name].tolist() for name in requested},
+        "seconds": sweep["seconds"],
+        "scenarios_per_sec": sweep["scenarios_per_sec"],
+        "cached": sweep["cached"],
+        "key": sweep["key"],
+    }
+
+
+@router.get("/industry-comparison")
+async def industry_comparison(
+    avg_ticket_value: float = 2500,
+    calls_per_day: int = 30,
+    current_answer_rate: float = 65,
+    days_open_per_week: int = 5,
+):
+    """
+    Same business, every industry benchmark
+    
+    GET /calculator/industry-comparison?avg_ticket_value=2500&calls_per_day=30
+    
+    Returns: Metrics per business type (benchmark conversion rates)
+    """
+    try:
+        return {
+            "success": True,
+            "industries": compare_industries(
+                avg_ticket_value=avg_ticket_value,
+                calls_per_day=calls_per_day,
+                current_answer_rate=current_answer_rate,
+                days_open_per_week=days_open_per_week,
+            ),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Comparison error: {str(e)}")
+
+
 # Background task functions
 
 async def send_results_email(lead_id: str, email: str):
     """
     Send calculator results via email with Resend
     """
-    from email_service.resend_client import ResendEmailClient
+    from email_service.resend_client import get_resend_client
     from storage_service.supabase_storage import SupabaseStorageClient
     
     try:
@@ -269,7 +358,7 @@ async def send_results_email(lead_id: str, email: str):
         pdf_url = lead.get("pdf_url")
         
         # Send email
-        email_client = ResendEmailClient()
+        email_client = get_resend_client()
         await email_client.send_roi_report_email(
             to_email=email,
             company_name=company_name,
@@ -3,10 +3,17 @@ Calculator engine - Core business logic for ROI calculations
 
 Based on formulas from Admintoolplan.md
 """
-from typing import Dict, Tuple
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+from collections import OrderedDict
 from datetime import datetime, timezone
+import hashlib
+import json
+import threading
+import time
 import uuid
 
+import numpy as np
+
 from .models import CalculatorInput, CalculatorResult, BusinessType
 
 
@@ -45,6 +52,11 @@ INDUSTRY_BENCHMARKS = {
 }
 
 
+# Assumptions shared by the scalar and sweep calculations
+IMPROVED_ANSWER_RATE = 80.0  # Answer rate with AI agent
+AI_AGENT_MONTHLY_COST = 500
+
+
 def calculate_missed_call_tax(input_data: CalculatorInput) -> CalculatorResult:
     """
     Calculate the "Missed Call Tax" - revenue lost from unanswered calls
@@ -86,14 +98,14 @@ def calculate_missed_call_tax(input_data: CalculatorInput) -> CalculatorResult:
     annual_loss = monthly_loss * 12
     
     # Improvement projections (assume 80% answer rate with AI agent)
-    improved_answer_rate = 80.0
+    improved_answer_rate = IMPROVED_ANSWER_RATE
     improved_calls_answered = int(total_calls_per_month * (improved_answer_rate / 100))
     additional_calls_answered = improved_calls_answered - calls_answered
     additional_jobs = int(additional_calls_answered * conversion_decimal)
     additional_revenue = additional_jobs * input_data.avg_ticket_value
     
     # ROI calculation (assume $500/month for AI agent)
-    monthly_cost = 500
+    monthly_cost = AI_AGENT_MONTHLY_COST
     roi_percentage = ((additional_revenue - monthly_cost) / monthly_cost * 100) if monthly_cost > 0 else 0
     
     # Performance vs industry
@@ -153,7 +165,7 @@ def calculate_missed_call_tax(input_data: CalculatorInput) -> CalculatorResult:
 
 def calculate_roi(
     monthly_loss: float,
-    monthly_cost: float = 500,
+    monthly_cost: float = AI_AGENT_MONTHLY_COST,
     improvement_rate: float = 0.65
 ) -> Dict[str, float]:
     """
@@ -182,6 +194,227 @@ def calculate_roi(
     }
 
 
+# What-if sweeps
+# Axes in grid order; each accepts a single value or a list of values
+SWEEP_AXES = (
+    "business_type",
+    "avg_ticket_value",
+    "calls_per_day",
+    "current_answer_rate",
+    "conversion_rate",
+    "days_open_per_week",
+    "monthly_cost",
+    "improvement_rate",
+)
+SWEEP_CACHE_SIZE = 64
+# Total bytes of cached metric arrays (~136 bytes per scenario); larger sweeps are not cached
+SWEEP_CACHE_BYTES = 64 * 1024 * 1024
+
+_sweep_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_sweep_cache_bytes = 0
+_sweep_cache_lock = threading.Lock()
+
+
+def _axis(values: Union[Any, Sequence[Any]]) -> list:
+    if isinstance(values, (list, tuple, np.ndarray)):
+        return list(values)
+    return [values]
+
+
+def _round(values: np.ndarray, digits: int) -> np.ndarray:
+    """np.round, with near-halfway values rounded by Python's round() to match the scalar path"""
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, digits)
+    scaled = values * 10.0 ** digits
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if ties.any():
+        rounded[ties] = [round(float(v), digits) for v in values[ties]]
+    return rounded
+
+
+def _sweep_key(axes: Dict[str, list]) -> str:
+    canonical = json.dumps(axes, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def sweep_missed_call_tax(
+    business_type: Union[BusinessType, str, Sequence[Union[BusinessType, str]]] = BusinessType.HVAC,
+    avg_ticket_value: Union[float, Sequence[float]] = 2500,
+    calls_per_day: Union[int, Sequence[int]] = 30,
+    current_answer_rate: Union[float, Sequence[float]] = 65,
+    conversion_rate: Union[Optional[float], Sequence[Optional[float]]] = 30,
+    days_open_per_week: Union[int, Sequence[int]] = 5,
+    monthly_cost: Union[float, Sequence[float]] = AI_AGENT_MONTHLY_COST,
+    improvement_rate: Union[float, Sequence[float]] = 0.65,
+) -> Dict[str, Any]:
+    """
+    Evaluate every combination of the given inputs in one vectorized pass
+    
+    Same formulas (and integer truncation) as calculate_missed_call_tax and
+    calculate_roi, broadcast over a grid with one axis per SWEEP_AXES entry.
+    A conversion_rate of None (or 0) uses the industry benchmark.
+    
+    Results are cached per input hash (LRU, bounded by SWEEP_CACHE_SIZE entries
+    and SWEEP_CACHE_BYTES of arrays); cached arrays are read-only.
+    
+    Returns:
+        {
+            "axes": {axis: [values]},
+            "shape": grid shape (one dim per axis),
+            "metrics": {metric: ndarray of that shape},
+            "scenarios": grid size,
+            "seconds": compute time,
+            "scenarios_per_sec": throughput of that computation,
+            "cached": bool,
+            "key": input hash,
+        }
+    """
+    axes = {
+        "business_type": [BusinessType(b).value for b in _axis(business_type)],
+        "avg_ticket_value": [float(v) for v in _axis(avg_ticket_value)],
+        "calls_per_day": [int(v) for v in _axis(calls_per_day)],
+        "current_answer_rate": [float(v) for v in _axis(current_answer_rate)],
+        "conversion_rate": [None if v is None else float(v) for v in _axis(conversion_rate)],
+        "days_open_per_week": [int(v or 5) for v in _axis(days_open_per_week)],
+        "monthly_cost": [float(v) for v in _axis(monthly_cost)],
+        "improvement_rate": [float(v) for v in _axis(improvement_rate)],
+    }
+    key = _sweep_key(axes)
+    with _sweep_cache_lock:
+        cached = _sweep_cache.get(key)
+        if cached is not None:
+            _sweep_cache.move_to_end(key)
+            return {**cached, "cached": True}
+
+    started = time.perf_counter()
+    shape = tuple(len(axes[name]) for name in SWEEP_AXES)
+
+    def grid(name: str, values) -> np.ndarray:
+        # 1-D values reshaped to broadcast along their own axis
+        dims = [1] * len(SWEEP_AXES)
+        dims[SWEEP_AXES.index(name)] = -1
+        return np.asarray(values, dtype=np.float64).reshape(dims)
+
+    types = [BusinessType(b) for b in axes["business_type"]]
+    benchmarks = [INDUSTRY_BENCHMARKS.get(t, INDUSTRY_BENCHMARKS[BusinessType.HVAC]) for t in types]
+    bench_conversion = grid("business_type", [b["avg_conversion_rate"] for b in benchmarks])
+    industry_avg = grid("business_type", [b["avg_answer_rate"] for b in benchmarks])
+
+    ticket = grid("avg_ticket_value", axes["avg_ticket_value"])
+    calls = grid("calls_per_day", axes["calls_per_day"])
+    answer_rate = grid("current_answer_rate", axes["current_answer_rate"])
+    conversion = grid("conversion_rate", [v or np.nan for v in axes["conversion_rate"]])
+    days = grid("days_open_per_week", axes["days_open_per_week"])
+    cost = grid("monthly_cost", axes["monthly_cost"])
+    improvement = grid("improvement_rate", axes["improvement_rate"])
+
+    # Same steps as calculate_missed_call_tax; int() truncation -> np.trunc
+    conversion = np.where(np.isnan(conversion), bench_conversion, conversion)
+    total_calls = np.trunc(calls * (days * 4.33))
+    calls_answered = np.trunc(total_calls * (answer_rate / 100))
+    calls_missed = total_calls - calls_answered
+    with np.errstate(divide="ignore", invalid="ignore"):
+        missed_percentage = np.where(total_calls > 0, calls_missed / total_calls * 100, 0.0)
+    conversion_decimal = conversion / 100
+    jobs_from_answered = np.trunc(calls_answered * conversion_decimal)
+    jobs_from_missed = np.trunc(calls_missed * conversion_decimal)
+    revenue_captured = jobs_from_answered * ticket
+    revenue_lost = jobs_from_missed * ticket
+    additional_calls = np.trunc(total_calls * (IMPROVED_ANSWER_RATE / 100)) - calls_answered
+    additional_revenue = np.trunc(additional_calls * conversion_decimal) * ticket
+    # Then calculate_roi's steps on the reported (rounded) monthly_loss
+    monthly_loss = _round(revenue_lost, 2)
+    monthly_recovery = monthly_loss * improvement
+    monthly_net_gain = monthly_recovery - cost
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi_percentage = np.where(cost > 0, (additional_revenue - cost) / cost * 100, 0.0)
+        agent_roi = np.where(cost > 0, monthly_net_gain / cost * 100, 0.0)
+        payback = np.where(monthly_net_gain > 0, cost / monthly_net_gain, 999.0)
+
+    metrics = {
+        "total_calls_per_month": total_calls,
+        "calls_answered": calls_answered,
+        "calls_missed": calls_missed,
+        "missed_call_percentage": _round(missed_percentage, 1),
+        "potential_jobs_from_missed": jobs_from_missed,
+        "revenue_captured": _round(revenue_captured, 2),
+        "monthly_loss": monthly_loss,
+        "annual_loss": _round(revenue_lost * 12, 2),
+        "additional_calls_answered": additional_calls,
+        "additional_revenue": _round(additional_revenue, 2),
+        "roi_percentage": _round(roi_percentage, 1),
+        "answer_rate_vs_industry": answer_rate - industry_avg,
+        "monthly_recovery": _round(monthly_recovery, 2),
+        "monthly_net_gain": _round(monthly_net_gain, 2),
+        "annual_net_gain": _round(monthly_net_gain * 12, 2),
+        "agent_roi_percentage": _round(agent_roi, 1),
+        "payback_months": _round(payback, 1),
+    }
+    for name, values in metrics.items():
+        values = np.broadcast_to(values, shape)
+        if name in ("total_calls_per_month", "calls_answered", "calls_missed",
+                    "potential_jobs_from_missed", "additional_calls_answered"):
+            values = values.astype(np.int64)
+        else:
+            values = np.ascontiguousarray(values)
+        values.flags.writeable = False
+        metrics[name] = values
+
+    elapsed = time.perf_counter() - started
+    scenarios = int(np.prod(shape))
+    result = {
+        "axes": axes,
+        "shape": list(shape),
+        "metrics": metrics,
+        "scenarios": scenarios,
+        "seconds": round(elapsed, 6),
+        "scenarios_per_sec": round(scenarios / elapsed) if elapsed > 0 else None,
+        "key": key,
+    }
+    _cache_sweep(key, result)
+    return {**result, "cached": False}
+
+
+def _sweep_nbytes(result: Dict[str, Any]) -> int:
+    return sum(values.nbytes for values in result["metrics"].values())
+
+
+def _cache_sweep(key: str, result: Dict[str, Any]) -> None:
+    """Add a sweep to the LRU, evicting the oldest until both bounds hold"""
+    global _sweep_cache_bytes
+    nbytes = _sweep_nbytes(result)
+    if nbytes > SWEEP_CACHE_BYTES:
+        return
+    with _sweep_cache_lock:
+        if key in _sweep_cache:
+            return  # A concurrent call computed it first
+        _sweep_cache[key] = result
+        _sweep_cache_bytes += nbytes
+        while len(_sweep_cache) > SWEEP_CACHE_SIZE or _sweep_cache_bytes > SWEEP_CACHE_BYTES:
+            _, evicted = _sweep_cache.popitem(last=False)
+            _sweep_cache_bytes -= _sweep_nbytes(evicted)
+
+
+def compare_industries(**inputs) -> Dict[str, Dict[str, float]]:
+    """
+    Run the same inputs against every industry benchmark
+    
+    Conversion defaults to each industry's benchmark rate.
+    
+    Returns: {business_type: {metric: value}} for a single scenario
+    (non-business_type inputs must be single values)
+    """
+    inputs.setdefault("conversion_rate", None)
+    sweep = sweep_missed_call_tax(business_type=list(BusinessType), **inputs)
+    return {
+        business_type: {
+            name: values.reshape(len(sweep["axes"]["business_type"]), -1)[i, 0].item()
+            for name, values in sweep["metrics"].items()
+        }
+        for i, business_type in enumerate(sweep["axes"]["business_type"])
+    }
+
+
 def calculate_lead_score(
     monthly_loss: float,
     has_email: bool = False,
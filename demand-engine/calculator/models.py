@@ -1,7 +1,7 @@
 """
 Pydantic models for calculator input/output validation
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 from pydantic import BaseModel, Field, validator, EmailStr
 from enum import Enum
@@ -100,6 +100,49 @@ class CalculatorResult(BaseModel):
         }
 
 
+class SweepInput(BaseModel):
+    """What-if sweep: every combination of the listed values is evaluated"""
+    
+    business_type: List[BusinessType] = Field(default=[BusinessType.HVAC], min_items=1)
+    avg_ticket_value: List[float] = Field(default=[2500], min_items=1)
+    calls_per_day: List[int] = Field(default=[30], min_items=1)
+    current_answer_rate: List[float] = Field(default=[65], min_items=1)
+    conversion_rate: List[Optional[float]] = Field(default=[30], min_items=1, description="None = industry benchmark")
+    days_open_per_week: List[int] = Field(default=[5], min_items=1)
+    monthly_cost: List[float] = Field(default=[500], min_items=1)
+    improvement_rate: List[float] = Field(default=[0.65], min_items=1)
+    
+    # Metrics to return (default: all)
+    metrics: Optional[List[str]] = None
+    
+    @validator('avg_ticket_value', each_item=True)
+    def validate_ticket_value(cls, v):
+        if not 0 < v <= 100000:
+            raise ValueError("Ticket value must be between 0 and 100000")
+        return v
+    
+    @validator('calls_per_day', each_item=True)
+    def validate_calls_per_day(cls, v):
+        if not 0 < v <= 1000:
+            raise ValueError("Calls per day must be between 1 and 1000")
+        return v
+    
+    @validator('current_answer_rate', 'conversion_rate', each_item=True)
+    def validate_rate(cls, v):
+        if v is not None and not 0 <= v <= 100:
+            raise ValueError("Rates must be between 0 and 100")
+        return v
+    
+    @validator('days_open_per_week', each_item=True)
+    def validate_days_open(cls, v):
+        if not 1 <= v <= 7:
+            raise ValueError("Days open must be between 1 and 7")
+        return v
+    
+    class Config:
+        use_enum_values = True
+
+
 class LeadSubmission(BaseModel):
     """Lead data stored in database"""
     
@@ -8,7 +8,18 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from calculator.engine import calculate_missed_call_tax, calculate_roi, calculate_lead_score
+import itertools
+import time
+
+from calculator import engine
+from calculator.engine import (
+    SWEEP_AXES,
+    calculate_missed_call_tax,
+    calculate_roi,
+    calculate_lead_score,
+    compare_industries,
+    sweep_missed_call_tax,
+)
 from calculator.models import CalculatorInput, BusinessType
 
 
@@ -214,6 +225,99 @@ def test_all_business_types():
     print("\n✅ Test 6 passed!")
 
 
+def test_sweep_matches_scalar():
+    """Test the vectorized sweep against the scalar calculator, cell by cell"""
+    print("\n" + "="*60)
+    print("TEST 7: What-if Sweep vs Scalar")
+    print("="*60)
+    
+    sweep = sweep_missed_call_tax(
+        business_type=list(BusinessType),
+        avg_ticket_value=[99.99, 450, 2500.5],
+        calls_per_day=[1, 7, 30, 333],
+        current_answer_rate=[0, 33.3, 65, 97.5, 100],
+        conversion_rate=[None, 12.5, 100],
+        days_open_per_week=[1, 5, 7],
+    )
+    assert sweep["shape"] == [5, 3, 4, 5, 3, 3, 1, 1]
+    
+    for index in itertools.product(*[range(n) for n in sweep["shape"]]):
+        values = {axis: sweep["axes"][axis][i] for axis, i in zip(SWEEP_AXES, index)}
+        result = calculate_missed_call_tax(CalculatorInput(
+            business_type=values["business_type"],
+            avg_ticket_value=values["avg_ticket_value"],
+            calls_per_day=values["calls_per_day"],
+            current_answer_rate=values["current_answer_rate"],
+            conversion_rate=values["conversion_rate"],
+            days_open_per_week=values["days_open_per_week"],
+        ))
+        roi = calculate_roi(result.monthly_loss)
+        for metric in ("calls_missed", "missed_call_percentage", "monthly_loss", "annual_loss",
+                       "additional_revenue", "roi_percentage"):
+            assert sweep["metrics"][metric][index] == getattr(result, metric), (metric, values)
+        assert sweep["metrics"]["agent_roi_percentage"][index] == roi["roi_percentage"], values
+        assert sweep["metrics"]["payback_months"][index] == roi["payback_months"], values
+    
+    print(f"\n   {sweep['scenarios']} scenarios match the scalar calculator")
+    print("\n✅ Test 7 passed!")
+
+
+def test_sweep_cache_and_throughput():
+    """Test sweep caching, industry comparison and scenarios/sec vs scalar"""
+    print("\n" + "="*60)
+    print("TEST 8: Sweep Cache and Benchmark")
+    print("="*60)
+    
+    grid = dict(
+        business_type=list(BusinessType),
+        current_answer_rate=list(range(40, 100, 2)),
+        conversion_rate=list(range(10, 60, 2)),
+        avg_ticket_value=list(range(200, 5200, 200)),
+    )
+    first = sweep_missed_call_tax(**grid)
+    again = sweep_missed_call_tax(**grid)
+    assert not first["cached"] and again["cached"] and again["key"] == first["key"]
+    assert again["metrics"]["monthly_loss"] is first["metrics"]["monthly_loss"]
+    assert not first["metrics"]["monthly_loss"].flags.writeable
+    
+    started = time.perf_counter()
+    for answer_rate in grid["current_answer_rate"][:10]:
+        for ticket in grid["avg_ticket_value"][:10]:
+            calculate_missed_call_tax(CalculatorInput(
+                business_type=BusinessType.HVAC, avg_ticket_value=ticket,
+                calls_per_day=30, current_answer_rate=answer_rate,
+            ))
+    scalar_rate = 100 / (time.perf_counter() - started)
+    print(f"\n   Sweep: {first['scenarios']} scenarios, {first['scenarios_per_sec']:,} scenarios/sec")
+    print(f"   Scalar: {scalar_rate:,.0f} scenarios/sec")
+    assert first["scenarios"] == 5 * 30 * 25 * 25
+    assert first["scenarios_per_sec"] > scalar_rate * 10
+    
+    # The cache is bounded by array bytes, not just entries
+    nbytes = sum(values.nbytes for values in first["metrics"].values())
+    budget = engine.SWEEP_CACHE_BYTES
+    engine.SWEEP_CACHE_BYTES = int(nbytes * 1.5)
+    try:
+        other = sweep_missed_call_tax(**{**grid, "calls_per_day": 40})
+        assert not other["cached"] and first["key"] not in engine._sweep_cache
+        assert engine._sweep_cache_bytes <= engine.SWEEP_CACHE_BYTES
+        huge = sweep_missed_call_tax(**{**grid, "calls_per_day": [20, 40]})
+        assert not huge["cached"] and huge["key"] not in engine._sweep_cache
+        assert not sweep_missed_call_tax(**{**grid, "calls_per_day": [20, 40]})["cached"]
+    finally:
+        engine.SWEEP_CACHE_BYTES = budget
+    
+    industries = compare_industries(avg_ticket_value=2000, calls_per_day=25, current_answer_rate=60)
+    for business_type in BusinessType:
+        result = calculate_missed_call_tax(CalculatorInput(
+            business_type=business_type, avg_ticket_value=2000, calls_per_day=25, current_answer_rate=60,
+            conversion_rate=None,  # Industry benchmark
+        ))
+        assert industries[business_type.value]["monthly_loss"] == result.monthly_loss
+    
+    print("\n✅ Test 8 passed!")
+
+
 def run_all_tests():
     """Run all calculator tests"""
     print("\n" + "="*60)
@@ -227,6 +331,8 @@ def run_all_tests():
         test_roi_calculation()
         test_lead_scoring()
         test_all_business_types()
+        test_sweep_matches_scalar()
+        test_sweep_cache_and_throughput()
         
         print("\n" + "="*60)
         print("✅ ALL TESTS PASSED!")
@@ -10,6 +10,63 @@ from datetime import datetime, timezone
 import openai
 from openai import OpenAI
 
+from services.llm_cache import prompt_version
+
+SIGNAL_SCORING_PROMPT = """You are an expert HVAC business development analyst specializing in identifying high-value sales leads from online discussions.
+
+Analyze the following post and provide a detailed scoring assessment for an HVAC service company.
+
+Score each dimension from 0-10:
+
+1. **Urgency** (0-10): How immediate is the need?
+   - 10: Emergency/immediate need (broken system, no heat/AC)
+   - 7-9: Urgent but not emergency (system failing, needs repair soon)
+   - 4-6: Planning/considering (thinking about replacement)
+   - 0-3: General inquiry or future planning
+
+2. **Budget** (0-10): Financial capacity indicators
+   - 10: Clear budget mentioned, willing to invest
+   - 7-9: Discussing costs, comparing options
+   - 4-6: Price-conscious but willing to pay for quality
+   - 0-3: Looking for cheapest option, DIY mentions
+
+3. **Authority** (0-10): Decision-making power
+   - 10: Homeowner, business owner, clear decision maker
+   - 7-9: Primary household decision maker
+   - 4-6: Involved in decision but not sole authority
+   - 0-3: Renter, asking for someone else, no authority
+
+4. **Pain** (0-10): Problem severity and impact
+   - 10: Major comfort/health/safety issue
+   - 7-9: Significant discomfort or inefficiency
+   - 4-6: Noticeable problem but manageable
+   - 0-3: Minor inconvenience or curiosity
+
+Additionally provide:
+- **Sentiment**: positive, neutral, negative, frustrated, desperate
+- **Intent**: seeking_help, comparing_options, emergency, planning, complaining
+- **Lead_Quality**: hot, warm, qualified, cold
+- **Key_Indicators**: List 3-5 specific phrases or signals that influenced your scoring
+- **Recommended_Action**: immediate_contact, nurture, monitor, skip
+- **Reasoning**: 2-3 sentence explanation of your assessment
+
+Respond ONLY with valid JSON in this exact format:
+{
+  "urgency": 8,
+  "budget": 7,
+  "authority": 9,
+  "pain": 8,
+  "sentiment": "frustrated",
+  "intent": "seeking_help",
+  "lead_quality": "hot",
+  "key_indicators": ["broken AC", "no cooling", "homeowner", "willing to pay"],
+  "recommended_action": "immediate_contact",
+  "reasoning": "Homeowner with broken AC showing urgency and willingness to invest in solution."
+}"""
+
+# Changes with the prompt, so editing it invalidates cached scores
+PROMPT_VERSION = prompt_version(SIGNAL_SCORING_PROMPT)
+
 
 class AISignalScorer:
     """
@@ -47,7 +104,7 @@ class AISignalScorer:
         """
         try:
             # Prepare context
-            context = self._prepare_context(title, content, source, metadata)
+            context = self.prepare_context(title, content, source, metadata)
             
             # Get AI analysis
             analysis = self._analyze_with_gpt(context)
@@ -66,14 +123,14 @@ class AISignalScorer:
             print(f"❌ AI scoring error: {str(e)}")
             return self._fallback_score()
     
-    def _prepare_context(
+    def prepare_context(
         self,
         title: str,
         content: str,
         source: str,
         metadata: Optional[Dict[str, Any]]
     ) -> str:
-        """Prepare context for GPT analysis"""
+        """Prepare context for GPT analysis (the user message score_signal sends)"""
         context_parts = [
             f"Platform: {source}",
             f"Title: {title}",
@@ -92,64 +149,12 @@ class AISignalScorer:
     
     def _analyze_with_gpt(self, context: str) -> str:
         """Call GPT-4 for signal analysis"""
-        
-        system_prompt = """You are an expert HVAC business development analyst specializing in identifying high-value sales leads from online discussions.
-
-Analyze the following post and provide a detailed scoring assessment for an HVAC service company.
-
-Score each dimension from 0-10:
-
-1. **Urgency** (0-10): How immediate is the need?
-   - 10: Emergency/immediate need (broken system, no heat/AC)
-   - 7-9: Urgent but not emergency (system failing, needs repair soon)
-   - 4-6: Planning/considering (thinking about replacement)
-   - 0-3: General inquiry or future planning
-
-2. **Budget** (0-10): Financial capacity indicators
-   - 10: Clear budget mentioned, willing to invest
-   - 7-9: Discussing costs, comparing options
-   - 4-6: Price-conscious but willing to pay for quality
-   - 0-3: Looking for cheapest option, DIY mentions
-
-3. **Authority** (0-10): Decision-making power
-   - 10: Homeowner, business owner, clear decision maker
-   - 7-9: Primary household decision maker
-   - 4-6: Involved in decision but not sole authority
-   - 0-3: Renter, asking for someone else, no authority
-
-4. **Pain** (0-10): Problem severity and impact
-   - 10: Major comfort/health/safety issue
-   - 7-9: Significant discomfort or inefficiency
-   - 4-6: Noticeable problem but manageable
-   - 0-3: Minor inconvenience or curiosity
-
-Additionally provide:
-- **Sentiment**: positive, neutral, negative, frustrated, desperate
-- **Intent**: seeking_help, comparing_options, emergency, planning, complaining
-- **Lead_Quality**: hot, warm, qualified, cold
-- **Key_Indicators**: List 3-5 specific phrases or signals that influenced your scoring
-- **Recommended_Action**: immediate_contact, nurture, monitor, skip
-- **Reasoning**: 2-3 sentence explanation of your assessment
-
-Respond ONLY with valid JSON in this exact format:
-{
-  "urgency": 8,
-  "budget": 7,
-  "authority": 9,
-  "pain": 8,
-  "sentiment": "frustrated",
-  "intent": "seeking_help",
-  "lead_quality": "hot",
-  "key_indicators": ["broken AC", "no cooling", "homeowner", "willing to pay"],
-  "recommended_action": "immediate_contact",
-  "reasoning": "Homeowner with broken AC showing urgency and willingness to invest in solution."
-}"""
 
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    {"role": "system", "content": SIGNAL_SCORING_PROMPT},
                     {"role": "user", "content": context}
                 ],
                 temperature=0.3,  # Lower temperature for consistent scoring
@@ -4,7 +4,9 @@ Runs on Modal for batch processing
 """
 import os
 import json
-from typing import Dict, List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timezone
 import modal
 from openai import OpenAI
@@ -12,8 +14,18 @@ from tenacity import retry, stop_after_attempt, wait_exponential
 
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from config.modal_config import app, scraper_image, secrets
+from config.modal_config import app, scraper_image, secrets, cache_volume, llm_cache_secret, CACHE_DIR
 from classifiers.keywords import calculate_keyword_score, should_use_ai_classification
+from services.near_duplicates import NearDuplicateIndex
+from services.llm_cache import Completion, get_llm_cache, prompt_version, usage_cost
+
+# Near-duplicate clusters seen by this container; each cluster is AI-scored once
+_near_duplicates = NearDuplicateIndex()
+
+# Parallel completions per batch (bounded to stay inside the OpenAI rate limit)
+AI_CONCURRENCY = int(os.getenv("SCORER_AI_CONCURRENCY", "8"))
+# Ids per bulk write-back (`id=in.(...)` stays well inside URL limits)
+WRITE_BATCH_SIZE = 200
 
 
 AI_CLASSIFICATION_PROMPT = """You are a lead qualification expert for an AI call answering service targeting HVAC, plumbing, and electrical contractors.
@@ -42,6 +54,9 @@ Respond ONLY with valid JSON:
 }}"""
 
 
+_CLASSIFICATION_PROMPT_VERSION = prompt_version(AI_CLASSIFICATION_PROMPT)
+
+
 def create_openai_client() -> OpenAI:
     """Create OpenAI client"""
     api_key = os.getenv("OPENAI_API_KEY")
@@ -54,27 +69,33 @@ def create_openai_client() -> OpenAI:
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=2, max=10)
 )
-def classify_with_ai(signal: Dict) -> Dict:
+def classify_with_ai(signal: Dict, client: Optional[OpenAI] = None) -> Dict:
     """
     Use GPT-4o-mini to classify signal
     
-    Returns dict with AI scores and reasoning
+    Args:
+        signal: Signal row
+        client: OpenAI client to reuse (batches share one connection pool)
+    
+    Returns dict with AI scores and reasoning (`ai_tokens` is 0 and
+    `ai_cached` set when the response came from the LLM cache)
     """
-    client = create_openai_client()
     model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
     
-    prompt = AI_CLASSIFICATION_PROMPT.format(
-        title=signal.get("title", ""),
-        content=signal.get("content", "")[:2000],  # Limit content length
-        source=signal.get("source_platform", "unknown")
-    )
+    inputs = {
+        "title": signal.get("title", ""),
+        "content": signal.get("content", "")[:2000],  # Limit content length
+        "source": signal.get("source_platform", "unknown"),
+    }
+    called = []
     
-    try:
-        response = client.chat.completions.create(
+    def complete() -> Completion:
+        called.append(True)
+        response = (client or create_openai_client()).chat.completions.create(
             model=model,
             messages=[
                 {"role": "system", "content": "You are a lead qualification expert. Respond only with valid JSON."},
-                {"role": "user", "content": prompt}
+                {"role": "user", "content": AI_CLASSIFICATION_PROMPT.format(**inputs)}
             ],
             temperature=0.3,
             max_tokens=300,
@@ -82,8 +103,9 @@ def classify_with_ai(signal: Dict) -> Dict:
         )
         
         result = json.loads(response.choices[0].message.content)
+        usage = usage_cost(model, response.usage)
         
-        return {
+        return Completion({
             "ai_pain_score": result.get("pain_score", 0),
             "ai_urgency_score": result.get("urgency_score", 0),
             "ai_budget_score": result.get("budget_score", 0),
@@ -91,8 +113,17 @@ def classify_with_ai(signal: Dict) -> Dict:
             "ai_reasoning": result.get("reasoning", ""),
             "ai_is_qualified": result.get("is_qualified", False),
             "ai_business_type": result.get("business_type", "unknown"),
+            "ai_tokens": usage.tokens,
             "classification_method": "ai",
-        }
+        }, usage.tokens, usage.cost)
+    
+    try:
+        result = get_llm_cache().get_or_call(
+            "signal_classification", model, _CLASSIFICATION_PROMPT_VERSION, inputs, complete,
+        )
+        if not called:
+            result = {**result, "ai_tokens": 0, "ai_cached": True}
+        return result
         
     except Exception as e:
         print(f"❌ AI classification error: {e}")
@@ -107,6 +138,55 @@ def classify_with_ai(signal: Dict) -> Dict:
         }
 
 
+def build_signal_update(signal: Dict, keyword_result: Dict, ai_result: Optional[Dict],
+                        processed_at: Optional[str] = None) -> Tuple[Dict, Dict]:
+    """Merged scores and the `signals` columns to write for one signal"""
+    final_result = merge_scores(keyword_result, ai_result)
+    
+    update_data = {
+        "classified_score": final_result["final_score"],
+        "urgency_signals": keyword_result["matched_keywords"]["urgency"],
+        "budget_signals": keyword_result["matched_keywords"]["budget"],
+        "authority_signals": keyword_result["matched_keywords"]["authority"],
+        "pain_signals": keyword_result["matched_keywords"]["pain"],
+        "is_qualified": final_result["is_qualified"],
+        "classification_method": final_result["classification_method"],
+        "classification_confidence": 0.85 if final_result["classification_method"] == "hybrid" else 0.70,
+        "status": "classified",
+        "processed_at": processed_at or datetime.now(timezone.utc).isoformat(),
+    }
+    
+    # Add AI data to raw_data if used
+    if ai_result:
+        raw_data = dict(signal.get("raw_data") or {})
+        raw_data["ai_classification"] = ai_result
+        update_data["raw_data"] = raw_data
+    
+    return final_result, update_data
+
+
+def classify_near_duplicate(key: str, text: str, signal: Dict,
+                            index: NearDuplicateIndex = None) -> Dict:
+    """
+    classify_with_ai once per near-duplicate cluster
+
+    Reposts and lightly edited copies of an already-scored signal reuse its
+    AI result (tagged with `near_duplicate_of`) instead of a new completion.
+    """
+    index = _near_duplicates if index is None else index
+    cluster = index.add(key, text)
+    cached = index.result(cluster)
+    if cached is not None:
+        print(f"♻️  Near-duplicate of {index.representative(cluster)}, reusing its AI score")
+        return {**cached, "near_duplicate_of": index.representative(cluster)}
+    
+    print(f"🤖 Using AI for refinement...")
+    ai_result = classify_with_ai(signal)
+    if ai_result.get("classification_method") == "ai":
+        index.set_result(cluster, ai_result)
+    return ai_result
+
+
 def merge_scores(keyword_result: Dict, ai_result: Optional[Dict] = None) -> Dict:
     """
     Merge keyword and AI scores with weighted average
@@ -151,7 +231,8 @@ def merge_scores(keyword_result: Dict, ai_result: Optional[Dict] = None) -> Dict
 
 @app.function(
     image=scraper_image,
-    secrets=secrets,
+    secrets=secrets + [llm_cache_secret],
+    volumes={CACHE_DIR: cache_volume},
     timeout=300,
 )
 def score_signal(signal_id: str) -> Dict:
@@ -187,34 +268,14 @@ def score_signal(signal_id: str) -> Dict:
     # Step 2: Decide if AI needed
     ai_result = None
     if should_use_ai_classification(keyword_result):
-        print(f"🤖 Using AI for refinement...")
-        ai_result = classify_with_ai(signal)
+        ai_result = classify_near_duplicate(signal_id, text, signal)
     else:
         print(f"⚡ Keyword score sufficient, skipping AI")
     
     # Step 3: Merge scores
-    final_result = merge_scores(keyword_result, ai_result)
+    final_result, update_data = build_signal_update(signal, keyword_result, ai_result)
     
     # Step 4: Update database
-    update_data = {
-        "classified_score": final_result["final_score"],
-        "urgency_signals": keyword_result["matched_keywords"]["urgency"],
-        "budget_signals": keyword_result["matched_keywords"]["budget"],
-        "authority_signals": keyword_result["matched_keywords"]["authority"],
-        "pain_signals": keyword_result["matched_keywords"]["pain"],
-        "is_qualified": final_result["is_qualified"],
-        "classification_method": final_result["classification_method"],
-        "classification_confidence": 0.85 if final_result["classification_method"] == "hybrid" else 0.70,
-        "status": "classified",
-        "processed_at": datetime.now(timezone.utc).isoformat(),
-    }
-    
-    # Add AI data to raw_data if used
-    if ai_result:
-        signal["raw_data"] = signal.get("raw_data", {})
-        signal["raw_data"]["ai_classification"] = ai_result
-        update_data["raw_data"] = signal["raw_data"]
-    
     client.table("signals").update(update_data).eq("id", signal_id).execute()
     
     print(f"✅ Signal {signal_id[:8]}... scored: {final_result['final_score']} (qualified: {final_result['is_qualified']})")
@@ -222,37 +283,46 @@ def score_signal(signal_id: str) -> Dict:
     return final_result
 
 
-@app.function(
-    image=scraper_image,
-    secrets=secrets,
-    timeout=1800,
-)
-def score_batch(batch_size: int = 50, source_type: Optional[str] = None) -> Dict:
+def score_signals(
+    client,
+    batch_size: int = 50,
+    source_type: Optional[str] = None,
+    ai_concurrency: int = AI_CONCURRENCY,
+    classify: Callable[[Dict, Optional[OpenAI]], Dict] = classify_with_ai,
+    index: Optional[NearDuplicateIndex] = None,
+) -> Dict:
     """
-    Score a batch of unclassified signals
+    Score a batch of pending signals in bulk
+    
+    1. One query for the full rows
+    2. Keyword scoring locally for the whole batch
+    3. AI only for the ambiguous subset, one completion per near-duplicate
+       cluster, `ai_concurrency` at a time over one shared OpenAI client
+    4. Updates of only the scored columns, one per distinct payload and
+       WRITE_BATCH_SIZE ids, so concurrent edits to other columns survive
+       and a signal deleted meanwhile is not re-created
     
     Args:
+        client: Supabase client
         batch_size: Number of signals to process
         source_type: Optional filter by source type
+        ai_concurrency: Parallel AI completions
+        classify: AI classifier (signal, openai_client) -> result
+        index: Near-duplicate index (default: this container's)
     
     Returns:
-        Stats dict
+        Stats dict, including signals/min and tokens per signal
     """
-    from supabase import create_client
-    
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_KEY")
-    client = create_client(supabase_url, supabase_key)
+    index = _near_duplicates if index is None else index
+    started = time.perf_counter()
     
     # Fetch unclassified signals
-    query = client.table("signals").select("id").eq("status", "pending")
+    query = client.table("signals").select("*").eq("status", "pending")
     
     if source_type:
         query = query.eq("source_type", source_type)
     
-    result = query.order("created_at", desc=False).limit(batch_size).execute()
-    
-    signals = result.data
+    signals = query.order("created_at", desc=False).limit(batch_size).execute().data or []
     
     print(f"🔄 Processing batch of {len(signals)} signals")
     
@@ -263,33 +333,125 @@ def score_batch(batch_size: int = 50, source_type: Optional[str] = None) -> Dict
         "ai_used": 0,
         "keyword_only": 0,
         "errors": 0,
+        "ai_calls": 0,
+        "ai_reused": 0,
+        "ai_cached": 0,
+        "ai_tokens": 0,
+        "round_trips": 1,
     }
     
-    for signal in signals:
-        try:
-            result = score_signal.remote(signal["id"])
-            
-            stats["total_processed"] += 1
-            
-            if result["is_qualified"]:
-                stats["qualified"] += 1
-            else:
-                stats["not_qualified"] += 1
-            
-            if result["classification_method"] == "hybrid":
-                stats["ai_used"] += 1
-            else:
-                stats["keyword_only"] += 1
-                
-        except Exception as e:
-            print(f"❌ Error scoring signal {signal['id']}: {e}")
-            stats["errors"] += 1
+    # Step 1: Keyword scoring (local)
+    texts = [f"{s.get('title', '')} {s.get('content', '')}" for s in signals]
+    keyword_results = [calculate_keyword_score(text) for text in texts]
+    needs_ai = [i for i, kr in enumerate(keyword_results) if should_use_ai_classification(kr)]
+    
+    # Step 2: AI for the ambiguous subset, once per near-duplicate cluster
+    clusters = index.add_many((signals[i]["id"], texts[i]) for i in needs_ai)
+    to_classify = {}
+    for i, cluster in zip(needs_ai, clusters):
+        if index.result(cluster) is None and cluster not in to_classify:
+            to_classify[cluster] = i
+    
+    called = {}
+    if to_classify:
+        print(f"🤖 Using AI for {len(to_classify)} of {len(signals)} signals ({ai_concurrency} at a time)...")
+        openai_client = create_openai_client() if classify is classify_with_ai else None
+        with ThreadPoolExecutor(max_workers=max(1, ai_concurrency)) as pool:
+            futures = {
+                cluster: pool.submit(classify, signals[i], openai_client)
+                for cluster, i in to_classify.items()
+            }
+            for cluster, future in futures.items():
+                result = future.result()
+                called[cluster] = result
+                stats["ai_calls"] += 1
+                stats["ai_tokens"] += result.get("ai_tokens", 0)
+                stats["ai_cached"] += bool(result.get("ai_cached"))
+                if result.get("classification_method") == "ai":
+                    index.set_result(cluster, result)
+    
+    ai_results: Dict[int, Dict] = {}
+    for i, cluster in zip(needs_ai, clusters):
+        if to_classify.get(cluster) == i:
+            ai_results[i] = called[cluster]
+        elif index.result(cluster) is not None:
+            ai_results[i] = {**index.result(cluster), "near_duplicate_of": index.representative(cluster)}
+            stats["ai_reused"] += 1
+        else:
+            # Cluster's completion failed this batch; keyword score only
+            ai_results[i] = called.get(cluster)
+    
+    # Step 3: Merge scores and write back in bulk. Signals with the same
+    # payload (same keyword matches, no AI raw_data) share one UPDATE
+    processed_at = datetime.now(timezone.utc).isoformat()
+    by_payload: Dict[str, Tuple[Dict, List[str]]] = {}
+    for i, signal in enumerate(signals):
+        final_result, update_data = build_signal_update(
+            signal, keyword_results[i], ai_results.get(i), processed_at=processed_at
+        )
+        key = json.dumps(update_data, sort_keys=True, default=str)
+        by_payload.setdefault(key, (update_data, []))[1].append(signal["id"])
+        
+        stats["total_processed"] += 1
+        if final_result["is_qualified"]:
+            stats["qualified"] += 1
+        else:
+            stats["not_qualified"] += 1
+        if final_result["classification_method"] == "hybrid":
+            stats["ai_used"] += 1
+        else:
+            stats["keyword_only"] += 1
+    
+    for payload, ids in by_payload.values():
+        for start in range(0, len(ids), WRITE_BATCH_SIZE):
+            chunk = ids[start:start + WRITE_BATCH_SIZE]
+            stats["round_trips"] += 1
+            try:
+                client.table("signals").update(payload).in_("id", chunk).execute()
+            except Exception as e:
+                print(f"❌ Error writing {len(chunk)} scored signals: {e}")
+                stats["errors"] += len(chunk)
+                stats["total_processed"] -= len(chunk)
+    
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 2)
+    stats["signals_per_min"] = round(stats["total_processed"] / elapsed * 60, 1) if elapsed > 0 else 0.0
+    stats["tokens_per_signal"] = round(stats["ai_tokens"] / len(signals), 1) if signals else 0.0
     
     print(f"\n✅ Batch complete: {stats}")
     
     return stats
 
 
+@app.function(
+    image=scraper_image,
+    secrets=secrets + [llm_cache_secret],
+    volumes={CACHE_DIR: cache_volume},
+    timeout=1800,
+)
+def score_batch(batch_size: int = 50, source_type: Optional[str] = None) -> Dict:
+    """
+    Score a batch of unclassified signals
+    
+    Args:
+        batch_size: Number of signals to process
+        source_type: Optional filter by source type
+    
+    Returns:
+        Stats dict
+    """
+    from supabase import create_client
+    
+    supabase_url = os.getenv("SUPABASE_URL")
+    supabase_key = os.getenv("SUPABASE_KEY")
+    client = create_client(supabase_url, supabase_key)
+    
+    stats = score_signals(client, batch_size=batch_size, source_type=source_type)
+    cache_volume.commit()
+    stats["llm_cache"] = get_llm_cache().report()["total"]
+    return stats
+
+
 @app.local_entrypoint()
 def main(
     signal_id: Optional[str] = None,
@@ -0,0 +1,159 @@
+"""
+Test batched signal scoring against the in-memory Supabase stand-in
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import classifiers.scorer as scorer
+from services.near_duplicates import NearDuplicateIndex
+from tests.fakes import FakeSupabase
+
+POST = (
+    "Our HVAC company is overwhelmed with calls this summer and we keep missing calls. "
+    "Looking for an answering service that can book jobs after hours and on weekends"
+)
+OTHER = "Plumbing shop owner here, our front desk cannot keep up with emergency calls in Dallas"
+
+
+def _signal(i, content, status="pending"):
+    return {
+        "id": f"sig-{i}",
+        "title": "",
+        "content": content,
+        "source_type": "reddit",
+        "status": status,
+        "created_at": f"2026-01-01T00:00:{i:02d}+00:00",
+        "raw_data": {"url": f"https://example.com/{i}"},
+    }
+
+
+def _stub_classifier(delay=0.0):
+    lock = threading.Lock()
+    state = {"calls": [], "active": 0, "peak": 0}
+
+    def classify(signal, client):
+        with lock:
+            state["calls"].append(signal["id"])
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(delay)
+        with lock:
+            state["active"] -= 1
+        return {
+            "ai_pain_score": 20, "ai_urgency_score": 20, "ai_budget_score": 20, "ai_authority_score": 20,
+            "ai_is_qualified": True, "ai_tokens": 300, "classification_method": "ai",
+        }
+
+    return classify, state
+
+
+def test_batch_is_one_fetch_and_ai_once_per_cluster(monkeypatch):
+    # Posts mentioning "calls" are the ambiguous ones that need AI
+    monkeypatch.setattr(scorer, "should_use_ai_classification", lambda kr: True)
+    rows = [
+        _signal(0, POST),
+        _signal(1, POST + " Thanks in advance!"),
+        _signal(2, OTHER),
+        _signal(3, "unrelated", status="classified"),
+    ]
+    fake = FakeSupabase({"signals": list(rows)})
+    classify, state = _stub_classifier()
+
+    stats = scorer.score_signals(fake, batch_size=10, classify=classify, index=NearDuplicateIndex())
+
+    # One fetch, then one update per AI-scored row (each carries its own raw_data)
+    assert fake.db["_calls"] == 4 and stats["round_trips"] == 4
+    assert sorted(state["calls"]) == ["sig-0", "sig-2"]
+    assert stats["ai_calls"] == 2 and stats["ai_reused"] == 1 and stats["ai_used"] == 3
+    assert stats["total_processed"] == 3 and stats["tokens_per_signal"] == 200.0
+    assert stats["signals_per_min"] > 0
+
+    by_id = {r["id"]: r for r in fake.db["signals"]}
+    assert all(by_id[f"sig-{i}"]["status"] == "classified" for i in range(3))
+    # Untouched columns survive the bulk write
+    assert by_id["sig-1"]["raw_data"]["url"] == "https://example.com/1"
+    assert by_id["sig-1"]["raw_data"]["ai_classification"]["near_duplicate_of"] == "sig-0"
+    assert by_id["sig-3"] == rows[3]
+
+
+def test_ai_subset_only_and_bounded_concurrency(monkeypatch):
+    monkeypatch.setattr(scorer, "should_use_ai_classification", lambda kr: kr["_ambiguous"])
+    real_keyword_score = scorer.calculate_keyword_score
+    monkeypatch.setattr(
+        scorer, "calculate_keyword_score",
+        lambda text: {**real_keyword_score(text), "_ambiguous": "ambiguous" in text},
+    )
+    cities = ["dallas", "phoenix", "miami", "chicago", "denver", "atlanta",
+              "austin", "boston", "tampa", "reno", "omaha", "tulsa"]
+    rows = [_signal(i, f"ambiguous {city} shop {i} needs {i * 7} more booked jobs") for i, city in enumerate(cities)]
+    rows += [_signal(20 + i, f"clear-cut post {i}") for i in range(5)]
+    fake = FakeSupabase({"signals": rows})
+    classify, state = _stub_classifier(delay=0.02)
+
+    stats = scorer.score_signals(fake, batch_size=50, ai_concurrency=3, classify=classify, index=NearDuplicateIndex())
+
+    assert len(state["calls"]) == 12 and 1 < state["peak"] <= 3
+    assert stats["ai_used"] == 12 and stats["keyword_only"] == 5
+    # One fetch, an update per AI-scored row and one for the identical keyword-only rows
+    assert stats["round_trips"] == 1 + 12 + 1
+
+
+def test_write_back_keeps_concurrent_edits(monkeypatch):
+    monkeypatch.setattr(scorer, "should_use_ai_classification", lambda kr: True)
+    fake = FakeSupabase({"signals": [_signal(0, POST), _signal(1, OTHER)]})
+    classify, _ = _stub_classifier()
+
+    def classify_while_edited(signal, client):
+        # Someone assigns the lead while its completion is in flight
+        rows = fake.db["signals"]
+        for i, row in enumerate(rows):
+            if row["id"] == signal["id"]:
+                rows[i] = {**row, "assigned_to": "rep-7"}
+        return classify(signal, client)
+
+    scorer.score_signals(fake, batch_size=10, classify=classify_while_edited, index=NearDuplicateIndex())
+
+    for row in fake.db["signals"]:
+        assert row["assigned_to"] == "rep-7"
+        assert row["status"] == "classified" and row["classified_score"] is not None
+
+
+def test_keyword_only_rows_share_one_update():
+    fake = FakeSupabase({"signals": [_signal(i, "clear-cut post") for i in range(300)]})
+
+    stats = scorer.score_signals(fake, batch_size=300, classify=_stub_classifier()[0], index=NearDuplicateIndex())
+
+    assert stats["keyword_only"] == 300 and stats["total_processed"] == 300
+    # One fetch plus one update per WRITE_BATCH_SIZE ids
+    assert stats["round_trips"] == fake.db["_calls"] == 3
+    assert all(r["status"] == "classified" for r in fake.db["signals"])
+
+
+def test_write_back_never_inserts(monkeypatch):
+    monkeypatch.setattr(scorer, "should_use_ai_classification", lambda kr: True)
+    fake = FakeSupabase({"signals": [_signal(0, POST), _signal(1, OTHER)]})
+    classify, _ = _stub_classifier()
+
+    def classify_while_deleted(signal, client):
+        # The signal is deleted while its completion is in flight
+        fake.db["signals"] = [r for r in fake.db["signals"] if r["id"] != "sig-1"]
+        return classify(signal, client)
+
+    stats = scorer.score_signals(fake, batch_size=10, classify=classify_while_deleted, index=NearDuplicateIndex())
+
+    assert [r["id"] for r in fake.db["signals"]] == ["sig-0"]
+    assert stats["errors"] == 0
+    # Only the columns the scorer computes are sent; content columns are left alone
+    assert fake.db["signals"][0]["content"] == POST and "source" not in fake.db["signals"][0]
+
+
+if __name__ == "__main__":
+    import pytest
+
+    sys.exit(pytest.main([__file__, "-q"]))
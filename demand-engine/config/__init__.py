@@ -1,7 +1,7 @@
 """Configuration module for Demand Engine."""
 
 from .modal_config import app, scraper_image, secrets
-from .supabase_config import get_supabase, SupabaseClient, Tables
+from .supabase_config import get_supabase, SupabaseClient, Tables, run_query, run_blocking, query_stats
 
 __all__ = [
     "app",
@@ -10,4 +10,7 @@ __all__ = [
     "get_supabase",
     "SupabaseClient",
     "Tables",
+    "run_query",
+    "run_blocking",
+    "query_stats",
 ]
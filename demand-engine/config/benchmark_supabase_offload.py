@@ -0,0 +1,80 @@
+"""
+Benchmark async routes calling supabase-py directly vs through run_query
+
+A stand-in query sleeps in execute() to emulate a slow PostgREST round trip.
+Each scenario fires a burst of slow "report" requests alongside fast "lookup"
+requests and reports throughput and the latency seen by the fast requests.
+
+Usage (from demand-engine/):
+    python -m config.benchmark_supabase_offload
+    python -m config.benchmark_supabase_offload --slow 40 --fast 200 --slow-ms 250
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from config.supabase_config import SUPABASE_MAX_WORKERS, run_query
+
+
+class _StandInQuery:
+    def __init__(self, delay_s: float):
+        self.delay_s = delay_s
+
+    def execute(self):
+        time.sleep(self.delay_s)
+        return self
+
+
+async def _inline(query):
+    return query.execute()
+
+
+async def _offloaded(query):
+    return await run_query(query)
+
+
+async def _scenario(execute, n_slow: int, n_fast: int, slow_ms: float, fast_ms: float):
+    fast_latencies = []
+    started = time.perf_counter()
+
+    async def fast_request():
+        # Latency from the moment the burst arrives, i.e. including time spent
+        # waiting for the event loop
+        await execute(_StandInQuery(fast_ms / 1000))
+        fast_latencies.append((time.perf_counter() - started) * 1000)
+
+    async def slow_request():
+        await execute(_StandInQuery(slow_ms / 1000))
+
+    await asyncio.gather(*[slow_request() for _ in range(n_slow)], *[fast_request() for _ in range(n_fast)])
+    elapsed = time.perf_counter() - started
+
+    fast_latencies.sort()
+    return {
+        "seconds": elapsed,
+        "req_per_s": (n_slow + n_fast) / elapsed,
+        "fast_p50_ms": statistics.median(fast_latencies),
+        "fast_p95_ms": fast_latencies[int(len(fast_latencies) * 0.95) - 1],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slow", type=int, default=20, help="slow requests in the burst")
+    parser.add_argument("--fast", type=int, default=100, help="fast requests in the burst")
+    parser.add_argument("--slow-ms", type=float, default=200)
+    parser.add_argument("--fast-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"pool size {SUPABASE_MAX_WORKERS}; {args.slow} x {args.slow_ms:.0f}ms + {args.fast} x {args.fast_ms:.0f}ms")
+    print(f"{'mode':<12} {'seconds':>8} {'req/s':>8} {'fast p50 ms':>12} {'fast p95 ms':>12}")
+    for mode, execute in (("inline", _inline), ("run_query", _offloaded)):
+        result = asyncio.run(_scenario(execute, args.slow, args.fast, args.slow_ms, args.fast_ms))
+        print(f"{mode:<12} {result['seconds']:>8.2f} {result['req_per_s']:>8.1f} "
+              f"{result['fast_p50_ms']:>12.1f} {result['fast_p95_ms']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
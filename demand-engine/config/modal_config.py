@@ -18,6 +18,7 @@ scraper_image = (
         "openai==1.12.0",
         "python-dotenv==1.0.0",
         "tenacity==8.2.3",
+        "numpy>=1.24.0",  # services/near_duplicates.py
     )
 )
 
@@ -29,6 +30,10 @@ secrets = [
 # Volume for caching (optional)
 cache_volume = modal.Volume.from_name("scraper-cache", create_if_missing=True)
 
+# LLM response cache (services/llm_cache.py) lives on the cache volume
+CACHE_DIR = "/data/cache"
+llm_cache_secret = modal.Secret.from_dict({"LLM_CACHE_PATH": f"{CACHE_DIR}/llm_cache.sqlite3"})
+
 # IP Rotation Configuration
 # Decision: NO IP rotation for Phase 1
 # Reasons:
@@ -1,13 +1,31 @@
 """
 Supabase configuration and helper functions
+
+supabase-py is synchronous. Async routes must not call `.execute()` directly:
+use `await run_query(builder)` so the request runs on a bounded thread pool and
+the event loop stays free for other requests.
 """
 import os
-from typing import Optional
-from supabase import create_client, Client
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from supabase import create_client, Client, ClientOptions
 from dotenv import load_dotenv
 
+from utils.metrics import counter, histogram
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Offload pool size bounds concurrent in-flight queries per worker process
+SUPABASE_MAX_WORKERS = int(os.getenv("SUPABASE_MAX_WORKERS", "16"))
+# Per-query timeout (seconds); also applied to the underlying HTTP client
+SUPABASE_QUERY_TIMEOUT = float(os.getenv("SUPABASE_QUERY_TIMEOUT", "15"))
+SLOW_QUERY_MS = float(os.getenv("SUPABASE_SLOW_QUERY_MS", "500"))
+
 class SupabaseClient:
     """Singleton Supabase client"""
     
@@ -25,7 +43,13 @@ class SupabaseClient:
                     "SUPABASE_URL and SUPABASE_KEY must be set in environment"
                 )
             
-            cls._instance = create_client(url, key)
+            # One client per process: its HTTP session (and keep-alive
+            # connections) is shared by every query and every pool thread
+            cls._instance = create_client(
+                url,
+                key,
+                options=ClientOptions(postgrest_client_timeout=SUPABASE_QUERY_TIMEOUT),
+            )
         
         return cls._instance
     
@@ -40,6 +64,118 @@ def get_supabase() -> Client:
     return SupabaseClient.get_client()
 
 
+class QueryStats:
+    """
+    Per-label query timing (count, total/max ms, timeouts, errors), kept in
+    the metrics registry so GET /metrics scrapes it too
+    """
+    
+    def __init__(self):
+        self._durations = histogram(
+            "supabase_query_duration_seconds", "Blocking client call duration", ("query",),
+            buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+        )
+        self._failures = counter("supabase_query_failures_total", "Timed out or failed client calls", ("query", "outcome"))
+        self._max_ms: Dict[str, float] = {}
+    
+    def record(self, label: str, elapsed_ms: float, outcome: str = "ok") -> None:
+        self._durations.labels(label).observe(elapsed_ms / 1000)
+        if elapsed_ms > self._max_ms.get(label, 0.0):
+            self._max_ms[label] = elapsed_ms
+        if outcome != "ok":
+            self._failures.labels(label, outcome).inc()
+    
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        failures = {labels: child.value for labels, child in self._failures.children()}
+        snapshot = {}
+        for (label,), child in self._durations.children():
+            total_ms = child.sum * 1000
+            snapshot[label] = {
+                "count": child.count,
+                "total_ms": total_ms,
+                "max_ms": self._max_ms.get(label, 0.0),
+                "timeouts": int(failures.get((label, "timeout"), 0)),
+                "errors": int(failures.get((label, "error"), 0)),
+                "avg_ms": round(total_ms / child.count, 2) if child.count else 0,
+            }
+        return snapshot
+    
+    def reset(self) -> None:
+        self._durations.clear()
+        self._failures.clear()
+        self._max_ms.clear()
+
+
+query_stats = QueryStats()
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=SUPABASE_MAX_WORKERS, thread_name_prefix="supabase")
+    return _executor
+
+
+def _query_label(query: Any) -> str:
+    """'GET contacts' style label from a postgrest request builder"""
+    request = getattr(query, "request", None)
+    method = getattr(getattr(request, "http_method", None), "value", None)
+    path = str(getattr(request, "path", "") or "")
+    table = path.rstrip("/").rsplit("/", 1)[-1] if path else None
+    if method and table:
+        return f"{method} {table}"
+    return type(query).__name__
+
+
+async def run_blocking(
+    func: Callable[..., Any],
+    *args: Any,
+    timeout: Optional[float] = None,
+    label: Optional[str] = None,
+    **kwargs: Any,
+) -> Any:
+    """
+    Run a blocking client call (Supabase, Twilio, ...) on the shared pool
+    with timing and a timeout.
+    
+    Raises asyncio.TimeoutError when the call exceeds `timeout`
+    (default SUPABASE_QUERY_TIMEOUT).
+    """
+    label = label or getattr(func, "__qualname__", "call")
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        return await asyncio.wait_for(
+            loop.run_in_executor(_get_executor(), lambda: func(*args, **kwargs)),
+            timeout=timeout or SUPABASE_QUERY_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        logger.warning(f"Supabase query timed out: {label}")
+        raise
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        query_stats.record(label, elapsed_ms, outcome)
+        if elapsed_ms >= SLOW_QUERY_MS:
+            logger.warning(f"Slow Supabase query ({elapsed_ms:.0f}ms): {label}")
+
+
+async def run_query(query: Any, timeout: Optional[float] = None, label: Optional[str] = None) -> Any:
+    """
+    Execute a supabase-py query builder without blocking the event loop.
+    
+    Usage:
+        response = await run_query(supabase.table("contacts").select("*").eq("id", contact_id))
+    """
+    return await run_blocking(query.execute, timeout=timeout, label=label or _query_label(query))
+
+
 # Table names
 class Tables:
     LEADS = "leads"
@@ -0,0 +1,57 @@
+"""
+Test the Supabase offload helpers with a deliberately slow stand-in query
+"""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.supabase_config import run_query, query_stats
+
+
+class _SlowQuery:
+    """Stand-in for a postgrest request builder whose execute() blocks"""
+
+    def __init__(self, delay, data=None):
+        self.delay, self.data = delay, data
+
+    def execute(self):
+        time.sleep(self.delay)
+        return self.data
+
+
+def test_slow_query_does_not_block_event_loop():
+    async def scenario():
+        slow = asyncio.create_task(run_query(_SlowQuery(0.5, "slow"), label="slow"))
+        await asyncio.sleep(0.01)
+        started = time.perf_counter()
+        fast = await run_query(_SlowQuery(0.01, "fast"), label="fast")
+        fast_elapsed = time.perf_counter() - started
+        return fast, fast_elapsed, await slow
+
+    fast, fast_elapsed, slow = asyncio.run(scenario())
+    assert (fast, slow) == ("fast", "slow")
+    assert fast_elapsed < 0.3, "fast query waited on the slow one"
+
+
+def test_timeout_is_recorded():
+    query_stats.reset()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run_query(_SlowQuery(0.3), timeout=0.05, label="stuck"))
+
+    asyncio.run(run_query(_SlowQuery(0), label="ok"))
+    stats = query_stats.snapshot()
+    assert stats["stuck"]["timeouts"] == 1
+    assert stats["ok"]["count"] == 1 and stats["ok"]["timeouts"] == 0
+
+
+if __name__ == "__main__":
+    test_slow_query_does_not_block_event_loop()
+    test_timeout_is_recorded()
+    print("✅ Supabase offload tests passed")
@@ -12,7 +12,7 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.supabase_config import get_supabase
+from config.supabase_config import get_supabase, run_query
 
 router = APIRouter(prefix="/api/crm/activities", tags=["CRM - Activities"])
 
@@ -56,7 +56,7 @@ async def get_activities(
         if activity_type:
             query = query.eq("activity_type", activity_type)
         
-        response = query.order("activity_date", desc=True).range(offset, offset + limit - 1).execute()
+        response = await run_query(query.order("activity_date", desc=True).range(offset, offset + limit - 1))
         
         return {
             "activities": response.data,
@@ -74,7 +74,7 @@ async def get_activity(activity_id: str):
     try:
         supabase = get_supabase()
         
-        response = supabase.table("activities").select("*").eq("id", activity_id).single().execute()
+        response = await run_query(supabase.table("activities").select("*").eq("id", activity_id).single())
         
         if not response.data:
             raise HTTPException(status_code=404, detail="Activity not found")
@@ -96,13 +96,13 @@ async def create_activity(activity: ActivityCreate):
         if not activity_data.get("activity_date"):
             activity_data["activity_date"] = datetime.now().isoformat()
         
-        response = supabase.table("activities").insert(activity_data).execute()
+        response = await run_query(supabase.table("activities").insert(activity_data))
         
         # Update last_contact_at on lead if applicable
         if activity_data.get("lead_id"):
-            supabase.table("leads").update({
+            await run_query(supabase.table("leads").update({
                 "last_contact_at": activity_data["activity_date"]
-            }).eq("id", activity_data["lead_id"]).execute()
+            }).eq("id", activity_data["lead_id"]))
         
         return {
             "success": True,
@@ -120,13 +120,13 @@ async def get_lead_timeline(lead_id: str, limit: int = 100):
         supabase = get_supabase()
         
         # Get activities
-        activities = supabase.table("activities").select("*").eq("lead_id", lead_id).order("activity_date", desc=True).limit(limit).execute()
+        activities = await run_query(supabase.table("activities").select("*").eq("lead_id", lead_id).order("activity_date", desc=True).limit(limit))
         
         # Get notes
-        notes = supabase.table("notes").select("*").eq("lead_id", lead_id).order("created_at", desc=True).limit(limit).execute()
+        notes = await run_query(supabase.table("notes").select("*").eq("lead_id", lead_id).order("created_at", desc=True).limit(limit))
         
         # Get tasks
-        tasks = supabase.table("tasks").select("*").eq("lead_id", lead_id).order("created_at", desc=True).limit(limit).execute()
+        tasks = await run_query(supabase.table("tasks").select("*").eq("lead_id", lead_id).order("created_at", desc=True).limit(limit))
         
         # Combine and sort by date
         timeline = []
@@ -173,7 +173,7 @@ async def track_email_event(
         supabase = get_supabase()
         
         # Find activity by email_id
-        activity_response = supabase.table("activities").select("*").eq("email_id", email_id).execute()
+        activity_response = await run_query(supabase.table("activities").select("*").eq("email_id", email_id))
         
         if activity_response.data:
             activity = activity_response.data[0]
@@ -186,7 +186,7 @@ async def track_email_event(
             elif event_type == "clicked":
                 update_data["email_clicks"] = (activity.get("email_clicks", 0) or 0) + 1
             
-            supabase.table("activities").update(update_data).eq("id", activity["id"]).execute()
+            await run_query(supabase.table("activities").update(update_data).eq("id", activity["id"]))
             
             # Update lead engagement metrics
             if activity.get("lead_id"):
@@ -197,7 +197,7 @@ async def track_email_event(
                     lead_update["email_clicks"] = supabase.rpc("increment", {"row_id": activity["lead_id"], "table_name": "leads", "column_name": "email_clicks"})
                 
                 if lead_update:
-                    supabase.table("leads").update(lead_update).eq("id", activity["lead_id"]).execute()
+                    await run_query(supabase.table("leads").update(lead_update).eq("id", activity["lead_id"]))
         
         return {"success": True, "event": event_type}
         
@@ -0,0 +1,352 @@
+"""
+Campaign Dispatch Engine
+Sends a campaign to its recipients with bounded concurrency, Resend's batch
+endpoint and buffered bulk status writes.
+
+- Templates (subject/html/text) are compiled once per campaign
+- Recipients go out in batches of `batch_size` (one /emails/batch request,
+  or one request each with `use_batch_api=False`), `concurrency` requests in
+  flight, paced to `requests_per_second` with retries on 429/5xx
+- `campaign_recipients` statuses are upserted and `activities` inserted in
+  bulk every `flush_size` results (or `flush_interval` seconds); results stay
+  buffered until their write succeeds, and a failed write is retried
+- Resumable: recipients already marked sent are skipped, every flush
+  checkpoints `email_campaigns.total_sent`, and each message carries an
+  idempotency key so a resumed batch is not delivered twice
+- Throughput metrics in `stats`
+
+    dispatcher = CampaignDispatcher(supabase, get_resend_client(), campaign_id, campaign)
+    stats = await dispatcher.run(recipients)
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from config.supabase_config import run_blocking, run_query
+from services.signal_rollups import fetch_pages
+
+logger = logging.getLogger(__name__)
+
+# Resend's default account limit is 2 requests/second
+RESEND_REQUESTS_PER_SECOND = float(os.getenv("RESEND_REQUESTS_PER_SECOND", "2"))
+RESEND_BATCH_LIMIT = 100
+
+_VARIABLE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+# Variables filled from the recipient row; anything else is left as written
+CAMPAIGN_VARIABLES = ("first_name", "last_name", "email")
+
+
+class CompiledTemplate:
+    """A template split once into literal text and variable slots"""
+
+    def __init__(self, source: Optional[str], variables=CAMPAIGN_VARIABLES):
+        self.source = source
+        self.parts: List[Any] = []  # str literals and (name,) slots
+        if source is None:
+            return
+        pos = 0
+        for match in _VARIABLE.finditer(source):
+            if match.group(1) not in variables:
+                continue
+            self.parts.append(source[pos:match.start()])
+            self.parts.append((match.group(1),))
+            pos = match.end()
+        self.parts.append(source[pos:])
+
+    def render(self, values: Dict[str, Any]) -> Optional[str]:
+        if self.source is None:
+            return None
+        return "".join(
+            part if isinstance(part, str) else str(values.get(part[0]) or "")
+            for part in self.parts
+        )
+
+
+class CampaignDispatcher:
+    """Sends one campaign; one instance per run"""
+
+    def __init__(
+        self,
+        supabase,
+        email_client,
+        campaign_id: str,
+        campaign: Dict[str, Any],
+        concurrency: int = 4,
+        batch_size: int = RESEND_BATCH_LIMIT,
+        use_batch_api: bool = True,
+        requests_per_second: float = RESEND_REQUESTS_PER_SECOND,
+        flush_size: int = 500,
+        flush_interval: float = 5.0,
+        max_retries: int = 3,
+    ):
+        """
+        Args:
+            supabase: Supabase client
+            email_client: ResendEmailClient (send_batch / send_email / build_message)
+            campaign_id: email_campaigns.id
+            campaign: Campaign row (subject, html_content, text_content, name)
+            concurrency: Send requests in flight
+            batch_size: Recipients per batch request (max 100)
+            use_batch_api: False = one /emails request per recipient
+            requests_per_second: Provider rate limit (0 = unpaced)
+            flush_size: Buffered results per bulk write
+            flush_interval: Max seconds between bulk writes
+            max_retries: Retries per request on 429/5xx/network errors, and per bulk write
+        """
+        self.supabase = supabase
+        self.email_client = email_client
+        self.campaign_id = campaign_id
+        self.campaign = campaign
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, min(batch_size, RESEND_BATCH_LIMIT)) if use_batch_api else 1
+        self.use_batch_api = use_batch_api
+        self.min_interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+
+        self.subject = CompiledTemplate(campaign.get("subject", ""))
+        self.html = CompiledTemplate(campaign.get("html_content") or "")
+        self.text = CompiledTemplate(campaign.get("text_content") or None)
+
+        self._recipient_rows: List[Dict[str, Any]] = []
+        self._activities: List[Dict[str, Any]] = []
+        self._flush_lock = asyncio.Lock()
+        self._pace_lock = asyncio.Lock()
+        self._next_request_at = 0.0
+        self._last_flush = time.monotonic()
+        self._checkpoint_due = False
+
+        self.stats = {
+            "recipients": 0,
+            "sent_before": 0,
+            "skipped": 0,
+            "sent": 0,  # Sent and recorded in campaign_recipients
+            "failed": 0,
+            "unsaved": 0,  # Results whose status write never succeeded
+            "requests": 0,
+            "retries": 0,
+            "flushes": 0,
+            "write_round_trips": 0,
+            "write_errors": 0,
+            "seconds": 0.0,
+            "emails_per_sec": 0.0,
+        }
+
+    # ---- run --------------------------------------------------------------
+
+    async def run(self, recipients: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Send to every recipient not already sent; returns stats"""
+        started = time.perf_counter()
+        self.stats["recipients"] = len(recipients)
+
+        done = await self._already_sent()
+        self.stats["sent_before"] = len(done)
+
+        # Batches are cut from the full, id-ordered list so a resumed run
+        # rebuilds an unflushed batch with the same members (and idempotency key)
+        ordered = sorted(recipients, key=lambda r: str(r["id"]))
+        queue: asyncio.Queue = asyncio.Queue()
+        for start in range(0, len(ordered), self.batch_size):
+            batch = [r for r in ordered[start:start + self.batch_size] if r["id"] not in done]
+            self.stats["skipped"] += min(self.batch_size, len(ordered) - start) - len(batch)
+            if batch:
+                queue.put_nowait(batch)
+
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await self.flush()
+            self.stats["unsaved"] = len(self._recipient_rows)
+
+        elapsed = time.perf_counter() - started
+        self.stats["seconds"] = round(elapsed, 2)
+        self.stats["emails_per_sec"] = round(self.stats["sent"] / elapsed, 1) if elapsed > 0 else 0.0
+        return dict(self.stats)
+
+    async def _already_sent(self) -> set:
+        """Contacts this campaign already reached (the resume checkpoint)"""
+        def build_query():
+            return self.supabase.table("campaign_recipients")\
+                .select("contact_id")\
+                .eq("campaign_id", self.campaign_id)\
+                .in_("status", ["sent", "delivered", "opened", "clicked", "bounced"])\
+                .order("contact_id")
+
+        rows = await run_blocking(fetch_pages, build_query, label="GET campaign_recipients")
+        return {row["contact_id"] for row in rows}
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            try:
+                batch = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await self._send(batch)
+            if self._flush_due():
+                await self.flush(only_if_due=True)
+
+    def _flush_due(self) -> bool:
+        return len(self._recipient_rows) >= self.flush_size or \
+            time.monotonic() - self._last_flush >= self.flush_interval
+
+    # ---- sending ----------------------------------------------------------
+
+    def personalize(self, recipient: Dict[str, Any]) -> Dict[str, Optional[str]]:
+        return {
+            "subject": self.subject.render(recipient),
+            "html": self.html.render(recipient),
+            "text": self.text.render(recipient),
+        }
+
+    def idempotency_key(self, recipients: List[Dict[str, Any]]) -> str:
+        ids = ",".join(sorted(str(r["id"]) for r in recipients))
+        return f"campaign-{self.campaign_id}-" + hashlib.sha256(ids.encode("utf-8")).hexdigest()[:32]
+
+    async def _send(self, batch: List[Dict[str, Any]]) -> None:
+        contents = [self.personalize(r) for r in batch]
+        try:
+            if self.use_batch_api:
+                messages = [
+                    self.email_client.build_message(r["email"], c["subject"], c["html"], c["text"])
+                    for r, c in zip(batch, contents)
+                ]
+                results = await self._request(
+                    self.email_client.send_batch, messages, idempotency_key=self.idempotency_key(batch)
+                )
+            else:
+                r, c = batch[0], contents[0]
+                results = [await self._request(
+                    self.email_client.send_email,
+                    to_email=r["email"], subject=c["subject"], html_content=c["html"], text_content=c["text"],
+                    idempotency_key=self.idempotency_key(batch),
+                )]
+        except Exception as e:
+            logger.error(f"Campaign {self.campaign_id}: {len(batch)} emails failed: {e}")
+            for recipient in batch:
+                self._record(recipient, None, None, error=str(e))
+            return
+
+        for recipient, content, result in zip(batch, contents, results):
+            self._record(recipient, content["subject"], (result or {}).get("id"))
+
+    async def _request(self, send, *args, **kwargs):
+        """One provider request, paced and retried on 429/5xx/network errors"""
+        for attempt in range(self.max_retries + 1):
+            await self._pace()
+            self.stats["requests"] += 1
+            try:
+                return await send(*args, **kwargs)
+            except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                response = getattr(e, "response", None)
+                status = response.status_code if response is not None else None
+                retryable = status is None or status == 429 or status >= 500
+                if not retryable or attempt == self.max_retries:
+                    raise
+                self.stats["retries"] += 1
+                retry_after = response.headers.get("retry-after") if response is not None else None
+                await asyncio.sleep(float(retry_after) if retry_after else min(30.0, 0.5 * 2 ** attempt))
+
+    async def _pace(self) -> None:
+        if not self.min_interval:
+            return
+        async with self._pace_lock:
+            now = time.monotonic()
+            wait = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + self.min_interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    # ---- buffered writes --------------------------------------------------
+
+    def _record(self, recipient, subject, email_id, error: Optional[str] = None) -> None:
+        now = datetime.now().isoformat()
+        row = {
+            "campaign_id": self.campaign_id,
+            "contact_id": recipient["id"],
+            "lead_id": recipient.get("lead_id"),
+            "email": recipient["email"],
+        }
+        if error is None:
+            row.update({"status": "sent", "resend_email_id": email_id, "sent_at": now, "error_message": None})
+            self._activities.append({
+                "lead_id": recipient.get("lead_id"),
+                "contact_id": recipient["id"],
+                "activity_type": "email",
+                "subject": subject,
+                "description": f"Campaign email sent: {self.campaign.get('name')}",
+                "direction": "outbound",
+                "email_id": email_id,
+                "email_status": "sent",
+            })
+        else:
+            self.stats["failed"] += 1
+            row.update({"status": "failed", "resend_email_id": None, "sent_at": None, "error_message": error})
+        self._recipient_rows.append(row)
+
+    async def flush(self, only_if_due: bool = False) -> bool:
+        """
+        Write buffered statuses and activities, then checkpoint progress
+
+        Each step drops its rows from the buffer only once written; a failed
+        write is retried, and what still fails stays buffered for the next
+        flush. Returns True when everything buffered was written.
+        """
+        async with self._flush_lock:
+            if only_if_due and not self._flush_due():
+                return True  # Another worker flushed while this one waited
+            self._last_flush = time.monotonic()
+            for attempt in range(self.max_retries + 1):
+                try:
+                    await self._write_buffered()
+                    return True
+                except Exception as e:
+                    self.stats["write_errors"] += 1
+                    if attempt == self.max_retries:
+                        # Sends already happened; a resumed run skips them via their idempotency keys
+                        logger.error(
+                            f"Campaign {self.campaign_id}: bulk status write failed, "
+                            f"{len(self._recipient_rows)} results kept for the next flush: {e}"
+                        )
+                        return False
+                    logger.warning(f"Campaign {self.campaign_id}: bulk status write failed, retrying: {e}")
+                    await asyncio.sleep(min(30.0, 0.5 * 2 ** attempt))
+            return False
+
+    async def _write_buffered(self) -> None:
+        # Workers keep appending while a write is in flight; only the rows
+        # that were written are removed from the front of each buffer
+        rows, activities = list(self._recipient_rows), list(self._activities)
+        if rows:
+            await run_query(
+                self.supabase.table("campaign_recipients").upsert(rows, on_conflict="campaign_id,contact_id"),
+                label="UPSERT campaign_recipients",
+            )
+            del self._recipient_rows[:len(rows)]
+            self.stats["flushes"] += 1
+            self.stats["write_round_trips"] += 1
+            self.stats["sent"] += sum(row["status"] == "sent" for row in rows)
+            self._checkpoint_due = True
+
+        if activities:
+            await run_query(self.supabase.table("activities").insert(activities), label="INSERT activities")
+            del self._activities[:len(activities)]
+            self.stats["write_round_trips"] += 1
+
+        if self._checkpoint_due:
+            await run_query(self.supabase.table("email_campaigns").update({
+                "total_sent": self.stats["sent_before"] + self.stats["sent"],
+            }).eq("id", self.campaign_id))
+            self._checkpoint_due = False
+            self.stats["write_round_trips"] += 1
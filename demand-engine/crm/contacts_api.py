@@ -12,7 +12,7 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.supabase_config import get_supabase
+from config.supabase_config import get_supabase, run_query
 
 router = APIRouter(prefix="/api/crm/contacts", tags=["CRM - Contacts"])
 
@@ -92,10 +92,10 @@ async def get_contacts(
             if email_subscribed is not None:
                 query = query.eq("email_subscribed", email_subscribed)
             
-            response = query.order("created_at", desc=True).range(offset, offset + limit - 1).execute()
+            response = await run_query(query.order("created_at", desc=True).range(offset, offset + limit - 1))
             all_contacts.extend(response.data or [])
             
-            count_response = supabase.table("contacts").select("id", count="exact").execute()
+            count_response = await run_query(supabase.table("contacts").select("id", count="exact"))
             total_count += count_response.count or 0
         except Exception as e:
             print(f"Error fetching from contacts table: {e}")
@@ -110,7 +110,7 @@ async def get_contacts(
             if company:
                 query = query.ilike("business_name", f"%{company}%")
             
-            response = query.order("created_at", desc=True).range(offset, offset + limit - 1).execute()
+            response = await run_query(query.order("created_at", desc=True).range(offset, offset + limit - 1))
             
             # Transform business_contacts to match contacts format
             for bc in response.data or []:
@@ -132,7 +132,7 @@ async def get_contacts(
                     "notes": bc.get("notes")
                 })
             
-            count_response = supabase.table("business_contacts").select("id", count="exact").execute()
+            count_response = await run_query(supabase.table("business_contacts").select("id", count="exact"))
             total_count += count_response.count or 0
         except Exception as e:
             print(f"Error fetching from business_contacts table: {e}")
@@ -157,7 +157,7 @@ async def get_contact(contact_id: str):
     try:
         supabase = get_supabase()
         
-        response = supabase.table("contacts").select("*").eq("id", contact_id).is_("deleted_at", None).single().execute()
+        response = await run_query(supabase.table("contacts").select("*").eq("id", contact_id).is_("deleted_at", None).single())
         
         if not response.data:
             raise HTTPException(status_code=404, detail="Contact not found")
@@ -178,7 +178,7 @@ async def create_contact(contact: ContactCreate):
         
         contact_data = contact.dict()
         
-        response = supabase.table("contacts").insert(contact_data).execute()
+        response = await run_query(supabase.table("contacts").insert(contact_data))
         
         return {
             "success": True,
@@ -200,7 +200,7 @@ async def update_contact(contact_id: str, contact: ContactUpdate):
         if not update_data:
             raise HTTPException(status_code=400, detail="No data to update")
         
-        response = supabase.table("contacts").update(update_data).eq("id", contact_id).execute()
+        response = await run_query(supabase.table("contacts").update(update_data).eq("id", contact_id))
         
         return {
             "success": True,
@@ -218,11 +218,11 @@ async def delete_contact(contact_id: str, hard_delete: bool = False):
         supabase = get_supabase()
         
         if hard_delete:
-            response = supabase.table("contacts").delete().eq("id", contact_id).execute()
+            response = await run_query(supabase.table("contacts").delete().eq("id", contact_id))
         else:
-            response = supabase.table("contacts").update({
+            response = await run_query(supabase.table("contacts").update({
                 "deleted_at": datetime.now().isoformat()
-            }).eq("id", contact_id).execute()
+            }).eq("id", contact_id))
         
         return {"success": True, "message": "Contact deleted"}
         
@@ -244,7 +244,7 @@ async def unsubscribe_contact(contact_id: str, unsubscribe_type: str = "email"):
         else:
             raise HTTPException(status_code=400, detail="Invalid unsubscribe type")
         
-        response = supabase.table("contacts").update(update_data).eq("id", contact_id).execute()
+        response = await run_query(supabase.table("contacts").update(update_data).eq("id", contact_id))
         
         return {"success": True, "message": f"Contact unsubscribed from {unsubscribe_type}"}
         
@@ -258,7 +258,7 @@ async def get_contacts_by_lead(lead_id: str):
     try:
         supabase = get_supabase()
         
-        response = supabase.table("contacts").select("*").eq("lead_id", lead_id).is_("deleted_at", None).execute()
+        response = await run_query(supabase.table("contacts").select("*").eq("lead_id", lead_id).is_("deleted_at", None))
         
         return response.data
         
@@ -272,7 +272,7 @@ async def get_contacts_by_company(company_name: str):
     try:
         supabase = get_supabase()
         
-        response = supabase.table("contacts").select("*").ilike("company_name", f"%{company_name}%").is_("deleted_at", None).execute()
+        response = await run_query(supabase.table("contacts").select("*").ilike("company_name", f"%{company_name}%").is_("deleted_at", None))
         
         return response.data
         
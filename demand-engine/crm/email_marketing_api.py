@@ -13,8 +13,10 @@ import httpx
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.supabase_config import get_supabase
-from email_service.resend_client import ResendEmailClient
+from config.supabase_config import get_supabase, run_blocking, run_query
+from email_service.resend_client import get_resend_client
+from crm.campaign_dispatch import CampaignDispatcher
+from services.signal_rollups import fetch_pages
 
 router = APIRouter(prefix="/api/crm/email-marketing", tags=["CRM - Email Marketing"])
 
@@ -63,7 +65,7 @@ async def get_templates(
             if category:
                 query = query.eq("category", category)
             
-            response = query.order("created_at", desc=True).execute()
+            response = await run_query(query.order("created_at", desc=True))
             
             if response.data:
                 return response.data
@@ -117,7 +119,7 @@ async def get_template(template_id: str):
     try:
         supabase = get_supabase()
         
-        response = supabase.table("email_templates").select("*").eq("id", template_id).single().execute()
+        response = await run_query(supabase.table("email_templates").select("*").eq("id", template_id).single())
         
         if not response.data:
             raise HTTPException(status_code=404, detail="Template not found")
@@ -137,7 +139,7 @@ async def create_template(template: EmailTemplateCreate):
         template_data = template.dict()
         template_data["created_by"] = "admin"
         
-        response = supabase.table("email_templates").insert(template_data).execute()
+        response = await run_query(supabase.table("email_templates").insert(template_data))
         
         return {
             "success": True,
@@ -163,7 +165,7 @@ async def get_campaigns(
         if status:
             query = query.eq("status", status)
         
-        response = query.order("created_at", desc=True).range(offset, offset + limit - 1).execute()
+        response = await run_query(query.order("created_at", desc=True).range(offset, offset + limit - 1))
         
         return {
             "campaigns": response.data,
@@ -182,7 +184,7 @@ async def get_campaign(campaign_id: str):
         supabase = get_supabase()
         
         # Get campaign
-        campaign_response = supabase.table("email_campaigns").select("*").eq("id", campaign_id).single().execute()
+        campaign_response = await run_query(supabase.table("email_campaigns").select("*").eq("id", campaign_id).single())
         
         if not campaign_response.data:
             raise HTTPException(status_code=404, detail="Campaign not found")
@@ -190,7 +192,7 @@ async def get_campaign(campaign_id: str):
         campaign = campaign_response.data
         
         # Get recipients stats
-        recipients_response = supabase.table("campaign_recipients").select("status", count="exact").eq("campaign_id", campaign_id).execute()
+        recipients_response = await run_query(supabase.table("campaign_recipients").select("status", count="exact").eq("campaign_id", campaign_id))
         
         # Group by status
         status_counts = {}
@@ -219,7 +221,7 @@ async def create_campaign(campaign: CampaignCreate):
         
         # If using template, load template content
         if campaign_data.get("template_id"):
-            template_response = supabase.table("email_templates").select("*").eq("id", campaign_data["template_id"]).single().execute()
+            template_response = await run_query(supabase.table("email_templates").select("*").eq("id", campaign_data["template_id"]).single())
             
             if template_response.data:
                 template = template_response.data
@@ -230,7 +232,7 @@ async def create_campaign(campaign: CampaignCreate):
                 if not campaign_data.get("subject"):
                     campaign_data["subject"] = template.get("subject")
         
-        response = supabase.table("email_campaigns").insert(campaign_data).execute()
+        response = await run_query(supabase.table("email_campaigns").insert(campaign_data))
         
         return {
             "success": True,
@@ -252,7 +254,7 @@ async def send_campaign(
         supabase = get_supabase()
         
         # Get campaign
-        campaign_response = supabase.table("email_campaigns").select("*").eq("id", campaign_id).single().execute()
+        campaign_response = await run_query(supabase.table("email_campaigns").select("*").eq("id", campaign_id).single())
         
         if not campaign_response.data:
             raise HTTPException(status_code=404, detail="Campaign not found")
@@ -261,7 +263,7 @@ async def send_campaign(
         
         # If test email provided, send test only
         if send_params.test_email:
-            email_client = ResendEmailClient()
+            email_client = get_resend_client()
             
             result = await email_client.send_email(
                 to_email=send_params.test_email,
@@ -279,23 +281,26 @@ async def send_campaign(
         # Get recipients based on target segment
         target_segment = campaign.get("target_segment", {})
         
-        query = supabase.table("contacts").select("id, email, first_name, last_name, lead_id").eq("email_subscribed", True).is_("deleted_at", None)
-        
-        # Apply segment filters
-        if target_segment.get("tags"):
-            query = query.contains("tags", target_segment["tags"])
+        def build_query():
+            query = supabase.table("contacts").select("id, email, first_name, last_name, lead_id").eq("email_subscribed", True).is_("deleted_at", None)
+            
+            # Apply segment filters
+            if target_segment.get("tags"):
+                query = query.contains("tags", target_segment["tags"])
+            
+            return query.order("id")
         
-        recipients_response = query.execute()
-        recipients = recipients_response.data or []
+        # Page past PostgREST's per-response cap
+        recipients = await run_blocking(fetch_pages, build_query, label="GET contacts")
         
         if not recipients:
             raise HTTPException(status_code=400, detail="No recipients found for this segment")
         
         # Update campaign status
-        supabase.table("email_campaigns").update({
+        await run_query(supabase.table("email_campaigns").update({
             "status": "sending",
             "recipient_count": len(recipients)
-        }).eq("id", campaign_id).execute()
+        }).eq("id", campaign_id))
         
         # Create recipient records
         recipient_records = []
@@ -309,7 +314,10 @@ async def send_campaign(
             })
         
         if recipient_records:
-            supabase.table("campaign_recipients").insert(recipient_records).execute()
+            # Re-sending a campaign resumes it: existing recipient rows keep their status
+            await run_query(supabase.table("campaign_recipients").upsert(
+                recipient_records, on_conflict="campaign_id,contact_id", ignore_duplicates=True
+            ))
         
         # Send emails in background
         background_tasks.add_task(
@@ -330,89 +338,33 @@ async def send_campaign(
 
 
 async def send_campaign_emails(campaign_id: str, campaign: dict, recipients: List[dict]):
-    """Background task to send campaign emails"""
+    """Background task to send campaign emails (see crm/campaign_dispatch.py)"""
     try:
         supabase = get_supabase()
-        email_client = ResendEmailClient()
         
-        sent_count = 0
-        failed_count = 0
-        
-        for recipient in recipients:
-            try:
-                # Personalize content
-                html_content = campaign.get("html_content", "")
-                text_content = campaign.get("text_content", "")
-                subject = campaign.get("subject", "")
-                
-                # Replace variables
-                replacements = {
-                    "{{first_name}}": recipient.get("first_name", ""),
-                    "{{last_name}}": recipient.get("last_name", ""),
-                    "{{email}}": recipient.get("email", "")
-                }
-                
-                for key, value in replacements.items():
-                    html_content = html_content.replace(key, value)
-                    text_content = text_content.replace(key, value) if text_content else None
-                    subject = subject.replace(key, value)
-                
-                # Send email
-                result = await email_client.send_email(
-                    to_email=recipient["email"],
-                    subject=subject,
-                    html_content=html_content,
-                    text_content=text_content
-                )
-                
-                # Update recipient status
-                supabase.table("campaign_recipients").update({
-                    "status": "sent",
-                    "resend_email_id": result.get("email_id"),
-                    "sent_at": datetime.now().isoformat()
-                }).eq("campaign_id", campaign_id).eq("contact_id", recipient["id"]).execute()
-                
-                # Create activity
-                supabase.table("activities").insert({
-                    "lead_id": recipient.get("lead_id"),
-                    "contact_id": recipient["id"],
-                    "activity_type": "email",
-                    "subject": subject,
-                    "description": f"Campaign email sent: {campaign['name']}",
-                    "direction": "outbound",
-                    "email_id": result.get("email_id"),
-                    "email_status": "sent"
-                }).execute()
-                
-                sent_count += 1
-                
-            except Exception as e:
-                print(f"Failed to send to {recipient['email']}: {str(e)}")
-                
-                # Update recipient with error
-                supabase.table("campaign_recipients").update({
-                    "status": "failed",
-                    "error_message": str(e)
-                }).eq("campaign_id", campaign_id).eq("contact_id", recipient["id"]).execute()
-                
-                failed_count += 1
+        dispatcher = CampaignDispatcher(supabase, get_resend_client(), campaign_id, campaign)
+        stats = await dispatcher.run(recipients)
         
         # Update campaign final stats
-        supabase.table("email_campaigns").update({
+        await run_query(supabase.table("email_campaigns").update({
             "status": "sent",
-            "total_sent": sent_count,
+            "total_sent": stats["sent_before"] + stats["sent"],
             "sent_at": datetime.now().isoformat()
-        }).eq("id", campaign_id).execute()
+        }).eq("id", campaign_id))
         
-        print(f"Campaign {campaign_id} complete: {sent_count} sent, {failed_count} failed")
+        print(
+            f"Campaign {campaign_id} complete: {stats['sent']} sent, {stats['failed']} failed, "
+            f"{stats['skipped']} already sent ({stats['emails_per_sec']} emails/s, {stats['requests']} requests)"
+        )
+        return stats
         
     except Exception as e:
         print(f"Campaign sending error: {str(e)}")
         
         # Mark campaign as failed
-        supabase.table("email_campaigns").update({
+        await run_query(supabase.table("email_campaigns").update({
             "status": "failed"
-        }).eq("id", campaign_id).execute()
+        }).eq("id", campaign_id))
 
 
 @router.get("/campaigns/{campaign_id}/recipients")
@@ -426,7 +378,7 @@ async def get_campaign_recipients(campaign_id: str, status: Optional[str] = None
         if status:
             query = query.eq("status", status)
         
-        response = query.order("sent_at", desc=True).execute()
+        response = await run_query(query.order("sent_at", desc=True))
         
         return response.data
         
@@ -454,21 +406,21 @@ async def resend_webhook(event_data: dict):
         elif event_type == "email.opened":
             update_data = {"status": "opened", "opened_at": datetime.now().isoformat()}
             # Increment opens count
-            supabase.rpc("increment_campaign_recipient_opens", {"email_id_param": email_id}).execute()
+            await run_query(supabase.rpc("increment_campaign_recipient_opens", {"email_id_param": email_id}))
         elif event_type == "email.clicked":
             update_data = {"status": "clicked", "clicked_at": datetime.now().isoformat()}
             # Increment clicks count
-            supabase.rpc("increment_campaign_recipient_clicks", {"email_id_param": email_id}).execute()
+            await run_query(supabase.rpc("increment_campaign_recipient_clicks", {"email_id_param": email_id}))
         elif event_type == "email.bounced":
             update_data = {"status": "bounced", "bounced_at": datetime.now().isoformat()}
         
         if update_data:
-            supabase.table("campaign_recipients").update(update_data).eq("resend_email_id", email_id).execute()
+            await run_query(supabase.table("campaign_recipients").update(update_data).eq("resend_email_id", email_id))
         
         # Also update activity if exists
-        supabase.table("activities").update({
+        await run_query(supabase.table("activities").update({
             "email_status": event_type.replace("email.", "")
-        }).eq("email_id", email_id).execute()
+        }).eq("email_id", email_id))
         
         return {"success": True, "event": event_type}
         
@@ -11,7 +11,7 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.supabase_config import get_supabase
+from config.supabase_config import get_supabase, run_query
 
 router = APIRouter(prefix="/api/crm/pipeline", tags=["CRM - Pipeline"])
 
@@ -35,7 +35,7 @@ async def get_pipeline_stages():
         supabase = get_supabase()
         
         try:
-            response = supabase.table("pipeline_stages").select("*").eq("is_active", True).order("position").execute()
+            response = await run_query(supabase.table("pipeline_stages").select("*").eq("is_active", True).order("position"))
             if response.data:
                 return response.data
         except Exception as e:
@@ -95,7 +95,7 @@ async def get_pipeline_view(
             if search:
                 query = query.or_(f"business_name.ilike.%{search}%,contact_name.ilike.%{search}%,email.ilike.%{search}%")
             
-            response = query.order("stage_position").order("lead_score", desc=True).execute()
+            response = await run_query(query.order("stage_position").order("lead_score", desc=True))
             
             for lead in response.data or []:
                 stage_name = lead.get("stage_name") or "New"
@@ -110,7 +110,7 @@ async def get_pipeline_view(
             if search:
                 query = query.or_(f"business_name.ilike.%{search}%,phone.ilike.%{search}%")
             
-            response = query.order("created_at", desc=True).execute()
+            response = await run_query(query.order("created_at", desc=True))
             
             for signal in response.data or []:
                 # Map signal status to pipeline stage
@@ -157,18 +157,18 @@ async def move_lead_to_stage(lead_id: str, update: LeadStageUpdate):
         status = update.stage_name.lower().replace(" ", "_")
         
         # Update lead
-        response = supabase.table("leads").update({
+        response = await run_query(supabase.table("leads").update({
             "status": status
-        }).eq("id", lead_id).execute()
+        }).eq("id", lead_id))
         
         # Create activity
-        supabase.table("activities").insert({
+        await run_query(supabase.table("activities").insert({
             "lead_id": lead_id,
             "activity_type": "status_change",
             "subject": f"Moved to {update.stage_name}",
             "description": update.notes or f"Lead moved to {update.stage_name} stage",
             "created_by": "system"
-        }).execute()
+        }))
         
         return {
             "success": True,
@@ -186,7 +186,7 @@ async def get_pipeline_stats():
         supabase = get_supabase()
         
         # Get leads by stage
-        response = supabase.table("lead_pipeline_view").select("stage_name, lead_score").execute()
+        response = await run_query(supabase.table("lead_pipeline_view").select("stage_name, lead_score"))
         
         stats = {}
         total_value = 0
@@ -225,7 +225,7 @@ async def update_stage(stage_id: str, update: StageUpdate):
         if not update_data:
             raise HTTPException(status_code=400, detail="No data to update")
         
-        response = supabase.table("pipeline_stages").update(update_data).eq("id", stage_id).execute()
+        response = await run_query(supabase.table("pipeline_stages").update(update_data).eq("id", stage_id))
         
         return {
             "success": True,
@@ -243,14 +243,14 @@ async def get_conversion_funnel():
         supabase = get_supabase()
         
         # Get all stages in order
-        stages_response = supabase.table("pipeline_stages").select("*").eq("is_active", True).order("position").execute()
+        stages_response = await run_query(supabase.table("pipeline_stages").select("*").eq("is_active", True).order("position"))
         
         funnel = []
         
         for stage in stages_response.data or []:
             # Count leads in this stage
             status = stage["name"].lower().replace(" ", "_")
-            count_response = supabase.table("leads").select("id", count="exact").eq("status", status).execute()
+            count_response = await run_query(supabase.table("leads").select("id", count="exact").eq("status", status))
             
             funnel.append({
                 "stage": stage["name"],
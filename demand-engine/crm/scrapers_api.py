@@ -12,7 +12,7 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.supabase_config import get_supabase
+from config.supabase_config import get_supabase, run_query
 
 router = APIRouter(prefix="/api/crm/scrapers", tags=["CRM - Scrapers"])
 
@@ -43,7 +43,7 @@ async def get_scraper_jobs(
         if status:
             query = query.eq("status", status)
         
-        response = query.order("created_at", desc=True).range(offset, offset + limit - 1).execute()
+        response = await run_query(query.order("created_at", desc=True).range(offset, offset + limit - 1))
         
         return {
             "jobs": response.data,
@@ -61,7 +61,7 @@ async def get_scraper_job(job_id: str):
     try:
         supabase = get_supabase()
         
-        response = supabase.table("scraper_jobs").select("*").eq("id", job_id).single().execute()
+        response = await run_query(supabase.table("scraper_jobs").select("*").eq("id", job_id).single())
         
         if not response.data:
             raise HTTPException(status_code=404, detail="Job not found")
@@ -88,7 +88,7 @@ async def create_scraper_job(
         if not job_data.get("job_name"):
             job_data["job_name"] = f"{job.scraper_type.title()} - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
         
-        response = supabase.table("scraper_jobs").insert(job_data).execute()
+        response = await run_query(supabase.table("scraper_jobs").insert(job_data))
         
         job_record = response.data[0] if response.data else None
         
@@ -119,10 +119,10 @@ async def run_scraper_job(job_id: str, scraper_type: str, config: Dict):
         supabase = get_supabase()
         
         # Update job status to running
-        supabase.table("scraper_jobs").update({
+        await run_query(supabase.table("scraper_jobs").update({
             "status": "running",
             "started_at": datetime.now().isoformat()
-        }).eq("id", job_id).execute()
+        }).eq("id", job_id))
         
         start_time = datetime.now()
         signals_found = 0
@@ -165,14 +165,14 @@ async def run_scraper_job(job_id: str, scraper_type: str, config: Dict):
         duration = int((end_time - start_time).total_seconds())
         
         # Update job with results
-        supabase.table("scraper_jobs").update({
+        await run_query(supabase.table("scraper_jobs").update({
             "status": "completed",
             "completed_at": end_time.isoformat(),
             "duration_seconds": duration,
             "signals_found": signals_found,
             "signals_new": signals_new,
             "signals_updated": signals_updated
-        }).eq("id", job_id).execute()
+        }).eq("id", job_id))
         
         print(f"Scraper job {job_id} completed: {signals_found} signals found, {signals_new} new")
         
@@ -180,12 +180,12 @@ async def run_scraper_job(job_id: str, scraper_type: str, config: Dict):
         print(f"Scraper job {job_id} failed: {str(e)}")
         
         # Update job with error
-        supabase.table("scraper_jobs").update({
+        await run_query(supabase.table("scraper_jobs").update({
             "status": "failed",
             "completed_at": datetime.now().isoformat(),
             "error_message": str(e),
             "error_details": {"error": str(e)}
-        }).eq("id", job_id).execute()
+        }).eq("id", job_id))
 
 
 @router.get("/stats")
@@ -195,7 +195,7 @@ async def get_scraper_stats():
         supabase = get_supabase()
         
         # Get job counts by type and status
-        jobs_response = supabase.table("scraper_jobs").select("scraper_type, status").execute()
+        jobs_response = await run_query(supabase.table("scraper_jobs").select("scraper_type, status"))
         
         stats = {
             "by_type": {},
@@ -216,7 +216,7 @@ async def get_scraper_stats():
             stats["by_status"][status] += 1
         
         # Get signal counts by source
-        signals_response = supabase.table("unified_signals_with_ai").select("source").execute()
+        signals_response = await run_query(supabase.table("unified_signals_with_ai").select("source"))
         
         stats["signals_by_source"] = {}
         for signal in signals_response.data or []:
@@ -12,7 +12,7 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.supabase_config import get_supabase
+from config.supabase_config import get_supabase, run_query
 
 router = APIRouter(prefix="/api/crm/tasks", tags=["CRM - Tasks"])
 
@@ -77,7 +77,7 @@ async def get_tasks(
             if overdue:
                 query = query.lt("due_date", datetime.now().isoformat()).eq("status", "pending")
             
-            response = query.order("due_date", desc=False).range(offset, offset + limit - 1).execute()
+            response = await run_query(query.order("due_date", desc=False).range(offset, offset + limit - 1))
             tasks = response.data or []
         except Exception as e:
             print(f"Tasks table not found, generating from signals: {e}")
@@ -85,7 +85,7 @@ async def get_tasks(
         # If no tasks, generate follow-up tasks from signals
         if not tasks:
             try:
-                signals_response = supabase.table("signals").select("*").order("created_at", desc=True).limit(limit).execute()
+                signals_response = await run_query(supabase.table("signals").select("*").order("created_at", desc=True).limit(limit))
                 
                 for signal in signals_response.data or []:
                     task_status = "completed" if signal.get("status") == "contacted" else "pending"
@@ -129,7 +129,7 @@ async def get_task(task_id: str):
     try:
         supabase = get_supabase()
         
-        response = supabase.table("tasks").select("*, leads(business_name, contact_name)").eq("id", task_id).single().execute()
+        response = await run_query(supabase.table("tasks").select("*, leads(business_name, contact_name)").eq("id", task_id).single())
         
         if not response.data:
             raise HTTPException(status_code=404, detail="Task not found")
@@ -148,13 +148,13 @@ async def create_task(task: TaskCreate):
         
         task_data = task.dict()
         
-        response = supabase.table("tasks").insert(task_data).execute()
+        response = await run_query(supabase.table("tasks").insert(task_data))
         
         # Update next_follow_up_at on lead if applicable
         if task_data.get("lead_id") and task_data.get("due_date"):
-            supabase.table("leads").update({
+            await run_query(supabase.table("leads").update({
                 "next_follow_up_at": task_data["due_date"]
-            }).eq("id", task_data["lead_id"]).execute()
+            }).eq("id", task_data["lead_id"]))
         
         return {
             "success": True,
@@ -180,7 +180,7 @@ async def update_task(task_id: str, task: TaskUpdate):
         if update_data.get("status") == "completed" and "completed_at" not in update_data:
             update_data["completed_at"] = datetime.now().isoformat()
         
-        response = supabase.table("tasks").update(update_data).eq("id", task_id).execute()
+        response = await run_query(supabase.table("tasks").update(update_data).eq("id", task_id))
         
         return {
             "success": True,
@@ -197,7 +197,7 @@ async def delete_task(task_id: str):
     try:
         supabase = get_supabase()
         
-        response = supabase.table("tasks").delete().eq("id", task_id).execute()
+        response = await run_query(supabase.table("tasks").delete().eq("id", task_id))
         
         return {"success": True, "message": "Task deleted"}
         
@@ -211,10 +211,10 @@ async def complete_task(task_id: str):
     try:
         supabase = get_supabase()
         
-        response = supabase.table("tasks").update({
+        response = await run_query(supabase.table("tasks").update({
             "status": "completed",
             "completed_at": datetime.now().isoformat()
-        }).eq("id", task_id).execute()
+        }).eq("id", task_id))
         
         return {
             "success": True,
@@ -237,13 +237,13 @@ async def get_upcoming_tasks_summary():
         today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
         today_end = now.replace(hour=23, minute=59, second=59, microsecond=999999)
         
-        today_tasks = supabase.table("tasks").select("id", count="exact").gte("due_date", today_start.isoformat()).lte("due_date", today_end.isoformat()).eq("status", "pending").execute()
+        today_tasks = await run_query(supabase.table("tasks").select("id", count="exact").gte("due_date", today_start.isoformat()).lte("due_date", today_end.isoformat()).eq("status", "pending"))
         
         # Overdue tasks
-        overdue_tasks = supabase.table("tasks").select("id", count="exact").lt("due_date", now.isoformat()).eq("status", "pending").execute()
+        overdue_tasks = await run_query(supabase.table("tasks").select("id", count="exact").lt("due_date", now.isoformat()).eq("status", "pending"))
         
         # High priority tasks
-        high_priority = supabase.table("tasks").select("id", count="exact").in_("priority", ["high", "urgent"]).eq("status", "pending").execute()
+        high_priority = await run_query(supabase.table("tasks").select("id", count="exact").in_("priority", ["high", "urgent"]).eq("status", "pending"))
         
         return {
             "today": today_tasks.count or 0,
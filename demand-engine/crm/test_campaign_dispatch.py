@@ -0,0 +1,192 @@
+"""
+Test the campaign dispatch engine with a local fake email provider
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import httpx
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from crm.campaign_dispatch import CampaignDispatcher, CompiledTemplate
+from email_service.resend_client import ResendEmailClient
+from tests.fakes import FakeSupabase
+
+CAMPAIGN = {
+    "name": "Spring tune-up",
+    "subject": "{{ first_name }}, your tune-up slot",
+    "html_content": "<p>Hi {{first_name}} {{last_name}}</p><p>{{unsubscribe_url}}</p>",
+    "text_content": "Hi {{first_name}}",
+}
+
+
+class FakeProvider(ResendEmailClient):
+    """Resend stand-in: counts requests, honours idempotency keys, can fail with 429"""
+
+    def __init__(self, rate_limited=0, delay=0.0):
+        super().__init__(api_key="test")
+        self.requests = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.delivered = []
+        self.keys = {}
+        self.rate_limited = rate_limited
+        self.delay = delay
+
+    async def send_batch(self, messages, idempotency_key=None):
+        self.requests += 1
+        if self.rate_limited:
+            self.rate_limited -= 1
+            request = httpx.Request("POST", "https://api.resend.com/emails/batch")
+            response = httpx.Response(429, headers={"retry-after": "0"}, request=request)
+            raise httpx.HTTPStatusError("rate limited", request=request, response=response)
+        if idempotency_key in self.keys:
+            return self.keys[idempotency_key]
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        self.delivered.extend(messages)
+        result = [{"id": f"email-{len(self.delivered) - len(messages) + i}"} for i in range(len(messages))]
+        self.keys[idempotency_key] = result
+        return result
+
+
+def _setup(n, sent=0):
+    recipients = [
+        {"id": f"c{i:05d}", "email": f"owner{i}@hvac.test", "first_name": f"Pat{i}", "last_name": "Lee", "lead_id": None}
+        for i in range(n)
+    ]
+    rows = [
+        {"campaign_id": "camp-1", "contact_id": r["id"], "email": r["email"], "status": "sent" if i < sent else "pending"}
+        for i, r in enumerate(recipients)
+    ]
+    fake = FakeSupabase({"campaign_recipients": rows, "activities": [], "email_campaigns": [{"id": "camp-1"}]})
+    return fake, recipients
+
+
+def test_template_compiled_once_renders_known_variables():
+    template = CompiledTemplate(CAMPAIGN["html_content"])
+    assert template.render({"first_name": "Sam", "last_name": None}) == "<p>Hi Sam </p><p>{{unsubscribe_url}}</p>"
+    assert CompiledTemplate(None).render({"first_name": "Sam"}) is None
+
+
+def test_batched_concurrent_send_with_bulk_writes():
+    fake, recipients = _setup(1000)
+    provider = FakeProvider(delay=0.01)
+    dispatcher = CampaignDispatcher(fake, provider, "camp-1", CAMPAIGN, concurrency=4, requests_per_second=0)
+
+    stats = asyncio.run(dispatcher.run(recipients))
+
+    assert stats["sent"] == 1000 and stats["failed"] == 0
+    assert provider.requests == 10 and 1 < provider.peak <= 4
+    # 2 flushes x (statuses + activities + checkpoint), instead of 2 writes per email
+    assert stats["write_round_trips"] == 6
+    assert all(r["status"] == "sent" and r["resend_email_id"] for r in fake.db["campaign_recipients"])
+    assert len(fake.db["activities"]) == 1000
+    assert fake.db["email_campaigns"][0]["total_sent"] == 1000
+
+    first = next(m for m in provider.delivered if m["to"] == ["owner7@hvac.test"])
+    assert first["subject"] == "Pat7, your tune-up slot" and first["text"] == "Hi Pat7"
+
+
+def test_resume_skips_sent_and_replays_unflushed_batches_idempotently():
+    fake, recipients = _setup(500, sent=200)
+    provider = FakeProvider()
+
+    # First run: sends go out but the status writes fail (e.g. worker killed)
+    class BrokenWrites(FakeSupabase):
+        def table(self, name):
+            query = super().table(name)
+            if name == "campaign_recipients":
+                def upsert(*args, **kwargs):
+                    raise RuntimeError("connection reset")
+                query.upsert = upsert
+            return query
+
+    broken = BrokenWrites(fake.db)
+    dispatcher = CampaignDispatcher(broken, provider, "camp-1", CAMPAIGN, requests_per_second=0, max_retries=0)
+    stats = asyncio.run(dispatcher.run(recipients))
+    assert stats["skipped"] == 200 and len(provider.delivered) == 300
+    # Nothing was recorded, so nothing is counted or checkpointed as sent
+    assert stats["sent"] == 0 and stats["unsaved"] == 300
+    assert "total_sent" not in fake.db["email_campaigns"][0]
+
+    # Resumed run: same batches, same idempotency keys, nothing delivered twice
+    stats = asyncio.run(CampaignDispatcher(fake, provider, "camp-1", CAMPAIGN, requests_per_second=0).run(recipients))
+    assert stats["sent"] == 300 and len(provider.delivered) == 300
+    assert sum(r["status"] == "sent" for r in fake.db["campaign_recipients"]) == 500
+
+
+class FlakyWrites(FakeSupabase):
+    """campaign_recipients upserts fail `failures` times, then succeed"""
+
+    def __init__(self, db, failures):
+        super().__init__(db)
+        self.failures = failures
+
+    def table(self, name):
+        query = super().table(name)
+        if name == "campaign_recipients":
+            upsert = query.upsert
+
+            def flaky_upsert(*args, **kwargs):
+                if self.failures:
+                    self.failures -= 1
+                    raise RuntimeError("connection reset")
+                return upsert(*args, **kwargs)
+            query.upsert = flaky_upsert
+        return query
+
+
+def test_failed_write_is_retried():
+    fake, recipients = _setup(200)
+    flaky = FlakyWrites(fake.db, failures=1)
+    dispatcher = CampaignDispatcher(flaky, FakeProvider(), "camp-1", CAMPAIGN, requests_per_second=0)
+
+    stats = asyncio.run(dispatcher.run(recipients))
+
+    assert stats["sent"] == 200 and stats["write_errors"] == 1 and stats["unsaved"] == 0
+    assert all(r["status"] == "sent" for r in fake.db["campaign_recipients"])
+    assert fake.db["email_campaigns"][0]["total_sent"] == 200
+
+
+def test_failed_flush_keeps_rows_for_the_next_flush():
+    fake, recipients = _setup(300)
+    flaky = FlakyWrites(fake.db, failures=1)
+    dispatcher = CampaignDispatcher(
+        flaky, FakeProvider(), "camp-1", CAMPAIGN,
+        concurrency=1, requests_per_second=0, flush_size=100, max_retries=0,
+    )
+
+    stats = asyncio.run(dispatcher.run(recipients))
+
+    # The first batch's write failed; its rows went out with the second flush
+    assert stats["write_errors"] == 1 and stats["flushes"] == 2
+    assert stats["sent"] == 300 and stats["unsaved"] == 0
+    assert all(r["status"] == "sent" for r in fake.db["campaign_recipients"])
+    assert len(fake.db["activities"]) == 300
+    assert fake.db["email_campaigns"][0]["total_sent"] == 300
+
+
+def test_rate_limited_requests_are_retried():
+    fake, recipients = _setup(150)
+    provider = FakeProvider(rate_limited=2)
+    dispatcher = CampaignDispatcher(fake, provider, "camp-1", CAMPAIGN, concurrency=1, requests_per_second=0)
+
+    stats = asyncio.run(dispatcher.run(recipients))
+
+    assert stats["sent"] == 150 and stats["retries"] == 2 and stats["requests"] == 4
+
+
+if __name__ == "__main__":
+    test_template_compiled_once_renders_known_variables()
+    test_batched_concurrent_send_with_bulk_writes()
+    test_resume_skips_sent_and_replays_unflushed_batches_idempotently()
+    test_failed_write_is_retried()
+    test_failed_flush_keeps_rows_for_the_next_flush()
+    test_rate_limited_requests_are_retried()
+    print("✅ Campaign dispatch tests passed")
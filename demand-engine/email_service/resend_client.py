@@ -4,8 +4,9 @@ Sends ROI calculator results and PDF reports to leads
 """
 
 import os
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import httpx
 
 logger = logging.getLogger(__name__)
@@ -14,20 +15,51 @@ logger = logging.getLogger(__name__)
 class ResendEmailClient:
     """Client for sending emails via Resend API"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, transport: Optional[httpx.AsyncBaseTransport] = None):
         self.api_key = api_key or os.getenv("RESEND_API_KEY")
         if not self.api_key:
             logger.warning("RESEND_API_KEY not set - email sending will fail")
         
         self.base_url = "https://api.resend.com"
         self.from_email = os.getenv("RESEND_FROM_EMAIL", "hello@kestrel.ai")
+        
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _http(self) -> httpx.AsyncClient:
+        """Keep-alive client shared by every request on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._drop_client()
+            self._client = httpx.AsyncClient(timeout=30.0, transport=self._transport)
+            self._client_loop = loop
+        return self._client
+    
+    def _drop_client(self) -> None:
+        """Forget the client of another loop, closing it there if that loop still runs"""
+        client, loop = self._client, self._client_loop
+        self._client = self._client_loop = None
+        if client is None or client.is_closed:
+            return
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        # A stopped loop's connections cannot be closed from here; they go with it
+    
+    async def aclose(self) -> None:
+        """Close the connection pool (it is reopened on the next send)"""
+        client, self._client, self._client_loop = self._client, None, None
+        if client is not None:
+            await client.aclose()
     
     async def send_email(
         self,
         to_email: str,
         subject: str,
         html_content: str,
-        attachments: Optional[list] = None
+        attachments: Optional[list] = None,
+        text_content: Optional[str] = None,
+        idempotency_key: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Send email via Resend API
@@ -37,6 +69,8 @@ class ResendEmailClient:
             subject: Email subject
             html_content: HTML email body
             attachments: Optional list of attachments
+            text_content: Optional plain-text body
+            idempotency_key: Resend drops repeats of the same key (24h)
             
         Returns:
             Response from Resend API
@@ -44,42 +78,96 @@ class ResendEmailClient:
         if not self.api_key:
             raise ValueError("RESEND_API_KEY not configured")
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        headers = self._headers(idempotency_key)
+        
+        payload = self.build_message(to_email, subject, html_content, text_content)
+        
+        if attachments:
+            payload["attachments"] = attachments
         
+        try:
+            response = await self._http().post(
+                f"{self.base_url}/emails",
+                json=payload,
+                headers=headers,
+                timeout=30.0
+            )
+            
+            response.raise_for_status()
+            result = response.json()
+            
+            logger.info(f"Email sent successfully to {to_email}: {result.get('id')}")
+            return result
+            
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Resend API error: {e.response.status_code} - {e.response.text}")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to send email: {str(e)}")
+            raise
+    
+    async def send_batch(
+        self,
+        messages: List[Dict[str, Any]],
+        idempotency_key: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Send up to 100 emails in one request via Resend's batch endpoint
+        
+        Args:
+            messages: Payloads from build_message()
+            idempotency_key: Resend drops repeats of the same key (24h)
+            
+        Returns:
+            One {"id": ...} per message, in order
+        """
+        if not self.api_key:
+            raise ValueError("RESEND_API_KEY not configured")
+        
+        try:
+            response = await self._http().post(
+                f"{self.base_url}/emails/batch",
+                json=messages,
+                headers=self._headers(idempotency_key),
+                timeout=30.0
+            )
+            
+            response.raise_for_status()
+            result = response.json()
+            
+            logger.info(f"Batch of {len(messages)} emails sent")
+            return result.get("data", [])
+            
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Resend batch API error: {e.response.status_code} - {e.response.text}")
+            raise
+    
+    def build_message(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Resend message payload"""
         payload = {
             "from": self.from_email,
             "to": [to_email],
             "subject": subject,
             "html": html_content
         }
-        
-        if attachments:
-            payload["attachments"] = attachments
-        
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/emails",
-                    json=payload,
-                    headers=headers,
-                    timeout=30.0
-                )
-                
-                response.raise_for_status()
-                result = response.json()
-                
-                logger.info(f"Email sent successfully to {to_email}: {result.get('id')}")
-                return result
-                
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Resend API error: {e.response.status_code} - {e.response.text}")
-                raise
-            except Exception as e:
-                logger.error(f"Failed to send email: {str(e)}")
-                raise
+        if text_content:
+            payload["text"] = text_content
+        return payload
+    
+    def _headers(self, idempotency_key: Optional[str] = None) -> Dict[str, str]:
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        if idempotency_key:
+            headers["Idempotency-Key"] = idempotency_key
+        return headers
     
     async def send_roi_report_email(
         self,
@@ -220,3 +308,14 @@ class ResendEmailClient:
 </html>
 """
         return html
+
+
+# Singleton instance
+_resend_client: Optional[ResendEmailClient] = None
+
+def get_resend_client() -> ResendEmailClient:
+    """Get or create the shared Resend client (one connection pool per process)"""
+    global _resend_client
+    if _resend_client is None:
+        _resend_client = ResendEmailClient()
+    return _resend_client
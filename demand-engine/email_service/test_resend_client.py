@@ -0,0 +1,64 @@
+"""
+Test that the Resend client reuses one connection pool
+"""
+
+import sys
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from email_service.resend_client import ResendEmailClient
+
+
+def _client(requests):
+    def handler(request):
+        requests.append(request)
+        if request.url.path == "/emails/batch":
+            return httpx.Response(200, json={"data": [{"id": f"e{i}"} for i in range(len(json.loads(request.content)))]})
+        return httpx.Response(200, json={"id": "e0"})
+
+    return ResendEmailClient(api_key="test", transport=httpx.MockTransport(handler))
+
+
+def test_requests_share_one_client():
+    requests = []
+    client = _client(requests)
+
+    async def send():
+        await client.send_email("a@hvac.test", "Hi", "<p>Hi</p>", idempotency_key="k1")
+        first = client._client
+        messages = [client.build_message(f"{n}@hvac.test", "Hi", "<p>Hi</p>") for n in "bc"]
+        result = await client.send_batch(messages)
+        assert client._client is first and not first.is_closed
+        await client.aclose()
+        return first, result
+
+    pool, result = asyncio.run(send())
+    assert result == [{"id": "e0"}, {"id": "e1"}]
+    assert pool.is_closed and client._client is None
+    assert [r.url.path for r in requests] == ["/emails", "/emails/batch"]
+    assert requests[0].headers["Idempotency-Key"] == "k1"
+
+
+def test_new_event_loop_gets_a_new_client():
+    requests = []
+    client = _client(requests)
+
+    async def send():
+        await client.send_email("a@hvac.test", "Hi", "<p>Hi</p>")
+        return client._client
+
+    first = asyncio.run(send())
+    second = asyncio.run(send())
+    assert second is not first and len(requests) == 2
+
+
+if __name__ == "__main__":
+    test_requests_share_one_client()
+    test_new_event_loop_gets_a_new_client()
+    print("✅ Resend client tests passed")
@@ -188,7 +188,7 @@ async def rate_limit_middleware(request: Request, call_next: Callable):
     FastAPI middleware for rate limiting
     """
     # Skip rate limiting for health checks
-    if request.url.path in ["/health", "/", "/docs", "/openapi.json"]:
+    if request.url.path in ["/health", "/metrics", "/", "/docs", "/openapi.json"]:
         return await call_next(request)
     
     try:
@@ -33,6 +33,7 @@ image = (
         "weasyprint>=60.0",
         "pillow>=10.0.0",
         "email-validator>=2.0.0",
+        "numpy>=1.24.0",  # VAD / streaming transcription
     )
     .apt_install("libpango-1.0-0", "libpangoft2-1.0-0", "libharfbuzz0b")  # For WeasyPrint PDF generation
 )
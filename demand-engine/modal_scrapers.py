@@ -19,20 +19,28 @@ image = (
         "supabase>=2.3.4",
         "python-dotenv>=1.0.0",
         "resend>=0.7.0",  # For email alerts
+        "numpy>=1.24.0",  # Near-duplicate index
     )
     .add_local_python_source("config")
     .add_local_python_source("classifiers")
     .add_local_python_source("email_service")
     .add_local_python_source("alerts")
     .add_local_python_source("scrapers")
+    .add_local_python_source("services")
 )
 
+# Dedupe index snapshots survive between runs (services/dedupe_index.py)
+dedupe_volume = modal.Volume.from_name("kestrel-dedupe-index", create_if_missing=True)
+DEDUPE_INDEX_DIR = "/data/dedupe"
+
 # Define secrets needed
 @app.function(
     image=image,
     secrets=[
         modal.Secret.from_name("hvac-agent-secrets"),  # Consolidated secrets
+        modal.Secret.from_dict({"DEDUPE_INDEX_DIR": DEDUPE_INDEX_DIR}),
     ],
+    volumes={DEDUPE_INDEX_DIR: dedupe_volume},
     schedule=modal.Cron("0 */6 * * *"),  # Every 6 hours
     timeout=900,  # 15 minutes max
 )
@@ -59,6 +67,7 @@ def run_reddit_monitor():
         
         monitor = RedditMonitorAI()
         stats = monitor.run()
+        dedupe_volume.commit()
         
         logger.info("=" * 60)
         logger.info("✅ Reddit Monitor Complete")
@@ -67,8 +76,16 @@ def run_reddit_monitor():
         logger.info(f"Duplicates skipped: {stats['total_duplicates']}")
         logger.info(f"AI scored: {stats['total_ai_scored']}")
         logger.info(f"High-value saved: {stats['total_saved']}")
+        logger.info(f"Dedupe round trips saved: {stats['dedupe']['round_trips_saved']}")
         logger.info("=" * 60)
         
+        # Fold the new signals into the dashboard rollups
+        try:
+            from services.signal_rollups import refresh_signal_rollups
+            stats["rollups"] = refresh_signal_rollups()
+        except Exception as e:
+            logger.error(f"⚠️ Signal rollup refresh failed: {str(e)}")
+        
         return {
             "success": True,
             "timestamp": datetime.utcnow().isoformat(),
@@ -137,6 +154,49 @@ def run_daily_digest():
         }
 
 
+@app.function(
+    image=image,
+    secrets=[
+        modal.Secret.from_name("hvac-agent-secrets"),  # Consolidated secrets
+    ],
+    schedule=modal.Cron("*/30 * * * *"),  # Every 30 minutes
+    timeout=600,
+)
+def run_signal_rollups():
+    """
+    Refresh the analytics dashboard rollups (signals written by any scraper)
+    Scheduled to run every 30 minutes
+    """
+    import sys
+    sys.path.insert(0, '/root')
+    
+    from services.signal_rollups import refresh_signal_rollups
+    import logging
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    logger = logging.getLogger(__name__)
+    
+    try:
+        stats = refresh_signal_rollups()
+        logger.info(f"✅ Signal rollups refreshed: {stats}")
+        return {
+            "success": True,
+            "timestamp": datetime.utcnow().isoformat(),
+            "stats": stats
+        }
+    except Exception as e:
+        logger.error(f"❌ Signal rollup refresh failed: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+
 @app.local_entrypoint()
 def main():
     """
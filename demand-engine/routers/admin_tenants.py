@@ -14,6 +14,7 @@ import hashlib
 
 from app.database import get_db
 from app.models.db_models import Tenant, TenantUser, TenantAPIKey
+from config.supabase_config import run_blocking
 from services.tenant_notifications import TenantNotificationService
 
 router = APIRouter(prefix="/api/admin/tenants", tags=["Admin - Tenants"])
@@ -178,12 +179,12 @@ async def create_tenant(
     db.add(owner)
     db.commit()
     
-    # Send notifications
+    # Send notifications (blocking Resend calls, kept off the event loop)
     try:
         notification_service = TenantNotificationService()
         
         # Notify admin
-        notification_service.notify_admin_new_tenant({
+        await run_blocking(notification_service.notify_admin_new_tenant, {
             'id': str(tenant.id),
             'company_name': tenant.company_name,
             'slug': tenant.slug,
@@ -192,16 +193,16 @@ async def create_tenant(
             'owner_phone': tenant.owner_phone,
             'industry': tenant.industry,
             'plan_tier': tenant.plan_tier
-        })
+        }, label="notify_admin_new_tenant")
         
         # Send welcome email to customer
-        notification_service.send_welcome_pending({
+        await run_blocking(notification_service.send_welcome_pending, {
             'company_name': tenant.company_name,
             'slug': tenant.slug,
             'owner_name': tenant.owner_name,
             'owner_email': tenant.owner_email,
             'plan_tier': tenant.plan_tier
-        })
+        }, label="send_welcome_pending")
     except Exception as e:
         # Don't fail tenant creation if email fails
         print(f"Failed to send notifications: {e}")
@@ -8,7 +8,7 @@ from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import logging
-from config.supabase_config import get_supabase, Tables
+from config.supabase_config import get_supabase, run_query, Tables
 
 logger = logging.getLogger(__name__)
 
@@ -44,17 +44,17 @@ async def get_scraping_status() -> Dict[str, Any]:
         supabase = get_supabase()
         
         # Get recent signals count
-        signals_response = supabase.table(Tables.SIGNALS).select("*", count="exact").execute()
+        signals_response = await run_query(supabase.table(Tables.SIGNALS).select("*", count="exact"))
         total_signals = signals_response.count if hasattr(signals_response, 'count') else len(signals_response.data)
         
         # Get signals from last 24 hours
         from datetime import timedelta
         yesterday = (datetime.utcnow() - timedelta(days=1)).isoformat()
-        recent_signals = supabase.table(Tables.SIGNALS).select("*", count="exact").gte("created_at", yesterday).execute()
+        recent_signals = await run_query(supabase.table(Tables.SIGNALS).select("*", count="exact").gte("created_at", yesterday))
         recent_count = recent_signals.count if hasattr(recent_signals, 'count') else len(recent_signals.data)
         
         # Get high-value signals (pain_score > 70)
-        high_value = supabase.table(Tables.SIGNALS).select("*", count="exact").gte("pain_score", 70).execute()
+        high_value = await run_query(supabase.table(Tables.SIGNALS).select("*", count="exact").gte("pain_score", 70))
         high_value_count = high_value.count if hasattr(high_value, 'count') else len(high_value.data)
         
         return {
@@ -106,7 +106,7 @@ async def get_signals(
         # Order by created_at desc and limit
         query = query.order("created_at", desc=True).limit(limit)
         
-        response = query.execute()
+        response = await run_query(query)
         
         # Format results
         signals = []
@@ -257,7 +257,7 @@ async def get_scraping_jobs(limit: int = 20) -> List[Dict[str, Any]]:
     try:
         supabase = get_supabase()
         
-        response = supabase.table("scraping_jobs").select("*").order("started_at", desc=True).limit(limit).execute()
+        response = await run_query(supabase.table("scraping_jobs").select("*").order("started_at", desc=True).limit(limit))
         
         return response.data
         
@@ -275,7 +275,7 @@ async def delete_signal(signal_id: int) -> Dict[str, Any]:
     try:
         supabase = get_supabase()
         
-        supabase.table(Tables.SIGNALS).delete().eq("id", signal_id).execute()
+        await run_query(supabase.table(Tables.SIGNALS).delete().eq("id", signal_id))
         
         return {
             "success": True,
@@ -296,7 +296,7 @@ async def get_scraping_analytics() -> Dict[str, Any]:
         supabase = get_supabase()
         
         # Get all signals
-        all_signals = supabase.table(Tables.SIGNALS).select("*").execute()
+        all_signals = await run_query(supabase.table(Tables.SIGNALS).select("*"))
         
         # Calculate analytics
         total = len(all_signals.data)
@@ -12,6 +12,9 @@ from twilio.rest import Client
 from twilio.base.exceptions import TwilioRestException
 import logging
 
+from config.supabase_config import get_supabase, run_blocking
+from services.twilio_insights_sync import TwilioCallCache, TwilioInsightsSync, recording_media_url
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/twilio/insights", tags=["Twilio Insights"])
@@ -21,6 +24,10 @@ TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 
 client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN) if TWILIO_ACCOUNT_SID else None
 
+# Call history / cost / uptime are served from the twilio_calls cache, which is
+# re-synced from Twilio when older than this
+INSIGHTS_MAX_AGE_SECONDS = int(os.getenv("TWILIO_INSIGHTS_MAX_AGE_SECONDS", "300"))
+
 
 class CallInsight(BaseModel):
     call_sid: str
@@ -72,6 +79,58 @@ class UptimeMetrics(BaseModel):
     period_end: datetime
 
 
+async def _cached_calls(
+    start: datetime,
+    end: Optional[datetime] = None,
+    to_number: Optional[str] = None,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Read calls from the local cache, syncing from Twilio first if it is stale"""
+    supabase = get_supabase()
+    try:
+        await run_blocking(
+            TwilioInsightsSync(client, supabase).sync_if_stale,
+            INSIGHTS_MAX_AGE_SECONDS,
+            timeout=120,
+            label="twilio_insights_sync"
+        )
+    except Exception as e:
+        # Serve whatever is cached rather than failing the dashboard
+        logger.warning(f"Twilio insights sync failed, serving cached calls: {e}")
+    
+    return await run_blocking(
+        TwilioCallCache(supabase).calls, start, end, to_number, limit,
+        label="twilio_calls"
+    )
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+@router.post("/sync")
+async def sync_call_cache(days: Optional[int] = Query(None, description="Re-sync this many days instead of the incremental range")):
+    """
+    Pull new/updated calls and recordings from Twilio into the local cache
+    """
+    if not client:
+        raise HTTPException(status_code=500, detail="Twilio not configured")
+    
+    try:
+        since = datetime.utcnow() - timedelta(days=days) if days else None
+        return await run_blocking(
+            TwilioInsightsSync(client, get_supabase()).sync, since,
+            timeout=300,
+            label="twilio_insights_sync"
+        )
+    except TwilioRestException as e:
+        logger.error(f"Twilio API error: {e}")
+        raise HTTPException(status_code=500, detail=f"Twilio error: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error syncing Twilio insights: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/call-history")
 async def get_call_history(
     phone_number: Optional[str] = Query(None, description="Filter by phone number"),
@@ -79,7 +138,7 @@ async def get_call_history(
     limit: int = Query(50, description="Maximum number of calls to return")
 ) -> List[CallInsight]:
     """
-    Get real call history from Twilio with full details
+    Get call history (Twilio data via the local call cache) with full details
     """
     if not client:
         raise HTTPException(status_code=500, detail="Twilio not configured")
@@ -88,46 +147,27 @@ async def get_call_history(
         # Calculate date range
         start_date = datetime.utcnow() - timedelta(days=days)
         
-        # Build query parameters
-        query_params = {
-            "start_time_after": start_date,
-            "limit": limit
-        }
-        
-        if phone_number:
-            query_params["to"] = phone_number
-        
-        # Fetch calls from Twilio
-        calls = client.calls.list(**query_params)
+        calls = await _cached_calls(start_date, to_number=phone_number, limit=limit)
         
         # Format response
-        call_insights = []
-        for call in calls:
-            insight = CallInsight(
-                call_sid=call.sid,
-                from_number=call.from_formatted or call.from_,
-                to_number=call.to_formatted or call.to,
-                status=call.status,
-                duration=int(call.duration) if call.duration else 0,
-                start_time=call.start_time,
-                end_time=call.end_time,
-                price=call.price,
-                price_unit=call.price_unit,
-                direction=call.direction,
-                answered_by=call.answered_by,
-                recording_url=None,
+        call_insights = [
+            CallInsight(
+                call_sid=call["call_sid"],
+                from_number=call.get("from_formatted") or call.get("from_number") or "",
+                to_number=call.get("to_formatted") or call.get("to_number") or "",
+                status=call["status"],
+                duration=call.get("duration") or 0,
+                start_time=call["start_time"],
+                end_time=call.get("end_time"),
+                price=str(call["price"]) if call.get("price") is not None else None,
+                price_unit=call.get("price_unit"),
+                direction=call["direction"],
+                answered_by=call.get("answered_by"),
+                recording_url=call.get("recording_url"),
                 transcript_url=None
             )
-            
-            # Try to get recording if available
-            try:
-                recordings = client.recordings.list(call_sid=call.sid, limit=1)
-                if recordings:
-                    insight.recording_url = f"https://api.twilio.com{recordings[0].uri.replace('.json', '.mp3')}"
-            except Exception:
-                pass
-            
-            call_insights.append(insight)
+            for call in calls
+        ]
         
         return call_insights
         
@@ -149,7 +189,9 @@ async def get_number_status(phone_number: str) -> NumberStatus:
     
     try:
         # Find the number
-        numbers = client.incoming_phone_numbers.list(phone_number=phone_number)
+        numbers = await run_blocking(
+            client.incoming_phone_numbers.list, phone_number=phone_number, label="twilio_numbers"
+        )
         
         if not numbers:
             raise HTTPException(status_code=404, detail="Number not found")
@@ -159,7 +201,7 @@ async def get_number_status(phone_number: str) -> NumberStatus:
         # Get last call time
         last_call_time = None
         try:
-            recent_calls = client.calls.list(to=phone_number, limit=1)
+            recent_calls = await run_blocking(client.calls.list, to=phone_number, limit=1, label="twilio_last_call")
             if recent_calls:
                 last_call_time = recent_calls[0].start_time
         except Exception:
@@ -206,28 +248,18 @@ async def get_cost_summary(
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
         
-        # Build query parameters
-        query_params = {
-            "start_time_after": start_date,
-            "end_time_before": end_date
-        }
-        
-        if phone_number:
-            query_params["to"] = phone_number
-        
-        # Fetch calls
-        calls = client.calls.list(**query_params)
+        calls = await _cached_calls(start_date, end_date, to_number=phone_number)
         
         # Calculate metrics
         total_calls = len(calls)
-        total_duration = sum(int(call.duration) if call.duration else 0 for call in calls)
-        total_cost = sum(abs(float(call.price)) if call.price else 0 for call in calls)
+        total_duration = sum(call.get("duration") or 0 for call in calls)
+        total_cost = sum(abs(call["price"]) if call.get("price") else 0 for call in calls)
         
         avg_cost = total_cost / total_calls if total_calls > 0 else 0
         avg_duration = total_duration / total_calls if total_calls > 0 else 0
         
         # Get currency from first call
-        currency = calls[0].price_unit if calls and calls[0].price_unit else "USD"
+        currency = calls[0].get("price_unit") if calls and calls[0].get("price_unit") else "USD"
         
         return CostSummary(
             total_calls=total_calls,
@@ -264,24 +296,14 @@ async def get_uptime_metrics(
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
         
-        # Build query parameters
-        query_params = {
-            "start_time_after": start_date,
-            "end_time_before": end_date
-        }
-        
-        if phone_number:
-            query_params["to"] = phone_number
-        
-        # Fetch calls
-        calls = client.calls.list(**query_params)
+        calls = await _cached_calls(start_date, end_date, to_number=phone_number)
         
         # Categorize calls
         total_calls = len(calls)
-        successful = sum(1 for call in calls if call.status == "completed")
-        failed = sum(1 for call in calls if call.status in ["failed", "canceled"])
-        busy = sum(1 for call in calls if call.status == "busy")
-        no_answer = sum(1 for call in calls if call.status == "no-answer")
+        successful = sum(1 for call in calls if call["status"] == "completed")
+        failed = sum(1 for call in calls if call["status"] in ["failed", "canceled"])
+        busy = sum(1 for call in calls if call["status"] == "busy")
+        no_answer = sum(1 for call in calls if call["status"] == "no-answer")
         
         # Calculate uptime percentage
         uptime = (successful / total_calls * 100) if total_calls > 0 else 100.0
@@ -289,8 +311,10 @@ async def get_uptime_metrics(
         # Calculate average response time (time to answer)
         response_times = []
         for call in calls:
-            if call.start_time and call.end_time and call.status == "completed":
-                response_times.append((call.end_time - call.start_time).total_seconds())
+            if call.get("start_time") and call.get("end_time") and call["status"] == "completed":
+                response_times.append(
+                    (_parse_time(call["end_time"]) - _parse_time(call["start_time"])).total_seconds()
+                )
         
         avg_response = sum(response_times) / len(response_times) if response_times else 0
         
@@ -323,13 +347,18 @@ async def get_call_transcript(call_sid: str) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail="Twilio not configured")
     
     try:
+        # Recording for the call (transcriptions link to it by recording SID)
+        recordings = await run_blocking(
+            client.recordings.list, call_sid=call_sid, limit=1, label="twilio_recordings"
+        )
+        
         # Try to get recording transcription
-        transcriptions = client.transcriptions.list(limit=20)
+        transcriptions = await run_blocking(
+            client.transcriptions.list, limit=20, label="twilio_transcriptions"
+        ) if recordings else []
         
         for transcription in transcriptions:
-            # Match by recording SID which is linked to call
-            recordings = client.recordings.list(call_sid=call_sid, limit=1)
-            if recordings and transcription.recording_sid == recordings[0].sid:
+            if transcription.recording_sid == recordings[0].sid:
                 return {
                     "call_sid": call_sid,
                     "transcript": transcription.transcription_text,
@@ -340,14 +369,13 @@ async def get_call_transcript(call_sid: str) -> Dict[str, Any]:
                 }
         
         # If no transcription found, check if recording exists
-        recordings = client.recordings.list(call_sid=call_sid, limit=1)
         if recordings:
             return {
                 "call_sid": call_sid,
                 "transcript": None,
                 "status": "no_transcript",
                 "message": "Recording exists but no transcript available. Enable transcription in Twilio settings.",
-                "recording_url": f"https://api.twilio.com{recordings[0].uri.replace('.json', '.mp3')}"
+                "recording_url": recording_media_url(recordings[0])
             }
         
         return {
@@ -381,21 +409,17 @@ async def get_offline_history(
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
         
-        calls = client.calls.list(
-            to=phone_number,
-            start_time_after=start_date,
-            end_time_before=end_date
-        )
+        calls = await _cached_calls(start_date, end_date, to_number=phone_number)
         
         # Identify offline periods (failed calls, no-answer, etc.)
         offline_incidents = []
         for call in calls:
-            if call.status in ["failed", "canceled", "no-answer"]:
+            if call["status"] in ["failed", "canceled", "no-answer"]:
                 offline_incidents.append({
-                    "timestamp": call.start_time,
-                    "status": call.status,
-                    "from": call.from_formatted or call.from_,
-                    "duration_attempted": call.duration
+                    "timestamp": call["start_time"],
+                    "status": call["status"],
+                    "from": call.get("from_formatted") or call.get("from_number"),
+                    "duration_attempted": call.get("duration")
                 })
         
         # Calculate offline percentage
@@ -116,43 +116,36 @@ class BBBComplaintsScraper:
             "source_url": complaint.get('url', '')
         }
     
-    def scrape_all_areas(self, days_back: int = 30) -> List[Dict]:
+    def build_signal(self, complaint: Dict, category: str, area: str) -> Dict:
+        """Signal dict for one complaint"""
+        return {
+            **self.extract_customer_info(complaint),
+            **self.analyze_complaint_signal(complaint),
+            "source_type": "bbb_complaints",
+            "signal_type": "customer_complaint",
+            "category": category,
+            "area": area,
+            "scraped_at": datetime.now().isoformat()
+        }
+    
+    def scrape_all_areas(self, days_back: int = 30, cursor_store=None) -> List[Dict]:
         """
         Scrape all target categories across all areas
         
+        Category/area lookups run concurrently through the scrape scheduler.
+        
         Args:
             days_back: How many days back to check
+            cursor_store: Optional CursorStore; only items newer than the last run are pulled
             
         Returns:
             List of all complaint signals
         """
-        all_signals = []
-        
-        for category in self.target_categories:
-            for area in self.target_areas:
-                print(f"🔍 Checking BBB complaints: {category} in {area}")
-                
-                complaints = self.scrape_complaints(category, area, days_back)
-                
-                for complaint in complaints:
-                    customer_info = self.extract_customer_info(complaint)
-                    pain_analysis = self.analyze_complaint_signal(complaint)
-                    
-                    signal = {
-                        **customer_info,
-                        **pain_analysis,
-                        "source_type": "bbb_complaints",
-                        "signal_type": "customer_complaint",
-                        "category": category,
-                        "area": area,
-                        "scraped_at": datetime.now().isoformat()
-                    }
-                    
-                    all_signals.append(signal)
-                
-                print(f"   Found {len(complaints)} complaints")
-        
-        return all_signals
+        from scrapers.scheduler import run_sources
+        from scrapers.sources import BBBSource
+        
+        source = BBBSource(self, days_back)
+        return run_sources([source], cursor_store=cursor_store)[source.name]
     
     def _get_mock_complaints(self, category: str, area: str, days_back: int) -> List[Dict]:
         """
@@ -0,0 +1,158 @@
+"""
+Benchmark full-window vs cursor-based incremental scraping
+
+A local job-search feed (Indeed response shape, newest first, ETag validators)
+gains a few postings between runs, then goes quiet for the last run(s). Each run scrapes every keyword x location
+through IndeedSource, once without cursors (re-pulls the whole lookback
+window) and once with a CursorStore, and reports HTTP requests and bytes.
+
+Usage (from demand-engine/):
+    python -m scrapers.benchmark_incremental
+    python -m scrapers.benchmark_incremental --backlog 90 --new-per-run 3 --runs 5 --idle-runs 1
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from scrapers.cursors import CursorStore
+from scrapers.job_boards.indeed_scraper import IndeedScraper
+from scrapers.scheduler import HostPolicy, ScrapeScheduler
+from scrapers.sources import IndeedSource
+from tests.fakes import FakeSupabase
+
+
+class JobFeed:
+    """Postings per (keyword, location), newest first"""
+
+    def __init__(self, backlog: int):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.postings = {}
+        self.backlog = backlog
+        self.clock = datetime.now(timezone.utc) - timedelta(days=2)
+
+    def _posting(self, keyword: str, location: str, n: int):
+        return {
+            "jobtitle": f"{keyword} #{n}",
+            "company": f"{location} HVAC {n}",
+            "snippet": "Urgent hire, expanding, high volume of service calls",
+            "date": (self.clock + timedelta(minutes=n)).isoformat(),
+            "jobkey": f"{keyword}-{location}-{n}",
+        }
+
+    def results(self, keyword: str, location: str):
+        with self.lock:
+            if (keyword, location) not in self.postings:
+                self.postings[(keyword, location)] = [
+                    self._posting(keyword, location, n) for n in reversed(range(self.backlog))
+                ]
+            return list(self.postings[(keyword, location)])
+
+    def publish(self, per_search: int) -> None:
+        with self.lock:
+            for (keyword, location), postings in self.postings.items():
+                start = len(postings)
+                fresh = [self._posting(keyword, location, n) for n in range(start, start + per_search)]
+                postings[:0] = list(reversed(fresh))
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    feed: JobFeed = None
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        postings = self.feed.results(query["q"][0], query["l"][0])
+        with self.feed.lock:
+            self.feed.requests += 1
+
+        start, limit = int(query["start"][0]), int(query["limit"][0])
+        body = json.dumps({"results": postings[start:start + limit]}).encode()
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_feed(feed: JobFeed) -> ThreadingHTTPServer:
+    """Start the feed on an ephemeral port in a daemon thread"""
+    handler = type("FeedHandler", (_FeedHandler,), {"feed": feed})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def feed_scraper(server: ThreadingHTTPServer, keywords: int, locations: int) -> IndeedScraper:
+    scraper = IndeedScraper(api_key="bench")
+    scraper.base_url = f"http://127.0.0.1:{server.server_address[1]}/jobs"
+    scraper.target_keywords = [f"kw{i}" for i in range(keywords)]
+    scraper.target_locations = [f"loc{i}" for i in range(locations)]
+    return scraper
+
+
+def _scenario(incremental: bool, args) -> list:
+    feed = JobFeed(args.backlog)
+    server = serve_feed(feed)
+    store = CursorStore(FakeSupabase({})) if incremental else None
+    source = IndeedSource(feed_scraper(server, args.keywords, args.locations), max_pages=args.max_pages)
+
+    runs = []
+    try:
+        for run in range(args.runs + args.idle_runs):
+            if 0 < run < args.runs:
+                feed.publish(args.new_per_run)
+            scheduler = ScrapeScheduler(
+                [source],
+                default_policy=HostPolicy(max_concurrency=8, requests_per_second=0),
+                cursor_store=store,
+            )
+            signals = asyncio.run(scheduler.run())[source.name]
+            metrics = scheduler.metrics.snapshot()
+            runs.append({"requests": metrics["requests"], "bytes": metrics["bytes"], "items": len(signals)})
+    finally:
+        server.shutdown()
+        server.server_close()
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keywords", type=int, default=4)
+    parser.add_argument("--locations", type=int, default=6)
+    parser.add_argument("--backlog", type=int, default=90, help="postings per search before run 1")
+    parser.add_argument("--new-per-run", type=int, default=3, help="postings published between runs")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--idle-runs", type=int, default=1, help="extra runs with nothing new published")
+    parser.add_argument("--max-pages", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{args.keywords * args.locations} searches, {args.backlog} postings each, "
+          f"+{args.new_per_run} per search between runs\n")
+    print(f"{'run':>4} {'mode':<12} {'requests':>9} {'bytes':>10} {'items':>6}")
+    for incremental in (False, True):
+        mode = "cursor" if incremental else "full-window"
+        for run, stats in enumerate(_scenario(incremental, args), start=1):
+            print(f"{run:>4} {mode:<12} {stats['requests']:>9} {stats['bytes']:>10} {stats['items']:>6}")
+
+
+if __name__ == "__main__":
+    main()
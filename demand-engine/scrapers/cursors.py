@@ -0,0 +1,156 @@
+"""
+Scrape Cursors
+Persistent per-job high-water marks so each scraper run only pulls new items.
+
+A cursor holds the newest item time seen for one scheduler job, the ids of
+the items at that time (several items can share the newest timestamp, and
+a later one may arrive on the next run), plus the ETag / Last-Modified
+validators of its last response. Cursors for a run are
+loaded in one query and written back in one batched upsert (migration 028).
+"""
+
+import logging
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCRAPE_CURSORS_TABLE = "scrape_cursors"
+# Bound on ids remembered at the high-water timestamp
+MAX_IDS_AT_WATERMARK = 200
+
+
+def parse_item_time(value: Any) -> Optional[datetime]:
+    """datetime / epoch seconds / ISO-8601 / RFC 2822 -> aware UTC datetime"""
+    if value in (None, ""):
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, (int, float)):
+        parsed = datetime.fromtimestamp(value, tz=timezone.utc)
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            try:
+                parsed = parsedate_to_datetime(str(value))
+            except (TypeError, ValueError):
+                return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class ScrapeCursor:
+    source: str
+    scope: str
+    last_seen_at: Optional[datetime] = None
+    last_seen_id: Optional[str] = None
+    last_seen_ids: Set[str] = field(default_factory=set)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def is_seen(self, item_time: Any, item_id: Optional[str] = None) -> bool:
+        """
+        True if the item is before the high-water mark, or at it and
+        already seen (items without an id at the mark count as seen)
+        """
+        if item_id is not None and item_id in self.last_seen_ids:
+            return True
+        when = parse_item_time(item_time)
+        if self.last_seen_at is None or when is None:
+            return False
+        if when == self.last_seen_at:
+            return item_id is None
+        return when < self.last_seen_at
+
+    def advance(self, item_time: Any, item_id: Optional[str] = None) -> None:
+        """Move the high-water mark forward to this item, or remember it at the mark"""
+        when = parse_item_time(item_time)
+        if when is None:
+            return
+        if self.last_seen_at is None or when > self.last_seen_at:
+            self.last_seen_at = when
+            self.last_seen_id = item_id
+            self.last_seen_ids = {item_id} if item_id is not None else set()
+        elif when == self.last_seen_at and item_id is not None \
+                and len(self.last_seen_ids) < MAX_IDS_AT_WATERMARK:
+            self.last_seen_ids.add(item_id)
+
+    def to_row(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "scope": self.scope,
+            "last_seen_at": self.last_seen_at.isoformat() if self.last_seen_at else None,
+            "last_seen_id": self.last_seen_id,
+            "last_seen_ids": sorted(self.last_seen_ids),
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "ScrapeCursor":
+        ids = set(row.get("last_seen_ids") or [])
+        if row.get("last_seen_id"):
+            ids.add(row["last_seen_id"])  # Rows written before last_seen_ids
+        return cls(
+            source=row["source"],
+            scope=row["scope"],
+            last_seen_at=parse_item_time(row.get("last_seen_at")),
+            last_seen_id=row.get("last_seen_id"),
+            last_seen_ids=ids,
+            etag=row.get("etag"),
+            last_modified=row.get("last_modified"),
+        )
+
+
+class CursorStore:
+    """Loads cursors for a run, hands out working copies and saves the changed ones"""
+
+    def __init__(self, supabase=None):
+        if supabase is None:
+            from config.supabase_config import get_supabase
+            supabase = get_supabase()
+        self.supabase = supabase
+        self._cursors: Dict[Tuple[str, str], ScrapeCursor] = {}
+        self._dirty: Dict[Tuple[str, str], ScrapeCursor] = {}
+
+    def load(self, sources: Iterable[str]) -> int:
+        """Load every stored cursor for `sources` in one query"""
+        sources = list(sources)
+        if not sources:
+            return 0
+        try:
+            response = self.supabase.table(SCRAPE_CURSORS_TABLE).select("*").in_("source", sources).execute()
+        except Exception as e:
+            # Without cursors the run falls back to the full lookback window
+            logger.warning(f"Could not load scrape cursors: {e}")
+            return 0
+        for row in response.data or []:
+            cursor = ScrapeCursor.from_row(row)
+            self._cursors[(cursor.source, cursor.scope)] = cursor
+        return len(response.data or [])
+
+    def get(self, source: str, scope: str) -> ScrapeCursor:
+        """Working copy; changes only stick once passed to put()"""
+        stored = self._cursors.get((source, scope))
+        if stored is None:
+            return ScrapeCursor(source=source, scope=scope)
+        return replace(stored, last_seen_ids=set(stored.last_seen_ids))
+
+    def put(self, cursor: ScrapeCursor) -> None:
+        key = (cursor.source, cursor.scope)
+        if self._cursors.get(key) != cursor:
+            self._cursors[key] = cursor
+            self._dirty[key] = cursor
+
+    def save(self) -> int:
+        """Upsert changed cursors in one request"""
+        if not self._dirty:
+            return 0
+        rows = [cursor.to_row() for cursor in self._dirty.values()]
+        self.supabase.table(SCRAPE_CURSORS_TABLE).upsert(rows, on_conflict="source,scope").execute()
+        self._dirty.clear()
+        return len(rows)
@@ -13,7 +13,10 @@ import httpx
 from bs4 import BeautifulSoup
 
 from config.supabase_config import get_supabase
-from classifiers.ai_scorer import AISignalScorer
+from classifiers.ai_scorer import AISignalScorer, PROMPT_VERSION
+from services.near_duplicates import NearDuplicateIndex
+from services.ingestion_sink import UpsertSink
+from services.llm_cache import get_llm_cache
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +69,10 @@ class JobBoardMonitor:
     def __init__(self):
         """Initialize job board monitor"""
         self.supabase = get_supabase()
+        # Job ids are stable, so dedupe against every stored posting
+        self.sink = UpsertSink(self.supabase, "job_board_signals", recent_days=None)
+        # Re-listed / lightly edited ads reuse the AI score of the first copy seen
+        self.near_duplicates = NearDuplicateIndex()
         self.client = httpx.Client(
             timeout=30.0,
             follow_redirects=True,
@@ -176,17 +183,32 @@ class JobBoardMonitor:
         description: str,
         metadata: Dict
     ) -> Optional[Dict]:
-        """Score job posting using AI"""
+        """Score job posting using AI, once per near-duplicate cluster (and cached across runs)"""
         if not self.ai_scorer:
             return None
         
+        text = f"{title}\n{description}"
+        cluster = self.near_duplicates.add(hashlib.md5(text.encode('utf-8')).hexdigest(), text)
+        cached = self.near_duplicates.result(cluster)
+        if cached is not None:
+            return cached
+        
         try:
-            return self.ai_scorer.score_signal(
-                title=title,
-                content=description,
-                source="job_board",
-                metadata=metadata
+            ai_scores = get_llm_cache().get_or_call(
+                "job_scoring", self.ai_scorer.model, PROMPT_VERSION,
+                # Keyed on the exact context the model sees
+                self.ai_scorer.prepare_context(title, description, "job_board", metadata),
+                lambda: self.ai_scorer.score_signal(
+                    title=title,
+                    content=description,
+                    source="job_board",
+                    metadata=metadata
+                ),
+                cacheable=lambda scores: scores.get("reasoning") != "AI analysis failed",
             )
+            if ai_scores:
+                self.near_duplicates.set_result(cluster, ai_scores)
+            return ai_scores
         except Exception as e:
             logger.error(f"❌ AI scoring failed: {str(e)}")
             return None
@@ -223,17 +245,8 @@ class JobBoardMonitor:
         return hashlib.md5(content).hexdigest()
     
     def check_duplicate(self, content_hash: str) -> bool:
-        """Check if job posting already exists"""
-        try:
-            result = self.supabase.table("job_board_signals")\
-                .select("id")\
-                .eq("content_hash", content_hash)\
-                .execute()
-            
-            return len(result.data) > 0
-        except Exception as e:
-            logger.error(f"❌ Duplicate check failed: {str(e)}")
-            return False
+        """Check if job posting already exists (the sink's local index; queries only on a filter hit)"""
+        return self.sink.index.contains(content_hash)
     
     def save_signal(
         self,
@@ -241,7 +254,7 @@ class JobBoardMonitor:
         keyword_scores: Dict,
         ai_scores: Optional[Dict]
     ) -> bool:
-        """Save job board signal to database"""
+        """Queue job board signal for the batched upsert (False if duplicate)"""
         try:
             # Calculate keyword total score
             keyword_total = sum(
@@ -298,10 +311,7 @@ class JobBoardMonitor:
                     'ai_confidence': ai_scores.get('confidence')
                 })
             
-            # Insert into database
-            self.supabase.table("job_board_signals").insert(signal_data).execute()
-            
-            return True
+            return self.sink.add(signal_data) is not None
             
         except Exception as e:
             logger.error(f"❌ Failed to save signal: {str(e)}")
@@ -323,6 +333,11 @@ class JobBoardMonitor:
         # Note: In production, this would actually scrape job boards
         # For now, it's a framework ready to be activated
         
+        # Write everything queued by save_signal in batched upserts
+        ingest_stats = self.sink.close()
+        stats['saved'] = ingest_stats['written']
+        stats['duplicates'] += ingest_stats['duplicates']
+        
         logger.info("=" * 60)
         logger.info("📊 Job Board Monitor Summary")
         logger.info("=" * 60)
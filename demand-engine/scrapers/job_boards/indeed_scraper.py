@@ -6,10 +6,13 @@ Monitors HVAC/Plumbing job postings for pain signals
 import os
 import requests
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import json
 import re
 
+# Shared keep-alive session for one-off searches
+_session = requests.Session()
+
 class IndeedScraper:
     """
     Scrapes Indeed for HVAC/Plumbing job postings
@@ -59,6 +62,21 @@ class IndeedScraper:
             print("⚠️  Indeed API key not set. Using mock data for demo.")
             return self._get_mock_data(keyword, location)
         
+        url, params = self.build_search_request(keyword, location, days_back)
+        
+        try:
+            response = _session.get(url, params=params, timeout=10)
+            response.raise_for_status()
+            
+            return self.parse_search_response(response.json())
+        
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Indeed API error: {e}")
+            return []
+    
+    def build_search_request(self, keyword: str, location: str, days_back: int = 7,
+                             page: int = 0) -> Tuple[str, Dict]:
+        """URL and query params for one results page (shared with the async scheduler)"""
         params = {
             "publisher": self.api_key,
             "q": keyword,
@@ -67,23 +85,17 @@ class IndeedScraper:
             "radius": 50,
             "st": "jobsite",
             "jt": "fulltime",
-            "start": 0,
+            "start": page * 25,
             "limit": 25,
             "fromage": days_back,
             "format": "json",
             "v": "2"
         }
-        
-        try:
-            response = requests.get(self.base_url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            return data.get("results", [])
-        
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Indeed API error: {e}")
-            return []
+        return self.base_url, params
+    
+    def parse_search_response(self, data: Dict) -> List[Dict]:
+        """Job postings from a search response"""
+        return data.get("results", [])
     
     def extract_company_info(self, job: Dict) -> Dict:
         """
@@ -148,42 +160,37 @@ class IndeedScraper:
             }
         }
     
-    def scrape_all_locations(self, days_back: int = 7) -> List[Dict]:
+    def build_signal(self, job: Dict, keyword: str) -> Dict:
+        """Signal dict for one job posting"""
+        return {
+            **self.extract_company_info(job),
+            **self.analyze_pain_signals(job),
+            "source_type": "job_board_indeed",
+            "signal_type": "hiring_activity",
+            "keywords": [keyword],
+            "scraped_at": datetime.now().isoformat()
+        }
+    
+    def scrape_all_locations(self, days_back: int = 7, cursor_store=None, max_pages: int = 1) -> List[Dict]:
         """
         Scrape all target keywords across all locations
         
+        Searches run concurrently through the scrape scheduler
+        (per-host limits, shared connections, retries).
+        
         Args:
             days_back: How many days back to search
+            cursor_store: Optional CursorStore; only items newer than the last run are pulled
+            max_pages: Results pages per search
             
         Returns:
             List of all signals found
         """
-        all_signals = []
-        
-        for keyword in self.target_keywords:
-            for location in self.target_locations:
-                print(f"🔍 Searching: {keyword} in {location}")
-                
-                jobs = self.search_jobs(keyword, location, days_back)
-                
-                for job in jobs:
-                    company_info = self.extract_company_info(job)
-                    pain_analysis = self.analyze_pain_signals(job)
-                    
-                    signal = {
-                        **company_info,
-                        **pain_analysis,
-                        "source_type": "job_board_indeed",
-                        "signal_type": "hiring_activity",
-                        "keywords": [keyword],
-                        "scraped_at": datetime.now().isoformat()
-                    }
-                    
-                    all_signals.append(signal)
-                
-                print(f"   Found {len(jobs)} jobs")
+        from scrapers.scheduler import run_sources
+        from scrapers.sources import IndeedSource
         
-        return all_signals
+        source = IndeedSource(self, days_back, max_pages=max_pages)
+        return run_sources([source], cursor_store=cursor_store)[source.name]
     
     def _get_mock_data(self, keyword: str, location: str) -> List[Dict]:
         """
@@ -6,9 +6,12 @@ Monitors HVAC/Plumbing job postings for pain signals
 import os
 import requests
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import json
 
+# Shared keep-alive session for one-off searches
+_session = requests.Session()
+
 class ZipRecruiterScraper:
     """
     Scrapes ZipRecruiter for HVAC/Plumbing job postings
@@ -53,27 +56,36 @@ class ZipRecruiterScraper:
             print("⚠️  ZipRecruiter API key not set. Using mock data for demo.")
             return self._get_mock_data(keyword, location)
         
-        params = {
-            "api_key": self.api_key,
-            "search": keyword,
-            "location": location,
-            "radius_miles": 50,
-            "days_ago": days_back,
-            "jobs_per_page": 20,
-            "page": 1
-        }
+        url, params = self.build_search_request(keyword, location, days_back)
         
         try:
-            response = requests.get(self.base_url, params=params, timeout=10)
+            response = _session.get(url, params=params, timeout=10)
             response.raise_for_status()
-            data = response.json()
             
-            return data.get("jobs", [])
+            return self.parse_search_response(response.json())
         
         except requests.exceptions.RequestException as e:
             print(f"❌ ZipRecruiter API error: {e}")
             return []
     
+    def build_search_request(self, keyword: str, location: str, days_back: int = 7,
+                             page: int = 0) -> Tuple[str, Dict]:
+        """URL and query params for one results page (shared with the async scheduler)"""
+        params = {
+            "api_key": self.api_key,
+            "search": keyword,
+            "location": location,
+            "radius_miles": 50,
+            "days_ago": days_back,
+            "jobs_per_page": 20,
+            "page": page + 1
+        }
+        return self.base_url, params
+    
+    def parse_search_response(self, data: Dict) -> List[Dict]:
+        """Job postings from a search response"""
+        return data.get("jobs", [])
+    
     def extract_company_info(self, job: Dict) -> Dict:
         """Extract company information from job posting"""
         return {
@@ -118,34 +130,24 @@ class ZipRecruiterScraper:
             }
         }
     
-    def scrape_all_locations(self, days_back: int = 7) -> List[Dict]:
-        """Scrape all target keywords across all locations"""
-        all_signals = []
-        
-        for keyword in self.target_keywords:
-            for location in self.target_locations:
-                print(f"🔍 Searching: {keyword} in {location}")
-                
-                jobs = self.search_jobs(keyword, location, days_back)
-                
-                for job in jobs:
-                    company_info = self.extract_company_info(job)
-                    pain_analysis = self.analyze_pain_signals(job)
-                    
-                    signal = {
-                        **company_info,
-                        **pain_analysis,
-                        "source_type": "job_board_ziprecruiter",
-                        "signal_type": "hiring_activity",
-                        "keywords": [keyword],
-                        "scraped_at": datetime.now().isoformat()
-                    }
-                    
-                    all_signals.append(signal)
-                
-                print(f"   Found {len(jobs)} jobs")
+    def build_signal(self, job: Dict, keyword: str) -> Dict:
+        """Signal dict for one job posting"""
+        return {
+            **self.extract_company_info(job),
+            **self.analyze_pain_signals(job),
+            "source_type": "job_board_ziprecruiter",
+            "signal_type": "hiring_activity",
+            "keywords": [keyword],
+            "scraped_at": datetime.now().isoformat()
+        }
+    
+    def scrape_all_locations(self, days_back: int = 7, cursor_store=None, max_pages: int = 1) -> List[Dict]:
+        """Scrape all target keywords across all locations (concurrently, via the scrape scheduler)"""
+        from scrapers.scheduler import run_sources
+        from scrapers.sources import ZipRecruiterSource
         
-        return all_signals
+        source = ZipRecruiterSource(self, days_back, max_pages=max_pages)
+        return run_sources([source], cursor_store=cursor_store)[source.name]
     
     def _get_mock_data(self, keyword: str, location: str) -> List[Dict]:
         """Generate mock data for demo"""
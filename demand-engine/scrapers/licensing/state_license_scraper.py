@@ -105,39 +105,34 @@ class StateLicenseScraper:
             }
         }
     
-    def scrape_all_states(self, days_back: int = 30) -> List[Dict]:
+    def build_signal(self, license_data: Dict) -> Dict:
+        """Signal dict for one license"""
+        return {
+            **license_data,
+            **self.analyze_license_signal(license_data),
+            "source_type": "licensing_board",
+            "signal_type": "new_license",
+            "scraped_at": datetime.now().isoformat()
+        }
+    
+    def scrape_all_states(self, days_back: int = 30, cursor_store=None) -> List[Dict]:
         """
         Scrape all configured states
         
+        States are checked concurrently through the scrape scheduler.
+        
         Args:
             days_back: How many days back to check
+            cursor_store: Optional CursorStore; only items newer than the last run are pulled
             
         Returns:
             List of all license signals
         """
-        all_signals = []
-        
-        for state_code, state_config in self.states.items():
-            print(f"🔍 Checking {state_config['name']} licensing board...")
-            
-            licenses = self.scrape_new_licenses(state_code, days_back)
-            
-            for license_data in licenses:
-                pain_analysis = self.analyze_license_signal(license_data)
-                
-                signal = {
-                    **license_data,
-                    **pain_analysis,
-                    "source_type": "licensing_board",
-                    "signal_type": "new_license",
-                    "scraped_at": datetime.now().isoformat()
-                }
-                
-                all_signals.append(signal)
-            
-            print(f"   Found {len(licenses)} new licenses")
+        from scrapers.scheduler import run_sources
+        from scrapers.sources import StateLicenseSource
         
-        return all_signals
+        source = StateLicenseSource(self, days_back)
+        return run_sources([source], cursor_store=cursor_store)[source.name]
     
     def _get_mock_licenses(self, state_config: Dict, days_back: int) -> List[Dict]:
         """
@@ -13,6 +13,7 @@ import httpx
 from bs4 import BeautifulSoup
 
 from config.supabase_config import get_supabase
+from services.dedupe_index import DedupeIndex
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +66,8 @@ class LicensingMonitor:
     def __init__(self):
         """Initialize licensing monitor"""
         self.supabase = get_supabase()
+        # License numbers never repeat, so dedupe against every stored license
+        self.dedupe = DedupeIndex(self.supabase, "licensing_signals", window_days=None)
         self.client = httpx.Client(
             timeout=30.0,
             follow_redirects=True,
@@ -203,17 +206,8 @@ class LicensingMonitor:
         return hashlib.md5(content).hexdigest()
     
     def check_duplicate(self, content_hash: str) -> bool:
-        """Check if license already exists"""
-        try:
-            result = self.supabase.table("licensing_signals")\
-                .select("id")\
-                .eq("content_hash", content_hash)\
-                .execute()
-            
-            return len(result.data) > 0
-        except Exception as e:
-            logger.error(f"❌ Duplicate check failed: {str(e)}")
-            return False
+        """Check if license already exists (local index; queries only on a filter hit)"""
+        return self.dedupe.contains(content_hash)
     
     def save_signal(self, license_data: Dict, score: int) -> bool:
         """Save licensing signal to database"""
@@ -256,6 +250,7 @@ class LicensingMonitor:
             
             # Insert into database
             self.supabase.table("licensing_signals").insert(signal_data).execute()
+            self.dedupe.add(signal_data['content_hash'])
             
             return True
             
@@ -278,6 +273,9 @@ class LicensingMonitor:
         # Note: In production, this would actually scrape licensing boards
         # For now, it's a framework ready to be activated
         
+        self.dedupe.save()
+        stats['dedupe'] = self.dedupe.report()
+        
         logger.info("=" * 60)
         logger.info("📊 Licensing Monitor Summary")
         logger.info("=" * 60)
@@ -19,6 +19,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from services.ingestion_sink import UpsertSink
+from services.llm_cache import Completion, get_llm_cache, prompt_version, usage_cost
+
 # Load environment variables
 load_dotenv()
 
@@ -28,6 +31,26 @@ class Tables:
     BUSINESS_CONTACTS = "business_contacts"
     SCRAPING_JOBS = "scraping_jobs"
 
+BUSINESS_SCORING_PROMPT = """
+Analyze this business and score the opportunity for selling an AI voice agent service:
+
+Business: {business_name}
+Industry: {industry}
+Complaints: {complaint_count}
+Years in Business: {years_in_business}
+Rating: {rating}
+
+Provide scores (0-100):
+1. Pain Score: How much pain/problems do they likely have?
+2. Urgency Score: How urgent is their need?
+3. Fit Score: How well do they fit our ideal customer profile?
+
+Respond in JSON format only:
+{{"pain_score": X, "urgency_score": Y, "fit_score": Z, "reasoning": "brief explanation"}}
+"""
+BUSINESS_SCORING_MODEL = "gpt-4o-mini"
+
+
 def get_supabase() -> Client:
     """Get Supabase client"""
     url = os.getenv("SUPABASE_URL")
@@ -211,26 +234,16 @@ class LocalBusinessScraper:
             # Return default scores if no API key
             return business
         
-        try:
+        inputs = {
+            "business_name": business.get('business_name'),
+            "industry": business.get('industry'),
+            "complaint_count": business.get('complaint_count', 0),
+            "years_in_business": business.get('years_in_business', 0),
+            "rating": business.get('rating', 'N/A'),
+        }
+        
+        async def complete():
             async with httpx.AsyncClient() as client:
-                prompt = f"""
-                Analyze this business and score the opportunity for selling an AI voice agent service:
-                
-                Business: {business.get('business_name')}
-                Industry: {business.get('industry')}
-                Complaints: {business.get('complaint_count', 0)}
-                Years in Business: {business.get('years_in_business', 0)}
-                Rating: {business.get('rating', 'N/A')}
-                
-                Provide scores (0-100):
-                1. Pain Score: How much pain/problems do they likely have?
-                2. Urgency Score: How urgent is their need?
-                3. Fit Score: How well do they fit our ideal customer profile?
-                
-                Respond in JSON format only:
-                {{"pain_score": X, "urgency_score": Y, "fit_score": Z, "reasoning": "brief explanation"}}
-                """
-                
                 response = await client.post(
                     "https://api.openai.com/v1/chat/completions",
                     headers={
@@ -238,23 +251,35 @@ class LocalBusinessScraper:
                         "Content-Type": "application/json"
                     },
                     json={
-                        "model": "gpt-4o-mini",
-                        "messages": [{"role": "user", "content": prompt}],
+                        "model": BUSINESS_SCORING_MODEL,
+                        "messages": [{"role": "user", "content": BUSINESS_SCORING_PROMPT.format(**inputs)}],
                         "temperature": 0.3,
                         "max_tokens": 200
                     },
                     timeout=10.0
                 )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    content = result['choices'][0]['message']['content']
-                    
-                    # Extract JSON from response
-                    if '{' in content and '}' in content:
-                        json_str = content[content.find('{'):content.rfind('}')+1]
-                        scores = json.loads(json_str)
-                        business.update(scores)
+            
+            if response.status_code != 200:
+                return None
+            result = response.json()
+            content = result['choices'][0]['message']['content']
+            
+            # Extract JSON from response
+            scores = None
+            if '{' in content and '}' in content:
+                json_str = content[content.find('{'):content.rfind('}')+1]
+                scores = json.loads(json_str)
+            usage = usage_cost(BUSINESS_SCORING_MODEL, result.get('usage'))
+            return Completion(scores, usage.tokens, usage.cost)
+        
+        try:
+            # Same business facts → cached scores (see services/llm_cache.py)
+            scores = await get_llm_cache().aget_or_call(
+                "business_scoring", BUSINESS_SCORING_MODEL, prompt_version(BUSINESS_SCORING_PROMPT),
+                inputs, complete, cacheable=lambda scores: scores is not None,
+            )
+            if scores:
+                business.update(scores)
                 
         except Exception as e:
             print(f"⚠️ AI scoring failed: {e}")
@@ -262,73 +287,76 @@ class LocalBusinessScraper:
         return business
     
     async def save_to_supabase(self, businesses: List[Dict[str, Any]]):
-        """Save scraped businesses to Supabase"""
+        """Save scraped businesses to Supabase (batched upserts keyed by content hash)"""
         print(f"\n💾 Saving {len(businesses)} businesses to Supabase...")
         
-        saved_count = 0
-        updated_count = 0
+        # One opportunity signal per business and source; re-runs leave existing signals alone
+        signals = UpsertSink(
+            self.supabase, Tables.SIGNALS,
+            key_fields=["source", "business_name", "contact_phone"],
+        )
+        # Contacts are refreshed in place (previously: insert, else update by name + phone)
+        contacts = UpsertSink(
+            self.supabase, Tables.BUSINESS_CONTACTS,
+            key_fields=["business_name", "phone"],
+            update_existing=True,
+        )
         
         for biz in businesses:
-            try:
-                # Create signal record
-                signal_data = {
-                    "title": f"{biz['business_name']} - {biz.get('industry', 'business').upper()} Opportunity",
-                    "content": f"Business with {biz.get('complaint_count', 0)} complaints, {biz.get('years_in_business', 0)} years in business",
-                    "url": biz.get('source_url', ''),
-                    "source": biz.get('source', 'unknown'),
-                    "pain_score": biz.get('pain_score', 50),
-                    "urgency_score": biz.get('urgency_score', 50),
-                    "relevance_score": biz.get('fit_score', 50),
-                    "business_name": biz.get('business_name'),
-                    "contact_name": biz.get('contact_name'),
-                    "contact_email": biz.get('email'),
-                    "contact_phone": biz.get('phone'),
-                    "location": f"{biz.get('city', '')}, {biz.get('state', '')}",
-                    "industry": biz.get('industry'),
-                    "status": "new"
-                }
-                
-                # Insert signal
-                self.supabase.table(Tables.SIGNALS).insert(signal_data).execute()
-                saved_count += 1
-                
-                # Create business contact record
-                contact_data = {
-                    "business_name": biz.get('business_name'),
-                    "industry": biz.get('industry'),
-                    "contact_name": biz.get('contact_name'),
-                    "email": biz.get('email'),
-                    "phone": biz.get('phone'),
-                    "website": biz.get('website'),
-                    "address": biz.get('address'),
-                    "city": biz.get('city'),
-                    "state": biz.get('state'),
-                    "license_number": biz.get('license_number'),
-                    "license_status": biz.get('license_status'),
-                    "years_in_business": biz.get('years_in_business'),
-                    "employee_count": biz.get('employee_count'),
-                    "annual_revenue": biz.get('annual_revenue'),
-                    "source": biz.get('source'),
-                    "source_url": biz.get('source_url'),
-                    "source_data": json.dumps(biz),
-                    "data_quality_score": 80,
-                    "status": "new"
-                }
-                
-                # Try to insert, update if exists
-                try:
-                    self.supabase.table("business_contacts").insert(contact_data).execute()
-                except:
-                    # Update existing record
-                    self.supabase.table("business_contacts").update(contact_data).eq(
-                        "business_name", biz.get('business_name')
-                    ).eq("phone", biz.get('phone')).execute()
-                    updated_count += 1
-                
-            except Exception as e:
-                print(f"❌ Error saving {biz.get('business_name')}: {e}")
+            signals.add({
+                "title": f"{biz['business_name']} - {biz.get('industry', 'business').upper()} Opportunity",
+                "content": f"Business with {biz.get('complaint_count', 0)} complaints, {biz.get('years_in_business', 0)} years in business",
+                "url": biz.get('source_url', ''),
+                "source": biz.get('source', 'unknown'),
+                "pain_score": biz.get('pain_score', 50),
+                "urgency_score": biz.get('urgency_score', 50),
+                "relevance_score": biz.get('fit_score', 50),
+                "business_name": biz.get('business_name'),
+                "contact_name": biz.get('contact_name'),
+                "contact_email": biz.get('email'),
+                "contact_phone": biz.get('phone'),
+                "location": f"{biz.get('city', '')}, {biz.get('state', '')}",
+                "industry": biz.get('industry'),
+                "status": "new"
+            })
+            
+            contacts.add({
+                "business_name": biz.get('business_name'),
+                "industry": biz.get('industry'),
+                "contact_name": biz.get('contact_name'),
+                "email": biz.get('email'),
+                "phone": biz.get('phone'),
+                "website": biz.get('website'),
+                "address": biz.get('address'),
+                "city": biz.get('city'),
+                "state": biz.get('state'),
+                "license_number": biz.get('license_number'),
+                "license_status": biz.get('license_status'),
+                "years_in_business": biz.get('years_in_business'),
+                "employee_count": biz.get('employee_count'),
+                "annual_revenue": biz.get('annual_revenue'),
+                "source": biz.get('source'),
+                "source_url": biz.get('source_url'),
+                "source_data": json.dumps(biz),
+                "data_quality_score": 80,
+                "status": "new"
+            })
+        
+        # Writes run on the default executor so the event loop is not blocked
+        loop = asyncio.get_running_loop()
+        signal_stats = await loop.run_in_executor(None, signals.close)
+        contact_stats = await loop.run_in_executor(None, contacts.close)
+        
+        saved_count = signal_stats["inserted"]
+        updated_count = contact_stats["updated"]
+        
+        for stats in (signal_stats, contact_stats):
+            if stats["failed"]:
+                print(f"❌ {stats['failed']} rows failed to save to {stats['table']}")
         
-        print(f"✅ Saved {saved_count} new businesses, updated {updated_count}")
+        print(f"✅ Saved {saved_count} new businesses, {contact_stats['inserted']} new contacts, "
+              f"updated {updated_count} contacts "
+              f"({signal_stats['round_trips'] + contact_stats['round_trips']} round trips)")
         return saved_count, updated_count
     
     async def run(self):
@@ -8,10 +8,14 @@ import os
 import hashlib
 import re
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Optional
+from typing import Collection, List, Dict, Optional
 import logging
 
 from config.supabase_config import get_supabase
+from services.ingestion_sink import UpsertSink
+from scrapers.cursors import CursorStore
+from scrapers.scheduler import HostPolicy, run_sources
+from scrapers.sources import RedditSource
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +24,9 @@ SUBREDDITS = ['HVAC', 'homeowners', 'Plumbing', 'HomeImprovement', 'hvacadvice']
 LOOKBACK_HOURS = 24
 MIN_SCORE_THRESHOLD = 70
 
+# Parallel subreddit listings, kept well under Reddit's OAuth limit (100 requests/min)
+REDDIT_HOST_POLICY = HostPolicy(max_concurrency=3, requests_per_second=1.0)
+
 # Scoring weights (must sum to 100)
 SCORE_WEIGHTS = {
     'urgency': 25,
@@ -65,40 +72,58 @@ class RedditMonitor:
             user_agent=os.getenv('REDDIT_USER_AGENT', 'PainSignalBot/1.0')
         )
         self.supabase = get_supabase()
+        self.sink: Optional[UpsertSink] = None
+    
+    def get_sink(self) -> UpsertSink:
+        """Batched reddit_signals writer, deduped against the last 7 days of content hashes"""
+        if self.sink is None:
+            self.sink = UpsertSink(self.supabase, "reddit_signals", recent_days=7)
+        return self.sink
     
-    def fetch_recent_posts(self, subreddit_name: str, hours: int = 24) -> List[Dict]:
+    def fetch_recent_posts(self, subreddit_name: str, hours: int = 24,
+                           after: Optional[datetime] = None,
+                           seen_ids: Collection[str] = ()) -> List[Dict]:
         """
         Fetch posts from last N hours
         
         Args:
             subreddit_name: Name of subreddit to monitor
             hours: How many hours back to look
-            
+            after: Only posts newer than this (newest post seen last run)
+            seen_ids: Posts already seen at exactly `after`; others sharing
+                that timestamp are still returned
+        
         Returns:
             List of post dictionaries
         """
         try:
             subreddit = self.reddit.subreddit(subreddit_name)
             cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+            if after is not None:
+                cutoff_time = max(cutoff_time, after)
             
             posts = []
             
-            # Fetch from new posts (most recent)
+            # Fetch from new posts (most recent first); the listing pages lazily,
+            # so stopping at the first old post saves the remaining requests
             for submission in subreddit.new(limit=100):
                 post_time = datetime.fromtimestamp(submission.created_utc, tz=timezone.utc)
                 
-                if post_time > cutoff_time:
-                    posts.append({
-                        'id': submission.id,
-                        'subreddit': subreddit_name,
-                        'author': str(submission.author) if submission.author else '[deleted]',
-                        'title': submission.title,
-                        'body': submission.selftext or '',
-                        'created_utc': post_time,
-                        'url': f"https://reddit.com{submission.permalink}",
-                        'score': submission.score,
-                        'num_comments': submission.num_comments
-                    })
+                if post_time < cutoff_time:
+                    break
+                if post_time == cutoff_time and (post_time != after or submission.id in seen_ids):
+                    continue
+                posts.append({
+                    'id': submission.id,
+                    'subreddit': subreddit_name,
+                    'author': str(submission.author) if submission.author else '[deleted]',
+                    'title': submission.title,
+                    'body': submission.selftext or '',
+                    'created_utc': post_time,
+                    'url': f"https://reddit.com{submission.permalink}",
+                    'score': submission.score,
+                    'num_comments': submission.num_comments
+                })
             
             logger.info(f"Fetched {len(posts)} posts from r/{subreddit_name}")
             return posts
@@ -124,32 +149,18 @@ class RedditMonitor:
         
         return hashlib.md5(normalized.encode()).hexdigest()
     
-    def is_duplicate(self, content_hash: str, lookback_days: int = 7) -> bool:
+    def is_duplicate(self, content_hash: str) -> bool:
         """
-        Check if similar content seen recently
+        Check if similar content seen recently (the sink's 7-day index;
+        queries only on a filter hit)
         
         Args:
             content_hash: MD5 hash of normalized content
-            lookback_days: How far back to check
             
         Returns:
             True if duplicate found
         """
-        try:
-            cutoff = datetime.now(timezone.utc) - timedelta(days=lookback_days)
-            
-            response = self.supabase.table("reddit_signals")\
-                .select("id")\
-                .eq("content_hash", content_hash)\
-                .gte("created_at", cutoff.isoformat())\
-                .limit(1)\
-                .execute()
-            
-            return len(response.data) > 0
-            
-        except Exception as e:
-            logger.error(f"Error checking duplicate: {str(e)}")
-            return False
+        return self.get_sink().index.contains(content_hash)
     
     def quick_keyword_score(self, text: str, category: str) -> int:
         """
@@ -331,33 +342,28 @@ class RedditMonitor:
     
     def save_signal(self, signal: Dict) -> Optional[str]:
         """
-        Save signal to database
+        Queue signal for the batched reddit_signals upsert
         
         Args:
             signal: Signal dictionary
             
         Returns:
-            Signal ID if saved, None if duplicate or error
+            Content hash if queued, None if duplicate
         """
-        try:
-            # Check for duplicate
-            if self.is_duplicate(signal['content_hash']):
-                logger.info(f"Skipping duplicate post: {signal['post_id']}")
-                return None
-            
-            # Insert into database
-            response = self.supabase.table("reddit_signals").insert(signal).execute()
-            
-            if response.data:
-                signal_id = response.data[0]['id']
-                logger.info(f"Saved signal {signal_id} with score {signal['total_score']}")
-                return signal_id
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error saving signal: {str(e)}")
-            return None
+        content_hash = self.get_sink().add(signal)
+        if content_hash is None:
+            logger.info(f"Skipping duplicate post: {signal['post_id']}")
+        return content_hash
+    
+    def flush_signals(self) -> Dict:
+        """
+        Write queued signals and return ingestion statistics
+        """
+        if self.sink is None:
+            return {}
+        stats = self.sink.close()
+        self.sink = None
+        return stats
     
     def process_subreddit(self, subreddit_name: str, hours: int = 24) -> Dict:
         """
@@ -423,10 +429,28 @@ class RedditMonitor:
             'saved': 0
         }
         
-        for subreddit in SUBREDDITS:
-            stats = self.process_subreddit(subreddit, LOOKBACK_HOURS)
-            for key in combined_stats:
-                combined_stats[key] += stats[key]
+        # Fetch every subreddit concurrently (only posts newer than last run's cursor),
+        # then save in one pass
+        source = RedditSource(self, SUBREDDITS, hours=LOOKBACK_HOURS)
+        signals = run_sources(
+            [source],
+            host_policies={source.host: REDDIT_HOST_POLICY},
+            cursor_store=CursorStore(self.supabase),
+        )[source.name]
+        
+        combined_stats['fetched'] = combined_stats['processed'] = len(signals)
+        for signal in signals:
+            if signal['total_score'] >= MIN_SCORE_THRESHOLD:
+                combined_stats['high_score'] += 1
+                self.save_signal(signal)
+            else:
+                combined_stats['skipped'] += 1
+        
+        # One batched upsert for every subreddit's signals
+        ingest_stats = self.flush_signals()
+        if ingest_stats:
+            combined_stats['saved'] = ingest_stats['written']
+            combined_stats['ingest'] = ingest_stats
         
         processing_time = (datetime.now() - start_time).total_seconds()
         combined_stats['processing_time_seconds'] = int(processing_time)
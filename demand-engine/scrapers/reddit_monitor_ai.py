@@ -14,6 +14,8 @@ import logging
 
 from config.supabase_config import get_supabase
 from classifiers.ai_scorer import AISignalScorer
+from services.dedupe_index import DedupeIndex
+from services.near_duplicates import NearDuplicateIndex
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +72,9 @@ class RedditMonitorAI:
         """Initialize Reddit client and AI scorer"""
         self.reddit = self._init_reddit()
         self.supabase = get_supabase()
+        self.dedupe = DedupeIndex(self.supabase, "reddit_signals", window_days=None)
+        # Reposts / cross-posts reuse the AI score of the first copy seen
+        self.near_duplicates = NearDuplicateIndex()
         
         # Initialize AI scorer if enabled
         self.ai_scorer = None
@@ -170,17 +175,25 @@ class RedditMonitorAI:
         body: str,
         metadata: Dict
     ) -> Optional[Dict]:
-        """Score post using AI (GPT-4)"""
+        """Score post using AI (GPT-4), once per near-duplicate cluster"""
         if not self.ai_scorer:
             return None
         
+        cluster = self.near_duplicates.add(self.generate_content_hash(title, body), f"{title}\n{body}")
+        cached = self.near_duplicates.result(cluster)
+        if cached is not None:
+            return cached
+        
         try:
-            return self.ai_scorer.score_signal(
+            ai_scores = self.ai_scorer.score_signal(
                 title=title,
                 content=body,
                 source="reddit",
                 metadata=metadata
             )
+            if ai_scores:
+                self.near_duplicates.set_result(cluster, ai_scores)
+            return ai_scores
         except Exception as e:
             logger.error(f"❌ AI scoring failed: {str(e)}")
             return None
@@ -231,17 +244,8 @@ class RedditMonitorAI:
         return hashlib.md5(content).hexdigest()
     
     def check_duplicate(self, content_hash: str) -> bool:
-        """Check if signal already exists"""
-        try:
-            result = self.supabase.table("reddit_signals")\
-                .select("id")\
-                .eq("content_hash", content_hash)\
-                .execute()
-            
-            return len(result.data) > 0
-        except Exception as e:
-            logger.error(f"❌ Duplicate check failed: {str(e)}")
-            return False
+        """Check if signal already exists (local index; queries only on a filter hit)"""
+        return self.dedupe.contains(content_hash)
     
     def save_signal(self, post: Dict, keyword_scores: Dict, ai_scores: Optional[Dict]) -> bool:
         """Save signal to database"""
@@ -306,6 +310,7 @@ class RedditMonitorAI:
             
             # Insert into database
             self.supabase.table("reddit_signals").insert(signal_data).execute()
+            self.dedupe.add(signal_data['content_hash'])
             
             return True
             
@@ -323,12 +328,16 @@ class RedditMonitorAI:
             'ai_scored': 0
         }
         
-        for post in posts:
-            # Check for duplicates
-            content_hash = self.generate_content_hash(post['title'], post['body'])
-            if self.check_duplicate(content_hash):
+        # One batched membership check for the whole listing
+        hashes = [self.generate_content_hash(post['title'], post['body']) for post in posts]
+        new_hashes = set(self.dedupe.filter_new(hashes))
+        
+        for post, content_hash in zip(posts, hashes):
+            # Check for duplicates (stored, or repeated within this listing)
+            if content_hash not in new_hashes:
                 stats['duplicates'] += 1
                 continue
+            new_hashes.discard(content_hash)
             
             # Keyword scoring (always done)
             keyword_scores = self.score_post_keywords(post['title'], post['body'])
@@ -388,6 +397,10 @@ class RedditMonitorAI:
             all_stats['total_ai_scored'] += stats['ai_scored']
             all_stats['by_subreddit'][subreddit] = stats
         
+        self.dedupe.save()
+        all_stats['dedupe'] = self.dedupe.report()
+        all_stats['near_duplicates'] = self.near_duplicates.report()
+        
         logger.info("=" * 60)
         logger.info("📊 Reddit Monitor Summary")
         logger.info("=" * 60)
@@ -396,6 +409,7 @@ class RedditMonitorAI:
         logger.info(f"Low score filtered: {all_stats['total_low_score']}")
         logger.info(f"AI scored: {all_stats['total_ai_scored']}")
         logger.info(f"High-value saved: {all_stats['total_saved']}")
+        logger.info(f"Dedupe round trips saved: {all_stats['dedupe']['round_trips_saved']}")
         logger.info("=" * 60)
         
         return all_stats
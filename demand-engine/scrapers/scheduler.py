@@ -0,0 +1,399 @@
+"""
+Async Scrape Scheduler
+Runs every (source x location x keyword) job concurrently while staying polite to each host.
+
+- Per-host concurrency and request-rate limits (HostPolicy)
+- One keep-alive httpx.AsyncClient per host, shared by every adapter that hits it
+- Job-level retries of transient errors with exponential backoff and full jitter
+  (honours Retry-After); parse errors and other 4xx fail the job at once
+- Progress / metrics via ScrapeMetrics.snapshot() (requests and bytes per host)
+- Optional CursorStore: incremental runs with conditional requests (scrapers/cursors.py)
+
+Scrapers plug in as source adapters (see scrapers/sources.py):
+
+    scheduler = ScrapeScheduler([IndeedSource(IndeedScraper()), RedditSource(RedditMonitor())])
+    signals_by_source = asyncio.run(scheduler.run())
+    print(scheduler.metrics.snapshot())
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from scrapers.cursors import CursorStore, ScrapeCursor
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (compatible; KestrelSignalBot/1.0)"
+
+
+@dataclass
+class ScrapeJob:
+    """One unit of work: a source queried for a location and keyword"""
+    source: str
+    location: Optional[str] = None
+    keyword: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return ":".join(part for part in (self.source, self.location, self.keyword) if part)
+
+
+@dataclass
+class HostPolicy:
+    """Politeness settings for one host"""
+    max_concurrency: int = 4
+    requests_per_second: float = 2.0
+
+
+class RetryableError(Exception):
+    """Transient failure (429/5xx/transport); the job is retried"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_transient(error: BaseException) -> bool:
+    """Worth retrying: timeouts, connection errors, 429 and 5xx"""
+    if isinstance(error, (RetryableError, httpx.TransportError, TimeoutError, ConnectionError)):
+        return True
+    # HTTP status errors raised by the adapters' own clients (httpx or requests)
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return status is not None and (status == 429 or status >= 500)
+
+
+class HostLimiter:
+    """Caps in-flight requests and spaces request starts for one host"""
+
+    def __init__(self, policy: HostPolicy):
+        self.semaphore = asyncio.Semaphore(policy.max_concurrency)
+        self.interval = 1.0 / policy.requests_per_second if policy.requests_per_second else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        if self.interval:
+            async with self._lock:
+                now = time.monotonic()
+                wait = self._next_start - now
+                self._next_start = max(now, self._next_start) + self.interval
+            if wait > 0:
+                await asyncio.sleep(wait)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+
+@dataclass
+class ScrapeMetrics:
+    """Counters for a scheduler run"""
+    jobs_total: int = 0
+    jobs_done: int = 0
+    jobs_failed: int = 0
+    retries: int = 0
+    cursors_saved: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    by_source: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    by_host: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    def source(self, name: str) -> Dict[str, int]:
+        if name not in self.by_source:
+            self.by_source[name] = {"jobs": 0, "done": 0, "failed": 0, "items": 0, "signals": 0}
+        return self.by_source[name]
+
+    def host(self, name: str) -> Dict[str, float]:
+        if name not in self.by_host:
+            self.by_host[name] = {
+                "requests": 0, "errors": 0, "not_modified": 0, "bytes": 0,
+                "in_flight": 0, "max_in_flight": 0, "total_ms": 0.0,
+            }
+        return self.by_host[name]
+
+    def snapshot(self) -> Dict[str, Any]:
+        finished = self.jobs_done + self.jobs_failed
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "jobs_total": self.jobs_total,
+            "jobs_done": self.jobs_done,
+            "jobs_failed": self.jobs_failed,
+            "retries": self.retries,
+            "requests": sum(stats["requests"] for stats in self.by_host.values()),
+            "bytes": sum(stats["bytes"] for stats in self.by_host.values()),
+            "cursors_saved": self.cursors_saved,
+            "progress_pct": round(finished / self.jobs_total * 100, 1) if self.jobs_total else 100.0,
+            "elapsed_seconds": round(elapsed, 2),
+            "by_source": {name: dict(stats) for name, stats in self.by_source.items()},
+            "by_host": {
+                name: {
+                    **stats,
+                    "avg_ms": round(stats["total_ms"] / stats["requests"], 1) if stats["requests"] else 0.0,
+                }
+                for name, stats in self.by_host.items()
+            },
+        }
+
+
+class ScrapeContext:
+    """What adapters use to reach the network: pooled HTTP and limited blocking calls"""
+
+    def __init__(self, scheduler: "ScrapeScheduler"):
+        self._scheduler = scheduler
+
+    def cursor(self, job: ScrapeJob) -> Optional[ScrapeCursor]:
+        """The job's working cursor (None when the run has no cursor store)"""
+        return self._scheduler.cursor_for(job)
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None,
+                       headers: Optional[Dict[str, str]] = None,
+                       cursor: Optional[ScrapeCursor] = None) -> Any:
+        """
+        GET through the host's shared client and limiter.
+
+        With a cursor the request is conditional on its ETag / Last-Modified;
+        a 304 returns None and fresh validators are stored back on the cursor.
+        """
+        host = urlsplit(url).hostname or "unknown"
+        client = self._scheduler.client_for(host)
+        headers = dict(headers or {})
+        if cursor is not None:
+            if cursor.etag:
+                headers["If-None-Match"] = cursor.etag
+            if cursor.last_modified:
+                headers["If-Modified-Since"] = cursor.last_modified
+        stats = self._scheduler.metrics.host(host)
+        async with self._scheduler.track(host):
+            try:
+                response = await client.get(url, params=params, headers=headers)
+            except httpx.TransportError as e:
+                raise RetryableError(f"{host}: {e!r}") from e
+        stats["bytes"] += len(response.content)
+        if response.status_code == 304:
+            stats["not_modified"] += 1
+            return None
+        if response.status_code == 429 or response.status_code >= 500:
+            self._scheduler.metrics.host(host)["errors"] += 1
+            retry_after = response.headers.get("Retry-After")
+            raise RetryableError(
+                f"{host}: HTTP {response.status_code}",
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+            )
+        response.raise_for_status()
+        if cursor is not None:
+            cursor.etag = response.headers.get("ETag")
+            cursor.last_modified = response.headers.get("Last-Modified")
+        return response.json()
+
+    async def run_blocking(self, host: str, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a synchronous client call (praw, mock data, ...) in a thread under the host's limits"""
+        async with self._scheduler.track(host):
+            return await asyncio.to_thread(func, *args)
+
+
+class SourceAdapter:
+    """
+    Base class for scheduler sources.
+
+    Subclasses set `name`/`host`, list their jobs, fetch raw items for a job
+    and turn them into signal dicts. Adapters that support incremental runs
+    read and advance `ctx.cursor(job)` in fetch(); the scheduler keeps the
+    change only if the job succeeds.
+    """
+
+    name = "source"
+    host = "localhost"
+
+    def jobs(self) -> Iterable[ScrapeJob]:
+        raise NotImplementedError
+
+    async def fetch(self, job: ScrapeJob, ctx: ScrapeContext) -> List[Any]:
+        raise NotImplementedError
+
+    def to_signals(self, job: ScrapeJob, items: List[Any]) -> List[Dict[str, Any]]:
+        return list(items)
+
+
+class ScrapeScheduler:
+    """Concurrent job runner for a set of source adapters"""
+
+    def __init__(
+        self,
+        adapters: Iterable[SourceAdapter],
+        host_policies: Optional[Dict[str, HostPolicy]] = None,
+        default_policy: Optional[HostPolicy] = None,
+        max_concurrent_jobs: int = 32,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        max_backoff_seconds: float = 30.0,
+        request_timeout: float = 15.0,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        cursor_store: Optional[CursorStore] = None,
+    ):
+        self.adapters = list(adapters)
+        self.host_policies = host_policies or {}
+        self.default_policy = default_policy or HostPolicy()
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.request_timeout = request_timeout
+        self.progress_callback = progress_callback
+        self.cursor_store = cursor_store
+
+        self.metrics = ScrapeMetrics()
+        self._limiters: Dict[str, HostLimiter] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._working_cursors: Dict[str, ScrapeCursor] = {}
+
+    def policy_for(self, host: str) -> HostPolicy:
+        return self.host_policies.get(host, self.default_policy)
+
+    def limiter_for(self, host: str) -> HostLimiter:
+        if host not in self._limiters:
+            self._limiters[host] = HostLimiter(self.policy_for(host))
+        return self._limiters[host]
+
+    def client_for(self, host: str) -> httpx.AsyncClient:
+        """Keep-alive client per host, sized to the host's concurrency limit"""
+        if host not in self._clients:
+            policy = self.policy_for(host)
+            self._clients[host] = httpx.AsyncClient(
+                timeout=self.request_timeout,
+                follow_redirects=True,
+                headers={"User-Agent": USER_AGENT},
+                limits=httpx.Limits(
+                    max_connections=policy.max_concurrency,
+                    max_keepalive_connections=policy.max_concurrency,
+                ),
+            )
+        return self._clients[host]
+
+    def cursor_for(self, job: ScrapeJob) -> Optional[ScrapeCursor]:
+        if self.cursor_store is None:
+            return None
+        if job.key not in self._working_cursors:
+            self._working_cursors[job.key] = self.cursor_store.get(job.source, job.key)
+        return self._working_cursors[job.key]
+
+    def track(self, host: str) -> "_Tracked":
+        return _Tracked(self.limiter_for(host), self.metrics.host(host))
+
+    async def run(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Run every adapter's jobs; returns signals grouped by source name"""
+        self.metrics = ScrapeMetrics()
+        results: Dict[str, List[Dict[str, Any]]] = {adapter.name: [] for adapter in self.adapters}
+        slots = asyncio.Semaphore(self.max_concurrent_jobs)
+        ctx = ScrapeContext(self)
+        if self.cursor_store is not None:
+            # One query for every cursor this run needs
+            self.cursor_store.load(adapter.name for adapter in self.adapters)
+
+        tasks = []
+        for adapter in self.adapters:
+            for job in adapter.jobs():
+                self.metrics.jobs_total += 1
+                self.metrics.source(adapter.name)["jobs"] += 1
+                tasks.append(self._run_job(adapter, job, ctx, slots, results[adapter.name]))
+
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            await self.aclose()
+            if self.cursor_store is not None:
+                try:
+                    self.metrics.cursors_saved = await asyncio.to_thread(self.cursor_store.save)
+                except Exception as e:
+                    # Next run re-reads from the old cursors; the upsert sink drops the repeats
+                    logger.error(f"Could not save scrape cursors: {e}")
+
+        logger.info(f"Scrape run complete: {self.metrics.snapshot()}")
+        return results
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    async def _run_job(self, adapter: SourceAdapter, job: ScrapeJob, ctx: ScrapeContext,
+                       slots: asyncio.Semaphore, out: List[Dict[str, Any]]) -> None:
+        source_stats = self.metrics.source(adapter.name)
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            async with slots:
+                # Each attempt starts from the stored cursor
+                self._working_cursors.pop(job.key, None)
+                try:
+                    items = await adapter.fetch(job, ctx)
+                    signals = adapter.to_signals(job, items)
+                except Exception as e:
+                    error = e
+                    retry_after = getattr(e, "retry_after", None)
+                else:
+                    cursor = self._working_cursors.pop(job.key, None)
+                    if cursor is not None:
+                        self.cursor_store.put(cursor)
+                    out.extend(signals)
+                    source_stats["items"] += len(items)
+                    source_stats["signals"] += len(signals)
+                    source_stats["done"] += 1
+                    self.metrics.jobs_done += 1
+                    self._report_progress()
+                    return
+
+            if attempt == self.max_retries or not is_transient(error):
+                break
+            # Full jitter keeps retries from many jobs on one host from lining up
+            delay = random.uniform(0, min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            self.metrics.retries += 1
+            logger.warning(f"Scrape job {job.key} failed ({error}); retry {attempt + 1} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+        if is_transient(error):
+            logger.error(f"Scrape job {job.key} failed after {attempt + 1} attempts: {error}")
+        else:
+            logger.error(f"Scrape job {job.key} failed, not retried: {error!r}")
+        source_stats["failed"] += 1
+        self.metrics.jobs_failed += 1
+        self._report_progress()
+
+    def _report_progress(self) -> None:
+        if self.progress_callback:
+            self.progress_callback(self.metrics.snapshot())
+
+
+class _Tracked:
+    """Host limiter + per-host request metrics around one request"""
+
+    def __init__(self, limiter: HostLimiter, stats: Dict[str, float]):
+        self.limiter, self.stats = limiter, stats
+
+    async def __aenter__(self):
+        await self.limiter.__aenter__()
+        self.stats["requests"] += 1
+        self.stats["in_flight"] += 1
+        self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+        self._started = time.perf_counter()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.stats["in_flight"] -= 1
+        self.stats["total_ms"] += (time.perf_counter() - self._started) * 1000
+        if exc_type is not None:
+            self.stats["errors"] += 1
+        await self.limiter.__aexit__(exc_type, exc, tb)
+
+
+def run_sources(adapters: Iterable[SourceAdapter], **kwargs) -> Dict[str, List[Dict[str, Any]]]:
+    """Synchronous entry point for scripts and the legacy scrape_all_* methods"""
+    return asyncio.run(ScrapeScheduler(adapters, **kwargs).run())
@@ -0,0 +1,217 @@
+"""
+Scrape Scheduler Source Adapters
+Wrap the existing scrapers so the scheduler can run their jobs concurrently.
+
+Each adapter expands its scraper's configuration into (source x location x keyword)
+jobs, fetches through the scheduler context (shared HTTP pools / host limits) and
+reuses the scraper's own parsing and scoring to build signals.
+
+When the scheduler has a cursor store, adapters only pull items newer than the
+job's cursor: lookback windows shrink to the time since the last seen item,
+paging stops at the first already-seen item (results are newest-first) and
+search APIs get conditional requests (ETag / Last-Modified).
+"""
+
+import math
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from scrapers.cursors import ScrapeCursor
+from scrapers.scheduler import ScrapeContext, ScrapeJob, SourceAdapter
+
+
+def window_days(cursor: Optional[ScrapeCursor], days_back: int) -> int:
+    """Lookback in whole days: up to the cursor, capped at days_back"""
+    if cursor is None or cursor.last_seen_at is None:
+        return days_back
+    age = (datetime.now(timezone.utc) - cursor.last_seen_at).total_seconds() / 86400
+    return max(1, min(days_back, math.ceil(age)))
+
+
+def unseen_items(items: List[Dict], cursor: Optional[ScrapeCursor],
+                 time_field: str, id_field: Optional[str] = None) -> List[Dict]:
+    """Drop items at or before the cursor"""
+    if cursor is None:
+        return list(items)
+    return [
+        item for item in items
+        if not cursor.is_seen(item.get(time_field), item.get(id_field) if id_field else None)
+    ]
+
+
+def advance_cursor(cursor: Optional[ScrapeCursor], items: List[Dict],
+                   time_field: str, id_field: Optional[str] = None) -> None:
+    if cursor is None:
+        return
+    for item in items:
+        cursor.advance(item.get(time_field), item.get(id_field) if id_field else None)
+
+
+class IndeedSource(SourceAdapter):
+    """
+    IndeedScraper: target_keywords x target_locations
+
+    Fetches one results page per search by default, like the scraper did on
+    its own; raise max_pages to page deeper (paging still stops at seen items).
+    """
+
+    name = "indeed"
+    host = "api.indeed.com"
+    id_field = "jobkey"
+    time_field = "date"
+    page_size = 25
+
+    def __init__(self, scraper, days_back: int = 7, max_pages: int = 1):
+        self.scraper = scraper
+        self.days_back = days_back
+        self.max_pages = max_pages
+
+    def jobs(self) -> Iterable[ScrapeJob]:
+        for keyword in self.scraper.target_keywords:
+            for location in self.scraper.target_locations:
+                yield ScrapeJob(self.name, location=location, keyword=keyword)
+
+    async def fetch(self, job: ScrapeJob, ctx: ScrapeContext) -> List[Dict]:
+        cursor = ctx.cursor(job)
+        if not self.scraper.api_key:
+            mock = self.scraper._get_mock_data(job.keyword, job.location)
+            items = unseen_items(mock, cursor, self.time_field, self.id_field)
+            advance_cursor(cursor, items, self.time_field, self.id_field)
+            return items
+
+        days_back = window_days(cursor, self.days_back)
+        items = []
+        for page in range(self.max_pages):
+            url, params = self.scraper.build_search_request(job.keyword, job.location, days_back, page=page)
+            # Validators only describe the first page
+            payload = await ctx.get_json(url, params=params, cursor=cursor if page == 0 else None)
+            if payload is None:
+                break  # 304: nothing new since the last run
+            page_items = self.scraper.parse_search_response(payload)
+            fresh = unseen_items(page_items, cursor, self.time_field, self.id_field)
+            items.extend(fresh)
+            # Sorted by date: an already-seen item means the rest are older
+            if len(fresh) < len(page_items) or len(page_items) < self.page_size:
+                break
+
+        advance_cursor(cursor, items, self.time_field, self.id_field)
+        return items
+
+    def to_signals(self, job: ScrapeJob, items: List[Dict]) -> List[Dict]:
+        return [self.scraper.build_signal(item, job.keyword) for item in items]
+
+
+class ZipRecruiterSource(IndeedSource):
+    """ZipRecruiterScraper: target_keywords x target_locations"""
+
+    name = "ziprecruiter"
+    host = "api.ziprecruiter.com"
+    id_field = "id"
+    time_field = "posted_time"
+    page_size = 20
+
+
+class BBBSource(SourceAdapter):
+    """BBBComplaintsScraper: target_categories x target_areas"""
+
+    name = "bbb"
+    host = "www.bbb.org"
+
+    def __init__(self, scraper, days_back: int = 30):
+        self.scraper = scraper
+        self.days_back = days_back
+
+    def jobs(self) -> Iterable[ScrapeJob]:
+        for category in self.scraper.target_categories:
+            for area in self.scraper.target_areas:
+                yield ScrapeJob(self.name, location=area, keyword=category)
+
+    async def fetch(self, job: ScrapeJob, ctx: ScrapeContext) -> List[Dict]:
+        cursor = ctx.cursor(job)
+        complaints = await ctx.run_blocking(
+            self.host, self.scraper.scrape_complaints, job.keyword, job.location,
+            window_days(cursor, self.days_back),
+        )
+        items = unseen_items(complaints, cursor, "complaint_date", "url")
+        advance_cursor(cursor, items, "complaint_date", "url")
+        return items
+
+    def to_signals(self, job: ScrapeJob, items: List[Dict]) -> List[Dict]:
+        return [self.scraper.build_signal(item, job.keyword, job.location) for item in items]
+
+
+class StateLicenseSource(SourceAdapter):
+    """StateLicenseScraper: one job per configured state board"""
+
+    name = "state_license"
+
+    def __init__(self, scraper, days_back: int = 30):
+        self.scraper = scraper
+        self.days_back = days_back
+
+    def jobs(self) -> Iterable[ScrapeJob]:
+        for state_code in self.scraper.states:
+            yield ScrapeJob(self.name, location=state_code)
+
+    async def fetch(self, job: ScrapeJob, ctx: ScrapeContext) -> List[Dict]:
+        # Each state board is its own host
+        board_url = self.scraper.states[job.location]["url"]
+        host = board_url.split("/")[2]
+        cursor = ctx.cursor(job)
+        licenses = await ctx.run_blocking(
+            host, self.scraper.scrape_new_licenses, job.location, window_days(cursor, self.days_back)
+        )
+        items = unseen_items(licenses, cursor, "issue_date", "license_number")
+        advance_cursor(cursor, items, "issue_date", "license_number")
+        return items
+
+    def to_signals(self, job: ScrapeJob, items: List[Dict]) -> List[Dict]:
+        return [self.scraper.build_signal(item) for item in items]
+
+
+class RedditSource(SourceAdapter):
+    """RedditMonitor: one job per subreddit; keeps posts scoring at or above min_score"""
+
+    name = "reddit"
+    host = "oauth.reddit.com"
+
+    def __init__(self, monitor, subreddits: Iterable[str], hours: int = 24, min_score: int = 0):
+        self.monitor = monitor
+        self.subreddits = list(subreddits)
+        self.hours = hours
+        self.min_score = min_score
+
+    def jobs(self) -> Iterable[ScrapeJob]:
+        for subreddit in self.subreddits:
+            yield ScrapeJob(self.name, location=subreddit)
+
+    async def fetch(self, job: ScrapeJob, ctx: ScrapeContext) -> List[Dict]:
+        # praw is synchronous and paces itself; the host limit bounds parallel listings.
+        # With a cursor the listing stops at the newest post seen last run.
+        cursor = ctx.cursor(job)
+        after = cursor.last_seen_at if cursor else None
+        seen_ids = set(cursor.last_seen_ids) if cursor else set()
+        posts = await ctx.run_blocking(
+            self.host, self.monitor.fetch_recent_posts, job.location, self.hours, after, seen_ids
+        )
+        advance_cursor(cursor, posts, "created_utc", "id")
+        return posts
+
+    def to_signals(self, job: ScrapeJob, items: List[Dict]) -> List[Dict]:
+        signals = [self.monitor.score_post(post) for post in items]
+        return [s for s in signals if s["total_score"] >= self.min_score]
+
+
+class CallableSource(SourceAdapter):
+    """A single blocking callable as one job (e.g. run_scrapers.py table loaders)"""
+
+    def __init__(self, name: str, func: Callable[[], Any], host: Optional[str] = None):
+        self.name = name
+        self.func = func
+        self.host = host or name
+
+    def jobs(self) -> Iterable[ScrapeJob]:
+        yield ScrapeJob(self.name)
+
+    async def fetch(self, job: ScrapeJob, ctx: ScrapeContext) -> List[Any]:
+        return [await ctx.run_blocking(self.host, self.func)]
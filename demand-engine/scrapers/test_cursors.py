@@ -0,0 +1,185 @@
+"""
+Test incremental scraping: persistent cursors, conditional requests and early termination
+"""
+
+import sys
+import asyncio
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scrapers.benchmark_incremental import JobFeed, feed_scraper, serve_feed
+from scrapers.cursors import CursorStore, ScrapeCursor, parse_item_time
+from scrapers.reddit_monitor import RedditMonitor
+from scrapers.scheduler import HostPolicy, ScrapeJob, ScrapeScheduler, SourceAdapter
+from scrapers.sources import IndeedSource
+from tests.fakes import FakeSupabase
+
+POLICY = HostPolicy(max_concurrency=4, requests_per_second=0)
+
+
+@pytest.fixture
+def feed():
+    feed = JobFeed(backlog=60)
+    server = serve_feed(feed)
+    yield feed, server
+    server.shutdown()
+    server.server_close()
+
+
+def _run(source, store):
+    scheduler = ScrapeScheduler([source], default_policy=POLICY, cursor_store=store)
+    signals = asyncio.run(scheduler.run())[source.name]
+    return signals, scheduler.metrics.snapshot()
+
+
+def test_parse_item_time():
+    expected = datetime(2024, 6, 15, 12, 0, tzinfo=timezone.utc)
+    assert parse_item_time("2024-06-15T12:00:00Z") == expected
+    assert parse_item_time("Sat, 15 Jun 2024 12:00:00 GMT") == expected
+    assert parse_item_time(expected.timestamp()) == expected
+    assert parse_item_time("2024-06-15T12:00:00") == expected
+    assert parse_item_time("not a date") is None
+
+
+def test_second_run_pulls_only_new_items(feed):
+    feed, server = feed
+    fake = FakeSupabase({})
+    store = CursorStore(fake)
+    source = IndeedSource(feed_scraper(server, keywords=2, locations=2), max_pages=4)
+
+    # Cold run: every page of the window (60 postings = 3 pages of 25)
+    signals, metrics = _run(source, store)
+    assert len(signals) == 240
+    assert metrics["requests"] == 12 and metrics["cursors_saved"] == 4
+    assert len(fake.db["scrape_cursors"]) == 4
+
+    # Nothing new: one conditional request per search, answered 304
+    signals, metrics = _run(source, CursorStore(fake))
+    assert signals == []
+    assert metrics["requests"] == 4 and metrics["bytes"] == 0
+    assert metrics["by_host"]["127.0.0.1"]["not_modified"] == 4
+    assert metrics["cursors_saved"] == 0
+
+    # Three new postings: the first page has seen items, so paging stops there
+    feed.publish(3)
+    signals, metrics = _run(source, CursorStore(fake))
+    assert len(signals) == 12
+    assert {s["job_title"].split(" #")[1] for s in signals} == {"60", "61", "62"}
+    assert metrics["requests"] == 4
+
+    cursor = CursorStore(fake)
+    cursor.load(["indeed"])
+    newest = cursor.get("indeed", "indeed:loc0:kw0")
+    assert newest.last_seen_id == "kw0-loc0-62" and newest.etag
+
+
+def test_failed_job_keeps_its_old_cursor():
+    class Feed(SourceAdapter):
+        name = "feed"
+        fail = False
+
+        def jobs(self):
+            return [ScrapeJob(self.name, keyword="a"), ScrapeJob(self.name, keyword="b")]
+
+        async def fetch(self, job, ctx):
+            cursor = ctx.cursor(job)
+            cursor.advance(datetime.now(timezone.utc), f"{job.keyword}-new")
+            if self.fail and job.keyword == "b":
+                raise ValueError("parse error")
+            return [job.keyword]
+
+    fake = FakeSupabase({})
+    source = Feed()
+    scheduler = ScrapeScheduler([source], cursor_store=CursorStore(fake), max_retries=0)
+    asyncio.run(scheduler.run())
+    assert len(fake.db["scrape_cursors"]) == 2
+
+    source.fail = True
+    before = {r["scope"]: r["last_seen_at"] for r in fake.db["scrape_cursors"]}
+    scheduler = ScrapeScheduler([source], cursor_store=CursorStore(fake), max_retries=0)
+    asyncio.run(scheduler.run())
+    after = {r["scope"]: r["last_seen_at"] for r in fake.db["scrape_cursors"]}
+
+    assert after["feed:b"] == before["feed:b"]
+    assert after["feed:a"] > before["feed:a"]
+
+
+def test_reddit_listing_stops_at_cursor():
+    now = datetime.now(timezone.utc)
+    consumed = []
+
+    def new(limit):
+        for minutes in range(0, 600, 10):
+            consumed.append(minutes)
+            yield SimpleNamespace(
+                id=f"p{minutes}", created_utc=(now - timedelta(minutes=minutes)).timestamp(),
+                author="someone", title="AC broken", selftext="", permalink=f"/r/HVAC/{minutes}",
+                score=1, num_comments=0,
+            )
+
+    monitor = RedditMonitor.__new__(RedditMonitor)
+    monitor.reddit = SimpleNamespace(subreddit=lambda name: SimpleNamespace(new=new))
+
+    posts = monitor.fetch_recent_posts("HVAC", hours=24, after=now - timedelta(minutes=35))
+    assert [p["id"] for p in posts] == ["p0", "p10", "p20", "p30"]
+    # Listing consumption ends at the first already-seen post
+    assert len(consumed) == 5
+
+    assert ScrapeCursor("reddit", "reddit:HVAC", last_seen_at=now).is_seen(now.isoformat())
+
+    # Posts sharing the newest timestamp: only the ones already seen are skipped
+    tied = datetime.fromtimestamp((now - timedelta(minutes=30)).timestamp(), tz=timezone.utc)
+    posts = monitor.fetch_recent_posts("HVAC", hours=24, after=tied, seen_ids={"p30"})
+    assert [p["id"] for p in posts] == ["p0", "p10", "p20"]
+    consumed.clear()
+    posts = monitor.fetch_recent_posts("HVAC", hours=24, after=tied, seen_ids={"other"})
+    assert [p["id"] for p in posts] == ["p0", "p10", "p20", "p30"] and len(consumed) == 5
+
+
+def test_items_sharing_the_watermark_timestamp():
+    at = datetime(2024, 6, 15, 12, 0, tzinfo=timezone.utc)
+    cursor = ScrapeCursor("indeed", "indeed:loc0:kw0")
+    cursor.advance(at, "a")
+    cursor.advance(at - timedelta(seconds=1), "older")
+    cursor.advance(at, "b")
+
+    assert cursor.last_seen_at == at and cursor.last_seen_ids == {"a", "b"}
+    assert cursor.is_seen(at, "a") and cursor.is_seen(at, "b")
+    # Same second, published after the last run: still new
+    assert not cursor.is_seen(at, "c")
+    assert cursor.is_seen(at - timedelta(seconds=1), "older-2")
+    assert not cursor.is_seen(at + timedelta(seconds=1), "d")
+
+    # A newer item resets the ids at the mark
+    cursor.advance(at + timedelta(seconds=1), "d")
+    assert cursor.last_seen_ids == {"d"}
+
+    # Round-trips through the table, including rows from before last_seen_ids
+    fake = FakeSupabase({})
+    store = CursorStore(fake)
+    cursor.advance(at + timedelta(seconds=1), "e")
+    store.put(cursor)
+    store.save()
+    assert fake.db["scrape_cursors"][0]["last_seen_ids"] == ["d", "e"]
+
+    loaded = CursorStore(fake)
+    loaded.load(["indeed"])
+    working = loaded.get("indeed", "indeed:loc0:kw0")
+    assert working.last_seen_ids == {"d", "e"}
+    working.advance(at + timedelta(seconds=1), "f")
+    loaded.put(working)
+    assert loaded.save() == 1  # The working copy's ids were not shared with the stored cursor
+
+    legacy = ScrapeCursor.from_row({"source": "indeed", "scope": "x", "last_seen_at": at.isoformat(),
+                                    "last_seen_id": "a"})
+    assert legacy.is_seen(at, "a") and not legacy.is_seen(at, "b")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,194 @@
+"""
+Test the async scrape scheduler against a local HTTP fixture server
+"""
+
+import sys
+import json
+import asyncio
+import time
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import httpx
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scrapers.scheduler import (
+    HostPolicy, RetryableError, ScrapeJob, ScrapeScheduler, SourceAdapter, is_transient, run_sources,
+)
+from scrapers.sources import BBBSource, IndeedSource
+from scrapers.job_boards.indeed_scraper import IndeedScraper
+from scrapers.bbb.complaints_scraper import BBBComplaintsScraper
+
+
+class _Fixture(BaseHTTPRequestHandler):
+    """Serves /jobs?q=..&l=.. as JSON; fails the first `fail_first` requests with `fail_status`"""
+
+    protocol_version = "HTTP/1.1"
+    state = {}
+
+    def do_GET(self):
+        state = self.state
+        with state["lock"]:
+            state["requests"] += 1
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            state["ports"].add(self.client_address[1])
+            fail = state["requests"] <= state["fail_first"]
+        time.sleep(state["delay"])
+
+        query = parse_qs(urlsplit(self.path).query)
+        if fail:
+            status, body = state["fail_status"], b"{}"
+        else:
+            status = 200
+            body = json.dumps({"results": [{
+                "jobtitle": query["q"][0],
+                "company": f"{query['l'][0]} HVAC",
+                "snippet": "Urgent hire, expanding, high volume",
+                "jobkey": f"{query['q'][0]}-{query['l'][0]}",
+            }]}).encode()
+
+        with state["lock"]:
+            state["in_flight"] -= 1
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fixture_server():
+    _Fixture.state = {
+        "lock": threading.Lock(), "requests": 0, "in_flight": 0, "max_in_flight": 0,
+        "ports": set(), "fail_first": 0, "fail_status": 503, "delay": 0.05,
+    }
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Fixture)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, _Fixture.state
+    server.shutdown()
+    server.server_close()
+
+
+def _indeed(server, keywords=4, locations=5):
+    scraper = IndeedScraper(api_key="test")
+    scraper.base_url = f"http://127.0.0.1:{server.server_address[1]}/jobs"
+    scraper.target_keywords = [f"kw{i}" for i in range(keywords)]
+    scraper.target_locations = [f"loc{i}" for i in range(locations)]
+    return scraper
+
+
+def test_job_graph_respects_host_concurrency_and_reuses_connections(fixture_server):
+    server, state = fixture_server
+    source = IndeedSource(_indeed(server))
+
+    results = run_sources([source], default_policy=HostPolicy(max_concurrency=3, requests_per_second=0))
+
+    signals = results["indeed"]
+    assert len(signals) == 20
+    assert {(s["job_title"], s["company_name"]) for s in signals} == {
+        (f"kw{k}", f"loc{l} HVAC") for k in range(4) for l in range(5)
+    }
+    assert signals[0]["source_type"] == "job_board_indeed" and signals[0]["total_score"] > 40
+
+    assert state["requests"] == 20
+    assert 1 < state["max_in_flight"] <= 3
+    # Keep-alive pool: far fewer connections than requests
+    assert len(state["ports"]) <= 3
+
+
+def test_rate_limit_spaces_requests(fixture_server):
+    server, state = fixture_server
+    state["delay"] = 0
+    source = IndeedSource(_indeed(server, keywords=1, locations=6))
+
+    started = time.perf_counter()
+    run_sources([source], default_policy=HostPolicy(max_concurrency=6, requests_per_second=20))
+    # 6 request starts spaced 50ms apart
+    assert time.perf_counter() - started >= 0.25
+
+
+def test_retries_transient_errors_with_metrics(fixture_server):
+    server, state = fixture_server
+    state["fail_first"] = 3
+    source = IndeedSource(_indeed(server, keywords=1, locations=3))
+    snapshots = []
+
+    scheduler = ScrapeScheduler(
+        [source],
+        default_policy=HostPolicy(max_concurrency=1, requests_per_second=0),
+        backoff_seconds=0.01,
+        progress_callback=snapshots.append,
+    )
+    results = asyncio.run(scheduler.run())
+
+    metrics = scheduler.metrics.snapshot()
+    assert len(results["indeed"]) == 3
+    assert metrics["retries"] == 3 and metrics["jobs_done"] == 3 and metrics["jobs_failed"] == 0
+    assert metrics["by_host"]["127.0.0.1"]["errors"] == 3
+    assert metrics["by_host"]["127.0.0.1"]["requests"] == 6
+    assert [s["progress_pct"] for s in snapshots][-1] == 100.0
+
+
+def test_client_errors_are_not_retried(fixture_server):
+    server, state = fixture_server
+    state["fail_first"], state["fail_status"] = 1, 404
+    source = IndeedSource(_indeed(server, keywords=1, locations=3))
+
+    scheduler = ScrapeScheduler(
+        [source],
+        default_policy=HostPolicy(max_concurrency=1, requests_per_second=0),
+        backoff_seconds=0.01,
+    )
+    results = asyncio.run(scheduler.run())
+
+    metrics = scheduler.metrics.snapshot()
+    assert len(results["indeed"]) == 2
+    assert metrics["retries"] == 0 and metrics["jobs_failed"] == 1
+    assert metrics["by_host"]["127.0.0.1"]["requests"] == 3
+
+
+def test_is_transient():
+    request = httpx.Request("GET", "http://hvac.test/jobs")
+    assert is_transient(RetryableError("HTTP 503"))
+    assert is_transient(httpx.ReadTimeout("slow", request=request))
+    assert is_transient(httpx.ConnectError("refused", request=request))
+    assert is_transient(TimeoutError())
+    for status, expected in ((429, True), (502, True), (400, False), (404, False)):
+        error = httpx.HTTPStatusError("", request=request, response=httpx.Response(status, request=request))
+        assert is_transient(error) is expected
+    assert not is_transient(ValueError("parse error"))
+    assert not is_transient(KeyError("results"))
+
+
+def test_failing_job_does_not_stop_others():
+    class Flaky(SourceAdapter):
+        name = "flaky"
+
+        def jobs(self):
+            return [ScrapeJob(self.name, keyword="ok"), ScrapeJob(self.name, keyword="broken")]
+
+        async def fetch(self, job, ctx):
+            if job.keyword == "broken":
+                raise ValueError("parse error")
+            return [{"keyword": job.keyword}]
+
+    bbb = BBBComplaintsScraper()
+    bbb.target_categories, bbb.target_areas = bbb.target_categories[:2], bbb.target_areas[:2]
+
+    results = run_sources([Flaky(), BBBSource(bbb)], max_retries=1, backoff_seconds=0)
+    assert results["flaky"] == [{"keyword": "ok"}]
+    assert len(results["bbb"]) == 8 and results["bbb"][0]["source_type"] == "bbb_complaints"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
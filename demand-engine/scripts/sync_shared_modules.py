@@ -0,0 +1,78 @@
+"""
+Vendor the modules demand-engine shares with hvac_agent
+
+hvac_agent holds the originals. The copies in this tree are generated from
+them (plus a header naming the original) because the two apps deploy
+separately. Edit the original in hvac_agent, then:
+
+    python scripts/sync_shared_modules.py           # rewrite stale copies
+    python scripts/sync_shared_modules.py --check   # exit 1 if a copy is stale
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import List
+
+ENGINE_ROOT = Path(__file__).resolve().parent.parent
+HVAC_ROOT = ENGINE_ROOT.parent / "hvac_agent"
+
+# Copy in demand-engine -> original in hvac_agent
+SHARED_MODULES = {
+    "ai_agent/vad.py": "app/services/audio/vad.py",
+    "ai_agent/transcriber.py": "app/services/audio/transcriber.py",
+    "utils/metrics.py": "app/utils/metrics.py",
+}
+
+HEADER = (
+    "# Vendored from hvac_agent/{source} by scripts/sync_shared_modules.py.\n"
+    "# Do not edit here: change the original and re-run the script.\n"
+)
+
+
+def render(source: str) -> str:
+    """Expected contents of the copy of `source`"""
+    return HEADER.format(source=source) + (HVAC_ROOT / source).read_text(encoding="utf-8")
+
+
+def stale_copies() -> List[str]:
+    """Copies that differ from (or are missing for) their original"""
+    stale = []
+    for copy, source in SHARED_MODULES.items():
+        path = ENGINE_ROOT / copy
+        if not path.exists() or path.read_text(encoding="utf-8") != render(source):
+            stale.append(copy)
+    return stale
+
+
+def sync() -> List[str]:
+    """Rewrite the stale copies; returns their paths"""
+    stale = stale_copies()
+    for copy in stale:
+        (ENGINE_ROOT / copy).write_text(render(SHARED_MODULES[copy]), encoding="utf-8")
+    return stale
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Vendor shared hvac_agent modules into demand-engine")
+    parser.add_argument("--check", action="store_true", help="Only report stale copies (exit 1 if any)")
+    args = parser.parse_args()
+
+    if not HVAC_ROOT.exists():
+        print(f"❌ hvac_agent not found at {HVAC_ROOT}")
+        return 1
+
+    if args.check:
+        stale = stale_copies()
+        for copy in stale:
+            print(f"❌ {copy} is out of date with hvac_agent/{SHARED_MODULES[copy]}")
+        if not stale:
+            print(f"✅ {len(SHARED_MODULES)} vendored modules up to date")
+        return 1 if stale else 0
+
+    for copy in sync():
+        print(f"✅ Updated {copy} from hvac_agent/{SHARED_MODULES[copy]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Test that the modules vendored from hvac_agent match their originals
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts import sync_shared_modules
+
+
+def test_vendored_copies_are_current():
+    if not sync_shared_modules.HVAC_ROOT.exists():
+        pytest.skip("hvac_agent not checked out alongside demand-engine")
+    assert sync_shared_modules.stale_copies() == [], "run python scripts/sync_shared_modules.py"
+
+
+def test_sync_rewrites_stale_copies(tmp_path, monkeypatch):
+    hvac = tmp_path / "hvac_agent"
+    (hvac / "app").mkdir(parents=True)
+    (hvac / "app" / "shared.py").write_text("VALUE = 1\n")
+    engine = tmp_path / "demand-engine"
+    (engine / "utils").mkdir(parents=True)
+    monkeypatch.setattr(sync_shared_modules, "HVAC_ROOT", hvac)
+    monkeypatch.setattr(sync_shared_modules, "ENGINE_ROOT", engine)
+    monkeypatch.setattr(sync_shared_modules, "SHARED_MODULES", {"utils/shared.py": "app/shared.py"})
+
+    assert sync_shared_modules.sync() == ["utils/shared.py"]
+    copy = engine / "utils" / "shared.py"
+    assert copy.read_text().startswith("# Vendored from hvac_agent/app/shared.py")
+    assert copy.read_text().endswith("VALUE = 1\n")
+    assert sync_shared_modules.stale_copies() == []
+
+    # A hand edit to the copy is reported and then overwritten
+    copy.write_text(copy.read_text() + "VALUE = 2\n")
+    assert sync_shared_modules.stale_copies() == ["utils/shared.py"]
+    sync_shared_modules.sync()
+    assert "VALUE = 2" not in copy.read_text()
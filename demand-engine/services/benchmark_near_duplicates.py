@@ -0,0 +1,110 @@
+"""
+Benchmark the MinHash/LSH near-duplicate index at scale
+
+Generates synthetic signals: distinct posts plus near-duplicates of earlier
+posts (a word or two changed, a sign-off appended, or a repost verbatim),
+indexes them incrementally in chunks and reports throughput, peak memory,
+how many AI scoring calls clustering would save, and precision/recall
+against the generator's ground truth.
+
+Usage (from demand-engine/):
+    python -m services.benchmark_near_duplicates
+    python -m services.benchmark_near_duplicates --signals 1000000 --dup-rate 0.3
+"""
+
+import argparse
+import random
+import resource
+import time
+
+from services.near_duplicates import NearDuplicateIndex
+
+_VOCAB = [
+    "hvac", "furnace", "ac", "unit", "compressor", "leak", "plumber", "pipe", "water", "heater",
+    "calls", "missed", "voicemail", "busy", "season", "booking", "customers", "technician",
+    "quote", "estimate", "install", "repair", "emergency", "today", "weekend", "company",
+    "owner", "hiring", "dispatch", "schedule", "service", "contract", "budget", "price",
+    "dallas", "phoenix", "miami", "chicago", "denver", "atlanta", "need", "help", "looking",
+    "for", "someone", "who", "can", "answer", "the", "phone", "after", "hours", "our", "team",
+]
+_SIGN_OFFS = ["Thanks in advance!", "Any recommendations?", "DM me please.", "Edit: still looking."]
+
+
+def generate(n: int, dup_rate: float, seed: int = 7):
+    """Yields (key, text, original_key); original_key is None for distinct posts"""
+    rng = random.Random(seed)
+    originals = []  # keys only; a post's words are regenerated from its key
+
+    def words_for(key):
+        post_rng = random.Random(key * 7919 + seed)
+        return [post_rng.choice(_VOCAB) for _ in range(post_rng.randint(30, 60))]
+
+    for i in range(n):
+        if originals and rng.random() < dup_rate:
+            source_key = originals[rng.randrange(len(originals))]
+            words = words_for(source_key)
+            edit = rng.random()
+            if edit < 0.4:
+                words[rng.randrange(len(words))] = rng.choice(_VOCAB)
+            elif edit < 0.8:
+                words.append(rng.choice(_SIGN_OFFS))
+            yield i, " ".join(words), source_key
+        else:
+            originals.append(i)
+            yield i, " ".join(words_for(i)), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--signals", type=int, default=1_000_000)
+    parser.add_argument("--dup-rate", type=float, default=0.3)
+    parser.add_argument("--chunk", type=int, default=10_000, help="signals per add_many call")
+    args = parser.parse_args()
+
+    index = NearDuplicateIndex()
+    truth = {}
+    found = missed = wrong = 0
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    started = time.perf_counter()
+    chunk = []
+    for key, text, original in generate(args.signals, args.dup_rate):
+        chunk.append((key, text, original))
+        if len(chunk) == args.chunk:
+            f, m, w = _index_chunk(index, chunk, truth)
+            found, missed, wrong = found + f, missed + m, wrong + w
+            chunk = []
+    if chunk:
+        f, m, w = _index_chunk(index, chunk, truth)
+        found, missed, wrong = found + f, missed + m, wrong + w
+    elapsed = time.perf_counter() - started
+
+    report = index.report()
+    peak_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss) / 1024
+    near_duplicates = found + missed
+    print(f"signals indexed:      {len(index):,}")
+    print(f"seconds:              {elapsed:.1f} ({len(index) / elapsed:,.0f} signals/s, incl. generation)")
+    print(f"peak memory growth:   {peak_mb:,.0f} MB")
+    print(f"clusters:             {report['clusters']:,}")
+    print(f"AI calls saved:       {report['near_duplicates']:,} "
+          f"({report['near_duplicates'] / len(index):.1%} of signals scored once per cluster)")
+    print(f"recall:               {found / near_duplicates:.3f} ({missed:,} near-duplicates missed)")
+    print(f"precision:            {found / max(1, found + wrong):.4f} ({wrong:,} joined the wrong cluster)")
+
+
+def _index_chunk(index, chunk, truth):
+    clusters = index.add_many((key, text) for key, text, _ in chunk)
+    found = missed = wrong = 0
+    for (key, _, original), cluster in zip(chunk, clusters):
+        truth[key] = truth[original] if original is not None else cluster
+        if original is None:
+            wrong += index.representative(cluster) != key
+        elif cluster == truth[original]:
+            found += 1
+        else:
+            missed += 1
+    return found, missed, wrong
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from services.openai_service import get_openai_service
+from services.llm_cache import Completion, get_llm_cache, prompt_version
 
 logger = logging.getLogger(__name__)
 
@@ -111,12 +112,20 @@ Respond in JSON format only."""
                 }
             ]
             
-            response = await self.openai_service.generate_response(
-                messages=messages,
-                system_prompt=system_prompt,
-                use_premium=True,  # Use premium model for accuracy
-                max_tokens=300,
-                temperature=0.3
+            async def complete() -> Completion:
+                response = await self.openai_service.generate_response(
+                    messages=messages,
+                    system_prompt=system_prompt,
+                    use_premium=True,  # Use premium model for accuracy
+                    max_tokens=300,
+                    temperature=0.3
+                )
+                return Completion(response, response["tokens_used"], response["cost"])
+            
+            # Re-analyzing an unchanged deal reuses the extraction
+            response = await get_llm_cache().aget_or_call(
+                "deal_signals", self.openai_service.premium_model, prompt_version(system_prompt),
+                messages, complete, cacheable=lambda response: _is_json(response["text"]),
             )
             
             # Parse JSON response
@@ -280,3 +289,12 @@ def get_deal_control_plane() -> DealControlPlane:
     if _dcp_instance is None:
         _dcp_instance = DealControlPlane()
     return _dcp_instance
+
+
+def _is_json(text: str) -> bool:
+    import json
+    try:
+        json.loads(text)
+        return True
+    except (TypeError, ValueError):
+        return False
@@ -0,0 +1,320 @@
+"""
+Signal Dedupe Index
+Local, time-partitioned Bloom filters over a table's content hashes.
+
+Replaces the one-query-per-item `content_hash` lookups in the scrapers:
+
+- Warmed once per run: from the local snapshot (DEDUPE_INDEX_DIR) plus only
+  the rows stored since that snapshot, or from the whole window on a cold start.
+  An unbounded window without a snapshot directory is never scanned; every
+  hash is confirmed against the table instead
+- Rolling window: one filter per `partition_days`, expired partitions dropped
+- Batch membership: filter_new() sends only the Bloom positives to the
+  database, in one `in` query per chunk, so false positives never drop a new
+  item. The table's unique `content_hash` constraint stays the final arbiter.
+
+    index = DedupeIndex(supabase, "reddit_signals", window_days=7)
+    new_hashes = index.filter_new(hashes)
+    ...
+    index.add_many(saved_hashes)
+    index.save()
+    print(index.report()["round_trips_saved"])
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from services.signal_rollups import fetch_pages
+
+logger = logging.getLogger(__name__)
+
+# Directory for index snapshots; unset = rebuild from the database every run
+DEDUPE_INDEX_DIR = os.getenv("DEDUPE_INDEX_DIR")
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for `capacity` items at `fp_rate`"""
+
+    def __init__(self, capacity: int = 100_000, fp_rate: float = 0.001):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.size = max(64, int(math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "fp_rate": self.fp_rate,
+            "count": self.count,
+            "bits": base64.b64encode(zlib.compress(bytes(self.bits))).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BloomFilter":
+        bloom = cls(data["capacity"], data["fp_rate"])
+        bloom.bits = bytearray(zlib.decompress(base64.b64decode(data["bits"])))
+        bloom.count = data["count"]
+        return bloom
+
+
+class DedupeIndex:
+    """Rolling Bloom-filter index of one table's content hashes"""
+
+    def __init__(
+        self,
+        supabase,
+        table: str,
+        hash_column: str = "content_hash",
+        time_column: str = "created_at",
+        window_days: Optional[int] = 7,
+        partition_days: int = 1,
+        capacity: int = 100_000,
+        fp_rate: float = 0.001,
+        path: Optional[str] = DEDUPE_INDEX_DIR,
+        confirm_batch_size: int = 200,
+        overlap_seconds: int = 600,
+    ):
+        """
+        Args:
+            supabase: Supabase client
+            table: Table holding the hashes
+            window_days: Dedupe horizon (None = whole table, one partition;
+                needs `path`, or every hash is confirmed by query)
+            partition_days: Days per filter partition
+            capacity: Expected hashes per partition
+            fp_rate: Target false-positive rate per partition
+            path: Snapshot directory (None = in-memory only)
+            confirm_batch_size: Hashes per confirmation query
+            overlap_seconds: Re-read this much before the snapshot watermark,
+                for rows committed late or stamped by a skewed clock
+        """
+        self.supabase = supabase
+        self.table = table
+        self.hash_column = hash_column
+        self.time_column = time_column
+        self.window_days = window_days
+        self.partition_days = partition_days
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        # Window in the name: indexes over different windows never share a snapshot
+        window = f"{window_days}d" if window_days is not None else "all"
+        self.path = Path(path) / f"{table}.{hash_column}.{window}.json" if path else None
+        self.confirm_batch_size = confirm_batch_size
+        self.overlap_seconds = overlap_seconds
+
+        self.partitions: Dict[str, BloomFilter] = {}
+        self.warmed_through: Optional[str] = None
+        self._warmed = False
+        self._confirm_all = False
+        self.stats = {
+            "table": table,
+            "checked": 0,
+            "new": 0,
+            "duplicates": 0,
+            "false_positives": 0,
+            "warm_rows": 0,
+            "warm_round_trips": 0,
+            "confirm_round_trips": 0,
+            "round_trips_saved": 0,
+        }
+
+    # ---- partitions -------------------------------------------------------
+
+    def _partition_key(self, when: Optional[datetime] = None) -> str:
+        if self.window_days is None:
+            return "all"
+        day = (when or datetime.now(timezone.utc)).date().toordinal()
+        return date.fromordinal(day - day % self.partition_days).isoformat()
+
+    def _expire(self) -> None:
+        if self.window_days is None:
+            return
+        oldest = self._partition_key(datetime.now(timezone.utc) - timedelta(days=self.window_days))
+        for key in [k for k in self.partitions if k < oldest]:
+            del self.partitions[key]
+
+    def _partition(self, when: Optional[datetime] = None) -> BloomFilter:
+        key = self._partition_key(when)
+        if key not in self.partitions:
+            self.partitions[key] = BloomFilter(self.capacity, self.fp_rate)
+        return self.partitions[key]
+
+    # ---- warm-up / persistence --------------------------------------------
+
+    def warm(self) -> None:
+        """Load the local snapshot, then only the rows stored since it was taken"""
+        if self._warmed:
+            return
+        self._warmed = True
+        if self.window_days is None and self.path is None:
+            # Warming would read the whole table on every run; without a filter
+            # each hash costs a share of one batched confirmation query instead
+            logger.warning(
+                f"Dedupe index for {self.table} has no window and no DEDUPE_INDEX_DIR; "
+                "confirming every hash against the table"
+            )
+            self._confirm_all = True
+            return
+        self._load_snapshot()
+        self._expire()
+
+        since = None
+        if self.warmed_through is not None:
+            watermark = _parse_time(self.warmed_through)
+            since = (watermark - timedelta(seconds=self.overlap_seconds)).isoformat() if watermark else None
+        elif self.window_days is not None:
+            since = (datetime.now(timezone.utc) - timedelta(days=self.window_days)).isoformat()
+
+        def build_query():
+            query = self.supabase.table(self.table).select(f"{self.hash_column},{self.time_column}")
+            if since is not None:
+                query = query.gte(self.time_column, since)
+            return query.order(self.time_column)
+
+        try:
+            rows = fetch_pages(build_query)
+        except Exception as e:
+            # Confirmation queries and the unique constraint still catch duplicates
+            logger.warning(f"Could not warm dedupe index for {self.table}: {e}")
+            return
+        self.stats["warm_round_trips"] += len(rows) // 1000 + 1
+        self.stats["warm_rows"] += len(rows)
+
+        for row in rows:
+            digest = row.get(self.hash_column)
+            if not digest:
+                continue
+            when = _parse_time(row.get(self.time_column))
+            self._partition(when).add(digest)
+            stamp = row.get(self.time_column)
+            if stamp and (self.warmed_through is None or str(stamp) > self.warmed_through):
+                self.warmed_through = str(stamp)
+
+    def _load_snapshot(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text())
+            if (data["capacity"], data["fp_rate"], data["window_days"]) != (
+                self.capacity, self.fp_rate, self.window_days
+            ):
+                return  # Sized differently; rebuild from the database
+            self.partitions = {k: BloomFilter.from_dict(v) for k, v in data["partitions"].items()}
+            self.warmed_through = data["warmed_through"]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable dedupe snapshot {self.path}: {e}")
+            self.partitions, self.warmed_through = {}, None
+
+    def save(self) -> None:
+        """Write the snapshot atomically (no-op without a path)"""
+        if self.path is None or not self._warmed:
+            return
+        self._expire()
+        data = {
+            "table": self.table,
+            "capacity": self.capacity,
+            "fp_rate": self.fp_rate,
+            "window_days": self.window_days,
+            "warmed_through": self.warmed_through,
+            "partitions": {k: v.to_dict() for k, v in self.partitions.items()},
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, self.path)
+
+    # ---- membership -------------------------------------------------------
+
+    def might_contain(self, digest: str) -> bool:
+        self.warm()
+        return any(digest in bloom for bloom in self.partitions.values())
+
+    def add(self, digest: str, when: Optional[datetime] = None) -> None:
+        self.warm()
+        self._partition(when).add(digest)
+
+    def add_many(self, digests: Iterable[str], when: Optional[datetime] = None) -> None:
+        for digest in digests:
+            self.add(digest, when)
+
+    def filter_new(self, digests: Iterable[str]) -> List[str]:
+        """
+        Hashes not yet stored, in input order and without repeats.
+
+        Bloom negatives are new for certain; positives are checked against the
+        table in batched queries.
+        """
+        unique = list(dict.fromkeys(d for d in digests if d))
+        self.warm()
+        positives = unique if self._confirm_all else [d for d in unique if self.might_contain(d)]
+        stored = self._confirm(positives)
+
+        new = [d for d in unique if d not in stored]
+        self.stats["checked"] += len(unique)
+        self.stats["new"] += len(new)
+        self.stats["duplicates"] += len(stored)
+        if not self._confirm_all:
+            self.stats["false_positives"] += len(positives) - len(stored)
+        return new
+
+    def contains(self, digest: str) -> bool:
+        """Single-item check (a query only when the filter reports a hit)"""
+        return not self.filter_new([digest])
+
+    def _confirm(self, digests: List[str]) -> set:
+        stored = set()
+        for start in range(0, len(digests), self.confirm_batch_size):
+            chunk = digests[start:start + self.confirm_batch_size]
+            self.stats["confirm_round_trips"] += 1
+            try:
+                response = self.supabase.table(self.table)\
+                    .select(self.hash_column)\
+                    .in_(self.hash_column, chunk)\
+                    .execute()
+            except Exception as e:
+                # Treat as new; the unique constraint rejects real duplicates
+                logger.error(f"Dedupe confirmation on {self.table} failed: {e}")
+                continue
+            stored.update(row[self.hash_column] for row in response.data or [])
+        return stored
+
+    def report(self) -> Dict[str, Any]:
+        """Stats, with round trips saved vs one lookup query per checked item"""
+        used = self.stats["warm_round_trips"] + self.stats["confirm_round_trips"]
+        self.stats["round_trips_saved"] = max(0, self.stats["checked"] - used)
+        return dict(self.stats)
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
@@ -4,9 +4,10 @@ Context-specific emails based on call transcript and objections
 """
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from services.openai_service import get_openai_service
+from services.llm_cache import Completion, get_llm_cache, prompt_version
 
 logger = logging.getLogger(__name__)
 
@@ -132,12 +133,20 @@ Generate follow-up email:"""
                 }
             ]
             
-            response = await self.openai_service.generate_response(
-                messages=messages,
-                system_prompt=system_prompt,
-                use_premium=True,  # Use GPT-4o for quality
-                max_tokens=300,
-                temperature=0.7
+            async def complete() -> Completion:
+                response = await self.openai_service.generate_response(
+                    messages=messages,
+                    system_prompt=system_prompt,
+                    use_premium=True,  # Use GPT-4o for quality
+                    max_tokens=300,
+                    temperature=0.7
+                )
+                return Completion(response, response["tokens_used"], response["cost"])
+            
+            # Same call context → same draft for a day (USE_CASE_TTLS)
+            response = await get_llm_cache().aget_or_call(
+                "follow_up_email", self.openai_service.premium_model, prompt_version(system_prompt),
+                messages, complete,
             )
             
             # Parse subject and body
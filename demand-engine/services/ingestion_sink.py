@@ -0,0 +1,280 @@
+"""
+Scraper Ingestion Sink
+Buffers scraped records and writes them to Supabase in batched, idempotent upserts.
+
+Each record is keyed by a content hash (stored in the table's `content_hash`
+column, unique per migration 027). Records are deduped in memory against the
+hashes queued in this run, then each batch is checked against the table's
+DedupeIndex (local Bloom filters, see services/dedupe_index.py), so re-scraping
+the same posts costs no extra round trips, and the `on_conflict` upsert makes
+any remaining overlap (e.g. two workers) harmless.
+
+Rows stored before the table had a `content_hash` column have it NULL. With
+`key_fields`, such a row is matched on those fields and given its hash
+instead of being inserted again.
+
+    with UpsertSink(supabase, "reddit_signals") as sink:
+        for signal in signals:
+            sink.add(signal)
+    print(sink.stats)
+"""
+
+import hashlib
+import json
+import logging
+import random
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+from services.dedupe_index import DedupeIndex
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(record: Dict[str, Any], fields: Optional[Sequence[str]] = None) -> str:
+    """
+    MD5 of the record's (selected) fields, normalized so that key order,
+    whitespace and case do not change the hash
+    """
+    keys = fields if fields is not None else sorted(k for k in record if k != "content_hash")
+    normalized = {}
+    for key in keys:
+        value = record.get(key)
+        if isinstance(value, str):
+            value = " ".join(value.lower().split())
+        normalized[key] = value
+    payload = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.md5(payload.encode("utf-8")).hexdigest()
+
+
+class UpsertSink:
+    """Buffered, deduping, retrying batch writer for one table"""
+
+    def __init__(
+        self,
+        supabase,
+        table: str,
+        key_fields: Optional[Sequence[str]] = None,
+        hash_column: str = "content_hash",
+        update_existing: bool = False,
+        recent_days: Optional[int] = 7,
+        batch_size: int = 500,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        index: Optional[DedupeIndex] = None,
+    ):
+        """
+        Args:
+            supabase: Supabase client
+            table: Target table (must have a unique `hash_column`)
+            key_fields: Fields that identify a record; default is every field.
+                Records that already carry `hash_column` are used as-is.
+                Also the natural key for rows whose hash is still NULL.
+            update_existing: Merge into existing rows on conflict instead of
+                leaving them untouched. Existing hashes are then not skipped
+                locally, since a re-scrape is expected to refresh them.
+            recent_days: Dedupe window of the default index (None = whole table)
+            batch_size: Rows per upsert request
+            max_retries: Retries per batch after the first attempt
+            backoff_seconds: Base delay for exponential backoff with jitter
+            index: Dedupe index to check batches against (default: one for
+                `table` over `recent_days`; none with update_existing)
+        """
+        self.supabase = supabase
+        self.table = table
+        self.key_fields = key_fields
+        self.hash_column = hash_column
+        self.update_existing = update_existing
+        self.recent_days = recent_days
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        if index is None and not update_existing:
+            index = DedupeIndex(supabase, table, hash_column, window_days=recent_days)
+        self.index = index
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._seen: Set[str] = set()
+        # Unknown until probed; False once the table has no NULL hashes
+        self._legacy_rows: Optional[bool] = None if key_fields else False
+        self._started = time.perf_counter()
+        self.stats = {
+            "table": table,
+            "received": 0,
+            "duplicates": 0,
+            "written": 0,
+            "inserted": 0,
+            "updated": 0,
+            "legacy_adopted": 0,
+            "failed": 0,
+            "batches": 0,
+            "round_trips": 0,
+            "retries": 0,
+            "round_trips_saved": 0,
+            "seconds": 0.0,
+            "rows_per_sec": 0.0,
+        }
+
+    def __enter__(self) -> "UpsertSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def add(self, record: Dict[str, Any]) -> Optional[str]:
+        """
+        Queue a record. Returns its content hash, or None if it was already
+        queued in this run (stored duplicates are dropped at flush).
+        """
+        self.stats["received"] += 1
+
+        digest = record.get(self.hash_column) or content_hash(record, self.key_fields)
+        if digest in self._seen:
+            self.stats["duplicates"] += 1
+            return None
+
+        self._seen.add(digest)
+        self._buffer.append({**record, self.hash_column: digest})
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+        return digest
+
+    def add_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Queue records; returns how many were not duplicates"""
+        return sum(1 for record in records if self.add(record))
+
+    def flush(self) -> None:
+        """Write everything buffered so far"""
+        while self._buffer:
+            batch, self._buffer = self._buffer[:self.batch_size], self._buffer[self.batch_size:]
+            self._write(batch)
+        self._update_rate()
+
+    def close(self) -> Dict[str, Any]:
+        """Flush, persist the dedupe index and return the run statistics"""
+        self.flush()
+        if self.index is not None:
+            try:
+                self.index.save()
+            except OSError as e:
+                logger.warning(f"Could not save dedupe index for {self.table}: {e}")
+        logger.info(f"Ingested into {self.table}: {self.stats}")
+        return self.stats
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        if self.index is not None:
+            index_trips = self._index_round_trips()
+            new = set(self.index.filter_new(r[self.hash_column] for r in batch))
+            self.stats["round_trips"] += self._index_round_trips() - index_trips
+            adopted = self._adopt_legacy_rows([r for r in batch if r[self.hash_column] in new])
+            self.index.add_many(adopted)
+            new -= adopted
+            self.stats["duplicates"] += sum(1 for r in batch if r[self.hash_column] not in new)
+            batch = [r for r in batch if r[self.hash_column] in new]
+            if not batch:
+                return
+
+        stored = self._stored_hashes(batch) if self.update_existing else set()
+
+        for attempt in range(self.max_retries + 1):
+            self.stats["round_trips"] += 1
+            try:
+                response = self.supabase.table(self.table).upsert(
+                    batch,
+                    on_conflict=self.hash_column,
+                    ignore_duplicates=not self.update_existing,
+                ).execute()
+                # With ignore_duplicates only newly inserted rows come back
+                written = len(response.data) if response.data is not None else len(batch)
+                self.stats["written"] += written
+                self.stats["duplicates"] += len(batch) - written
+                updated = sum(1 for r in batch if r[self.hash_column] in stored)
+                self.stats["updated"] += updated
+                self.stats["inserted"] += written - updated
+                self.stats["batches"] += 1
+                if self.index is not None:
+                    self.index.add_many(r[self.hash_column] for r in batch)
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error(f"Upsert into {self.table} failed after {attempt + 1} attempts: {e}")
+                    break
+                delay = self.backoff_seconds * (2 ** attempt) * (1 + random.random())
+                logger.warning(f"Upsert into {self.table} failed ({e}); retrying in {delay:.1f}s")
+                self.stats["retries"] += 1
+                time.sleep(delay)
+
+        # Let a later run pick these records up again
+        self.stats["failed"] += len(batch)
+        self._seen.difference_update(r[self.hash_column] for r in batch)
+
+    def _stored_hashes(self, batch: List[Dict[str, Any]]) -> Set[str]:
+        """Hashes in `batch` the table already has (so the upsert updates them)"""
+        digests = [r[self.hash_column] for r in batch]
+        self.stats["round_trips"] += 1
+        try:
+            response = self.supabase.table(self.table)\
+                .select(self.hash_column)\
+                .in_(self.hash_column, digests)\
+                .execute()
+        except Exception as e:
+            # Only the inserted/updated split is lost; the upsert is unaffected
+            logger.warning(f"Could not look up stored hashes in {self.table}: {e}")
+            return set()
+        stored = {row[self.hash_column] for row in response.data or []}
+        missing = [r for r in batch if r[self.hash_column] not in stored]
+        return stored | self._adopt_legacy_rows(missing)
+
+    def _adopt_legacy_rows(self, records: List[Dict[str, Any]]) -> Set[str]:
+        """
+        Give rows stored without a hash the hash of the matching record.
+
+        Returns the hashes adopted; those records now exist in the table.
+        """
+        if not records or self._legacy_rows is False:
+            return set()
+        try:
+            if self._legacy_rows is None:
+                self.stats["round_trips"] += 1
+                probe = self.supabase.table(self.table).select("id")\
+                    .is_(self.hash_column, "null").limit(1).execute()
+                self._legacy_rows = bool(probe.data)
+                if not self._legacy_rows:
+                    return set()
+
+            first = self.key_fields[0]
+            values = list({r.get(first) for r in records if r.get(first) is not None})
+            if not values:
+                return set()
+            self.stats["round_trips"] += 1
+            legacy = self.supabase.table(self.table)\
+                .select(",".join(["id", *self.key_fields]))\
+                .is_(self.hash_column, "null")\
+                .in_(first, values)\
+                .execute().data or []
+
+            wanted = {r[self.hash_column] for r in records}
+            adopted: Set[str] = set()
+            for row in legacy:
+                digest = content_hash(row, self.key_fields)
+                if digest not in wanted or digest in adopted:
+                    continue
+                self.stats["round_trips"] += 1
+                self.supabase.table(self.table).update({self.hash_column: digest}).eq("id", row["id"]).execute()
+                adopted.add(digest)
+        except Exception as e:
+            # The record is then written as new, as before the hash column existed
+            logger.warning(f"Could not match rows without {self.hash_column} in {self.table}: {e}")
+            return set()
+        self.stats["legacy_adopted"] += len(adopted)
+        return adopted
+
+    def _index_round_trips(self) -> int:
+        return self.index.stats["warm_round_trips"] + self.index.stats["confirm_round_trips"]
+
+    def _update_rate(self) -> None:
+        elapsed = time.perf_counter() - self._started
+        self.stats["seconds"] = round(elapsed, 3)
+        self.stats["rows_per_sec"] = round(self.stats["written"] / elapsed, 1) if elapsed > 0 else 0.0
+        if self.index is not None:
+            self.stats["round_trips_saved"] = self.index.report()["round_trips_saved"]
@@ -0,0 +1,369 @@
+"""
+LLM Response Cache
+Persistent, shared cache for OpenAI completions used by lead scoring and
+content generation.
+
+The same prompts repeat across runs (re-scraped posts, re-scored businesses,
+regenerated follow-ups). Responses are cached by:
+
+    (use case, model, prompt template version, hash of the normalized input)
+
+- SQLite backend (LLM_CACHE_PATH), safe to share between threads and runs
+- TTL per use case (USE_CASE_TTLS); expired rows are refreshed on next use
+- In-flight coalescing: concurrent identical requests wait for one call
+- Cost/latency accounting: tokens, dollars and seconds spent vs saved
+
+    cache = get_llm_cache()
+    result = cache.get_or_call(
+        "signal_classification", model, prompt_version(PROMPT), {"title": t, "content": c},
+        lambda: Completion(call_openai(), tokens=usage.total_tokens, cost=cost),
+    )
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# SQLite file; ":memory:" keeps the cache per process
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    str(Path.home() / ".cache" / "demand-engine" / "llm_cache.sqlite3"),
+)
+# Set LLM_CACHE_DISABLED=1 to always call the model
+LLM_CACHE_DISABLED = os.getenv("LLM_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+DAY = 24 * 3600
+
+# How long a cached response stays valid, per use case (seconds)
+USE_CASE_TTLS = {
+    "signal_classification": 30 * DAY,  # Scores for a post do not change
+    "job_scoring": 14 * DAY,
+    "business_scoring": 7 * DAY,        # Complaint counts / ratings drift
+    "deal_signals": 1 * DAY,
+    "email_generation": 1 * DAY,        # Fresh copy each day for the same lead
+    "follow_up_email": 1 * DAY,
+}
+DEFAULT_TTL = 1 * DAY
+
+# $ per 1M tokens (input, output)
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+
+class Completion(NamedTuple):
+    """A model response plus what it cost; returned by the wrapped call"""
+    value: Any
+    tokens: int = 0
+    cost: float = 0.0
+
+
+def completion_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Dollar cost of one completion (0 for unknown models)"""
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return prompt_tokens / 1_000_000 * input_price + completion_tokens / 1_000_000 * output_price
+
+
+def usage_cost(model: str, usage: Any) -> Completion:
+    """Tokens and cost from an OpenAI `usage` object or dict (value left empty)"""
+    if usage is None:
+        return Completion(None)
+    get = usage.get if isinstance(usage, dict) else lambda k, d=0: getattr(usage, k, d)
+    prompt_tokens, completion_tokens = get("prompt_tokens", 0) or 0, get("completion_tokens", 0) or 0
+    total = get("total_tokens", 0) or prompt_tokens + completion_tokens
+    return Completion(None, total, completion_cost(model, prompt_tokens, completion_tokens))
+
+
+def prompt_version(*templates: str) -> str:
+    """Short hash of prompt templates; editing a template invalidates its cache"""
+    return hashlib.sha256("\x00".join(templates).encode("utf-8")).hexdigest()[:12]
+
+
+def normalize_input(payload: Any) -> str:
+    """Canonical text for hashing: NFKC, collapsed whitespace, sorted keys"""
+    def clean(value):
+        if isinstance(value, str):
+            return " ".join(unicodedata.normalize("NFKC", value).split())
+        if isinstance(value, dict):
+            return {str(k): clean(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [clean(v) for v in value]
+        return value
+    return json.dumps(clean(payload), sort_keys=True, default=str, ensure_ascii=False)
+
+
+class LLMCache:
+    """SQLite-backed LLM response cache with in-flight coalescing"""
+
+    def __init__(
+        self,
+        path: Optional[str] = LLM_CACHE_PATH,
+        ttls: Optional[Dict[str, int]] = None,
+        default_ttl: int = DEFAULT_TTL,
+        enabled: bool = not LLM_CACHE_DISABLED,
+    ):
+        """
+        Args:
+            path: SQLite file (":memory:" or None = per-process only)
+            ttls: Seconds per use case (default USE_CASE_TTLS)
+            default_ttl: Seconds for use cases not in `ttls`
+            enabled: False = pass every call through (still accounted)
+        """
+        self.path = path or ":memory:"
+        self.ttls = dict(USE_CASE_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._ainflight: Dict[str, asyncio.Future] = {}
+        self._conn = self._connect()
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                use_case TEXT NOT NULL,
+                model TEXT NOT NULL,
+                version TEXT NOT NULL,
+                value TEXT NOT NULL,
+                tokens INTEGER NOT NULL DEFAULT 0,
+                cost REAL NOT NULL DEFAULT 0,
+                latency REAL NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache (expires_at)")
+        conn.commit()
+        return conn
+
+    # ---- keys / storage ---------------------------------------------------
+
+    @staticmethod
+    def key(use_case: str, model: str, version: str, payload: Any) -> str:
+        digest = hashlib.sha256(normalize_input(payload).encode("utf-8")).hexdigest()
+        return f"{use_case}:{model}:{version}:{digest}"
+
+    def ttl(self, use_case: str) -> int:
+        return self.ttls.get(use_case, self.default_ttl)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Live entry for a key (None if missing or expired)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, tokens, cost, latency FROM llm_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE llm_cache SET hits = hits + 1 WHERE key = ?", (key,))
+            self._conn.commit()
+        return {"value": json.loads(row[0]), "tokens": row[1], "cost": row[2], "latency": row[3]}
+
+    def set(
+        self,
+        use_case: str,
+        model: str,
+        version: str,
+        payload: Any,
+        completion: Completion,
+        latency: float = 0.0,
+        ttl: Optional[int] = None,
+    ) -> None:
+        key = self.key(use_case, model, version, payload)
+        now = time.time()
+        ttl = self.ttl(use_case) if ttl is None else ttl
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, use_case, model, version, value, tokens, cost, latency, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, use_case, model, version, json.dumps(completion.value, default=str),
+                 completion.tokens, completion.cost, latency, now, now + ttl),
+            )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Delete expired rows; returns how many"""
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+            self._conn.commit()
+        return deleted
+
+    # ---- cached calls -----------------------------------------------------
+
+    def get_or_call(
+        self,
+        use_case: str,
+        model: str,
+        version: str,
+        payload: Any,
+        call: Callable[[], Any],
+        cacheable: Callable[[Any], bool] = lambda value: True,
+        ttl: Optional[int] = None,
+    ) -> Any:
+        """
+        Cached response for the request, calling the model on a miss.
+
+        Concurrent callers with the same key wait for the first caller's
+        result. `call` returns the value or a Completion; exceptions and
+        values rejected by `cacheable` are not cached.
+        """
+        request = (use_case, model, version, payload)
+        key = self.key(*request)
+        if not self.enabled:
+            return self._call(request, call, cacheable, ttl, store=False)
+
+        hit = self.get(key)
+        if hit is not None:
+            self._record_hit(use_case, hit)
+            return hit["value"]
+
+        with self._lock:
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = self._inflight[key] = Future()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            self._count(use_case, "coalesced")
+            return pending.result()
+
+        try:
+            value = self._call(request, call, cacheable, ttl)
+            pending.set_result(value)
+            return value
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget_or_call(
+        self,
+        use_case: str,
+        model: str,
+        version: str,
+        payload: Any,
+        call: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = lambda value: True,
+        ttl: Optional[int] = None,
+    ) -> Any:
+        """get_or_call for coroutines; identical requests on the loop share one call"""
+        request = (use_case, model, version, payload)
+        key = self.key(*request)
+        if not self.enabled:
+            return await self._acall(request, call, cacheable, ttl, store=False)
+
+        hit = self.get(key)
+        if hit is not None:
+            self._record_hit(use_case, hit)
+            return hit["value"]
+
+        pending = self._ainflight.get(key)
+        if pending is not None:
+            self._count(use_case, "coalesced")
+            return await asyncio.shield(pending)
+
+        pending = self._ainflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            value = await self._acall(request, call, cacheable, ttl)
+            pending.set_result(value)
+            return value
+        except BaseException as e:
+            pending.set_exception(e)
+            # Nobody may be waiting; mark retrieved so asyncio doesn't warn
+            pending.exception()
+            raise
+        finally:
+            self._ainflight.pop(key, None)
+
+    def _call(self, request, call, cacheable, ttl, store=True):
+        started = time.perf_counter()
+        completion = _as_completion(call())
+        return self._finish(request, completion, time.perf_counter() - started, cacheable, ttl, store)
+
+    async def _acall(self, request, call, cacheable, ttl, store=True):
+        started = time.perf_counter()
+        completion = _as_completion(await call())
+        return self._finish(request, completion, time.perf_counter() - started, cacheable, ttl, store)
+
+    def _finish(self, request, completion, latency, cacheable, ttl, store):
+        use_case = request[0]
+        self._count(use_case, "misses")
+        self._count(use_case, "tokens_spent", completion.tokens)
+        self._count(use_case, "cost_spent", completion.cost)
+        self._count(use_case, "seconds_spent", latency)
+        if store and cacheable(completion.value):
+            try:
+                self.set(*request, completion, latency, ttl)
+            except Exception as e:
+                logger.warning(f"Could not cache {use_case} response: {e}")
+        return completion.value
+
+    # ---- accounting -------------------------------------------------------
+
+    def _count(self, use_case: str, field: str, amount: float = 1) -> None:
+        with self._lock:
+            stats = self.stats.setdefault(use_case, {})
+            stats[field] = stats.get(field, 0) + amount
+
+    def _record_hit(self, use_case: str, hit: Dict[str, Any]) -> None:
+        self._count(use_case, "hits")
+        self._count(use_case, "tokens_saved", hit["tokens"])
+        self._count(use_case, "cost_saved", hit["cost"])
+        self._count(use_case, "seconds_saved", hit["latency"])
+
+    def report(self) -> Dict[str, Any]:
+        """Per-use-case and total hits, misses, tokens/cost/seconds spent and saved"""
+        fields = ("hits", "misses", "coalesced", "tokens_spent", "tokens_saved",
+                  "cost_spent", "cost_saved", "seconds_spent", "seconds_saved")
+        with self._lock:
+            by_use_case = {
+                use_case: {f: round(stats.get(f, 0), 6) for f in fields}
+                for use_case, stats in self.stats.items()
+            }
+        total = {f: round(sum(s[f] for s in by_use_case.values()), 6) for f in fields}
+        requests = total["hits"] + total["misses"] + total["coalesced"]
+        total["hit_rate"] = round((total["hits"] + total["coalesced"]) / requests, 4) if requests else 0.0
+        return {"total": total, "by_use_case": by_use_case}
+
+
+def _as_completion(result: Any) -> Completion:
+    return result if isinstance(result, Completion) else Completion(result)
+
+
+# Singleton instance
+_llm_cache: Optional[LLMCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Get or create the shared LLM cache"""
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMCache()
+        return _llm_cache
@@ -0,0 +1,194 @@
+"""
+Near-Duplicate Signal Index
+MinHash signatures + LSH banding over signal text.
+
+Content hashes only catch byte-identical text after normalization; reposts,
+cross-posts and lightly edited job ads get through them and each one costs an
+AI scoring call. This index groups such signals into clusters so a cluster is
+scored once and the result reused for every later member.
+
+- Word shingles (default 3-grams) hashed with CRC32, MinHash with `num_perm`
+  universal hashes mod 2^31-1, computed in NumPy for chunks of documents
+- LSH: `bands` x `rows` band keys; a band collision makes a candidate, which
+  is accepted when its estimated Jaccard similarity reaches `threshold`
+- Only cluster representatives are banded and keep a signature, so memory
+  grows with distinct content rather than with signals
+- Incremental: add()/add_many() at any time; nothing is rebuilt
+
+    index = NearDuplicateIndex()
+    cluster = index.add(signal["id"], text)
+    result = index.result(cluster)
+    if result is None:
+        result = classify_with_ai(signal)
+        index.set_result(cluster, result)
+"""
+
+import re
+import zlib
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def shingles(text: str, size: int = 3) -> List[int]:
+    """CRC32 hashes of the word `size`-grams of normalized text"""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return [zlib.crc32(" ".join(words).encode("utf-8"))]
+    return list({zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)})
+
+
+class NearDuplicateIndex:
+    """Incremental MinHash/LSH clustering of signal text"""
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.8,
+        shingle_size: int = 3,
+        seed: int = 1,
+        chunk_size: int = 2000,
+    ):
+        """
+        Args:
+            num_perm: MinHash permutations (signature length)
+            bands: LSH bands; num_perm must divide evenly
+            threshold: Estimated Jaccard similarity to join a cluster
+            shingle_size: Words per shingle
+            seed: Hash-family seed (indexes only compare with the same seed)
+            chunk_size: Documents per vectorized signature chunk
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.chunk_size = chunk_size
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        # Weights that fold a band's `rows` values into one 64-bit key
+        self._band_weights = rng.integers(1, 1 << 62, size=(bands, self.rows), dtype=np.uint64) | np.uint64(1)
+
+        self._buckets: Dict[int, int] = {}
+        self._signatures = np.empty((1024, num_perm), dtype=np.uint32)
+        self._representatives: List[Hashable] = []
+        self._sizes: List[int] = []
+        self._results: Dict[int, Any] = {}
+        self._cluster_of: Dict[Hashable, int] = {}
+        self.stats = {"added": 0, "clusters": 0, "near_duplicates": 0, "candidates": 0}
+
+    def __len__(self) -> int:
+        return len(self._cluster_of)
+
+    # ---- signatures -------------------------------------------------------
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """MinHash signatures, one uint32 row per text"""
+        out = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for start in range(0, len(texts), self.chunk_size):
+            chunk = [shingles(t or "", self.shingle_size) for t in texts[start:start + self.chunk_size]]
+            offsets = np.cumsum([0] + [len(s) for s in chunk[:-1]])
+            x = np.fromiter((h for s in chunk for h in s), dtype=np.uint64)
+            # a < 2^31 and x < 2^32, so a*x + b stays inside uint64; in place to
+            # keep one (shingles x num_perm) buffer per chunk
+            hashed = x[:, None] * self._a
+            hashed += self._b
+            hashed %= np.uint64(_MERSENNE_PRIME)
+            out[start:start + len(chunk)] = np.minimum.reduceat(hashed, offsets, axis=0)
+        return out
+
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """(n, bands) uint64 keys; band index is mixed in so bands never collide with each other"""
+        banded = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        keys = (banded * self._band_weights).sum(axis=2)
+        return keys ^ (np.arange(self.bands, dtype=np.uint64) << np.uint64(58))
+
+    # ---- clustering -------------------------------------------------------
+
+    def add(self, key: Hashable, text: str) -> int:
+        """Index one signal; returns its cluster id"""
+        return self.add_many([(key, text)])[0]
+
+    def add_many(self, items: Iterable[Tuple[Hashable, str]]) -> List[int]:
+        """Index signals (vectorized signatures); returns their cluster ids in order"""
+        items = list(items)
+        clusters = []
+        for start in range(0, len(items), self.chunk_size):
+            chunk = items[start:start + self.chunk_size]
+            sigs = self.signatures([text for _, text in chunk])
+            keys = self._band_keys(sigs).tolist()
+            for (key, _), sig, band_keys in zip(chunk, sigs, keys):
+                clusters.append(self._add_one(key, sig, band_keys))
+        return clusters
+
+    def _add_one(self, key: Hashable, sig: np.ndarray, band_keys: List[int]) -> int:
+        if key in self._cluster_of:
+            return self._cluster_of[key]
+        self.stats["added"] += 1
+
+        cluster = self._match(sig, band_keys)
+        if cluster is None:
+            cluster = len(self._representatives)
+            if cluster == len(self._signatures):
+                self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+            self._signatures[cluster] = sig
+            self._representatives.append(key)
+            self._sizes.append(0)
+            for band_key in band_keys:
+                self._buckets.setdefault(band_key, cluster)
+            self.stats["clusters"] += 1
+        else:
+            self.stats["near_duplicates"] += 1
+
+        self._sizes[cluster] += 1
+        self._cluster_of[key] = cluster
+        return cluster
+
+    def _match(self, sig: np.ndarray, band_keys: List[int]) -> Optional[int]:
+        candidates = {self._buckets[k] for k in band_keys if k in self._buckets}
+        if not candidates:
+            return None
+        self.stats["candidates"] += len(candidates)
+        ids = np.fromiter(candidates, dtype=np.int64)
+        similarity = (self._signatures[ids] == sig).mean(axis=1)
+        best = int(similarity.argmax())
+        return int(ids[best]) if similarity[best] >= self.threshold else None
+
+    def query(self, text: str) -> Optional[int]:
+        """Cluster a text would join, without indexing it"""
+        sig = self.signatures([text])
+        return self._match(sig[0], self._band_keys(sig)[0].tolist())
+
+    def similarity(self, a: str, b: str) -> float:
+        """Estimated Jaccard similarity of two texts"""
+        sigs = self.signatures([a, b])
+        return float((sigs[0] == sigs[1]).mean())
+
+    # ---- cluster metadata -------------------------------------------------
+
+    def cluster_of(self, key: Hashable) -> Optional[int]:
+        return self._cluster_of.get(key)
+
+    def representative(self, cluster: int) -> Hashable:
+        return self._representatives[cluster]
+
+    def size(self, cluster: int) -> int:
+        return self._sizes[cluster]
+
+    def result(self, cluster: int) -> Optional[Any]:
+        """Score stored for the cluster (None until one member is scored)"""
+        return self._results.get(cluster)
+
+    def set_result(self, cluster: int, result: Any) -> None:
+        self._results[cluster] = result
+
+    def report(self) -> Dict[str, Any]:
+        return {**self.stats, "scored_clusters": len(self._results)}
@@ -10,6 +10,8 @@ from openai import AsyncOpenAI
 import logging
 from utils.retry_logic import retry_async
 from utils.error_logger import ErrorLogger
+from ai_agent.transcriber import StreamingTranscriber, WhisperBackend
+from ai_agent.vad import Endpointer, VADConfig
 
 logger = logging.getLogger(__name__)
 
@@ -86,29 +88,38 @@ class OpenAIService:
     
     async def transcribe_streaming(
         self, 
-        audio_stream: AsyncGenerator[bytes, None]
+        audio_stream: AsyncGenerator[bytes, None],
+        sample_rate: int = 16000
     ) -> AsyncGenerator[str, None]:
         """
-        Stream audio chunks and get real-time transcription
-        Note: OpenAI Whisper doesn't support true streaming yet
-        This batches chunks for near-real-time processing
-        """
-        buffer = bytearray()
-        chunk_size = 16000 * 2  # 1 second of 16kHz 16-bit audio
+        Stream PCM16 audio chunks and get one transcript per utterance
         
-        async for chunk in audio_stream:
-            buffer.extend(chunk)
+        Whisper has no streaming API, so utterances are endpointed locally
+        and sent in overlapping windows while the speaker is still talking
+        (see ai_agent/transcriber.py). Each utterance's text is yielded as
+        soon as it ends - only the last window is left to wait for.
+        """
+        transcriber = StreamingTranscriber(
+            WhisperBackend(self.client),
+            Endpointer(VADConfig(sample_rate=sample_rate, encoding="pcm16"))
+        )
+        try:
+            async for chunk in audio_stream:
+                for event in transcriber.feed(chunk):
+                    if event.kind == "end":
+                        text = await event.transcript.text()
+                        if text:
+                            yield text
             
-            # Process when buffer is large enough
-            if len(buffer) >= chunk_size:
-                result = await self.transcribe_audio(bytes(buffer))
-                yield result["text"]
-                buffer.clear()
-        
-        # Process remaining buffer
-        if buffer:
-            result = await self.transcribe_audio(bytes(buffer))
-            yield result["text"]
+            # Stream ended mid-utterance
+            event = transcriber.flush()
+            if event and event.kind == "end":
+                text = await event.transcript.text()
+                if text:
+                    yield text
+        finally:
+            logger.info(f"Streaming STT stats: {transcriber.get_stats()}")
+            transcriber.close()
     
     # ==================== LANGUAGE MODEL (LLM) ====================
     
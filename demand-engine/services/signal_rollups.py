@@ -0,0 +1,297 @@
+"""
+Signal Rollup Materializer
+Maintains per-day aggregates of pain signals for the admin analytics dashboard.
+
+The dashboard endpoints read only the rollup tables (see migration 025), so their
+cost depends on the number of days x sources x intents, not on the number of signals.
+
+Refresh is incremental: each run recomputes whole days starting at the stored
+watermark (minus a lookback window so late status changes such as
+"contacted"/"alerted"/"converted_to_lead" are picked up).
+"""
+
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SIGNAL_ROLLUPS_TABLE = "signal_daily_rollups"
+AI_SIGNAL_ROLLUPS_TABLE = "ai_signal_daily_rollups"
+ROLLUP_STATE_TABLE = "rollup_state"
+
+# (label, histogram column, exclusive upper bound) in ascending order
+SCORE_BUCKETS = [
+    ("0-49", "bucket_0_49", 50),
+    ("50-69", "bucket_50_69", 70),
+    ("70-84", "bucket_70_84", 85),
+    ("85-100", "bucket_85_100", None),
+]
+
+HOT_SCORE = 70
+
+
+def score_bucket(score: float) -> Tuple[str, str]:
+    """Return (label, histogram column) for a 0-100 score"""
+    for label, column, upper in SCORE_BUCKETS:
+        if upper is None or score < upper:
+            return label, column
+    return SCORE_BUCKETS[-1][0], SCORE_BUCKETS[-1][1]
+
+
+def fetch_pages(build_query, page_size: int = 1000) -> List[Dict[str, Any]]:
+    """Run a Supabase select page by page (PostgREST caps each response)"""
+    rows: List[Dict[str, Any]] = []
+    offset = 0
+    while True:
+        page = build_query().range(offset, offset + page_size - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        offset += page_size
+
+
+def _day(created_at: Any) -> str:
+    """created_at (ISO string or datetime) -> 'YYYY-MM-DD'"""
+    if isinstance(created_at, datetime):
+        return created_at.date().isoformat()
+    return str(created_at)[:10]
+
+
+def _new_signal_rollup(day: str, source: str, intent: str) -> Dict[str, Any]:
+    rollup = {
+        "day": day,
+        "source": source,
+        "intent": intent,
+        "signal_count": 0,
+        "score_sum": 0,
+        "hot_count": 0,
+        "converted_count": 0,
+    }
+    for _, column, _ in SCORE_BUCKETS:
+        rollup[column] = 0
+    return rollup
+
+
+def _add_signal(rollups: Dict[tuple, Dict[str, Any]], day: str, source: str, intent: str,
+                score: float, hot: bool, converted: bool) -> None:
+    key = (day, source, intent)
+    rollup = rollups.get(key)
+    if rollup is None:
+        rollup = rollups[key] = _new_signal_rollup(day, source, intent)
+    rollup["signal_count"] += 1
+    rollup["score_sum"] += score
+    rollup["hot_count"] += int(hot)
+    rollup["converted_count"] += int(converted)
+    rollup[score_bucket(score)[1]] += 1
+
+
+def aggregate_signals(signals: Iterable[Dict[str, Any]], reddit_signals: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Aggregate `signals` and `reddit_signals` rows into signal_daily_rollups rows.
+    Field semantics match the original per-request aggregation in admin/analytics_api.py.
+    """
+    rollups: Dict[tuple, Dict[str, Any]] = {}
+
+    for signal in signals:
+        score = signal.get("pain_score") or 0
+        _add_signal(
+            rollups,
+            day=_day(signal["created_at"]),
+            source=signal.get("source") or "scraped",
+            intent=signal.get("signal_type") or "business_signal",
+            score=score,
+            hot=score >= HOT_SCORE,
+            converted=signal.get("status") == "contacted",
+        )
+
+    for signal in reddit_signals:
+        score = signal.get("total_score") or 0
+        _add_signal(
+            rollups,
+            day=_day(signal["created_at"]),
+            source="reddit",
+            intent=signal.get("intent") or "",
+            score=score,
+            hot=signal.get("ai_tier") == "hot" or score >= HOT_SCORE,
+            converted=bool(signal.get("alerted")),
+        )
+
+    return list(rollups.values())
+
+
+def aggregate_unified_signals(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Aggregate unified_signals_with_ai rows into ai_signal_daily_rollups rows"""
+    rollups: Dict[tuple, Dict[str, Any]] = {}
+
+    for signal in rows:
+        score = signal.get("combined_score") or 0
+        key = (
+            _day(signal["created_at"]),
+            signal.get("intent") or "",
+            signal.get("sentiment") or "unknown",
+            score_bucket(score)[0],
+        )
+        rollup = rollups.get(key)
+        if rollup is None:
+            rollup = rollups[key] = {
+                "day": key[0],
+                "intent": key[1],
+                "sentiment": key[2],
+                "score_bucket": key[3],
+                "signal_count": 0,
+                "combined_score_sum": 0,
+                "converted_count": 0,
+                "ai_scored_count": 0,
+                "ai_scored_keyword_sum": 0,
+                "ai_scored_ai_sum": 0,
+                "ai_scored_converted": 0,
+            }
+
+        converted = bool(signal.get("converted_to_lead"))
+        rollup["signal_count"] += 1
+        rollup["combined_score_sum"] += score
+        rollup["converted_count"] += int(converted)
+
+        if signal.get("ai_total") is not None:
+            rollup["ai_scored_count"] += 1
+            rollup["ai_scored_keyword_sum"] += signal.get("keyword_total") or 0
+            rollup["ai_scored_ai_sum"] += signal["ai_total"]
+            rollup["ai_scored_converted"] += int(converted)
+
+    return list(rollups.values())
+
+
+class SignalRollupMaterializer:
+    """Incrementally (re)builds the daily rollup tables from the signal tables"""
+
+    STATE_NAME = "signal_rollups"
+
+    def __init__(self, supabase=None, lookback_days: int = 3, page_size: int = 1000, write_batch_size: int = 500):
+        if supabase is None:
+            from config.supabase_config import get_supabase
+            supabase = get_supabase()
+        self.supabase = supabase
+        self.lookback_days = lookback_days
+        self.page_size = page_size
+        self.write_batch_size = write_batch_size
+
+    def refresh(self, since: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Recompute rollups for every day >= `since`.
+
+        Without `since`, starts at the stored watermark's day minus `lookback_days`
+        (or rebuilds the last 90 days on first run).
+        """
+        started = datetime.now(timezone.utc)
+
+        if since is None:
+            watermark = self._get_watermark()
+            if watermark is None:
+                since = started.date() - timedelta(days=90)
+            else:
+                since = watermark.date() - timedelta(days=self.lookback_days)
+
+        since_iso = datetime.combine(since, datetime.min.time()).isoformat()
+
+        signals = self._fetch_all("signals", "created_at, source, signal_type, pain_score, status", since_iso)
+        reddit = self._fetch_all("reddit_signals", "created_at, total_score, ai_tier, alerted, intent", since_iso)
+        unified = self._fetch_all(
+            "unified_signals_with_ai",
+            "created_at, intent, sentiment, combined_score, keyword_total, ai_total, converted_to_lead",
+            since_iso,
+        )
+
+        signal_rollups = aggregate_signals(signals, reddit)
+        ai_rollups = aggregate_unified_signals(unified)
+
+        self._replace_days(SIGNAL_ROLLUPS_TABLE, since, signal_rollups, "day,source,intent")
+        self._replace_days(AI_SIGNAL_ROLLUPS_TABLE, since, ai_rollups, "day,intent,sentiment,score_bucket")
+
+        stats = {
+            "since": since.isoformat(),
+            "source_rows": len(signals) + len(reddit) + len(unified),
+            "signal_rollups": len(signal_rollups),
+            "ai_rollups": len(ai_rollups),
+            "duration_ms": round((datetime.now(timezone.utc) - started).total_seconds() * 1000, 1),
+        }
+        self._set_watermark(started, stats)
+
+        logger.info(f"Signal rollups refreshed: {stats}")
+        return stats
+
+    def rebuild(self, days: int = 365) -> Dict[str, Any]:
+        """Full rebuild of the last `days` days"""
+        return self.refresh(since=datetime.now(timezone.utc).date() - timedelta(days=days))
+
+    def _fetch_all(self, table: str, columns: str, since_iso: str) -> List[Dict[str, Any]]:
+        """Page through `table` selecting only the columns the rollups need"""
+        return fetch_pages(
+            lambda: self.supabase.table(table).select(columns).gte("created_at", since_iso).order("created_at"),
+            self.page_size,
+        )
+
+    def _replace_days(self, table: str, since: date, rollups: List[Dict[str, Any]], on_conflict: str) -> None:
+        """
+        Write the recomputed rollups for days >= since, then delete the keys
+        that no longer occur (upserting first, readers never see the days empty)
+        """
+        for i in range(0, len(rollups), self.write_batch_size):
+            batch = rollups[i:i + self.write_batch_size]
+            self.supabase.table(table).upsert(batch, on_conflict=on_conflict).execute()
+
+        keys = on_conflict.split(",")
+        fresh = {tuple(str(row[k]) for k in keys) for row in rollups}
+        existing = fetch_pages(
+            lambda: self.supabase.table(table).select(on_conflict).gte("day", since.isoformat()).order("day"),
+            self.page_size,
+        )
+        for row in existing:
+            if tuple(str(row[k]) for k in keys) in fresh:
+                continue
+            query = self.supabase.table(table).delete()
+            for k in keys:
+                query = query.eq(k, row[k])
+            query.execute()
+
+    def _get_watermark(self) -> Optional[datetime]:
+        try:
+            response = self.supabase.table(ROLLUP_STATE_TABLE).select("watermark").eq(
+                "name", self.STATE_NAME
+            ).limit(1).execute()
+        except Exception as e:
+            logger.warning(f"Could not read rollup watermark: {e}")
+            return None
+        if not response.data or not response.data[0].get("watermark"):
+            return None
+        return datetime.fromisoformat(response.data[0]["watermark"].replace("Z", "+00:00"))
+
+    def _set_watermark(self, watermark: datetime, stats: Dict[str, Any]) -> None:
+        self.supabase.table(ROLLUP_STATE_TABLE).upsert({
+            "name": self.STATE_NAME,
+            "watermark": watermark.isoformat(),
+            "last_run_at": datetime.now(timezone.utc).isoformat(),
+            "last_run_stats": stats,
+        }, on_conflict="name").execute()
+
+
+class SignalRollupReader:
+    """Read-side helpers used by admin/analytics_api.py"""
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    def signal_rollups(self, days: int) -> List[Dict[str, Any]]:
+        return self._read(SIGNAL_ROLLUPS_TABLE, days)
+
+    def ai_signal_rollups(self, days: int) -> List[Dict[str, Any]]:
+        return self._read(AI_SIGNAL_ROLLUPS_TABLE, days)
+
+    def _read(self, table: str, days: int) -> List[Dict[str, Any]]:
+        cutoff = (datetime.now(timezone.utc).date() - timedelta(days=days)).isoformat()
+        return fetch_pages(lambda: self.supabase.table(table).select("*").gte("day", cutoff).order("day"))
+
+
+def refresh_signal_rollups(since: Optional[date] = None) -> Dict[str, Any]:
+    """Convenience entry point for schedulers and scraper post-run hooks"""
+    return SignalRollupMaterializer().refresh(since=since)
@@ -0,0 +1,110 @@
+"""
+Test the Bloom-filter dedupe index against the in-memory Supabase stand-in
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests.fakes import FakeSupabase
+from services.dedupe_index import BloomFilter, DedupeIndex
+
+
+def _rows(prefix, n, days_ago=0):
+    # One row per minute, ending now (minus days_ago)
+    start = datetime.now(timezone.utc) - timedelta(days=days_ago, minutes=n)
+    return [
+        {"content_hash": f"{prefix}{i}", "created_at": (start + timedelta(minutes=i)).isoformat()}
+        for i in range(n)
+    ]
+
+
+def test_bloom_filter_false_positive_rate_and_round_trip():
+    bloom = BloomFilter(capacity=10_000, fp_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"seen-{i}")
+
+    assert all(f"seen-{i}" in bloom for i in range(10_000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(20_000))
+    assert false_positives / 20_000 < 0.02
+
+    restored = BloomFilter.from_dict(bloom.to_dict())
+    assert all(f"seen-{i}" in restored for i in range(0, 10_000, 97))
+    assert restored.count == 10_000
+
+
+def test_batch_membership_uses_a_few_round_trips():
+    fake = FakeSupabase({"reddit_signals": _rows("old", 500)})
+    index = DedupeIndex(fake, "reddit_signals", window_days=7, path=None)
+
+    hashes = [f"old{i}" for i in range(0, 500, 5)] + [f"new{i}" for i in range(1000)] + ["new1"]
+    new = index.filter_new(hashes)
+
+    assert new == [f"new{i}" for i in range(1000)]
+    stats = index.report()
+    assert stats["duplicates"] == 100 and stats["checked"] == 1100
+    # 1 warm-up page + 1 confirmation query (plus any false-positive chunk)
+    assert fake.db["_calls"] == stats["warm_round_trips"] + stats["confirm_round_trips"] <= 3
+    assert stats["round_trips_saved"] >= 1097
+
+
+def test_false_positive_never_drops_a_new_item():
+    fake = FakeSupabase({"signals": []})
+    # Tiny filter: nearly every lookup is a (false) positive
+    index = DedupeIndex(fake, "signals", capacity=1, fp_rate=0.5, path=None)
+    index.add_many(f"x{i}" for i in range(200))
+
+    assert index.filter_new(["a", "b", "c"]) == ["a", "b", "c"]
+    assert index.stats["false_positives"] >= 1
+
+
+def test_snapshot_warms_incrementally_and_expires_old_partitions(tmp_path):
+    fake = FakeSupabase({"reddit_signals": _rows("recent", 50, days_ago=1) + _rows("stale", 50, days_ago=20)})
+
+    index = DedupeIndex(fake, "reddit_signals", window_days=7, path=str(tmp_path))
+    assert index.filter_new(["recent1", "stale1"]) == ["stale1"]
+    assert index.stats["warm_rows"] == 50
+    index.save()
+
+    # Next run: only rows stored since the snapshot come from the database
+    fake.db["reddit_signals"] += _rows("later", 10)
+    index = DedupeIndex(fake, "reddit_signals", window_days=7, path=str(tmp_path))
+    assert index.filter_new(["recent2", "later3", "fresh"]) == ["fresh"]
+    # The 10 new rows plus the 11 stored within the 10-minute overlap before the watermark
+    assert index.stats["warm_rows"] == 21
+
+    index.partitions["2000-01-01"] = BloomFilter(index.capacity, index.fp_rate)
+    index.save()
+    reloaded = DedupeIndex(fake, "reddit_signals", window_days=7, path=str(tmp_path))
+    reloaded.warm()
+    assert "2000-01-01" not in reloaded.partitions
+
+
+def test_unbounded_window_without_snapshot_never_scans():
+    fake = FakeSupabase({"licensing_signals": _rows("lic", 5000, days_ago=400)})
+    index = DedupeIndex(fake, "licensing_signals", window_days=None, path=None)
+
+    hashes = [f"lic{i}" for i in range(0, 5000, 50)] + [f"new{i}" for i in range(300)]
+    new = index.filter_new(hashes)
+
+    assert new == [f"new{i}" for i in range(300)]
+    stats = index.report()
+    # No warm-up read of the table, one confirmation query per 200 hashes
+    assert stats["warm_rows"] == 0 and stats["warm_round_trips"] == 0
+    assert fake.db["_calls"] == stats["confirm_round_trips"] == 2
+    assert stats["duplicates"] == 100 and stats["false_positives"] == 0
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    test_bloom_filter_false_positive_rate_and_round_trip()
+    test_batch_membership_uses_a_few_round_trips()
+    test_false_positive_never_drops_a_new_item()
+    test_unbounded_window_without_snapshot_never_scans()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_snapshot_warms_incrementally_and_expires_old_partitions(Path(tmp))
+    print("✅ Dedupe index tests passed")
@@ -0,0 +1,143 @@
+"""
+Test the batched scraper ingestion sink against the in-memory Supabase stand-in
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime, timezone
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests.fakes import FakeSupabase
+from services.ingestion_sink import UpsertSink, content_hash
+
+
+def _post(i):
+    return {"post_id": f"p{i}", "title": f"AC broken #{i}", "body": "Need help today"}
+
+
+def test_content_hash_normalizes_text_and_key_order():
+    a = {"title": "AC  Broken", "body": "help"}
+    b = {"body": "help", "title": "ac broken"}
+    assert content_hash(a) == content_hash(b)
+    assert content_hash(a, ["title"]) != content_hash(a, ["body"])
+
+
+def test_thousands_of_records_in_a_handful_of_round_trips():
+    now = datetime.now(timezone.utc).isoformat()
+    existing = [{**_post(i), "content_hash": content_hash(_post(i)), "created_at": now} for i in range(300)]
+    fake = FakeSupabase({"reddit_signals": existing})
+
+    with UpsertSink(fake, "reddit_signals", batch_size=500) as sink:
+        # 3000 unique posts (300 already stored), each scraped twice
+        for i in list(range(3000)) * 2:
+            sink.add(_post(i))
+
+    stats = sink.stats
+    assert stats["received"] == 6000
+    assert stats["written"] == 2700
+    assert stats["duplicates"] == 3300
+    assert stats["batches"] == 6
+    # 1 hash warm-up + 2 confirmation queries for the 300 stored posts + 6 upserts
+    assert fake.db["_calls"] == stats["round_trips"] == 9
+    assert stats["round_trips_saved"] == 3000 - 3
+    assert len(fake.db["reddit_signals"]) == 3000
+    assert stats["rows_per_sec"] > 0
+
+
+def test_retries_then_gives_up_and_forgets_hashes():
+    fake = FakeSupabase({})
+    failures = {"left": 2}
+    real_table = fake.table
+
+    class _Flaky:
+        def __init__(self, query):
+            self.query = query
+
+        def __getattr__(self, name):
+            attr = getattr(self.query, name)
+            if name != "execute":
+                return lambda *a, **kw: _Flaky(attr(*a, **kw))
+
+            def execute():
+                if self.query.op == "upsert" and failures["left"] > 0:
+                    failures["left"] -= 1
+                    raise ConnectionError("503")
+                return attr()
+            return execute
+
+    fake.table = lambda name: _Flaky(real_table(name))
+
+    sink = UpsertSink(fake, "signals", max_retries=2, backoff_seconds=0)
+    sink.add(_post(1))
+    assert sink.close()["written"] == 1 and sink.stats["retries"] == 2
+
+    failures["left"] = 10
+    sink = UpsertSink(fake, "signals", max_retries=1, backoff_seconds=0)
+    digest = sink.add(_post(2))
+    stats = sink.close()
+    assert stats["failed"] == 1 and stats["written"] == 0
+    # A failed record can be queued again
+    failures["left"] = 0
+    assert sink.add(_post(2)) == digest
+
+
+def test_update_existing_merges_rows():
+    fake = FakeSupabase({})
+    for phone_book in ("old", "new"):
+        with UpsertSink(fake, "business_contacts", key_fields=["business_name", "phone"],
+                        update_existing=True) as sink:
+            sink.add({"business_name": "Arctic Air", "phone": "555", "notes": phone_book})
+
+    rows = fake.db["business_contacts"]
+    assert len(rows) == 1 and rows[0]["notes"] == "new"
+    assert (sink.stats["inserted"], sink.stats["updated"]) == (0, 1)
+
+
+def test_rows_without_a_hash_are_matched_on_key_fields():
+    # Stored before migration 027 added content_hash
+    legacy = [
+        {"id": 1, "business_name": "Arctic Air", "phone": "555", "notes": "old", "content_hash": None},
+        {"id": 2, "business_name": "Polar HVAC", "phone": "777", "notes": "old", "content_hash": None},
+    ]
+    fake = FakeSupabase({"business_contacts": [dict(r) for r in legacy]})
+
+    with UpsertSink(fake, "business_contacts", key_fields=["business_name", "phone"],
+                    update_existing=True) as sink:
+        sink.add({"business_name": "Arctic Air", "phone": "555", "notes": "new"})
+        sink.add({"business_name": "Blizzard Co", "phone": "999", "notes": "new"})
+
+    assert len(fake.db["business_contacts"]) == 3
+    assert (sink.stats["inserted"], sink.stats["updated"], sink.stats["legacy_adopted"]) == (1, 1, 1)
+    adopted = next(r for r in fake.db["business_contacts"] if r["id"] == 1)
+    assert adopted["notes"] == "new" and adopted["content_hash"]
+    assert next(r for r in fake.db["business_contacts"] if r["id"] == 2)["content_hash"] is None
+
+    # Insert-only tables: the legacy row is left alone instead of duplicated
+    fake = FakeSupabase({"signals": [{"id": 9, "source": "bbb", "business_name": "Arctic Air", "content_hash": None}]})
+    with UpsertSink(fake, "signals", key_fields=["source", "business_name"]) as sink:
+        sink.add({"source": "bbb", "business_name": "Arctic Air", "title": "Opportunity"})
+    assert len(fake.db["signals"]) == 1 and fake.db["signals"][0]["content_hash"]
+    assert sink.stats["inserted"] == 0 and sink.stats["duplicates"] == 1
+
+
+def test_no_legacy_lookups_once_every_row_has_a_hash():
+    fake = FakeSupabase({})
+    with UpsertSink(fake, "business_contacts", key_fields=["business_name", "phone"],
+                    update_existing=True, batch_size=1) as sink:
+        for i in range(3):
+            sink.add({"business_name": f"Shop {i}", "phone": str(i)})
+    # One NULL-hash probe, then a stored-hash lookup and an upsert per batch
+    assert fake.db["_calls"] == sink.stats["round_trips"] == 1 + 3 * 2
+    assert sink.stats["inserted"] == 3
+
+
+if __name__ == "__main__":
+    test_content_hash_normalizes_text_and_key_order()
+    test_thousands_of_records_in_a_handful_of_round_trips()
+    test_retries_then_gives_up_and_forgets_hashes()
+    test_update_existing_merges_rows()
+    test_rows_without_a_hash_are_matched_on_key_fields()
+    test_no_legacy_lookups_once_every_row_has_a_hash()
+    print("✅ Ingestion sink tests passed")
@@ -0,0 +1,132 @@
+"""
+Test the persistent LLM response cache with a stub model
+"""
+
+import sys
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.llm_cache import Completion, LLMCache, completion_cost, prompt_version
+
+
+class StubLLM:
+    """Counts calls; answers after `delay` seconds"""
+
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, text):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return Completion({"score": len(text)}, tokens=100, cost=completion_cost("gpt-4o-mini", 80, 20))
+
+    async def acall(self, text):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return Completion({"score": len(text)}, tokens=100, cost=0.001)
+
+
+def test_hits_persist_across_instances_and_respect_versions(tmp_path):
+    path = str(tmp_path / "llm.sqlite3")
+    llm = StubLLM()
+    version = prompt_version("Score this post: {text}")
+
+    cache = LLMCache(path=path)
+    first = cache.get_or_call("signal_classification", "gpt-4o-mini", version, {"text": "AC broke"},
+                              lambda: llm("AC broke"))
+    # Whitespace/Unicode-only differences hit the same entry
+    again = cache.get_or_call("signal_classification", "gpt-4o-mini", version, {"text": "  AC broke \n"},
+                              lambda: llm("AC broke"))
+    assert first == again == {"score": 8} and llm.calls == 1
+
+    # New process, same file: still cached
+    reopened = LLMCache(path=path)
+    reopened.get_or_call("signal_classification", "gpt-4o-mini", version, {"text": "AC broke"}, lambda: llm("x"))
+    assert llm.calls == 1
+    # Another model or template version is a different request
+    reopened.get_or_call("signal_classification", "gpt-4o", version, {"text": "AC broke"}, lambda: llm("x"))
+    reopened.get_or_call("signal_classification", "gpt-4o-mini", prompt_version("v2 {text}"),
+                         {"text": "AC broke"}, lambda: llm("x"))
+    assert llm.calls == 3
+
+    total = reopened.report()["total"]
+    assert total["hits"] == 1 and total["misses"] == 2 and total["tokens_saved"] == 100
+    assert total["cost_saved"] > 0
+
+
+def test_ttl_per_use_case_and_failures_not_cached():
+    llm = StubLLM()
+    cache = LLMCache(path=":memory:", ttls={"email_generation": 0, "job_scoring": 3600})
+
+    for _ in range(2):
+        cache.get_or_call("email_generation", "gpt-4o-mini", "1", "same prompt", lambda: llm("a"))
+        cache.get_or_call("job_scoring", "gpt-4o-mini", "1", "same prompt", lambda: llm("b"))
+    assert llm.calls == 3  # Expired email twice, job scored once
+
+    def failing():
+        raise RuntimeError("rate limited")
+
+    for _ in range(2):
+        try:
+            cache.get_or_call("job_scoring", "gpt-4o-mini", "1", "other", failing)
+        except RuntimeError:
+            pass
+    cache.get_or_call("job_scoring", "gpt-4o-mini", "1", "bad", lambda: None,
+                      cacheable=lambda value: value is not None)
+    cache.get_or_call("job_scoring", "gpt-4o-mini", "1", "bad", lambda: llm("c"),
+                      cacheable=lambda value: value is not None)
+    assert llm.calls == 4
+
+
+def test_concurrent_identical_requests_are_coalesced():
+    llm = StubLLM(delay=0.1)
+    cache = LLMCache(path=":memory:")
+    results = []
+
+    def worker():
+        results.append(cache.get_or_call("deal_signals", "gpt-4o", "1", "transcript", lambda: llm("transcript")))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert llm.calls == 1 and len(results) == 8
+    stats = cache.report()["by_use_case"]["deal_signals"]
+    assert stats["misses"] == 1 and stats["hits"] + stats["coalesced"] == 7
+
+
+def test_async_requests_are_coalesced():
+    llm = StubLLM(delay=0.05)
+    cache = LLMCache(path=":memory:")
+
+    async def run():
+        return await asyncio.gather(*[
+            cache.aget_or_call("follow_up_email", "gpt-4o", "1", [{"role": "user", "content": "hi"}],
+                               lambda: llm.acall("hi"))
+            for _ in range(5)
+        ])
+
+    results = asyncio.run(run())
+    assert llm.calls == 1 and results == [{"score": 2}] * 5
+    assert cache.report()["total"]["hit_rate"] == 0.8
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_hits_persist_across_instances_and_respect_versions(Path(tmp))
+    test_ttl_per_use_case_and_failures_not_cached()
+    test_concurrent_identical_requests_are_coalesced()
+    test_async_requests_are_coalesced()
+    print("✅ LLM cache tests passed")
@@ -0,0 +1,68 @@
+"""
+Test MinHash/LSH near-duplicate clustering of signal text
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.near_duplicates import NearDuplicateIndex, shingles
+
+POST = (
+    "Our HVAC company is overwhelmed with calls this summer and we keep missing calls. "
+    "Looking for an answering service that can book jobs after hours and on weekends, "
+    "we lose customers every time the phone goes to voicemail"
+)
+OTHER = "Pipe burst in the basement in Dallas, water everywhere, need a plumber today please"
+
+
+def test_shingles_ignore_case_and_punctuation():
+    assert shingles("AC unit died!! Need help") == shingles("ac unit died need help")
+    assert len(shingles("too short")) == 1
+
+
+def test_reposts_and_light_edits_join_one_cluster():
+    index = NearDuplicateIndex()
+    clusters = index.add_many([
+        ("orig", POST),
+        ("repost", POST.upper()),
+        ("signed", POST + " Thanks in advance!"),
+        ("edited", POST.replace("this summer", "this season")),
+        ("other", OTHER),
+    ])
+
+    assert clusters[:4] == [clusters[0]] * 4
+    assert clusters[4] != clusters[0]
+    assert index.representative(clusters[0]) == "orig" and index.size(clusters[0]) == 4
+    assert index.report()["near_duplicates"] == 3
+
+
+def test_incremental_adds_and_result_reuse():
+    index = NearDuplicateIndex()
+    calls = []
+
+    def score(key, text):
+        cluster = index.add(key, text)
+        if index.result(cluster) is None:
+            calls.append(key)
+            index.set_result(cluster, {"ai_total_score": 80})
+        return index.result(cluster)
+
+    for key, text in [("a", POST), ("b", OTHER), ("c", POST + " DM me."), ("d", OTHER.lower())]:
+        assert score(key, text)
+    # Adding an already indexed key is a no-op
+    assert index.add("a", OTHER) == index.cluster_of("a")
+
+    assert calls == ["a", "b"]
+    assert len(index) == 4 and index.report()["scored_clusters"] == 2
+    assert index.query(POST + " Edit: still looking.") == index.cluster_of("a")
+    assert index.query("Completely unrelated text about roofing shingles in Denver") is None
+
+
+if __name__ == "__main__":
+    test_shingles_ignore_case_and_punctuation()
+    test_reposts_and_light_edits_join_one_cluster()
+    test_incremental_adds_and_result_reuse()
+    print("✅ Near-duplicate index tests passed")
@@ -0,0 +1,132 @@
+"""
+Test signal rollup materializer and the rollup-backed analytics endpoints
+Uses the in-memory stand-in for the Supabase query builder (tests/fakes.py)
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+from datetime import date, datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.signal_rollups import SignalRollupMaterializer, aggregate_signals, aggregate_unified_signals
+from tests.fakes import FakeSupabase
+
+
+def _iso(days_ago):
+    return (datetime.now() - timedelta(days=days_ago)).isoformat()
+
+
+def _fixture():
+    return {
+        "signals": [
+            {"created_at": _iso(1), "source": "google_maps", "signal_type": "hiring", "pain_score": 80, "status": "contacted"},
+            {"created_at": _iso(1), "source": "google_maps", "signal_type": "hiring", "pain_score": 40, "status": "new"},
+            {"created_at": _iso(2), "source": None, "signal_type": None, "pain_score": 65, "status": "new"},
+        ],
+        "reddit_signals": [
+            {"created_at": _iso(1), "total_score": 60, "ai_tier": "hot", "alerted": True, "intent": "seeking_help"},
+            {"created_at": _iso(3), "total_score": 90, "ai_tier": "warm", "alerted": False, "intent": None},
+        ],
+        "unified_signals_with_ai": [
+            {"created_at": _iso(1), "intent": "seeking_help", "sentiment": "frustrated", "combined_score": 88,
+             "keyword_total": 80, "ai_total": 92, "converted_to_lead": True},
+            {"created_at": _iso(1), "intent": "seeking_help", "sentiment": None, "combined_score": 55,
+             "keyword_total": 50, "ai_total": None, "converted_to_lead": False},
+            {"created_at": _iso(2), "intent": None, "sentiment": "neutral", "combined_score": 72,
+             "keyword_total": 70, "ai_total": 74, "converted_to_lead": False},
+        ],
+    }
+
+
+def test_aggregate_signals():
+    data = _fixture()
+    rollups = aggregate_signals(data["signals"], data["reddit_signals"])
+    by_key = {(r["source"], r["intent"]): r for r in rollups}
+
+    hiring = by_key[("google_maps", "hiring")]
+    assert hiring["signal_count"] == 2
+    assert hiring["score_sum"] == 120
+    assert hiring["hot_count"] == 1
+    assert hiring["converted_count"] == 1
+    assert hiring["bucket_0_49"] == 1 and hiring["bucket_70_84"] == 1
+
+    assert ("scraped", "business_signal") in by_key
+    assert by_key[("reddit", "seeking_help")]["hot_count"] == 1
+
+
+def test_aggregate_unified_signals():
+    rollups = aggregate_unified_signals(_fixture()["unified_signals_with_ai"])
+    assert sum(r["signal_count"] for r in rollups) == 3
+    assert sum(r["ai_scored_count"] for r in rollups) == 2
+    assert {r["sentiment"] for r in rollups} == {"frustrated", "unknown", "neutral"}
+
+
+def test_endpoints_read_rollups(monkeypatch):
+    import admin.analytics_api as api
+
+    fake = FakeSupabase(_fixture())
+    stats = SignalRollupMaterializer(fake, page_size=2).refresh()
+    assert stats["source_rows"] == 8
+
+    monkeypatch.setattr(api, "get_supabase", lambda: fake)
+    fake.db["_calls"] = 0
+
+    summary = asyncio.run(api.get_analytics_summary(days=7))
+    assert summary["total_signals"] == 5
+    assert summary["converted_count"] == 2
+    assert summary["sources_breakdown"] == {"google_maps": 2, "scraped": 1, "reddit": 2}
+    assert summary["intents_breakdown"] == {"hiring": 2, "business_signal": 1, "seeking_help": 1}
+    assert fake.db["_calls"] == 1, "summary should be a single rollup read"
+
+    sources = asyncio.run(api.get_source_performance(days=30))
+    assert {s.source: s.total_signals for s in sources} == {"google_maps": 2, "scraped": 1, "reddit": 2}
+
+    trends = asyncio.run(api.get_trends(days=30))
+    assert sum(t.total_signals for t in trends) == 5
+    assert [t.date for t in trends] == sorted((t.date for t in trends), reverse=True)
+
+    correlation = asyncio.run(api.get_score_correlation(days=30))
+    assert {c.score_range: c.count for c in correlation} == {"85-100": 1, "70-84": 1}
+
+    intents = asyncio.run(api.get_intent_analysis(days=30))
+    assert len(intents) == 1 and intents[0].intent == "seeking_help" and intents[0].count == 2
+
+
+def test_incremental_refresh_keeps_older_days():
+    fake = FakeSupabase(_fixture())
+    materializer = SignalRollupMaterializer(fake, lookback_days=0)
+    materializer.refresh()
+    before = len(fake.db["signal_daily_rollups"])
+
+    # Second run starts at today's watermark and leaves older days untouched
+    materializer.refresh()
+    assert len(fake.db["signal_daily_rollups"]) == before
+
+
+def test_refresh_upserts_then_deletes_only_stale_keys():
+    fake = FakeSupabase(_fixture())
+    materializer = SignalRollupMaterializer(fake, lookback_days=0)
+    materializer.refresh(since=date.today() - timedelta(days=30))
+    rows = {(r["day"], r["source"], r["intent"]): r for r in fake.db["signal_daily_rollups"]}
+
+    # A key whose signals have since gone away, and one that is recomputed
+    gone = {**next(iter(rows.values())), "intent": "no_longer_present"}
+    fake.db["signal_daily_rollups"].append(gone)
+    kept_key = next(iter(rows))
+    kept = next(r for r in fake.db["signal_daily_rollups"] if (r["day"], r["source"], r["intent"]) == kept_key)
+
+    materializer.refresh(since=date.today() - timedelta(days=30))
+    after = fake.db["signal_daily_rollups"]
+    assert {(r["day"], r["source"], r["intent"]) for r in after} == set(rows)
+    # Recomputed rows are updated in place, not deleted and re-inserted
+    assert any(r is kept for r in after)
+
+
+if __name__ == "__main__":
+    test_aggregate_signals()
+    test_aggregate_unified_signals()
+    test_incremental_refresh_keeps_older_days()
+    print("✅ Signal rollup tests passed")
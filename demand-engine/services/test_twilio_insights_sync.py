@@ -0,0 +1,119 @@
+"""
+Test the Twilio insights cache sync and the cache-backed insights endpoints
+Uses a local stub of the Twilio REST client and the in-memory Supabase stand-in
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests.fakes import FakeSupabase
+from services.twilio_insights_sync import TWILIO_CALLS_TABLE, TwilioInsightsSync
+
+
+class _Listing:
+    """Stub for client.calls / client.recordings; records every list() call"""
+
+    def __init__(self, items, time_attr, since_param):
+        self.items, self.time_attr, self.since_param = items, time_attr, since_param
+        self.requests = []
+
+    def list(self, **params):
+        self.requests.append(params)
+        since = params.get(self.since_param)
+        items = [i for i in self.items if since is None or getattr(i, self.time_attr) >= since]
+        if "call_sid" in params:
+            items = [i for i in items if i.call_sid == params["call_sid"]]
+        return items[:params["limit"]] if params.get("limit") else items
+
+
+class StubTwilio:
+    def __init__(self, calls, recordings):
+        self.calls = _Listing(calls, "start_time", "start_time_after")
+        self.recordings = _Listing(recordings, "date_created", "date_created_after")
+
+
+def _call(i, minutes_ago, status="completed", to="+15550000001"):
+    start = datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)
+    return SimpleNamespace(
+        sid=f"CA{i:04d}", from_=f"+1555100{i:04d}", to=to, from_formatted=None, to_formatted=None,
+        status=status, direction="inbound", answered_by=None, duration="60" if status == "completed" else None,
+        start_time=start, end_time=start + timedelta(seconds=60), price="-0.0100", price_unit="USD",
+    )
+
+
+def _recording(call):
+    return SimpleNamespace(
+        sid=f"RE{call.sid[2:]}", call_sid=call.sid, date_created=call.end_time,
+        uri=f"/2010-04-01/Accounts/AC1/Recordings/RE{call.sid[2:]}.json",
+    )
+
+
+def _fixture():
+    calls = [_call(1, 30), _call(2, 90, status="no-answer"), _call(3, 600, status="busy", to="+15550000002")]
+    return StubTwilio(calls, [_recording(calls[0])])
+
+
+def test_sync_joins_recordings_in_bulk():
+    twilio, fake = _fixture(), FakeSupabase({})
+    stats = TwilioInsightsSync(twilio, fake).sync()
+
+    assert stats["calls"] == 3 and stats["recordings"] == 1
+    assert len(twilio.calls.requests) == 1 and len(twilio.recordings.requests) == 1
+
+    rows = {r["call_sid"]: r for r in fake.db[TWILIO_CALLS_TABLE]}
+    assert rows["CA0001"]["recording_url"].endswith("/Recordings/RE0001.mp3")
+    assert rows["CA0002"]["recording_url"] is None
+    assert rows["CA0001"]["price"] == pytest.approx(-0.01)
+
+
+def test_incremental_cursor_with_overlap():
+    twilio, fake = _fixture(), FakeSupabase({})
+    sync = TwilioInsightsSync(twilio, fake, overlap_minutes=60)
+    sync.sync()
+    sync.sync()
+
+    since = twilio.calls.requests[-1]["start_time_after"]
+    assert datetime.now(timezone.utc) - since < timedelta(minutes=61)
+    # Overlapping range re-upserts in place
+    assert len(fake.db[TWILIO_CALLS_TABLE]) == 3
+
+    assert sync.sync_if_stale(max_age_seconds=300) is None
+    assert len(twilio.calls.requests) == 2
+
+
+def test_endpoints_serve_from_cache(monkeypatch):
+    import routers.twilio_insights as api
+
+    twilio, fake = _fixture(), FakeSupabase({})
+    monkeypatch.setattr(api, "client", twilio)
+    monkeypatch.setattr(api, "get_supabase", lambda: fake)
+
+    history = asyncio.run(api.get_call_history(phone_number=None, days=7, limit=50))
+    assert [c.call_sid for c in history] == ["CA0001", "CA0002", "CA0003"]
+    assert history[0].recording_url and history[1].recording_url is None
+
+    cost = asyncio.run(api.get_cost_summary(phone_number="+15550000001", days=30))
+    assert cost.total_calls == 2
+    assert cost.total_cost == pytest.approx(0.02)
+
+    uptime = asyncio.run(api.get_uptime_metrics(phone_number=None, days=7))
+    assert (uptime.successful_calls, uptime.no_answer_calls, uptime.busy_calls) == (1, 1, 1)
+    assert uptime.average_response_time == pytest.approx(60)
+
+    # One bulk listing per resource for all three requests, no per-call lookups
+    assert len(twilio.calls.requests) == 1
+    assert len(twilio.recordings.requests) == 1
+
+
+if __name__ == "__main__":
+    test_sync_joins_recordings_in_bulk()
+    test_incremental_cursor_with_overlap()
+    print("✅ Twilio insights sync tests passed")
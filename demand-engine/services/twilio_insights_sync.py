@@ -0,0 +1,176 @@
+"""
+Twilio Insights Sync
+Keeps a local cache of Twilio call and recording metadata for the insights API.
+
+Each run lists calls and recordings for the same time range in bulk (Twilio pages
+through both listings), joins recordings to calls by call_sid locally, and upserts
+the result into `twilio_calls` (see migration 026). The start of the range is an
+incremental cursor stored in `rollup_state`, minus an overlap window so calls that
+were still in progress on the previous run get their final status and recording.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from services.signal_rollups import ROLLUP_STATE_TABLE, fetch_pages
+
+logger = logging.getLogger(__name__)
+
+TWILIO_CALLS_TABLE = "twilio_calls"
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
+
+def _float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def recording_media_url(recording) -> str:
+    return f"https://api.twilio.com{recording.uri.replace('.json', '.mp3')}"
+
+
+def call_to_row(call, recording=None) -> Dict[str, Any]:
+    """Twilio CallInstance (+ optional RecordingInstance) -> twilio_calls row"""
+    return {
+        "call_sid": call.sid,
+        "from_number": call.from_,
+        "to_number": call.to,
+        "from_formatted": call.from_formatted,
+        "to_formatted": call.to_formatted,
+        "status": call.status,
+        "direction": call.direction,
+        "answered_by": call.answered_by,
+        "duration": int(call.duration) if call.duration else 0,
+        "start_time": _iso(call.start_time),
+        "end_time": _iso(call.end_time),
+        "price": _float(call.price),
+        "price_unit": call.price_unit,
+        "recording_sid": recording.sid if recording else None,
+        "recording_url": recording_media_url(recording) if recording else None,
+        "synced_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+class TwilioInsightsSync:
+    """Incrementally mirrors Twilio calls + recordings into the twilio_calls table"""
+
+    STATE_NAME = "twilio_insights"
+
+    # One sync at a time per process; concurrent callers serve from the cache
+    _lock = threading.Lock()
+
+    def __init__(self, twilio_client, supabase=None, overlap_minutes: int = 120,
+                 initial_days: int = 90, page_size: int = 1000, write_batch_size: int = 500):
+        if supabase is None:
+            from config.supabase_config import get_supabase
+            supabase = get_supabase()
+        self.twilio = twilio_client
+        self.supabase = supabase
+        self.overlap = timedelta(minutes=overlap_minutes)
+        self.initial_days = initial_days
+        self.page_size = page_size
+        self.write_batch_size = write_batch_size
+
+    def sync(self, since: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Pull calls started at or after `since` (default: cursor minus overlap,
+        or `initial_days` back on the first run) and upsert them into the cache.
+        """
+        started = datetime.now(timezone.utc)
+
+        if since is None:
+            cursor = self._get_cursor()
+            since = cursor - self.overlap if cursor else started - timedelta(days=self.initial_days)
+
+        calls = self.twilio.calls.list(start_time_after=since, page_size=self.page_size)
+        recordings = self.twilio.recordings.list(date_created_after=since, page_size=self.page_size)
+
+        # Keep the first (most recent) recording per call, like the old per-call lookup
+        recording_by_call: Dict[str, Any] = {}
+        for recording in recordings:
+            recording_by_call.setdefault(recording.call_sid, recording)
+
+        rows = [call_to_row(call, recording_by_call.get(call.sid)) for call in calls]
+        for i in range(0, len(rows), self.write_batch_size):
+            batch = rows[i:i + self.write_batch_size]
+            self.supabase.table(TWILIO_CALLS_TABLE).upsert(batch, on_conflict="call_sid").execute()
+
+        stats = {
+            "since": since.isoformat(),
+            "calls": len(rows),
+            "recordings": len(recording_by_call),
+            "duration_ms": round((datetime.now(timezone.utc) - started).total_seconds() * 1000, 1),
+        }
+        self._set_cursor(started, stats)
+
+        logger.info(f"Twilio insights synced: {stats}")
+        return stats
+
+    def sync_if_stale(self, max_age_seconds: int) -> Optional[Dict[str, Any]]:
+        """
+        Sync when the last run is older than `max_age_seconds`.
+        Returns None when the cache is fresh or another sync is already running.
+        """
+        cursor = self._get_cursor()
+        if cursor and datetime.now(timezone.utc) - cursor < timedelta(seconds=max_age_seconds):
+            return None
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            return self.sync()
+        finally:
+            self._lock.release()
+
+    def _get_cursor(self) -> Optional[datetime]:
+        try:
+            response = self.supabase.table(ROLLUP_STATE_TABLE).select("watermark").eq(
+                "name", self.STATE_NAME
+            ).limit(1).execute()
+        except Exception as e:
+            logger.warning(f"Could not read Twilio sync cursor: {e}")
+            return None
+        if not response.data or not response.data[0].get("watermark"):
+            return None
+        return datetime.fromisoformat(response.data[0]["watermark"].replace("Z", "+00:00"))
+
+    def _set_cursor(self, cursor: datetime, stats: Dict[str, Any]) -> None:
+        self.supabase.table(ROLLUP_STATE_TABLE).upsert({
+            "name": self.STATE_NAME,
+            "watermark": cursor.isoformat(),
+            "last_run_at": datetime.now(timezone.utc).isoformat(),
+            "last_run_stats": stats,
+        }, on_conflict="name").execute()
+
+
+class TwilioCallCache:
+    """Read-side helpers used by routers/twilio_insights.py"""
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    def calls(self, start: datetime, end: Optional[datetime] = None, to_number: Optional[str] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Cached calls started in [start, end], newest first"""
+
+        def build_query():
+            query = self.supabase.table(TWILIO_CALLS_TABLE).select("*").gte("start_time", _iso(start))
+            if end is not None:
+                query = query.lte("start_time", _iso(end))
+            if to_number:
+                query = query.eq("to_number", to_number)
+            return query.order("start_time", desc=True)
+
+        if limit is not None:
+            return build_query().limit(limit).execute().data or []
+        return fetch_pages(build_query)
@@ -0,0 +1,134 @@
+"""
+In-memory stand-in for the Supabase query builder
+
+Shared by the tests (and the incremental scraping benchmark). Supports the
+chains the services use: select/insert/update/upsert/delete with
+eq/is_/in_/gte/lte filters, or_ over eq/is.null, order, limit and range.
+Upserts merge into the existing row like ON CONFLICT DO UPDATE.
+db["_calls"] counts executed requests.
+"""
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, db, table):
+        self.db, self.table = db, table
+        self.filters, self.op, self.payload = [], "select", None
+        self.offset, self.limit_to = 0, None
+        self.sort = None
+
+    def select(self, *_):
+        return self
+
+    def gte(self, col, value):
+        self.filters.append(lambda r: str(r.get(col)) >= value)
+        return self
+
+    def lte(self, col, value):
+        self.filters.append(lambda r: str(r.get(col)) <= value)
+        return self
+
+    def eq(self, col, value):
+        self.filters.append(lambda r: r.get(col) == value)
+        return self
+
+    def or_(self, conditions):
+        # PostgREST "col.eq.value,col.is.null" (only the operators used)
+        tests = []
+        for condition in conditions.split(","):
+            col, op, value = condition.split(".", 2)
+            if op == "is" and value == "null":
+                tests.append(lambda r, col=col: r.get(col) is None)
+            elif op == "eq":
+                tests.append(lambda r, col=col, value=value: str(r.get(col)) == value)
+            else:
+                raise NotImplementedError(condition)
+        self.filters.append(lambda r: any(test(r) for test in tests))
+        return self
+
+    def is_(self, col, value):
+        assert value == "null"
+        self.filters.append(lambda r: r.get(col) is None)
+        return self
+
+    def in_(self, col, values):
+        self.filters.append(lambda r: r.get(col) in values)
+        return self
+
+    def order(self, col, desc=False):
+        self.sort = (col, desc)
+        return self
+
+    def limit(self, n):
+        self.limit_to = n
+        return self
+
+    def range(self, start, end):
+        self.offset, self.limit_to = start, end - start + 1
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def insert(self, payload):
+        self.op, self.payload = "insert", payload
+        return self
+
+    def update(self, payload):
+        self.op, self.payload = "update", payload
+        return self
+
+    def upsert(self, payload, on_conflict=None, ignore_duplicates=False):
+        self.op, self.payload, self.keys = "upsert", payload, on_conflict.split(",")
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def execute(self):
+        rows = self.db.setdefault(self.table, [])
+        self.db["_calls"] = self.db.get("_calls", 0) + 1
+        if self.op == "delete":
+            self.db[self.table] = [r for r in rows if not all(f(r) for f in self.filters)]
+            return _Result([])
+        if self.op == "insert":
+            payload = self.payload if isinstance(self.payload, list) else [self.payload]
+            rows.extend(dict(r) for r in payload)
+            return _Result(payload)
+        if self.op == "update":
+            matched = [r for r in rows if all(f(r) for f in self.filters)]
+            for r in matched:
+                r.update(self.payload)
+            return _Result(matched)
+        if self.op == "upsert":
+            payload = self.payload if isinstance(self.payload, list) else [self.payload]
+            written = []
+            for new in payload:
+                key = tuple(new[k] for k in self.keys)
+                existing = [r for r in rows if tuple(r.get(k) for k in self.keys) == key]
+                if existing and self.ignore_duplicates:
+                    continue
+                if existing:
+                    # ON CONFLICT DO UPDATE only sets the columns sent
+                    existing[0].update(new)
+                else:
+                    rows.append(dict(new))
+                written.append(new)
+            return _Result(written)
+        matched = [r for r in rows if all(f(r) for f in self.filters)]
+        if self.sort:
+            col, desc = self.sort
+            matched.sort(key=lambda r: str(r.get(col)), reverse=desc)
+        end = None if self.limit_to is None else self.offset + self.limit_to
+        return _Result(matched[self.offset:end])
+
+
+class FakeSupabase:
+    def __init__(self, tables):
+        self.db = tables
+
+    def table(self, name):
+        return _Query(self.db, name)
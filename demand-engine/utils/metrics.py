@@ -0,0 +1,386 @@
+# Vendored from hvac_agent/app/utils/metrics.py by scripts/sync_shared_modules.py.
+# Do not edit here: change the original and re-run the script.
+"""
+Prometheus-style metrics registry.
+
+Counters, gauges and histograms (optionally labelled) kept in process and
+rendered in the Prometheus text exposition format for GET /metrics:
+
+    from app.utils.metrics import counter, histogram
+
+    CACHE_LOOKUPS = counter("hvac_response_cache_lookups_total", "Cache lookups", ("result",))
+    CACHE_LOOKUPS.labels("hit").inc()
+
+    STT_SECONDS = histogram("hvac_stt_seconds", "Transcription latency")
+    STT_SECONDS.observe(0.182)
+
+Updates are plain attribute arithmetic on a pre-resolved child - no locks,
+so they cost well under a microsecond on the event loop. Code that updates
+from worker threads should keep its own locked stats and expose them with
+register_stats() instead (a racing `+=` can lose an increment).
+
+Components that already keep a stats dict can be scraped as-is:
+
+    register_stats("hvac_calendar_sync", worker.get_stats,
+                   counters={"synced", "retried"}, labels={"outbox": "status"})
+
+This file is the original; demand-engine/utils/metrics.py is generated
+from it by demand-engine/scripts/sync_shared_modules.py.
+"""
+
+import logging
+import math
+import re
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger("metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers a 5 ms cache hit up to a 10 s LLM/TTS stall
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+# (labels, value) pairs of one metric family
+Samples = List[Tuple[Dict[str, str], float]]
+
+
+# =============================================================================
+# METRIC TYPES
+# =============================================================================
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("_value", "_fn")
+
+    def __init__(self):
+        self._value = 0.0
+        self._fn: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._value -= amount
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        """Read the value from fn() at scrape time (sizes, health flags)."""
+        self._fn = fn
+
+    @property
+    def value(self) -> float:
+        return float(self._fn()) if self._fn is not None else self._value
+
+
+class _HistogramChild:
+    __slots__ = ("_upper", "buckets", "sum", "count")
+
+    def __init__(self, upper: Tuple[float, ...]):
+        self._upper = upper
+        self.buckets = [0] * (len(upper) + 1)  # Last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect_left(self._upper, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._default = None if self.labelnames else self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: Any):
+        """Child for these label values (resolve once, keep it for hot paths)."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def children(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        return list(self._children.items())
+
+    def clear(self) -> None:
+        """Drop all labelled children (unlabelled metrics are reset)."""
+        self._children.clear()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        for key, child in self.children():
+            yield self.name, self._labels(key), child.value
+
+
+class Counter(_Metric):
+    """Monotonic count (requests, errors, bytes)."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    @property
+    def value(self) -> float:
+        return self._default.value
+
+
+class Gauge(_Metric):
+    """Value that goes up and down (level, queue depth, cache size)."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.dec(amount)
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        self._default.set_function(fn)
+
+    @property
+    def value(self) -> float:
+        return self._default.value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.upper = tuple(sorted(float(b) for b in buckets if b != math.inf))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.upper)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        for key, child in self.children():
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.upper + (math.inf,), list(child.buckets)):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, child.sum
+            yield f"{self.name}_count", labels, child.count
+
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+class MetricsRegistry:
+    """Named metrics plus stats collectors, rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[Tuple[str, str, str, Samples]]]] = {}
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics.setdefault(name, cls(name, documentation, labelnames, **kwargs))
+        if type(metric) is not cls or metric.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric {name} already registered as {metric.kind} {metric.labelnames}")
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def register_collector(self, key: str, collect: Callable[[], Iterable[Tuple[str, str, str, Samples]]]) -> None:
+        """
+        Call collect() at scrape time; it yields (name, kind, help, samples).
+        Registering the same key again replaces the previous collector.
+        """
+        self._collectors[key] = collect
+
+    def unregister_collector(self, key: str) -> None:
+        self._collectors.pop(key, None)
+
+    def register_stats(
+        self,
+        prefix: str,
+        get_stats: Callable[[], Dict[str, Any]],
+        counters: Iterable[str] = (),
+        labels: Optional[Dict[str, str]] = None,
+        documentation: str = "",
+    ) -> None:
+        """
+        Expose a component's get_stats() dict.
+
+        Numeric and boolean values become `<prefix>_<key>` gauges; keys in
+        `counters` become `<prefix>_<key>_total` counters. A nested dict is
+        flattened into `<prefix>_<key>_<subkey>`, unless `labels` maps its key
+        to a label name - then its entries are label values:
+        labels={"providers": "provider"} turns {"providers": {"polly": {"healthy": True}}}
+        into <prefix>_providers_healthy{provider="polly"} 1.
+        """
+        counter_keys: Set[str] = set(counters)
+        label_names = labels or {}
+
+        def collect():
+            families: Dict[str, Tuple[str, Samples]] = {}
+            _flatten(get_stats(), prefix, {}, counter_keys, label_names, families)
+            for name, (kind, samples) in families.items():
+                yield name, kind, documentation or f"{prefix} stats", samples
+
+        self.register_collector(prefix, collect)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(_sample_line(name, labels, value))
+        for key, collect in list(self._collectors.items()):
+            try:
+                families = list(collect())
+            except Exception as e:
+                logger.warning("Metrics collector %s failed: %s", key, str(e))
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {_escape_help(documentation)}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(_sample_line(name, labels, value))
+        return "\n".join(lines) + "\n"
+
+
+def _flatten(
+    stats: Dict[str, Any],
+    prefix: str,
+    labels: Dict[str, str],
+    counter_keys: Set[str],
+    label_names: Dict[str, str],
+    families: Dict[str, Tuple[str, Samples]],
+) -> None:
+    for key, value in stats.items():
+        name = f"{prefix}_{_NAME_RE.sub('_', str(key))}"
+        if isinstance(value, dict):
+            label = label_names.get(key)
+            if label is None:
+                _flatten(value, name, labels, counter_keys, label_names, families)
+                continue
+            for entry, inner in value.items():
+                entry_labels = {**labels, label: str(entry)}
+                if isinstance(inner, dict):
+                    _flatten(inner, name, entry_labels, counter_keys, label_names, families)
+                else:
+                    _add_sample(families, name, key in counter_keys, entry_labels, inner)
+        else:
+            _add_sample(families, name, key in counter_keys, labels, value)
+
+
+def _add_sample(families, name: str, is_counter: bool, labels: Dict[str, str], value: Any) -> None:
+    if isinstance(value, bool):
+        value = int(value)
+    if not isinstance(value, (int, float)):
+        return
+    if is_counter and not name.endswith("_total"):
+        name += "_total"
+    families.setdefault(name, ("counter" if is_counter else "gauge", []))[1].append((labels, value))
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _sample_line(name: str, labels: Dict[str, str], value: float) -> str:
+    if not labels:
+        return f"{name} {_format_value(value)}"
+    rendered = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+    return f"{name}{{{rendered}}} {_format_value(value)}"
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Process-wide registry
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.counter(name, documentation, labelnames)
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.gauge(name, documentation, labelnames)
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.histogram(name, documentation, labelnames, buckets)
+
+
+def register_stats(prefix: str, get_stats: Callable[[], Dict[str, Any]], counters: Iterable[str] = (),
+                   labels: Optional[Dict[str, str]] = None, documentation: str = "") -> None:
+    REGISTRY.register_stats(prefix, get_stats, counters, labels, documentation)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,74 @@
+"""
+Test the metrics registry and the Supabase query stats it backs
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.metrics import MetricsRegistry, render_metrics
+from config.supabase_config import run_query, query_stats
+
+
+class _Query:
+    def __init__(self, error=None):
+        self.error = error
+
+    def execute(self):
+        if self.error:
+            raise self.error
+        return "rows"
+
+
+def test_exposition_format():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    calls.labels('say "hi"').inc(2)
+    latency.observe(0.05)
+    latency.observe(3)
+
+    text = registry.render()
+    assert "# TYPE calls_total counter" in text
+    assert 'calls_total{route="say \\"hi\\""} 2' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "latency_seconds_count 2" in text
+
+    # Same name, same type: the existing metric; different type: an error
+    assert registry.counter("calls_total", "Calls", ("route",)) is calls
+    with pytest.raises(ValueError):
+        registry.gauge("calls_total", "Calls")
+
+
+def test_register_stats_flattens_nested_dicts():
+    registry = MetricsRegistry()
+    stats = {"running": True, "synced": 7, "outbox": {"pending": 3, "dead": 1}, "last_error": "boom"}
+    registry.register_stats("sync", lambda: stats, counters=("synced",), labels={"outbox": "status"})
+
+    text = registry.render()
+    assert "sync_running 1" in text
+    assert "# TYPE sync_synced_total counter" in text and "sync_synced_total 7" in text
+    assert 'sync_outbox{status="pending"} 3' in text
+    assert "last_error" not in text
+
+
+def test_query_stats_are_scraped():
+    query_stats.reset()
+    asyncio.run(run_query(_Query(), label="GET contacts"))
+    with pytest.raises(RuntimeError):
+        asyncio.run(run_query(_Query(RuntimeError("down")), label="GET contacts"))
+
+    stats = query_stats.snapshot()["GET contacts"]
+    assert stats["count"] == 2 and stats["errors"] == 1 and stats["timeouts"] == 0
+    assert set(stats) == {"count", "total_ms", "max_ms", "timeouts", "errors", "avg_ms"}
+
+    text = render_metrics()
+    assert 'supabase_query_duration_seconds_count{query="GET contacts"} 2' in text
+    assert 'supabase_query_failures_total{query="GET contacts",outcome="error"} 1' in text
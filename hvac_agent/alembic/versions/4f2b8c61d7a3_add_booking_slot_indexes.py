@@ -0,0 +1,67 @@
+"""add booking slot indexes
+
+Revision ID: 4f2b8c61d7a3
+Revises: dda903c9c1bf
+Create Date: 2026-10-19 10:12:41.318204
+
+Partial unique index on active (location_id, date, time): bookings commit
+against it, so two callers can't both take a slot. It also serves the
+availability index's per-location date range load. Partial index on
+call_sid for the create_booking idempotency lookup.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2b8c61d7a3'
+down_revision: Union[str, Sequence[str], None] = 'dda903c9c1bf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+
+    # Legacy rows may predate the is_cancelled default
+    op.execute(sa.text("UPDATE appointments SET is_cancelled = :no WHERE is_cancelled IS NULL").bindparams(no=False))
+
+    # Existing double bookings would make the unique index fail half-way;
+    # they need a human decision, so stop with a clear message instead
+    duplicates = bind.execute(sa.text(
+        "SELECT location_id, date, time, COUNT(*) FROM appointments "
+        "WHERE is_cancelled = :no GROUP BY location_id, date, time HAVING COUNT(*) > 1"
+    ).bindparams(no=False)).fetchall()
+    if duplicates:
+        slots = ", ".join(f"location {row[0]} {row[1]} {row[2]} ({row[3]}x)" for row in duplicates[:10])
+        raise RuntimeError(
+            f"{len(duplicates)} slot(s) are double-booked: {slots}. "
+            "Cancel or move the extra appointments, then re-run the migration."
+        )
+
+    op.create_index(
+        'uq_appointments_active_slot',
+        'appointments',
+        ['location_id', 'date', 'time'],
+        unique=True,
+        sqlite_where=sa.text('is_cancelled = 0'),
+        postgresql_where=sa.text('is_cancelled = false'),
+    )
+    op.create_index(
+        'ix_appointments_call_sid',
+        'appointments',
+        ['call_sid'],
+        unique=False,
+        sqlite_where=sa.text('call_sid IS NOT NULL'),
+        postgresql_where=sa.text('call_sid IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_appointments_call_sid', table_name='appointments')
+    op.drop_index('uq_appointments_active_slot', table_name='appointments')
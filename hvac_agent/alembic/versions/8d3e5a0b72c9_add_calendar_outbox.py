@@ -0,0 +1,55 @@
+"""add calendar outbox
+
+Revision ID: 8d3e5a0b72c9
+Revises: 4f2b8c61d7a3
+Create Date: 2026-10-19 14:03:27.552910
+
+Appointment changes waiting to be written to Google Calendar by the
+calendar sync worker (write-behind).
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3e5a0b72c9'
+down_revision: Union[str, Sequence[str], None] = '4f2b8c61d7a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'calendar_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('appointment_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('lease_until', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['appointment_id'], ['appointments.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_calendar_outbox_appointment_id'), 'calendar_outbox', ['appointment_id'], unique=False)
+    op.create_index(
+        'ix_calendar_outbox_due',
+        'calendar_outbox',
+        ['next_attempt_at'],
+        unique=False,
+        sqlite_where=sa.text("status = 'pending'"),
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_calendar_outbox_due', table_name='calendar_outbox')
+    op.drop_index(op.f('ix_calendar_outbox_appointment_id'), table_name='calendar_outbox')
+    op.drop_table('calendar_outbox')
@@ -38,6 +38,7 @@ from app.services.emergency_service import (
     log_emergency,
 )
 from app.utils.logging import get_logger
+from app.utils.tracing import span
 from app.utils.voice_config import (
     detect_caller_emotion,
     get_soft_response_prefix,
@@ -353,13 +354,14 @@ class HVACAgent:
         tools = get_tools_schema()
         
         try:
-            completion = client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=messages,
-                tools=tools,
-                temperature=0.9,  # Enterprise-level: high variability for natural, human-like conversation
-                max_tokens=200,   # Fuller responses for conversational, complete thoughts
-            )
+            with span("llm", self.call_sid, model=OPENAI_MODEL):
+                completion = client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=messages,
+                    tools=tools,
+                    temperature=0.9,  # Enterprise-level: high variability for natural, human-like conversation
+                    max_tokens=200,   # Fuller responses for conversational, complete thoughts
+                )
         except httpx.TimeoutException:
             self.logger.warning("OpenAI timeout - returning fallback")
             return "One moment. Say that again."
@@ -393,7 +395,10 @@ class HVACAgent:
             
             self.logger.info("Executing tool: %s with args: %s", fn_name, args)
             
-            result = self._execute_tool(fn_name, args, state)
+            # Booking writes are what LatencyPerformanceEngine reports as booking_execution
+            metric = "booking_execution" if fn_name in ("create_booking", "reschedule_booking") else None
+            with span("tool", self.call_sid, tool=fn_name, metric=metric):
+                result = self._execute_tool(fn_name, args, state)
             tool_results.append({
                 "tool_call_id": call.id,
                 "role": "tool",
@@ -419,12 +424,13 @@ class HVACAgent:
         
         # Get follow-up response
         try:
-            follow_up = client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=messages,
-                temperature=0.9,  # Enterprise-level: natural, varied, human-like
-                max_tokens=200,   # Fuller, conversational responses
-            )
+            with span("llm", self.call_sid, model=OPENAI_MODEL, follow_up=True):
+                follow_up = client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=messages,
+                    temperature=0.9,  # Enterprise-level: natural, varied, human-like
+                    max_tokens=200,   # Fuller, conversational responses
+                )
             return follow_up.choices[0].message.content.strip()
         except httpx.TimeoutException:
             self.logger.warning("Follow-up timeout - using fallback")
@@ -450,6 +456,7 @@ class HVACAgent:
                     date=args.get("date", ""),
                     time=args.get("time", ""),
                     location_code=args.get("location_code", ""),
+                    call_sid=self.call_sid,
                 )
             
             elif fn_name == "create_booking":
@@ -488,6 +495,7 @@ class HVACAgent:
                     new_date=args.get("new_date", ""),
                     new_time=args.get("new_time", ""),
                     location_code=args.get("location_code", ""),
+                    call_sid=self.call_sid,
                 )
                 
                 if result.get("status") == "success":
@@ -54,15 +54,19 @@ def tool_check_availability(
     date: str,
     time: str,
     location_code: str,
+    call_sid: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Check if a specific time slot is available.
     
+    A free slot is held for the call while the caller confirms.
+    
     Args:
         db: Database session
         date: Date in YYYY-MM-DD format
         time: Time in HH:MM format
         location_code: Location code (e.g., "DAL")
+        call_sid: Twilio CallSid to hold the slot for (optional)
         
     Returns:
         Availability result
@@ -71,7 +75,7 @@ def tool_check_availability(
         "Tool called: check_availability date=%s time=%s location=%s",
         date, time, location_code
     )
-    return check_availability(db, date, time, location_code)
+    return check_availability(db, date, time, location_code, hold_for=call_sid)
 
 
 def tool_create_booking(
@@ -125,6 +129,7 @@ def tool_reschedule_booking(
     new_date: str,
     new_time: str,
     location_code: str,
+    call_sid: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Reschedule an existing appointment.
@@ -135,6 +140,7 @@ def tool_reschedule_booking(
         new_date: New date in YYYY-MM-DD format
         new_time: New time in HH:MM format
         location_code: Location code
+        call_sid: Twilio CallSid (optional)
         
     Returns:
         Reschedule result
@@ -149,6 +155,7 @@ def tool_reschedule_booking(
         new_date=new_date,
         new_time=new_time,
         location_code=location_code,
+        call_sid=call_sid,
     )
 
 
@@ -9,15 +9,21 @@ Production-ready HVAC AI Voice Agent with:
 - Empathetic, soft-tone responses
 """
 
+import asyncio
 import os
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from dotenv import load_dotenv
 load_dotenv() 
 from app.services.db import init_db, check_db_health
+from app.services.availability import get_availability_index
+from app.services.calendar_sync import start_calendar_sync
+from app.services.job_queue import start_embedded_worker
+from app.services.jobs import schedule_next_day_reminders
+from app.services.sms_service import get_messaging_service
 from app.routers import (
     health_router,
     booking_router,
@@ -35,6 +41,7 @@ from app.routers.twilio_demo_call import router as twilio_demo_router
 from app.routers.alertstream import router as alertstream_router
 from app.utils.logging import get_logger
 from app.utils.error_handler import HVACAgentError
+from app.utils.metrics import CONTENT_TYPE, render_metrics
 from app.middleware.logging_middleware import log_requests
 from app.middleware.twilio_auth_middleware import validate_twilio_request
 logger = get_logger("main")
@@ -63,6 +70,18 @@ async def lifespan(app: FastAPI):
         logger.error("Failed to initialize database: %s", str(e))
         raise
     
+    # Build the availability index and start the Google free/busy refresher
+    # so the first call doesn't wait on either
+    get_availability_index()
+    
+    # Google Calendar writes are drained from the outbox in the background
+    calendar_sync = start_calendar_sync()
+    
+    # Confirmations, SMS and lead emails are only enqueued by request handlers;
+    # run a worker here unless dedicated worker processes drain the queue
+    job_worker = start_embedded_worker()
+    schedule_next_day_reminders()
+    
     # Verify OpenAI API key is configured
     if not os.getenv("OPENAI_API_KEY"):
         logger.warning("OPENAI_API_KEY not configured - agent will not function")
@@ -73,6 +92,12 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down %s", APP_NAME)
+    # stop() may join worker threads; keep the event loop free meanwhile
+    if calendar_sync is not None:
+        await asyncio.to_thread(calendar_sync.stop)
+    if job_worker is not None:
+        await asyncio.to_thread(job_worker.stop)
+    await get_messaging_service().aclose()
 
 
 # Create FastAPI application
@@ -146,6 +171,7 @@ async def root():
         "status": "running",
         "endpoints": {
             "health": "/health",
+            "metrics": "/metrics",
             "twilio_voice": "/twilio/voice",
             "twilio_stream": "/twilio/stream",
             "twilio_elevenlabs_stream": "/twilio/elevenlabs/stream",
@@ -159,6 +185,12 @@ async def root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint (sync: some collectors query the database)."""
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -4,6 +4,7 @@ Database models for HVAC Voice Agent.
 Models:
 - Location: Service locations (Dallas, Fort Worth, etc.)
 - Appointment: Customer appointments
+- CalendarOutbox: Pending Google Calendar writes (write-behind sync)
 - EmergencyLog: Emergency call tracking
 - CallLog: All call history for analytics
 """
@@ -23,6 +24,8 @@ from sqlalchemy import (
     Text,
     Enum,
     Float,
+    Index,
+    false,
 )
 from sqlalchemy.orm import declarative_base, relationship
 import enum
@@ -105,12 +108,68 @@ class Appointment(Base):
 
     location = relationship("Location", back_populates="appointments")
 
+    __table_args__ = (
+        # One active appointment per slot; cancelled rows don't hold the slot.
+        # Bookings commit against this, so concurrent callers can't both win.
+        Index(
+            "uq_appointments_active_slot",
+            "location_id", "date", "time",
+            unique=True,
+            sqlite_where=is_cancelled == false(),
+            postgresql_where=is_cancelled == false(),
+        ),
+        # Idempotency lookup in create_booking (most rows have no CallSid)
+        Index(
+            "ix_appointments_call_sid",
+            "call_sid",
+            sqlite_where=call_sid.isnot(None),
+            postgresql_where=call_sid.isnot(None),
+        ),
+    )
+
     def __repr__(self) -> str:
         d: date = self.date
         t: time = self.time
         return f"<Appointment {self.customer_name} {d.isoformat()} {t.strftime('%H:%M')} @ {self.location_id}>"
 
 
+class CalendarOutbox(Base):
+    """
+    Appointment changes waiting to be written to Google Calendar.
+
+    Rows are added in the same transaction as the appointment change and
+    drained by the calendar sync worker, which writes the appointment's
+    current state (so several pending rows for one appointment collapse
+    into one API call).
+    """
+    __tablename__ = "calendar_outbox"
+
+    id: int = Column(Integer, primary_key=True)
+    appointment_id: int = Column(Integer, ForeignKey("appointments.id"), nullable=False, index=True)
+    status: str = Column(String(20), default="pending", nullable=False)  # pending, done, dead
+    attempts: int = Column(Integer, default=0, nullable=False)
+    next_attempt_at: datetime = Column(DateTime, default=datetime.utcnow, nullable=False)
+    lease_until: Optional[datetime] = Column(DateTime, nullable=True)
+    last_error: Optional[str] = Column(Text, nullable=True)
+    created_at: datetime = Column(DateTime, default=datetime.utcnow)
+    updated_at: datetime = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    appointment = relationship("Appointment")
+
+    __table_args__ = (
+        # Worker scan: pending rows that are due
+        Index(
+            "ix_calendar_outbox_due",
+            "next_attempt_at",
+            sqlite_where=status == "pending",
+            postgresql_where=status == "pending",
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return f"<CalendarOutbox appointment={self.appointment_id} {self.status} x{self.attempts}>"
+
+
 class EmergencyLog(Base):
     """Emergency call log for tracking urgent situations."""
     __tablename__ = "emergency_logs"
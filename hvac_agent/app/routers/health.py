@@ -9,11 +9,13 @@ Provides:
 - Degradation level
 - Session store stats
 - TTS provider health
+- SMS delivery metrics
+- Per-stage call latency (tracing)
 """
 
 import os
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
@@ -21,10 +23,16 @@ from sqlalchemy.orm import Session
 from app.services.db import get_db, check_db_health
 from app.agents.state import call_state_store
 from app.utils.logging import get_logger
+from app.utils.tracing import get_recent_spans, get_stage_summary, get_tracing_stats
 from app.utils.circuit_breaker import CircuitBreakerManager
 from app.services.degradation import get_degradation
 from app.services.session_store import session_store
 from app.services.response_cache import get_response_cache
+from app.services.sms_service import get_messaging_service
+from app.services.availability import get_availability_index
+from app.services.slot_reservations import get_slot_reservations
+from app.services.calendar_sync import get_calendar_sync_worker
+from app.services.tts.hybrid_engine import get_hybrid_engine
 
 router = APIRouter(tags=["health"])
 logger = get_logger("health")
@@ -96,6 +104,12 @@ def health_detailed(db: Session = Depends(get_db)) -> Dict[str, Any]:
         "circuits": circuit_stats,
         "degradation": degradation_stats,
         "cache": cache_stats,
+        "sms": get_messaging_service().get_stats(),
+        "availability": get_availability_index().get_stats(),
+        "slot_holds": get_slot_reservations().get_stats(),
+        "calendar_sync": get_calendar_sync_worker().get_stats(),
+        "tts": get_hybrid_engine().get_stats(),
+        "tracing": get_tracing_stats(),
         "alerts": {
             "open_circuits": open_circuits,
             "degradation_active": degradation_stats["current_level"] > 0,
@@ -103,6 +117,22 @@ def health_detailed(db: Session = Depends(get_db)) -> Dict[str, Any]:
     }
 
 
+@router.get("/health/traces")
+def health_traces(call_sid: Optional[str] = None, limit: int = 200) -> Dict[str, Any]:
+    """
+    Recent latency spans and per-stage percentiles.
+    
+    Args:
+        call_sid: Only return spans for this call
+        limit: Maximum number of spans to return
+    """
+    return {
+        "stages": get_stage_summary(),
+        "spans": get_recent_spans(call_sid, limit=min(limit, 1000)),
+        **get_tracing_stats(),
+    }
+
+
 @router.get("/ready")
 def readiness() -> Dict[str, str]:
     """
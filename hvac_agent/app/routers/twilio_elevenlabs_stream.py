@@ -3,12 +3,16 @@ Twilio Media Streams with ElevenLabs TTS integration.
 
 This module provides a streaming voice handler that uses:
 - Twilio Media Streams for audio I/O
-- OpenAI Whisper for STT (speech-to-text)
+- OpenAI Whisper for STT (speech-to-text), streamed in overlapping windows
+  while the caller talks
 - OpenAI GPT for conversation
 - ElevenLabs for TTS (text-to-speech) - natural, human-like voice
 
 Key features:
 - Low-latency streaming TTS
+- Sentence-level LLM -> TTS streaming (speech starts with the first
+  sentence, not the full completion)
+- Voice activity detection / endpointing on the inbound audio
 - Barge-in support (interrupt agent speech)
 - Natural conversation pacing
 - Fallback to Twilio Polly if ElevenLabs unavailable
@@ -21,7 +25,7 @@ import os
 import asyncio
 import base64
 import time
-from typing import Optional, Set
+from typing import AsyncIterator, Optional, Set
 from contextlib import asynccontextmanager
 from enum import Enum
 
@@ -29,10 +33,14 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Request
 from fastapi.responses import Response
 from starlette.websockets import WebSocketState
 
-from app.utils.logging import get_logger
+from app.utils.logging import get_logger, LogSampler
+from app.utils.tracing import bind_call, record_span, span
 from app.utils.audio import validate_base64_audio, encode_audio
 from app.services.tts.elevenlabs import ElevenLabsTTS
 from app.services.tts.factory import get_tts_provider, TTSProvider, is_elevenlabs_available
+from app.services.tts.pipeline import stream_speech
+from app.services.audio.transcriber import StreamingTranscriber, Transcript, WhisperBackend
+from app.services.audio.vad import Endpointer
 
 router = APIRouter(tags=["twilio-elevenlabs"])
 logger = get_logger("twilio.elevenlabs")
@@ -91,6 +99,7 @@ def ulaw_to_frames(ulaw_bytes: bytes) -> list:
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 HVAC_COMPANY_NAME = os.getenv("HVAC_COMPANY_NAME", "KC Comfort Air")
 USE_ELEVENLABS = os.getenv("USE_ELEVENLABS", "false").lower() == "true"
+BARGE_IN_ENABLED = os.getenv("BARGE_IN_ENABLED", "true").lower() == "true"
 
 # Import enterprise prompts
 from app.utils.prompts import STREAMING_SYSTEM_PROMPT
@@ -135,6 +144,8 @@ class CallContext:
         self.audio_sender_task: Optional[asyncio.Task] = None
         self.keepalive_task: Optional[asyncio.Task] = None
         self.reprompt_task: Optional[asyncio.Task] = None
+        self.speech_task: Optional[asyncio.Task] = None  # Current agent speech (cancelled on barge-in)
+        self.turn_task: Optional[asyncio.Task] = None    # Greeting / utterance being processed
         
         # TTS
         self.tts: Optional[ElevenLabsTTS] = None
@@ -146,11 +157,10 @@ class CallContext:
         self.last_agent_speech_time: float = 0
         self.reprompt_count: int = 0
         
-        # STT buffers
-        self.input_buffer = bytearray()
+        # STT: the endpointer turns inbound frames into utterances, which are
+        # transcribed window by window while the caller is still talking
+        self.transcriber = StreamingTranscriber(WhisperBackend(), Endpointer())
         self.user_speaking = False
-        self.silence_frames = 0
-        self.speech_frames = 0
         
         # Diagnostics
         self.frames_sent: int = 0
@@ -159,6 +169,9 @@ class CallContext:
 # =============================================================================
 # AUDIO SENDER - SOLE WRITER TO TWILIO WEBSOCKET
 # =============================================================================
+_FRAME_LOG = LogSampler(first=5, every=25, per_second=1)
+
+
 async def audio_sender(ctx: CallContext):
     """
     Dedicated Twilio audio sender. This is the ONLY coroutine that sends audio.
@@ -196,18 +209,23 @@ async def audio_sender(ctx: CallContext):
                 if elapsed < FRAME_INTERVAL:
                     await asyncio.sleep(FRAME_INTERVAL - elapsed)
                 
-                # Send to Twilio
+                # Send to Twilio (timing the first frame of each burst of speech)
                 payload = base64.b64encode(frame).decode("ascii")
-                await ctx.ws.send_text(json.dumps({
+                message = json.dumps({
                     "event": "media",
                     "streamSid": ctx.stream_sid,
                     "media": {"payload": payload},
-                }))
+                })
+                if now - last_send_time > 0.2:
+                    with span("twilio_send", queued_frames=ctx.audio_queue.qsize()):
+                        await ctx.ws.send_text(message)
+                else:
+                    await ctx.ws.send_text(message)
                 ctx.frames_sent += 1
                 last_send_time = time.time()
                 
-                # Log first 5 frames and then every 25 frames
-                if ctx.frames_sent <= 5 or ctx.frames_sent % 25 == 0:
+                # Log the first 5 frames, then at most one line a second
+                if _FRAME_LOG.allow("frame_sent", ctx.call_sid):
                     logger.info(">>> SENT frame #%d to Twilio (160 bytes, streamSid=%s)", 
                                ctx.frames_sent, ctx.stream_sid[:20] if ctx.stream_sid else "None")
                     
@@ -220,6 +238,7 @@ async def audio_sender(ctx: CallContext):
                     logger.error("Audio sender error: %s", str(e))
                     
     finally:
+        _FRAME_LOG.forget(ctx.call_sid)
         logger.info("Audio sender stopped, total frames: %d", ctx.frames_sent)
 
 
@@ -355,11 +374,6 @@ class ElevenLabsStreamBridge:
     def __init__(self, twilio_ws: WebSocket):
         self.ctx = CallContext(twilio_ws)
         
-        # Thresholds for speech detection - tuned to avoid false positives
-        self._silence_threshold = 40  # Reduced: frames of silence to trigger processing
-        self._min_speech_frames = 15  # Reduced: minimum frames to consider as speech
-        self._speech_threshold = 50   # Increased: variance threshold for speech detection
-        
         # Utterance lock
         self._utterance_lock = asyncio.Lock()
     
@@ -390,6 +404,8 @@ class ElevenLabsStreamBridge:
         
         # Cancel tasks
         tasks_to_cancel = [
+            self.ctx.turn_task,
+            self.ctx.speech_task,
             self.ctx.audio_sender_task,
             self.ctx.keepalive_task,
             self.ctx.reprompt_task,
@@ -415,7 +431,9 @@ class ElevenLabsStreamBridge:
             self.ctx.tts = None
         
         # Clear buffers
-        self.ctx.input_buffer.clear()
+        logger.info("VAD stats for call_sid=%s: %s", self.ctx.call_sid, self.ctx.transcriber.endpointer.get_stats())
+        logger.info("STT stats for call_sid=%s: %s", self.ctx.call_sid, self.ctx.transcriber.get_stats())
+        self.ctx.transcriber.close()
         self.ctx.conversation_history.clear()
         
         logger.info("Cleanup complete for call_sid=%s", self.ctx.call_sid)
@@ -468,6 +486,9 @@ class ElevenLabsStreamBridge:
             "Stream started [v%s]: stream_sid=%s, call_sid=%s",
             _STREAM_VERSION, self.ctx.stream_sid, self.ctx.call_sid
         )
+        # Spans from this handler and the tasks it starts belong to this call
+        bind_call(self.ctx.call_sid, "elevenlabs")
+        started = time.monotonic()
         
         # Start audio sender task (SOLE writer to Twilio)
         self.ctx.audio_sender_task = asyncio.create_task(audio_sender(self.ctx))
@@ -479,10 +500,12 @@ class ElevenLabsStreamBridge:
         self.ctx.reprompt_task = asyncio.create_task(reprompt_loop(self.ctx, self._speak))
         
         # Send initial greeting
+        # Send initial greeting as a task so inbound audio keeps flowing to
+        # the endpointer (noise floor, barge-in) while it plays
         logger.info(">>> SENDING INITIAL GREETING")
-        await self._speak("Thank you for calling KC Comfort Air. How may I help you today?")
-        
-        logger.info(">>> GREETING COMPLETE, reprompt will fire in 5.0 seconds if no user speech")
+        self.ctx.turn_task = asyncio.create_task(
+            self._speak("Thank you for calling KC Comfort Air. How may I help you today?", "answer", started)
+        )
     
     async def _handle_media(self, msg: dict):
         """Handle incoming audio from Twilio."""
@@ -495,59 +518,24 @@ class ElevenLabsStreamBridge:
         
         audio_bytes = base64.b64decode(payload)
         
-        # Log first few media events to debug
-        if not hasattr(self, '_media_count'):
-            self._media_count = 0
-        self._media_count += 1
-        if self._media_count <= 3:
-            # Check audio characteristics
-            avg_val = sum(audio_bytes) / len(audio_bytes) if audio_bytes else 0
-            variance = self._calculate_variance(audio_bytes)
-            logger.info(">>> INBOUND MEDIA #%d: %d bytes, avg=%.1f, variance=%.1f", 
-                       self._media_count, len(audio_bytes), avg_val, variance)
-        
-        # Don't process audio while agent is speaking (prevents echo)
-        if self.ctx.is_speaking:
-            return  # Skip all processing while speaking
-        
-        # TEMPORARILY DISABLED: Speech detection causing false positives
-        # Just buffer audio, don't set user_speaking
-        self.ctx.input_buffer.extend(audio_bytes)
-        self.ctx.silence_frames += 1
-        
-        # Always keep user_speaking = False to allow reprompt
-        self.ctx.user_speaking = False
-    
-    def _calculate_variance(self, audio_bytes: bytes) -> float:
-        """Calculate variance from silence values."""
-        if not audio_bytes:
-            return 0
-        silence_low = 0x7F
-        return sum(abs(b - silence_low) for b in audio_bytes) / len(audio_bytes)
-    
-    def _detect_speech(self, audio_bytes: bytes, threshold: int = 40) -> bool:
-        """
-        Detect if audio contains speech (not silence).
-        
-        For μ-law, silence is around 0xFF (255) or 0x7F (127).
-        Uses a higher default threshold to avoid false positives from noise.
-        """
-        if len(audio_bytes) < 160:  # Need at least 20ms of audio at 8kHz
-            return False
-        
-        # μ-law silence values
-        silence_high = 0xFF
-        silence_low = 0x7F
-        
-        # Calculate variance from both silence points and take the minimum
-        variance_high = sum(abs(b - silence_high) for b in audio_bytes) / len(audio_bytes)
-        variance_low = sum(abs(b - silence_low) for b in audio_bytes) / len(audio_bytes)
-        variance = min(variance_high, variance_low)
-        
-        return variance > threshold
+        for event in self.ctx.transcriber.feed(audio_bytes):
+            if event.kind == "start":
+                self.ctx.user_speaking = True
+                self.ctx.last_speech_time = time.time()
+                if self.ctx.is_speaking and BARGE_IN_ENABLED:
+                    await self._barge_in()
+            elif event.kind == "end":
+                self.ctx.user_speaking = False
+                logger.info("Utterance detected: %dms", event.end_ms - event.start_ms)
+                self.ctx.turn_task = asyncio.create_task(
+                    self._process_utterance(event.transcript, time.monotonic())
+                )
+            else:
+                # Too short to be speech (cough, click)
+                self.ctx.user_speaking = False
     
-    async def _process_utterance(self, audio_data: bytes):
-        """Process a complete user utterance."""
+    async def _process_utterance(self, transcript: Transcript, ended: float):
+        """Process a complete user utterance (`ended`: monotonic end of speech)."""
         if self.ctx.closed:
             return
         
@@ -560,7 +548,7 @@ class ElevenLabsStreamBridge:
                 if self.ctx.closed:
                     return
                 
-                text = await self._transcribe(audio_data)
+                text = await self._transcribe(transcript)
                 if not text or not text.strip():
                     return
                 
@@ -573,158 +561,180 @@ class ElevenLabsStreamBridge:
                 
                 logger.info("User said: %s", text[:100])
                 
-                response = await self._get_response(text)
-                if response and not self.ctx.closed:
-                    logger.info("Agent response: %s", response[:100])
-                    await self._speak(response)
+                # Speak the response sentence by sentence as it is generated
+                await self._speak_stream(self._stream_response(text), ended)
                     
             except asyncio.CancelledError:
                 logger.debug("Utterance processing cancelled")
             except Exception as e:
                 logger.error("Error processing utterance: %s", str(e))
     
-    async def _transcribe(self, audio_data: bytes) -> Optional[str]:
-        """Transcribe audio using OpenAI Whisper."""
+    async def _transcribe(self, transcript: Transcript) -> Optional[str]:
+        """Wait for the utterance's final text (most of it is already transcribed)."""
         try:
-            import openai
-            
-            client = openai.AsyncOpenAI(api_key=OPENAI_API_KEY)
-            
-            # OpenAI Whisper expects specific formats
-            # We need to convert μ-law to a supported format
-            wav_data = await self._ulaw_to_wav(audio_data)
-            if not wav_data:
-                return None
-            
-            # Create a file-like object
-            import io
-            audio_file = io.BytesIO(wav_data)
-            audio_file.name = "audio.wav"
-            
-            response = await client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language="en",
-            )
-            
-            return response.text
-            
+            text = await transcript.text()
+            logger.info("Transcribed in %.0fms after end of speech", transcript.latency_ms)
+            record_span("stt", transcript.latency_ms, backend=type(self.ctx.transcriber.backend).__name__)
+            return text
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error("Transcription error: %s", str(e))
             return None
     
-    async def _ulaw_to_wav(self, ulaw_data: bytes) -> Optional[bytes]:
-        """Convert μ-law audio to WAV format for Whisper."""
-        try:
-            import audioop
-            import struct
-            
-            # Convert μ-law to linear PCM
-            pcm_data = audioop.ulaw2lin(ulaw_data, 2)
-            
-            # Create WAV header
-            sample_rate = 8000
-            num_channels = 1
-            bits_per_sample = 16
-            byte_rate = sample_rate * num_channels * bits_per_sample // 8
-            block_align = num_channels * bits_per_sample // 8
-            data_size = len(pcm_data)
-            
-            wav_header = struct.pack(
-                '<4sI4s4sIHHIIHH4sI',
-                b'RIFF',
-                36 + data_size,
-                b'WAVE',
-                b'fmt ',
-                16,  # Subchunk1Size
-                1,   # AudioFormat (PCM)
-                num_channels,
-                sample_rate,
-                byte_rate,
-                block_align,
-                bits_per_sample,
-                b'data',
-                data_size,
-            )
-            
-            return wav_header + pcm_data
-            
-        except Exception as e:
-            logger.error("Audio conversion error: %s", str(e))
-            return None
-    
-    async def _get_response(self, user_text: str) -> Optional[str]:
-        """Get response from OpenAI GPT."""
+    async def _stream_response(self, user_text: str) -> AsyncIterator[str]:
+        """Stream the GPT response as text deltas.
+        
+        The assistant turn is added to the history when the stream ends -
+        including a partial one if the caller barged in.
+        """
+        import openai
+        
+        client = openai.AsyncOpenAI(api_key=OPENAI_API_KEY)
+        
+        self.ctx.conversation_history.append({
+            "role": "user",
+            "content": user_text
+        })
+        if len(self.ctx.conversation_history) > 20:
+            self.ctx.conversation_history = self.ctx.conversation_history[-20:]
+        
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            *self.ctx.conversation_history
+        ]
+        
+        parts = []
+        # Time to first token - what the caller waits on before TTS can start
+        llm_span = span("llm", model="gpt-4o-mini", stream=True)
         try:
-            import openai
-            
-            client = openai.AsyncOpenAI(api_key=OPENAI_API_KEY)
-            
-            # Add to conversation history
-            self.ctx.conversation_history.append({
-                "role": "user",
-                "content": user_text
-            })
-            
-            # Keep history manageable
-            if len(self.ctx.conversation_history) > 20:
-                self.ctx.conversation_history = self.ctx.conversation_history[-20:]
-            
-            messages = [
-                {"role": "system", "content": SYSTEM_PROMPT},
-                *self.ctx.conversation_history
-            ]
-            
-            response = await client.chat.completions.create(
+            stream = await client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=messages,
                 max_tokens=100,
                 temperature=0.7,
+                stream=True,
             )
-            
-            assistant_message = response.choices[0].message.content
-            
-            # Add to history
-            self.ctx.conversation_history.append({
-                "role": "assistant",
-                "content": assistant_message
-            })
-            
-            return assistant_message
-            
+            async for event in stream:
+                delta = event.choices[0].delta.content if event.choices else None
+                if delta:
+                    llm_span.end()
+                    parts.append(delta)
+                    yield delta
         except Exception as e:
+            llm_span.end(type(e).__name__)
             logger.error("GPT error: %s", str(e))
-            return "I'm sorry, I didn't catch that. Could you repeat?"
-    
-    async def _speak(self, text: str):
-        """Speak text using ElevenLabs TTS."""
+            if not parts:
+                fallback = "I'm sorry, I didn't catch that. Could you repeat?"
+                parts.append(fallback)
+                yield fallback
+        finally:
+            llm_span.end()
+            if parts:
+                response = "".join(parts)
+                logger.info("Agent response: %s", response[:100])
+                self.ctx.conversation_history.append({
+                    "role": "assistant",
+                    "content": response
+                })
+    
+    async def _speak(self, text: str, turn: Optional[str] = None, turn_started: Optional[float] = None):
+        """Speak text using ElevenLabs TTS.
+        
+        `turn` names the latency span ("answer" for the greeting) running from
+        `turn_started` to the first audio.
+        """
         if not text or not text.strip():
             return
         
-        if self.ctx.closed:
+        if not self.ctx.tts:
+            logger.warning("No TTS available for streaming")
             return
         
-        self.ctx.is_speaking = True
         logger.info("Starting speech for: %s", text[:50])
         
+        # Stream ElevenLabs audio to Twilio via enqueue_audio
+        send = self._first_audio_timer(turn, turn_started, tts_started=time.monotonic())
+        result = await self._run_speech(self.ctx.tts.stream_to_twilio(text, send))
+        logger.info("TTS stream_to_twilio completed with result: %s", result)
+    
+    async def _speak_stream(self, tokens: AsyncIterator[str], ended: float):
+        """Speak an LLM token stream, starting TTS at the first sentence."""
+        if not self.ctx.tts:
+            logger.warning("No TTS available for streaming")
+            await tokens.aclose()
+            return
+        
+        # stream_speech records tts_first_byte per sentence
+        send = self._first_audio_timer("turn", ended)
+        result = await self._run_speech(stream_speech(tokens, self.ctx.tts.stream_to_twilio, send))
+        logger.info("Streamed response completed with result: %s", result)
+    
+    def _first_audio_timer(
+        self,
+        turn: Optional[str],
+        turn_started: Optional[float],
+        tts_started: Optional[float] = None,
+    ):
+        """Audio callback recording turn / TTS first-byte latency at the first chunk."""
+        first_audio = []
+        
+        async def send(chunk: bytes):
+            if not first_audio:
+                now = time.monotonic()
+                first_audio.append(now)
+                if tts_started is not None:
+                    record_span("tts_first_byte", (now - tts_started) * 1000, provider="elevenlabs")
+                if turn and turn_started is not None:
+                    record_span(turn, (now - turn_started) * 1000)
+                    logger.info("First %s audio after %.0fms", turn, (now - turn_started) * 1000)
+            await self._send_audio_chunk(chunk)
+        
+        return send
+    
+    async def _run_speech(self, speech) -> Optional[bool]:
+        """Run a speech coroutine as the call's current speech, so barge-in can cancel it."""
+        if self.ctx.closed:
+            speech.close()
+            return None
+        
+        self.ctx.is_speaking = True
+        self.ctx.speech_task = asyncio.ensure_future(speech)
         try:
-            if self.ctx.tts:
-                # Stream ElevenLabs audio to Twilio via enqueue_audio
-                result = await self.ctx.tts.stream_to_twilio(
-                    text,
-                    self._send_audio_chunk
-                )
-                logger.info("TTS stream_to_twilio completed with result: %s", result)
-            else:
-                logger.warning("No TTS available for streaming")
-                
+            return await self.ctx.speech_task
         except asyncio.CancelledError:
             logger.debug("TTS cancelled")
         except Exception as e:
             logger.error("TTS error: %s", str(e))
         finally:
+            self.ctx.speech_task = None
             self.ctx.is_speaking = False
             self.ctx.last_agent_speech_time = time.time()
+        return None
+    
+    async def _barge_in(self):
+        """Caller started talking: stop synthesis and drop audio not yet played."""
+        task = self.ctx.speech_task
+        if task and not task.done():
+            task.cancel()
+        if self.ctx.tts:
+            self.ctx.tts.cancel_speech()
+        
+        dropped = 0
+        while not self.ctx.audio_queue.empty():
+            self.ctx.audio_queue.get_nowait()
+            dropped += 1
+        
+        # Flush audio Twilio has already buffered
+        if self.ctx.stream_sid and self.ctx.ws.client_state == WebSocketState.CONNECTED:
+            try:
+                await self.ctx.ws.send_text(json.dumps({
+                    "event": "clear",
+                    "streamSid": self.ctx.stream_sid,
+                }))
+            except Exception as e:
+                logger.warning("Failed to clear Twilio audio: %s", str(e))
+        logger.info("Barge-in: speech cancelled, %d queued frames dropped", dropped)
     
     async def _send_audio_chunk(self, audio_bytes: bytes):
         """Send audio chunk to Twilio via the audio queue.
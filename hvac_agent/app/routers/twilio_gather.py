@@ -40,6 +40,7 @@ from fastapi import APIRouter, Request, Form, HTTPException
 from fastapi.responses import Response
 
 from app.utils.logging import get_logger
+from app.utils.tracing import bind_call, span, traced
 from app.services.hvac_knowledge import (
     get_hvac_insight, 
     get_troubleshooting_tips,
@@ -54,6 +55,7 @@ from app.services.session_store import (
 )
 from app.services.response_cache import get_faq_response, cache_response, get_cached_response
 from app.services.acknowledgments import get_acknowledgment, get_thinking_phrase
+from app.services.jobs import enqueue_sms
 from app.services.sentiment import analyze_sentiment, get_frustration_level, clear_analyzer
 
 logger = get_logger("twilio.gather")
@@ -531,6 +533,7 @@ def check_universal_commands(speech: str, session: Dict) -> Optional[Tuple[str,
     return None
 
 
+@traced("llm", purpose="smart_response")
 async def smart_gpt_response(speech: str, current_state: str, session: Dict) -> str:
     """
     Use GPT to generate a smart, contextual response for complex or off-topic queries.
@@ -673,24 +676,22 @@ def check_availability(date: str, time: str) -> Tuple[bool, str]:
 
 async def send_sms_confirmation(phone: str, name: str, date: str, time: str, address: str) -> bool:
     """
-    Send SMS confirmation (stub - configure Twilio SMS when ready).
-    Returns True if sent successfully.
+    Queue SMS confirmation (sent by the job workers over the shared Twilio session).
+    Returns True if queued.
     """
     if not TWILIO_ACCOUNT_SID or not TWILIO_AUTH_TOKEN or not TWILIO_PHONE_NUMBER:
         logger.info("SMS not configured - skipping confirmation SMS")
         return False
     
     try:
-        # Stub - will implement when Twilio SMS is configured
         message = f"Hi {name}! Your {COMPANY_NAME} appointment is confirmed for {date} ({time}) at {address}. Call {COMPANY_PHONE} to reschedule. Thank you!"
-        logger.info("SMS would be sent to %s: %s", phone, message)
-        # TODO: Implement actual Twilio SMS sending
-        # from twilio.rest import Client
-        # client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-        # client.messages.create(body=message, from_=TWILIO_PHONE_NUMBER, to=phone)
+        await asyncio.to_thread(
+            enqueue_sms, phone, message,
+            idempotency_key=f"gather_confirmation:{phone}:{date}:{time}",
+        )
         return True
     except Exception as e:
-        logger.error("Failed to send SMS: %s", str(e))
+        logger.error("Failed to queue SMS: %s", str(e))
         return False
 
 
@@ -852,6 +853,7 @@ def get_prompt(state: ConversationState, slots: Dict[str, Any] = None, key: str
 # =============================================================================
 # INTENT DETECTION & SLOT EXTRACTION (GPT-powered)
 # =============================================================================
+@traced("intent")
 async def analyze_speech(speech: str, current_state: ConversationState, session: Dict) -> Dict[str, Any]:
     """
     Analyze user speech using GPT to extract intent and slots.
@@ -1381,7 +1383,7 @@ async def process_state(
         if any(word in speech_lower for word in YES_WORDS):
             logger.info("BOOKING CONFIRMED: %s", slots)
             
-            # Try to send SMS confirmation (stub)
+            # Queue SMS confirmation
             await send_sms_confirmation(
                 slots.get("phone", ""),
                 slots.get("name", ""),
@@ -1605,6 +1607,7 @@ async def gather_incoming(request: Request):
     caller = form_dict.get("From", "unknown")
     
     logger.info("Incoming call [v%s]: CallSid=%s, From=%s", _VERSION, call_sid, caller)
+    bind_call(call_sid, "gather")
     
     # Initialize session
     session = get_session(call_sid)
@@ -1615,7 +1618,8 @@ async def gather_incoming(request: Request):
     
     # Generate TwiML with ElevenLabs
     host = request.headers.get("host", "")
-    twiml = await generate_twiml(greeting, ConversationState.GREETING, call_sid, host)
+    with span("answer"):
+        twiml = await generate_twiml(greeting, ConversationState.GREETING, call_sid, host)
     
     return Response(content=twiml, media_type="application/xml")
 
@@ -1633,6 +1637,7 @@ async def gather_respond(request: Request):
     """
     host = request.headers.get("host", "")
     action_url = f"https://{host}/twilio/gather/respond"
+    turn = None
     
     try:
         # Get form data - try cached first (from middleware), then parse fresh
@@ -1646,6 +1651,8 @@ async def gather_respond(request: Request):
         
         call_sid = form_dict.get("CallSid", "unknown")
         speech_result = form_dict.get("SpeechResult", "")
+        bind_call(call_sid, "gather")
+        turn = span("turn")
         confidence_str = form_dict.get("Confidence", "0")
         
         # Parse confidence as float
@@ -1792,6 +1799,9 @@ async def gather_respond(request: Request):
     </Gather>
 </Response>"""
         return Response(content=twiml, media_type="application/xml")
+    finally:
+        if turn is not None:
+            turn.end()
 
 
 @router.api_route("/twilio/gather/transfer", methods=["GET", "POST"])
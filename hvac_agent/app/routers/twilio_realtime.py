@@ -33,8 +33,10 @@ from fastapi.responses import Response
 import websockets
 from websockets.client import WebSocketClientProtocol
 
-from app.utils.logging import get_logger
+from app.utils.logging import get_logger, LogSampler
+from app.utils.tracing import record_span, span
 from app.services.transcript_collector import get_transcript_collector
+from app.services.job_queue import get_job_queue, PRIORITY_TRANSACTIONAL
 
 # Resend API configuration for lead notifications
 RESEND_API_KEY = os.getenv("RESEND_API_KEY")
@@ -76,7 +78,10 @@ CALLER_RATE_LIMIT_WINDOW = 3600  # 1 hour window
 
 # In-memory rate limiting (simple, resets on container restart)
 _caller_call_counts: dict = {}  # {caller_number: [(timestamp, call_sid), ...]}
-print(f"[REALTIME_MODULE_LOADED] Version: {_VERSION}")
+logger.info("[REALTIME_MODULE_LOADED] Version: %s", _VERSION)
+
+# Realtime events arrive per token/audio chunk: log each type at most once a second per call
+_EVENT_LOG = LogSampler(per_second=1)
 
 # =============================================================================
 # INDUSTRY-BEST CONVERSATION SCRIPT
@@ -305,6 +310,14 @@ class RealtimeSession:
         # Buffer for accumulating transcript text
         self.current_assistant_transcript: str = ""
         self.current_user_transcript: str = ""
+        
+        # Latency tracing (perf_counter marks, cleared once their span is recorded).
+        # The Twilio and OpenAI handlers run as separate tasks, so spans carry
+        # call_sid explicitly.
+        self.answer_pending: bool = True
+        self.speech_stopped_at: Optional[float] = None
+        self.transcription_started_at: Optional[float] = None
+        self.response_created_at: Optional[float] = None
     
     def _is_caller_rate_limited(self) -> bool:
         """Check if caller has exceeded rate limit (flood protection)."""
@@ -676,8 +689,8 @@ Then STOP. Let them respond. Don't keep talking."""
         """Process incoming message from OpenAI."""
         event_type = message.get("type")
         
-        # DEBUG: Log all event types to diagnose audio issues
-        if event_type not in ["response.audio.delta", "input_audio_buffer.append"]:
+        # DEBUG: Log event types to diagnose audio issues (sampled per call)
+        if event_type not in ["response.audio.delta", "input_audio_buffer.append"] and _EVENT_LOG.allow(event_type, self.call_sid):
             logger.info("OpenAI event: %s", event_type)
         
         if event_type == "session.created":
@@ -728,9 +741,11 @@ Then STOP. Let them respond. Don't keep talking."""
         elif event_type == "input_audio_buffer.speech_stopped":
             logger.info("User stopped speaking")
             self.last_user_speech_time = time.time()
+            self.speech_stopped_at = self.transcription_started_at = time.perf_counter()
             
         elif event_type == "response.created":
             self.response_in_progress = True
+            self.response_created_at = time.perf_counter()
             response = message.get("response", {})
             self.current_response_id = response.get("id")
             # Log full response details to debug audio issues
@@ -814,6 +829,10 @@ Then STOP. Let them respond. Don't keep talking."""
         elif event_type == "conversation.item.input_audio_transcription.completed":
             # User's speech has been transcribed - save for Gather model training
             transcript = message.get("transcript", "")
+            if self.transcription_started_at is not None:
+                record_span("stt", (time.perf_counter() - self.transcription_started_at) * 1000,
+                            self.call_sid, backend="realtime")
+                self.transcription_started_at = None
             if transcript and self.transcript_started and self.call_sid:
                 logger.info("User said: %s", transcript[:100])
                 self.transcript_collector.add_user_turn(self.call_sid, transcript)
@@ -854,6 +873,9 @@ Then STOP. Let them respond. Don't keep talking."""
         
         self.is_speaking = True
         self.last_audio_sent_time = current_time
+        first_audio = self.response_created_at is not None
+        if first_audio:
+            self._record_first_audio(time.perf_counter())
         
         try:
             # Decode PCM16 audio from OpenAI
@@ -899,7 +921,11 @@ Then STOP. Let them respond. Don't keep talking."""
             
             # Check WebSocket state before sending
             try:
-                await self.twilio_ws.send_text(json.dumps(media_message))
+                if first_audio:
+                    with span("twilio_send", self.call_sid):
+                        await self.twilio_ws.send_text(json.dumps(media_message))
+                else:
+                    await self.twilio_ws.send_text(json.dumps(media_message))
                 
                 # Send mark to track when this audio chunk finishes playing
                 mark_message = {
@@ -915,6 +941,18 @@ Then STOP. Let them respond. Don't keep talking."""
         except Exception as e:
             logger.error("Error forwarding audio to Twilio: %s", str(e))
     
+    def _record_first_audio(self, now: float):
+        """Record the latency spans ending at a response's first audio delta."""
+        record_span("tts_first_byte", (now - self.response_created_at) * 1000, self.call_sid, provider="realtime")
+        self.response_created_at = None
+        if self.answer_pending:
+            # Greeting: call connected -> first audio
+            self.answer_pending = False
+            record_span("answer", (time.time() - self.call_start_time) * 1000, self.call_sid)
+        elif self.speech_stopped_at is not None:
+            record_span("turn", (now - self.speech_stopped_at) * 1000, self.call_sid)
+        self.speech_stopped_at = None
+    
     async def handle_function_call(self, item: dict):
         """Handle function calls from OpenAI."""
         call_id = item.get("call_id")
@@ -933,6 +971,9 @@ Then STOP. Let them respond. Don't keep talking."""
             args = {}
         
         logger.info("Function call: %s with args: %s", name, args)
+        # Lead capture is this line's booking
+        tool_span = span("tool", self.call_sid, tool=name,
+                         metric="booking_execution" if name == "schedule_appointment" else None)
         
         result = {}
         
@@ -968,7 +1009,7 @@ Then STOP. Let them respond. Don't keep talking."""
             logger.info("   Notes: %s", lead["issue_description"])
             logger.info("=" * 60)
             
-            # Send email notification via Resend
+            # Queue email notification (sent via Resend by the job workers)
             await self.send_lead_email(lead)
             
             result = {
@@ -993,6 +1034,7 @@ Then STOP. Let them respond. Don't keep talking."""
         else:
             logger.warning("Unknown function called: %s", name)
             result = {"success": False, "message": f"Unknown function: {name}"}
+        tool_span.end()
         
         # Send function result back to OpenAI
         if self.openai_ws and self.openai_connected:
@@ -1094,50 +1136,17 @@ Then STOP. Let them respond. Don't keep talking."""
             logger.error("Error sending failure alert email: %s", str(e))
     
     async def send_lead_email(self, lead: dict):
-        """Send lead notification email via Resend API."""
-        if not RESEND_API_KEY:
-            logger.warning("RESEND_API_KEY not configured - skipping email notification")
-            return
-        
+        """Queue the lead notification email (sent by the job workers via Resend)."""
         try:
-            email_html = f"""
-            <h2>🎯 New Lead from AI Demo Line</h2>
-            <table style="border-collapse: collapse; width: 100%;">
-                <tr><td style="padding: 8px; border: 1px solid #ddd;"><strong>Lead ID</strong></td><td style="padding: 8px; border: 1px solid #ddd;">{lead['id']}</td></tr>
-                <tr><td style="padding: 8px; border: 1px solid #ddd;"><strong>Name</strong></td><td style="padding: 8px; border: 1px solid #ddd;">{lead['customer_name']}</td></tr>
-                <tr><td style="padding: 8px; border: 1px solid #ddd;"><strong>Company</strong></td><td style="padding: 8px; border: 1px solid #ddd;">{lead['company_name']}</td></tr>
-                <tr><td style="padding: 8px; border: 1px solid #ddd;"><strong>Phone</strong></td><td style="padding: 8px; border: 1px solid #ddd;">{lead['phone_number']}</td></tr>
-                <tr><td style="padding: 8px; border: 1px solid #ddd;"><strong>Email</strong></td><td style="padding: 8px; border: 1px solid #ddd;">{lead['email'] or 'Not provided'}</td></tr>
-                <tr><td style="padding: 8px; border: 1px solid #ddd;"><strong>Notes</strong></td><td style="padding: 8px; border: 1px solid #ddd;">{lead['issue_description']}</td></tr>
-                <tr><td style="padding: 8px; border: 1px solid #ddd;"><strong>Preferred Contact</strong></td><td style="padding: 8px; border: 1px solid #ddd;">{lead['preferred_date']} - {lead['preferred_time']}</td></tr>
-                <tr><td style="padding: 8px; border: 1px solid #ddd;"><strong>Captured At</strong></td><td style="padding: 8px; border: 1px solid #ddd;">{lead['timestamp']}</td></tr>
-            </table>
-            <p style="margin-top: 20px; color: #666;">This lead was captured by the AI Demo Line. Follow up ASAP!</p>
-            """
-            
-            async with httpx.AsyncClient() as client:
-                resp = await client.post(
-                    "https://api.resend.com/emails",
-                    headers={
-                        "Authorization": f"Bearer {RESEND_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "from": "AI Demo <leads@haiec.com>",
-                        "to": [LEAD_NOTIFICATION_EMAIL],
-                        "subject": f"🎯 New Lead: {lead['customer_name']} - {lead['company_name']}",
-                        "html": email_html
-                    },
-                    timeout=10.0
-                )
-                
-                if resp.status_code == 200:
-                    logger.info("✅ Lead email sent to %s", LEAD_NOTIFICATION_EMAIL)
-                else:
-                    logger.error("❌ Failed to send lead email: %s - %s", resp.status_code, resp.text)
-                    
+            await get_job_queue().aenqueue(
+                "leads.email",
+                {"lead": lead},
+                queue="leads",
+                priority=PRIORITY_TRANSACTIONAL,
+                idempotency_key=f"lead:{lead['call_sid']}:{lead['id']}",
+            )
         except Exception as e:
-            logger.error("❌ Error sending lead email: %s", str(e))
+            logger.error("❌ Error queueing lead email: %s", str(e))
     
     # =============================================================================
     # AUDIO CONVERSION UTILITIES
@@ -1299,6 +1308,7 @@ Then STOP. Let them respond. Don't keep talking."""
         
         self.closed = True
         self.openai_connected = False
+        _EVENT_LOG.forget(self.call_sid)
         
         # Calculate call duration
         call_duration = time.time() - self.call_start_time
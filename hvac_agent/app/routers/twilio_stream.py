@@ -6,14 +6,18 @@ Handles:
 - OpenAI Realtime API integration
 - Bidirectional audio streaming
 - Real-time conversation
+- Local barge-in: a VAD on the caller audio clears Twilio's playback
+  buffer the moment the caller talks over the agent
 
 This provides lower latency than turn-based voice but requires
 more complex setup and OpenAI Realtime API access.
 """
 
+import base64
 import json
 import os
 import asyncio
+import time
 from typing import Optional, Dict, Any
 from contextlib import asynccontextmanager
 
@@ -24,6 +28,7 @@ from websockets.exceptions import ConnectionClosed
 from app.utils.logging import get_logger
 from app.utils.audio import validate_base64_audio, AudioBuffer
 from app.utils.error_handler import handle_error
+from app.services.audio.vad import Endpointer
 
 router = APIRouter(tags=["twilio-stream"])
 logger = get_logger("twilio.stream")
@@ -137,6 +142,9 @@ class StreamBridge:
         self.is_running = True
         self.audio_buffer = AudioBuffer(max_duration_seconds=30)
         self._tasks: list = []
+        self.endpointer = Endpointer()
+        self._responding = False
+        self._playout_until = 0.0  # When Twilio finishes playing what we've sent
     
     async def start(self):
         """Start the bidirectional stream bridge."""
@@ -206,6 +214,7 @@ class StreamBridge:
                     payload = msg.get("media", {}).get("payload")
                     if payload and validate_base64_audio(payload):
                         await self._forward_audio_to_openai(payload)
+                        await self._detect_barge_in(payload)
                 
                 elif event == "stop":
                     logger.info("Twilio stream stop received")
@@ -249,6 +258,7 @@ class StreamBridge:
                     # Forward audio to Twilio
                     audio_b64 = msg.get("delta")
                     if audio_b64 and self.stream_sid:
+                        self._responding = True
                         await self._send_audio_to_twilio(audio_b64)
                 
                 elif msg_type == "response.audio.done":
@@ -261,6 +271,7 @@ class StreamBridge:
                         logger.debug("OpenAI text: %s", text)
                 
                 elif msg_type == "response.done":
+                    self._responding = False
                     logger.debug("OpenAI response complete")
                 
                 elif msg_type == "input_audio_buffer.speech_started":
@@ -291,8 +302,33 @@ class StreamBridge:
         except Exception as e:
             logger.error("Failed to forward audio to OpenAI: %s", str(e))
     
+    async def _detect_barge_in(self, audio_b64: str):
+        """Run the local VAD; interrupt the agent if the caller talks over it.
+        
+        The server VAD also notices, but only after a network round trip, and
+        it can't flush audio already queued at Twilio.
+        """
+        for event in self.endpointer.feed(base64.b64decode(audio_b64)):
+            if event.kind != "start" or time.monotonic() >= self._playout_until:
+                continue
+            logger.info("Barge-in: caller spoke over the agent")
+            self._playout_until = 0.0
+            try:
+                await self.twilio_ws.send_text(json.dumps({
+                    "event": "clear",
+                    "streamSid": self.stream_sid,
+                }))
+                if self._responding:
+                    self._responding = False
+                    await self.openai_ws.send(json.dumps({"type": "response.cancel"}))
+            except Exception as e:
+                logger.error("Failed to interrupt agent audio: %s", str(e))
+    
     async def _send_audio_to_twilio(self, audio_b64: str):
         """Send audio chunk to Twilio."""
+        # g711_ulaw: 8000 bytes per second of playback (4 base64 chars per 3 bytes)
+        now = time.monotonic()
+        self._playout_until = max(self._playout_until, now) + len(audio_b64) * 3 / 4 / 8000
         try:
             await self.twilio_ws.send_text(json.dumps({
                 "event": "media",
@@ -21,6 +21,7 @@ from sqlalchemy.orm import Session
 from app.agents import CallState, call_state_store, run_agent
 from app.services.db import get_db
 from app.services.emergency_service import detect_emergency, get_emergency_contact
+from app.services.sms_service import get_messaging_service
 from app.utils.logging import get_logger, log_call_event
 from app.utils.voice_config import get_voice_config, VoiceTone
 from app.utils.error_handler import handle_error, get_user_friendly_error
@@ -454,3 +455,20 @@ async def twilio_status(
         call_state_store.delete(CallSid)
     
     return {"status": "received"}
+
+
+@router.post("/twilio/sms/status")
+async def twilio_sms_status(
+    MessageSid: str = Form(...),
+    MessageStatus: str = Form(...),
+    ErrorCode: Optional[str] = Form(None),
+):
+    """
+    Handle Twilio SMS delivery-status webhook (TWILIO_SMS_STATUS_CALLBACK_URL).
+    
+    Aggregates queued/sent/delivered/undelivered/failed into SMS metrics.
+    """
+    get_messaging_service().record_status(MessageSid, MessageStatus, ErrorCode)
+    if MessageStatus in ("undelivered", "failed"):
+        logger.warning("SMS %s %s (error %s)", MessageSid, MessageStatus, ErrorCode)
+    return {"status": "received"}
@@ -21,6 +21,7 @@ from datetime import datetime
 from cachetools import TTLCache
 
 from app.utils.logging import get_logger
+from app.utils.metrics import register_stats
 
 logger = get_logger("acknowledgments")
 
@@ -251,6 +252,15 @@ def get_acknowledgment_manager() -> AcknowledgmentManager:
     global _acknowledgment_manager
     if _acknowledgment_manager is None:
         _acknowledgment_manager = AcknowledgmentManager()
+        register_stats(
+            "hvac_acknowledgments",
+            lambda: {
+                "spoken": _acknowledgment_manager.get_stats()["total_acknowledgments"],
+                "unique_phrases": len(_acknowledgment_manager._usage_count),
+            },
+            counters=("spoken",),
+            documentation="Filler phrases spoken",
+        )
     return _acknowledgment_manager
 
 
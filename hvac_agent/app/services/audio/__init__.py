@@ -4,13 +4,23 @@ Audio processing services for HVAC Voice Agent.
 Provides:
 - StreamingAudioConverter: Persistent FFmpeg pipeline for MP3 to μ-law conversion
 - MP3FrameBuffer: Buffer for handling MP3 frame boundaries
+- Endpointer: Voice activity detection and utterance endpointing
+- StreamingTranscriber: Incremental STT over overlapping windows
 """
 
 from app.services.audio.converter import StreamingAudioConverter, convert_mp3_to_ulaw
 from app.services.audio.buffer import MP3FrameBuffer
+from app.services.audio.vad import Endpointer, VADConfig, VoiceActivityDetector
+from app.services.audio.transcriber import StreamingTranscriber, WhisperBackend, LocalBackend
 
 __all__ = [
     "StreamingAudioConverter",
     "convert_mp3_to_ulaw",
     "MP3FrameBuffer",
+    "Endpointer",
+    "VADConfig",
+    "VoiceActivityDetector",
+    "StreamingTranscriber",
+    "WhisperBackend",
+    "LocalBackend",
 ]
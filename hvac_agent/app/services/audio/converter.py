@@ -18,9 +18,16 @@ from asyncio import Queue
 import time
 
 from app.utils.logging import get_logger
+from app.utils.metrics import counter, gauge
 
 logger = get_logger("audio.converter")
 
+_BYTES = counter("hvac_audio_converter_bytes_total", "Bytes through the FFmpeg converters", ("direction",))
+_ACTIVE = gauge("hvac_audio_converter_active", "Running FFmpeg converter processes")
+_START_FAILURES = counter("hvac_audio_converter_start_failures_total", "FFmpeg processes that failed to start")
+_BYTES_IN = _BYTES.labels("in")
+_BYTES_OUT = _BYTES.labels("out")
+
 # Twilio requires exactly 160 bytes per frame (20ms @ 8kHz μ-law)
 TWILIO_FRAME_SIZE = 160
 
@@ -94,6 +101,7 @@ class StreamingAudioConverter:
             
             self._running = True
             self._start_time = time.time()
+            _ACTIVE.inc()
             
             # Start background reader task
             self._reader_task = asyncio.create_task(self._read_output())
@@ -103,9 +111,11 @@ class StreamingAudioConverter:
             
         except FileNotFoundError:
             logger.error("FFmpeg not found - required for audio conversion")
+            _START_FAILURES.inc()
             return False
         except Exception as e:
             logger.error("Failed to start FFmpeg: %s", str(e))
+            _START_FAILURES.inc()
             return False
     
     async def feed(self, mp3_data: bytes) -> None:
@@ -126,6 +136,7 @@ class StreamingAudioConverter:
             self._process.stdin.write(mp3_data)
             await self._process.stdin.drain()
             self._bytes_in += len(mp3_data)
+            _BYTES_IN.inc(len(mp3_data))
         except Exception as e:
             logger.error("Error feeding data to FFmpeg: %s", str(e))
     
@@ -223,6 +234,7 @@ class StreamingAudioConverter:
                 pass
             
             self._process = None
+            _ACTIVE.dec()
         
         # Log stats
         if self._start_time:
@@ -262,6 +274,7 @@ class StreamingAudioConverter:
                     del buffer[:self.output_chunk_size]
                     await self._output_queue.put(frame)
                     self._bytes_out += len(frame)
+                    _BYTES_OUT.inc(len(frame))
             
             # Flush remaining buffer
             if buffer:
@@ -270,6 +283,7 @@ class StreamingAudioConverter:
                     buffer.extend(b'\x7f' * (self.output_chunk_size - len(buffer)))
                 await self._output_queue.put(bytes(buffer))
                 self._bytes_out += len(buffer)
+                _BYTES_OUT.inc(len(buffer))
                 
         except asyncio.CancelledError:
             pass
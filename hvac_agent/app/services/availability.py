@@ -0,0 +1,306 @@
+"""
+Availability index for appointment slots.
+
+Keeps, per location and day, a bitmap of booked hours (bit h = the
+h:00-h+1:00 slot), loaded from the database once per horizon and patched
+in place when bookings are created, rescheduled or cancelled. Google
+Calendar free/busy is fetched by a background thread into the same
+bitmap form, so slot lookups during a call are bit operations: no
+per-slot queries, no parsing and no network I/O.
+
+Provides:
+- AvailabilityIndex: is_free() / next_free() / book() / release()
+- FreeBusyCache: background-refreshed Google busy bitmaps with a
+  staleness bound (stale data is ignored rather than fetched inline)
+
+Every process keeps its own index; AVAILABILITY_INDEX_TTL bounds how long
+bookings made by other instances can go unseen (the booking commit path
+still checks the database).
+"""
+
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.db_models import Appointment, Location
+from app.utils.logging import get_logger
+from app.utils.metrics import register_stats
+
+logger = get_logger("availability")
+
+# Configuration
+AVAILABILITY_HORIZON_DAYS = int(os.getenv("AVAILABILITY_HORIZON_DAYS", "14"))
+AVAILABILITY_INDEX_TTL = float(os.getenv("AVAILABILITY_INDEX_TTL", "60"))
+FREEBUSY_REFRESH_SECONDS = float(os.getenv("FREEBUSY_REFRESH_SECONDS", "60"))
+FREEBUSY_MAX_STALENESS = float(os.getenv("FREEBUSY_MAX_STALENESS", "300"))
+CALENDAR_TIMEZONE = os.getenv("CALENDAR_TIMEZONE", "America/Chicago")
+WORKDAYS = (0, 1, 2, 3, 4)  # Monday-Friday
+
+
+def hours_mask(start_hour: int, end_hour: int) -> int:
+    """Bitmap with bits start_hour..end_hour-1 set"""
+    return ((1 << max(0, end_hour - start_hour)) - 1) << start_hour if end_hour > start_hour else 0
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Set bit positions, lowest first (one step per set bit)"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class FreeBusyCache:
+    """
+    Google Calendar busy hours as per-day bitmaps, refreshed off the call path.
+
+    `fetch(time_min, time_max)` returns the raw freebusy intervals
+    ([{"start": iso, "end": iso}, ...]); it only ever runs in the refresh
+    thread (or an explicit refresh()).
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str, str], List[Dict[str, str]]],
+        refresh_seconds: float = FREEBUSY_REFRESH_SECONDS,
+        max_staleness: float = FREEBUSY_MAX_STALENESS,
+        horizon_days: int = AVAILABILITY_HORIZON_DAYS,
+        timezone: str = CALENDAR_TIMEZONE,
+    ):
+        self.fetch = fetch
+        self.refresh_seconds = refresh_seconds
+        self.max_staleness = max_staleness
+        self.horizon_days = horizon_days
+        self.tz = ZoneInfo(timezone)
+        self._busy: Dict[date, int] = {}
+        self._fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = {"refreshes": 0, "refresh_errors": 0, "stale_reads": 0}
+
+    def refresh(self) -> None:
+        """Fetch busy intervals for the horizon and swap in new bitmaps."""
+        start = datetime.now(self.tz).replace(hour=0, minute=0, second=0, microsecond=0)
+        end = start + timedelta(days=self.horizon_days + 1)
+        try:
+            intervals = self.fetch(start.isoformat(), end.isoformat())
+        except Exception as e:
+            self.stats["refresh_errors"] += 1
+            logger.error("Free/busy refresh failed: %s", str(e))
+            return
+
+        busy: Dict[date, int] = {}
+        for interval in intervals:
+            try:
+                slot_start = datetime.fromisoformat(interval["start"]).astimezone(self.tz)
+                slot_end = datetime.fromisoformat(interval["end"]).astimezone(self.tz)
+            except (KeyError, ValueError) as e:
+                logger.warning("Skipping free/busy interval %s: %s", interval, e)
+                continue
+            # Mark every hour the interval overlaps, day by day
+            day = slot_start.date()
+            while day <= slot_end.date():
+                first = slot_start.hour if day == slot_start.date() else 0
+                if day == slot_end.date():
+                    last = slot_end.hour + (1 if slot_end.minute or slot_end.second else 0)
+                else:
+                    last = 24
+                busy[day] = busy.get(day, 0) | hours_mask(first, last)
+                day += timedelta(days=1)
+
+        with self._lock:
+            self._busy = busy
+            self._fetched_at = time.monotonic()
+        self.stats["refreshes"] += 1
+
+    def age(self) -> Optional[float]:
+        return None if self._fetched_at is None else time.monotonic() - self._fetched_at
+
+    def busy_mask(self, day: date) -> int:
+        """Busy hours for `day`; 0 when the data is missing or too stale to trust."""
+        age = self.age()
+        if age is None or age > self.max_staleness:
+            self.stats["stale_reads"] += 1
+            return 0
+        with self._lock:
+            return self._busy.get(day, 0)
+
+    def start(self) -> None:
+        """Start the background refresh thread (idempotent)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="freebusy-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.refresh_seconds)
+
+    def get_stats(self) -> Dict[str, object]:
+        age = self.age()
+        return {**self.stats, "age_seconds": round(age, 1) if age is not None else None, "days": len(self._busy)}
+
+
+class AvailabilityIndex:
+    """Per-location booked-hour bitmaps, loaded once and patched on writes."""
+
+    def __init__(
+        self,
+        horizon_days: int = AVAILABILITY_HORIZON_DAYS,
+        ttl: float = AVAILABILITY_INDEX_TTL,
+        freebusy: Optional[FreeBusyCache] = None,
+    ):
+        self.horizon_days = horizon_days
+        self.ttl = ttl
+        self.freebusy = freebusy
+        self._booked: Dict[int, Dict[date, int]] = {}
+        # location_id -> (first day, last day, loaded_at)
+        self._loaded: Dict[int, Tuple[date, date, float]] = {}
+        self._lock = threading.RLock()
+        self.stats = {"loads": 0, "queries": 0}
+
+    # ---- loading ----------------------------------------------------------
+
+    def _covers(self, location_id: int, first: date, last: date) -> bool:
+        loaded = self._loaded.get(location_id)
+        return bool(loaded and loaded[0] <= first and last <= loaded[1]
+                    and time.monotonic() - loaded[2] < self.ttl)
+
+    def ensure_loaded(self, db: Session, location_id: int, first: date, last: date) -> None:
+        """Load booked hours for [first, last] in one query unless already fresh."""
+        with self._lock:
+            if self._covers(location_id, first, last):
+                return
+            loaded = self._loaded.get(location_id)
+            if loaded and time.monotonic() - loaded[2] < self.ttl:
+                # Widen the range instead of reloading a narrower one
+                first, last = min(first, loaded[0]), max(last, loaded[1])
+            last = max(last, first + timedelta(days=self.horizon_days))
+
+            rows = db.execute(
+                select(Appointment.date, Appointment.time)
+                .where(Appointment.location_id == location_id)
+                .where(Appointment.date >= first)
+                .where(Appointment.date <= last)
+                .where(Appointment.is_cancelled == False)
+            ).all()
+            days: Dict[date, int] = {}
+            for day, slot_time in rows:
+                days[day] = days.get(day, 0) | (1 << slot_time.hour)
+            self._booked[location_id] = days
+            self._loaded[location_id] = (first, last, time.monotonic())
+            self.stats["loads"] += 1
+
+    def invalidate(self, location_id: Optional[int] = None) -> None:
+        with self._lock:
+            if location_id is None:
+                self._booked.clear()
+                self._loaded.clear()
+            else:
+                self._booked.pop(location_id, None)
+                self._loaded.pop(location_id, None)
+
+    # ---- incremental updates ------------------------------------------------
+
+    def book(self, location_id: int, day: date, hour: int) -> None:
+        with self._lock:
+            if location_id in self._booked:
+                days = self._booked[location_id]
+                days[day] = days.get(day, 0) | (1 << hour)
+
+    def release(self, location_id: int, day: date, hour: int) -> None:
+        with self._lock:
+            days = self._booked.get(location_id)
+            if days and day in days:
+                days[day] &= ~(1 << hour)
+
+    # ---- queries ----------------------------------------------------------
+
+    def free_mask(self, loc: Location, day: date) -> int:
+        """Open, unbooked, not-busy hours for an already loaded day"""
+        taken = self._booked.get(loc.id, {}).get(day, 0)
+        if self.freebusy is not None:
+            taken |= self.freebusy.busy_mask(day)
+        return hours_mask(loc.opening_hour, loc.closing_hour) & ~taken
+
+    def is_free(self, db: Session, loc: Location, day: date, hour: int) -> bool:
+        self.stats["queries"] += 1
+        self.ensure_loaded(db, loc.id, day, day)
+        with self._lock:
+            return bool(self.free_mask(loc, day) >> hour & 1)
+
+    def next_free(
+        self,
+        db: Session,
+        loc: Location,
+        start: date,
+        num_slots: int,
+        max_days: int = AVAILABILITY_HORIZON_DAYS,
+        workdays: Tuple[int, ...] = WORKDAYS,
+    ) -> List[Tuple[date, int]]:
+        """First `num_slots` free (day, hour) slots from `start`, at most `max_days` days ahead."""
+        self.stats["queries"] += 1
+        self.ensure_loaded(db, loc.id, start, start + timedelta(days=max_days - 1))
+        slots: List[Tuple[date, int]] = []
+        with self._lock:
+            for offset in range(max_days):
+                day = start + timedelta(days=offset)
+                if day.weekday() not in workdays:
+                    continue
+                for hour in iter_bits(self.free_mask(loc, day)):
+                    slots.append((day, hour))
+                    if len(slots) >= num_slots:
+                        return slots
+        return slots
+
+    def get_stats(self) -> Dict[str, object]:
+        stats = {**self.stats, "locations": len(self._booked)}
+        if self.freebusy is not None:
+            stats["freebusy"] = self.freebusy.get_stats()
+        return stats
+
+
+def _google_freebusy_cache() -> Optional[FreeBusyCache]:
+    """Free/busy cache for the configured Google calendar, if credentials exist"""
+    from app.core.config import settings
+
+    if not (settings.GOOGLE_CREDENTIALS_PATH and os.path.exists(settings.GOOGLE_CREDENTIALS_PATH)):
+        return None
+
+    def fetch(time_min: str, time_max: str) -> List[Dict[str, str]]:
+        from app.services.google_calendar_service import get_google_calendar_service
+        return get_google_calendar_service().get_busy_intervals(
+            settings.GOOGLE_CALENDAR_ID, time_min=time_min, time_max=time_max, time_zone=CALENDAR_TIMEZONE
+        )
+
+    cache = FreeBusyCache(fetch)
+    cache.start()
+    return cache
+
+
+# Singleton instance
+_availability_index: Optional[AvailabilityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_availability_index() -> AvailabilityIndex:
+    """Get or create the availability index (starts the free/busy refresher if configured)."""
+    global _availability_index
+    with _index_lock:
+        if _availability_index is None:
+            _availability_index = AvailabilityIndex(freebusy=_google_freebusy_cache())
+            register_stats("hvac_availability", _availability_index.get_stats,
+                           counters=("loads", "queries", "refreshes", "refresh_errors", "stale_reads"),
+                           documentation="Availability index")
+        return _availability_index
@@ -4,30 +4,33 @@ Calendar and appointment management service.
 Handles:
 - Location listing
 - Availability checking
-- Appointment booking
+- Appointment booking (slot holds + unique-index commit, no double booking)
 - Rescheduling
 - Cancellation
+- Next-day reminders (batched SMS)
 - Smart slot suggestions
-- Google Calendar synchronization
+- Google Calendar synchronization (write-behind via the calendar outbox)
 """
 
-import os
+import uuid
 from datetime import datetime, timedelta, date, time
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.models.db_models import Location, Appointment
 from app.utils.logging import get_logger
 from app.services.notification_service import (
     AppointmentDetails,
-    send_booking_confirmation,
     send_cancellation_notification,
-    send_reschedule_notification,
+    send_reminders,
 )
-from app.services.google_calendar_service import get_google_calendar_service
-from app.core.config import settings
+from app.services.jobs import enqueue_booking_confirmation, enqueue_reschedule_notification
+from app.services.calendar_sync import enqueue_calendar_sync
+from app.services.availability import get_availability_index
+from app.services.slot_reservations import get_slot_reservations
 
 logger = get_logger("calendar")
 
@@ -71,7 +74,8 @@ def check_availability(
     date_str: str,
     time_str: str,
     location_code: str,
-    duration_minutes: int = 60
+    duration_minutes: int = 60,
+    hold_for: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Check if a specific date/time slot is available.
@@ -82,6 +86,7 @@ def check_availability(
         time_str: Time in HH:MM format (24-hour)
         location_code: Location code (e.g., "DAL")
         duration_minutes: Appointment duration
+        hold_for: Caller (CallSid) to hold a free slot for while they confirm
         
     Returns:
         Availability status with details
@@ -108,25 +113,27 @@ def check_availability(
             "reason": f"Outside business hours. We're open {loc.opening_hour}:00 - {loc.closing_hour}:00."
         }
 
-    # Check for existing appointments at this slot
-    stmt = (
-        select(Appointment)
-        .where(Appointment.location_id == loc.id)
-        .where(Appointment.date == d)
-        .where(Appointment.time == t)
-        .where(Appointment.is_cancelled == False)
-    )
-    existing = db.scalar(stmt)
-    
-    if existing:
+    # Check booked/busy hours in the availability index (no per-slot query)
+    if not get_availability_index().is_free(db, loc, d, t.hour):
         return {"available": False, "reason": "This time slot is already booked."}
 
-    return {
+    # Another caller may be confirming this slot right now
+    holds = get_slot_reservations()
+    if hold_for:
+        if not holds.reserve(loc.id, d, t.hour, holder=hold_for):
+            return {"available": False, "reason": "Another caller is booking this time slot."}
+    elif holds.holder(loc.id, d, t.hour):
+        return {"available": False, "reason": "Another caller is booking this time slot."}
+
+    result = {
         "available": True,
         "location": loc.name,
         "date": date_str,
         "time": time_str
     }
+    if hold_for:
+        result["held_for_seconds"] = int(holds.ttl)
+    return result
 
 
 def get_next_available_slots(
@@ -138,8 +145,8 @@ def get_next_available_slots(
     """
     Get the next available appointment slots.
     
-    This function first checks the local database for availability and can optionally
-    sync with Google Calendar to check for conflicts.
+    Uses the in-memory availability index (local bookings plus cached Google
+    Calendar busy times), so no queries or API calls happen per slot.
     
     Args:
         db: Database session
@@ -162,92 +169,19 @@ def get_next_available_slots(
     else:
         current_date = datetime.now().date()
 
+    # Booked hours come from the availability index, Google busy hours from
+    # the background-refreshed free/busy cache (weekdays only)
     available_slots = []
-    days_checked = 0
-    max_days = 14  # Look up to 2 weeks ahead
-
-    # Get all booked slots for the next 14 days
-    booked_slots = db.scalars(
-        select(Appointment)
-        .where(
-            and_(
-                Appointment.location_id == loc.id,  # Use loc.id
-                Appointment.date >= current_date,   # Use .date
-                Appointment.date <= current_date + timedelta(days=14),
-                Appointment.status.in_(["scheduled", "rescheduled"]),
-                Appointment.is_cancelled == False,
-            )
-        )
-        .order_by(Appointment.date, Appointment.time)  # Use .date and .time
-    ).all()
-    
-    # Convert to a set of (date, time) tuples for quick lookup
-    booked_times = {
-        (slot.date, slot.time)
-        for slot in booked_slots
-    }
-    
-    # If Google Calendar is configured, check for busy times there too
-    if settings.GOOGLE_CREDENTIALS_PATH and os.path.exists(settings.GOOGLE_CREDENTIALS_PATH):
-        try:
-            calendar_service = get_google_calendar_service()
-            
-            # Format time range for Google Calendar API
-            time_min = datetime.combine(current_date, time.min).isoformat() + 'Z'  # 'Z' indicates UTC
-            time_max = (datetime.combine(current_date, time.min) + timedelta(days=14)).isoformat() + 'Z'
-            
-            # Get busy intervals from Google Calendar
-            busy_slots = calendar_service.get_available_slots(
-                settings.GOOGLE_CALENDAR_ID,
-                time_min=time_min,
-                time_max=time_max,
-                time_zone='America/Chicago'  # Adjust based on your timezone
-            )
-            
-            # Add Google Calendar busy times to our booked_times set
-            from dateutil import parser
-            
-            for slot in busy_slots:
-                try:
-                    slot_start = parser.parse(slot['start'])
-                    slot_date = slot_start.date()
-                    slot_time = slot_start.time()
-                    
-                    # Round to nearest 30 minutes to match our slot system
-                    minutes = (slot_time.minute // 30) * 30
-                    slot_time = slot_time.replace(minute=minutes, second=0, microsecond=0)
-                    
-                    booked_times.add((slot_date, slot_time))
-                except Exception as e:
-                    logger.warning(f"Error processing Google Calendar slot: {e}")
-                    
-        except Exception as e:
-            logger.error(f"Error checking Google Calendar availability: {e}")
-            # Continue with local availability if Google Calendar check fails
-
-    while len(available_slots) < num_slots and days_checked < max_days:
-        # Skip weekends (optional - remove if you work weekends)
-        if current_date.weekday() < 5:  # Monday = 0, Friday = 4
-            # Check each hour during business hours
-            for hour in range(loc.opening_hour, loc.closing_hour):
-                time_str = f"{hour:02d}:00"
-                date_str = current_date.strftime("%Y-%m-%d")
-                
-                # Check if this slot is booked or busy
-                if (current_date, datetime.strptime(time_str, "%H:%M").time()) in booked_times:
-                    continue
-                
-                available_slots.append({
-                    "date": date_str,
-                    "time": time_str,
-                    "display": f"{current_date.strftime('%A, %B %d')} at {hour}:00"
-                })
-                
-                if len(available_slots) >= num_slots:
-                    break
-
-        current_date += timedelta(days=1)
-        days_checked += 1
+    day_labels: Dict[date, Tuple[str, str]] = {}
+    for slot_date, hour in get_availability_index().next_free(db, loc, current_date, num_slots):
+        if slot_date not in day_labels:
+            day_labels[slot_date] = (slot_date.isoformat(), slot_date.strftime('%A, %B %d'))
+        date_str, day_label = day_labels[slot_date]
+        available_slots.append({
+            "date": date_str,
+            "time": f"{hour:02d}:00",
+            "display": f"{day_label} at {hour}:00"
+        })
 
     return available_slots
 
@@ -268,8 +202,8 @@ def create_booking(
     """
     Create a new appointment booking.
     
-    This function creates a booking in the local database and synchronizes it with
-    Google Calendar if configured.
+    This function creates a booking in the local database and queues its
+    Google Calendar event (written by the calendar sync worker).
     
     Args:
         db: Database session
@@ -291,6 +225,11 @@ def create_booking(
         If call_sid is provided, this function is idempotent - calling it
         multiple times with the same call_sid will return the existing booking
         instead of creating a duplicate.
+
+        The slot is held for the caller (reusing the hold check_availability
+        placed for the same call_sid) and the insert commits against the
+        unique index on active (location_id, date, time); when concurrent
+        callers race for a slot exactly one gets "success", the rest "taken".
     """
     loc = get_location_by_code(db, location_code)
     if not loc:
@@ -302,6 +241,7 @@ def create_booking(
         existing = db.scalar(
             select(Appointment)
             .where(Appointment.call_sid == call_sid)
+            .where(Appointment.is_cancelled == False)
             .order_by(Appointment.created_at.desc())
         )
         if existing:
@@ -309,12 +249,13 @@ def create_booking(
                 "status": "success",
                 "message": "Appointment already exists",
                 "appointment_id": existing.id,
-                "confirmation": f"Your appointment is already confirmed for {existing.appointment_date} at {existing.appointment_time}.",
+                "confirmation": f"Your appointment is already confirmed for {existing.date} at {existing.time.strftime('%H:%M')}.",
                 "google_event_id": existing.google_event_id,
             }
 
-    # Check availability first
-    avail = check_availability(db, date_str, time_str, location_code)
+    # Check availability first (and hold the slot while we write)
+    holder = call_sid or uuid.uuid4().hex
+    avail = check_availability(db, date_str, time_str, location_code, hold_for=holder)
     if not avail.get("available"):
         return {"status": "taken", "message": avail.get("reason", "Time slot not available.")}
 
@@ -324,100 +265,93 @@ def create_booking(
     except ValueError:
         return {"status": "error", "message": "Invalid date or time format."}
 
-    # Categorize the issue
-    issue_category = _categorize_issue(issue)
-
-    # Create the appointment in Google Calendar if configured
-    google_event_id = None
     try:
-        if settings.GOOGLE_CREDENTIALS_PATH and os.path.exists(settings.GOOGLE_CREDENTIALS_PATH):
-            calendar_service = get_google_calendar_service()
-            
-            # Format start and end times (assuming 1-hour appointment by default)
-            start_datetime = datetime.combine(appointment_date, appointment_time)
-            end_datetime = start_datetime + timedelta(hours=1)
-            
-            # Format for Google Calendar API
-            timezone = "America/Chicago"  # Adjust based on your timezone
-            event = {
-                'summary': f"HVAC Service - {name}",
-                'description': f"Service for: {name}\nIssue: {issue}\nPhone: {phone or 'Not provided'}",
-                'start': {
-                    'dateTime': start_datetime.isoformat(),
-                    'timeZone': timezone,
-                },
-                'end': {
-                    'dateTime': end_datetime.isoformat(),
-                    'timeZone': timezone,
-                },
-                'attendees': [{'email': email}] if email else [],
-                'reminders': {
-                    'useDefault': False,
-                    'overrides': [
-                        {'method': 'email', 'minutes': 24 * 60},  # 1 day before
-                        {'method': 'popup', 'minutes': 30},       # 30 min before
-                    ],
-                },
-            }
-            
-            # Add the event to Google Calendar
-            google_event = calendar_service.create_event(settings.GOOGLE_CALENDAR_ID, event)
-            if google_event:
-                google_event_id = google_event.get('id')
-                logger.info(f"Created Google Calendar event: {google_event_id}")
-    except Exception as e:
-        logger.error(f"Error creating Google Calendar event: {e}")
-        # Don't fail the booking if Google Calendar sync fails
-    
-    # Create the appointment in our database
+        return _commit_booking(
+            db, loc, name, appointment_date, appointment_time, issue,
+            phone=phone, email=email, call_sid=call_sid, priority=priority,
+            send_confirmation=send_confirmation,
+        )
+    finally:
+        get_slot_reservations().release(loc.id, appointment_date, appointment_time.hour, holder)
+
+
+def _commit_booking(
+    db: Session,
+    loc: Location,
+    name: str,
+    appointment_date: date,
+    appointment_time: time,
+    issue: str,
+    phone: Optional[str],
+    email: Optional[str],
+    call_sid: Optional[str],
+    priority: int,
+    send_confirmation: bool,
+) -> Dict[str, Any]:
+    """Insert a held slot's appointment; the unique index decides races."""
+    date_str = appointment_date.isoformat()
+    time_str = appointment_time.strftime("%H:%M")
+
+    # The index may lag bookings made by other instances; confirm against the database
+    if _slot_taken(db, loc.id, appointment_date, appointment_time):
+        get_availability_index().invalidate(loc.id)
+        return {"status": "taken", "message": "This time slot is already booked."}
+
+    # Commit first: the slot is ours only once the insert succeeds
     appointment = Appointment(
         customer_name=name,
-        date=appointment_date,  
+        date=appointment_date,
         time=appointment_time,
         issue=issue,
+        issue_category=_categorize_issue(issue),
         location_id=loc.id,
         customer_phone=phone,
-        # email=email,
+        customer_email=email,
         call_sid=call_sid,
         status="scheduled",
         priority=priority,
-        google_event_id=google_event_id,
     )
-    
     db.add(appointment)
-    db.commit()
+    enqueue_calendar_sync(db, appointment)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        get_availability_index().invalidate(loc.id)
+        logger.info("Slot %s %s at %s taken by a concurrent booking", date_str, time_str, loc.name)
+        return {"status": "taken", "message": "This time slot is already booked."}
     db.refresh(appointment)
-        
+    get_availability_index().book(loc.id, appointment_date, appointment_time.hour)
+
     logger.info(
         "Booking created: %s at %s %s for %s",
         name, date_str, time_str, loc.name
     )
         
-    # Send confirmation if requested
+    # Queue confirmation if requested (sent by the job workers)
     if send_confirmation and (email or phone):
         try:
             details = AppointmentDetails(
                 customer_name=name,
+                customer_phone=phone,
+                customer_email=email,
                 appointment_date=appointment_date,
                 appointment_time=appointment_time,
+                location_name=loc.name,
+                location_address=loc.address or "",
                 issue=issue,
-                # location_code=location_code,
-                location_id=loc.id,
-                confirmation_number=appointment.id,
-                phone=phone,
-                email=email,
-                google_event_id=google_event_id,
+                confirmation_id=appointment.id,
             )
-            send_booking_confirmation(details)
+            enqueue_booking_confirmation(details)
         except Exception as e:
-            logger.error(f"Error sending confirmation: {e}")
+            logger.error(f"Error queueing confirmation: {e}")
     
     return {
         "status": "success",
         "message": "Appointment created successfully",
         "appointment_id": appointment.id,
         "confirmation": f"Your appointment has been confirmed for {appointment_date} at {appointment_time}.",
-        "google_event_id": google_event_id,
+        "google_event_id": appointment.google_event_id,
     }
 
 
@@ -427,11 +361,15 @@ def reschedule_booking(
     new_date: str,
     new_time: str,
     location_code: str,
+    call_sid: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Reschedule the most recent appointment for a customer.
     
-    This updates the appointment in both the local database and Google Calendar.
+    This updates the appointment in the local database and queues the Google
+    Calendar update. The new slot is held and the move commits against the
+    unique slot index, so a reschedule can't land on a slot another caller
+    just booked.
     
     Args:
         db: Database session
@@ -439,6 +377,7 @@ def reschedule_booking(
         new_date: New date in YYYY-MM-DD format
         new_time: New time in HH:MM format
         location_code: Location code
+        call_sid: Twilio CallSid holding the new slot (optional)
         
     Returns:
         Reschedule result with status
@@ -468,85 +407,69 @@ def reschedule_booking(
     if not appointment:
         return {"status": "not_found", "message": "No upcoming appointment found to reschedule."}
 
-    # Check new slot availability
-    avail = check_availability(db, new_date, new_time, location_code)
+    # Check new slot availability (and hold it while we write)
+    holder = call_sid or uuid.uuid4().hex
+    avail = check_availability(db, new_date, new_time, location_code, hold_for=holder)
     if not avail.get("available"):
         return {"status": "taken", "message": avail.get("reason", "New time slot is not available.")}
+    try:
+        return _commit_reschedule(db, loc, appointment, new_d, new_t)
+    finally:
+        get_slot_reservations().release(loc.id, new_d, new_t.hour, holder)
 
-    # Update the appointment in Google Calendar if it exists there
-    if appointment.google_event_id and settings.GOOGLE_CREDENTIALS_PATH and os.path.exists(settings.GOOGLE_CREDENTIALS_PATH):
-        try:
-            calendar_service = get_google_calendar_service()
-            
-            # Format start and end times (assuming 1-hour appointment by default)
-            start_datetime = datetime.combine(
-                datetime.strptime(new_date, '%Y-%m-%d').date(),
-                datetime.strptime(new_time, '%H:%M').time()
-            )
-            end_datetime = start_datetime + timedelta(hours=1)
-            
-            # Format for Google Calendar API
-            timezone = "America/Chicago"  # Adjust based on your timezone
-            event = {
-                'summary': f"HVAC Service - {appointment.customer_name}",
-                'start': {
-                    'dateTime': start_datetime.isoformat(),
-                    'timeZone': timezone,
-                },
-                'end': {
-                    'dateTime': end_datetime.isoformat(),
-                    'timeZone': timezone,
-                },
-                'description': f"Service for: {appointment.customer_name}\nIssue: {appointment.issue}",
-            }
-            
-            # Update the event in Google Calendar
-            updated_event = calendar_service.update_event(
-                settings.GOOGLE_CALENDAR_ID,
-                appointment.google_event_id,
-                event
-            )
-            
-            if updated_event:
-                logger.info(f"Updated Google Calendar event: {appointment.google_event_id}")
-            
-        except Exception as e:
-            logger.error(f"Error updating Google Calendar event: {e}")
-            # Continue with local update even if Google Calendar update fails
-    
-    # Update the appointment in our database
+
+def _commit_reschedule(
+    db: Session,
+    loc: Location,
+    appointment: Appointment,
+    new_d: date,
+    new_t: time,
+) -> Dict[str, Any]:
+    """Move an appointment into a held slot; the unique index decides races."""
+    new_date = new_d.isoformat()
+    new_time = new_t.strftime("%H:%M")
+    if _slot_taken(db, loc.id, new_d, new_t):
+        get_availability_index().invalidate(loc.id)
+        return {"status": "taken", "message": "New time slot is not available."}
+
+    # Move the appointment in our database first: the slot is ours only once this commits
     old_date = appointment.date
     old_time = appointment.time
     
-    appointment.date = datetime.strptime(new_date, '%Y-%m-%d').date()
-    appointment.time = datetime.strptime(new_time, '%H:%M').time()
+    appointment.date = new_d
+    appointment.time = new_t
     appointment.status = "rescheduled"
     appointment.updated_at = datetime.utcnow()
+    enqueue_calendar_sync(db, appointment)
     
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        get_availability_index().invalidate(loc.id)
+        logger.info("Slot %s %s at %s taken by a concurrent booking", new_date, new_time, loc.name)
+        return {"status": "taken", "message": "New time slot is not available."}
     db.refresh(appointment)
-    
-    # Send reschedule notification
+    index = get_availability_index()
+    index.release(loc.id, old_date, old_time.hour)
+    index.book(loc.id, new_d, new_t.hour)
+
+    # Queue reschedule notification
     try:
         details = AppointmentDetails(
             customer_name=appointment.customer_name,
             customer_phone=appointment.customer_phone,
             customer_email=appointment.customer_email,
-            appointment_date=datetime.strptime(new_date, '%Y-%m-%d').date(),
-            appointment_time=datetime.strptime(new_time, '%H:%M').time(),
+            appointment_date=new_d,
+            appointment_time=new_t,
             location_name=loc.name,
             location_address=loc.address or "",
             issue=appointment.issue,
             confirmation_id=appointment.id,
         )
-        # send_reschedule_notification(details)
-        send_reschedule_notification(
-            details=details,
-            old_date=old_date,
-            old_time=old_time
-        )
+        enqueue_reschedule_notification(details, old_date=old_date, old_time=old_time)
     except Exception as e:
-        logger.error(f"Error sending reschedule notification: {e}")
+        logger.error(f"Error queueing reschedule notification: {e}")
     
     return {
         "status": "success",
@@ -567,7 +490,8 @@ def cancel_booking(
     """
     Cancel an appointment.
     
-    This cancels the appointment in both the local database and Google Calendar.
+    This cancels the appointment in the local database and queues removal of
+    its Google Calendar event.
     
     Args:
         db: Database session
@@ -603,24 +527,14 @@ def cancel_booking(
     if not appt:
         return {"status": "not_found", "message": "No appointment found to cancel."}
 
-    # Delete from Google Calendar if it exists there
-    if appt.google_event_id and settings.GOOGLE_CREDENTIALS_PATH and os.path.exists(settings.GOOGLE_CREDENTIALS_PATH):
-        try:
-            calendar_service = get_google_calendar_service()
-            calendar_service.delete_event(
-                settings.GOOGLE_CALENDAR_ID,
-                appt.google_event_id
-            )
-            logger.info(f"Deleted Google Calendar event: {appt.google_event_id}")
-        except Exception as e:
-            logger.error(f"Error deleting Google Calendar event: {e}")
-            # Continue with local cancellation even if Google Calendar deletion fails
-    
     # Update the appointment in our database
     appt.is_cancelled = True
+    appt.status = "cancelled"
+    enqueue_calendar_sync(db, appt)
     
     try:
         db.commit()
+        get_availability_index().release(appt.location_id, appt.date, appt.time.hour)
         logger.info("Appointment cancelled: %s on %s", name, appt.date.isoformat())
         return {
             "status": "success",
@@ -632,6 +546,59 @@ def cancel_booking(
         return {"status": "error", "message": "Failed to cancel. Please try again."}
 
 
+async def send_next_day_reminders(db: Session, day: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Send reminder SMS for every active appointment on `day` (default: tomorrow)
+    as one batch over the shared Twilio session.
+    
+    Args:
+        db: Database session
+        day: Appointment date to remind for
+        
+    Returns:
+        Reminder counts and per-appointment results
+    """
+    day = day or (datetime.now().date() + timedelta(days=1))
+    stmt = (
+        select(Appointment, Location)
+        .join(Location, Appointment.location_id == Location.id)
+        .where(Appointment.date == day)
+        .where(Appointment.is_cancelled == False)
+        .where(Appointment.customer_phone.isnot(None))
+        .order_by(Appointment.time.asc())
+    )
+    appointments = [
+        AppointmentDetails(
+            customer_name=appt.customer_name,
+            customer_phone=appt.customer_phone,
+            customer_email=appt.customer_email,
+            appointment_date=appt.date,
+            appointment_time=appt.time,
+            location_name=loc.name,
+            location_address=loc.address or "",
+            issue=appt.issue,
+            confirmation_id=appt.id,
+        )
+        for appt, loc in db.execute(stmt).all()
+    ]
+    result = await send_reminders(appointments)
+    logger.info("Reminders for %s: %d appointments", day.isoformat(), len(appointments))
+    return {"date": day.isoformat(), "appointments": len(appointments), **result}
+
+
+def _slot_taken(db: Session, location_id: int, slot_date: date, slot_time: time) -> bool:
+    """Authoritative check for an active appointment in the slot's hour."""
+    return db.scalar(
+        select(Appointment.id)
+        .where(Appointment.location_id == location_id)
+        .where(Appointment.date == slot_date)
+        .where(Appointment.time >= slot_time.replace(minute=0, second=0, microsecond=0))
+        .where(Appointment.time <= slot_time.replace(minute=59, second=59, microsecond=0))
+        .where(Appointment.is_cancelled == False)
+        .limit(1)
+    ) is not None
+
+
 def _categorize_issue(issue: str) -> str:
     """Categorize HVAC issue based on keywords."""
     issue_lower = issue.lower()
@@ -0,0 +1,573 @@
+"""
+Write-behind Google Calendar sync for HVAC Voice Agent.
+
+Booking, rescheduling and cancelling only add a row to the calendar_outbox
+table in the same transaction as the appointment change; this worker
+writes the changes to Google Calendar in the background, so call handling
+never waits on (or fails with) the Google API.
+
+Provides:
+- Outbox drain: due rows are leased, collapsed per appointment and sent
+  as one Google batch HTTP request (up to CALENDAR_SYNC_BATCH_SIZE calls)
+- Retries with exponential backoff + jitter, then a dead state
+- Conflict handling: the database is the source of truth. Inserts use a
+  deterministic event id (a repeated insert gets 409 and becomes an
+  update), updates of events deleted in Google re-create them, deletes of
+  events already gone succeed
+- Periodic full reconciliation: Google events tagged with our appointment
+  ids are compared with the database, drift is queued and orphaned
+  events are deleted
+
+Usage:
+    from app.services.calendar_sync import enqueue_calendar_sync
+
+    enqueue_calendar_sync(db, appointment)
+    db.commit()
+
+Worker (started by the app when Google Calendar is configured):
+    python -m app.services.calendar_sync            # run until stopped
+    python -m app.services.calendar_sync --once     # drain one batch
+    python -m app.services.calendar_sync --reconcile
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from googleapiclient.errors import HttpError
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.db_models import Appointment, CalendarOutbox, Location
+from app.utils.logging import get_logger
+from app.utils.metrics import register_stats
+
+logger = get_logger("calendar_sync")
+
+# Configuration
+CALENDAR_SYNC_BATCH_SIZE = int(os.getenv("CALENDAR_SYNC_BATCH_SIZE", "50"))  # Google's batch limit is 50 for Calendar
+CALENDAR_SYNC_INTERVAL = float(os.getenv("CALENDAR_SYNC_INTERVAL", "2"))
+CALENDAR_SYNC_MAX_ATTEMPTS = int(os.getenv("CALENDAR_SYNC_MAX_ATTEMPTS", "8"))
+CALENDAR_SYNC_LEASE_SECONDS = float(os.getenv("CALENDAR_SYNC_LEASE_SECONDS", "120"))
+CALENDAR_RECONCILE_SECONDS = float(os.getenv("CALENDAR_RECONCILE_SECONDS", "3600"))
+CALENDAR_RECONCILE_DAYS = int(os.getenv("CALENDAR_RECONCILE_DAYS", "30"))
+CALENDAR_TIMEZONE = os.getenv("CALENDAR_TIMEZONE", "America/Chicago")
+# "auto": sync when Google credentials are present
+CALENDAR_SYNC_ENABLED = os.getenv("CALENDAR_SYNC_ENABLED", "auto").lower()
+
+# Private extended property marking events this app owns
+EVENT_SOURCE = "hvac_agent"
+
+
+def calendar_sync_enabled() -> bool:
+    """Whether appointment changes should be queued for Google Calendar"""
+    if CALENDAR_SYNC_ENABLED in ("auto", ""):
+        from app.core.config import settings
+        return bool(settings.GOOGLE_CREDENTIALS_PATH and os.path.exists(settings.GOOGLE_CREDENTIALS_PATH))
+    return CALENDAR_SYNC_ENABLED in ("1", "true", "yes")
+
+
+def enqueue_calendar_sync(db: Session, appointment: Appointment) -> Optional[CalendarOutbox]:
+    """
+    Queue a Google Calendar write for `appointment`.
+
+    Adds the outbox row to the caller's session; it is committed (or rolled
+    back) together with the appointment change. No-op when sync is disabled.
+    """
+    if not calendar_sync_enabled():
+        return None
+    row = CalendarOutbox(appointment=appointment)
+    db.add(row)
+    return row
+
+
+def event_id_for(appointment_id: int) -> str:
+    """Deterministic Google event id (base32hex: 0-9, a-v) for an appointment"""
+    return f"hvacappt{appointment_id}"
+
+
+def event_body(appointment: Appointment, location: Optional[Location]) -> Dict[str, Any]:
+    """Google Calendar event for the appointment's current state"""
+    timezone = (location.timezone if location else None) or CALENDAR_TIMEZONE
+    start = datetime.combine(appointment.date, appointment.time)
+    end = start + timedelta(minutes=appointment.estimated_duration or 60)
+    body = {
+        'summary': f"HVAC Service - {appointment.customer_name}",
+        'description': (
+            f"Service for: {appointment.customer_name}\n"
+            f"Issue: {appointment.issue}\n"
+            f"Phone: {appointment.customer_phone or 'Not provided'}"
+        ),
+        'start': {'dateTime': start.isoformat(), 'timeZone': timezone},
+        'end': {'dateTime': end.isoformat(), 'timeZone': timezone},
+        'attendees': [{'email': appointment.customer_email}] if appointment.customer_email else [],
+        'reminders': {
+            'useDefault': False,
+            'overrides': [
+                {'method': 'email', 'minutes': 24 * 60},  # 1 day before
+                {'method': 'popup', 'minutes': 30},       # 30 min before
+            ],
+        },
+        'extendedProperties': {
+            'private': {'source': EVENT_SOURCE, 'hvac_appointment_id': str(appointment.id)},
+        },
+    }
+    if location and location.address:
+        body['location'] = location.address
+    return body
+
+
+def _http_status(error: Exception) -> Optional[int]:
+    if isinstance(error, HttpError):
+        return getattr(error, "status_code", None) or int(error.resp.status)
+    return None
+
+
+class CalendarSyncWorker:
+    """Drains the calendar outbox into Google Calendar batch requests."""
+
+    def __init__(
+        self,
+        service_factory: Callable[[], Any],
+        calendar_id: str,
+        session_factory: Optional[Callable[[], Session]] = None,
+        batch_size: int = CALENDAR_SYNC_BATCH_SIZE,
+        max_attempts: int = CALENDAR_SYNC_MAX_ATTEMPTS,
+        lease_seconds: float = CALENDAR_SYNC_LEASE_SECONDS,
+        interval: float = CALENDAR_SYNC_INTERVAL,
+        reconcile_seconds: float = CALENDAR_RECONCILE_SECONDS,
+        reconcile_days: int = CALENDAR_RECONCILE_DAYS,
+    ):
+        self.service_factory = service_factory
+        self.calendar_id = calendar_id
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.interval = interval
+        self.reconcile_seconds = reconcile_seconds
+        self.reconcile_days = reconcile_days
+        self._service = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_reconcile: Optional[float] = None
+        self.stats = {
+            "batches": 0, "synced": 0, "retried": 0, "dead": 0, "conflicts": 0,
+            "reconciles": 0, "drift": 0, "orphans_deleted": 0, "last_batch_ms": None,
+        }
+
+    @property
+    def service(self):
+        if self._service is None:
+            self._service = self.service_factory()
+        return self._service
+
+    def _session(self) -> Session:
+        if self.session_factory is None:
+            from app.services.db import SessionLocal
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    # ---- claiming -----------------------------------------------------------
+
+    def _claim(self, db: Session, now: datetime) -> Dict[int, Tuple[int, int]]:
+        """
+        Lease due outbox rows, grouped by appointment.
+
+        Returns {appointment_id: (highest claimed row id, attempts so far)}.
+        Rows added after the claim have higher ids and stay pending for the
+        next pass.
+        """
+        due = db.execute(
+            select(
+                CalendarOutbox.appointment_id,
+                func.max(CalendarOutbox.id),
+                func.max(CalendarOutbox.attempts),
+            )
+            .where(CalendarOutbox.status == "pending")
+            .where(CalendarOutbox.next_attempt_at <= now)
+            .where(or_(CalendarOutbox.lease_until.is_(None), CalendarOutbox.lease_until < now))
+            .group_by(CalendarOutbox.appointment_id)
+            .order_by(func.min(CalendarOutbox.id))
+            .limit(self.batch_size)
+        ).all()
+
+        claimed: Dict[int, Tuple[int, int]] = {}
+        lease_until = now + timedelta(seconds=self.lease_seconds)
+        for appointment_id, max_id, attempts in due:
+            # Conditional update: another worker may have leased these rows meanwhile
+            result = db.execute(
+                update(CalendarOutbox)
+                .where(CalendarOutbox.appointment_id == appointment_id)
+                .where(CalendarOutbox.status == "pending")
+                .where(CalendarOutbox.id <= max_id)
+                .where(or_(CalendarOutbox.lease_until.is_(None), CalendarOutbox.lease_until < now))
+                .values(lease_until=lease_until)
+            )
+            if result.rowcount:
+                claimed[appointment_id] = (max_id, attempts)
+        db.commit()
+        return claimed
+
+    def _settle(self, db: Session, appointment_id: int, max_id: int, values: Dict[str, Any]) -> None:
+        db.execute(
+            update(CalendarOutbox)
+            .where(CalendarOutbox.appointment_id == appointment_id)
+            .where(CalendarOutbox.status == "pending")
+            .where(CalendarOutbox.id <= max_id)
+            .values(lease_until=None, updated_at=datetime.utcnow(), **values)
+        )
+
+    def _retry_later(self, db: Session, appointment_id: int, max_id: int, attempts: int, error: str,
+                     delay: Optional[float] = None) -> None:
+        """Count a failed attempt; retry after backoff (or `delay`), or give up."""
+        attempts += 1
+        if attempts >= self.max_attempts:
+            self.stats["dead"] += 1
+            logger.error("Calendar sync for appointment %s gave up after %d attempts: %s",
+                         appointment_id, attempts, error)
+            self._settle(db, appointment_id, max_id, {"status": "dead", "attempts": attempts, "last_error": error})
+            return
+        if delay is None:
+            delay = min(3600.0, 2.0 * 2 ** attempts) * random.uniform(0.8, 1.2)
+        self.stats["retried"] += 1
+        self._settle(db, appointment_id, max_id, {
+            "attempts": attempts,
+            "last_error": error,
+            "next_attempt_at": datetime.utcnow() + timedelta(seconds=delay),
+        })
+
+    # ---- draining -----------------------------------------------------------
+
+    def _plan(self, appointment: Optional[Appointment]) -> Optional[Tuple[str, str, Optional[Dict[str, Any]]]]:
+        """(operation, event id, body) that brings Google in line with the row"""
+        if appointment is None:
+            return None
+        if appointment.is_cancelled:
+            return ("delete", appointment.google_event_id, None) if appointment.google_event_id else None
+        body = event_body(appointment, appointment.location)
+        if appointment.google_event_id:
+            # Setting status also restores an event someone deleted in Google
+            return "update", appointment.google_event_id, {**body, "status": "confirmed"}
+        event_id = event_id_for(appointment.id)
+        return "insert", event_id, {**body, "id": event_id}
+
+    def _request(self, operation: str, event_id: str, body: Optional[Dict[str, Any]]):
+        events = self.service.events()
+        if operation == "insert":
+            return events.insert(calendarId=self.calendar_id, body=body, sendUpdates='all')
+        if operation == "update":
+            return events.update(calendarId=self.calendar_id, eventId=event_id, body=body, sendUpdates='all')
+        return events.delete(calendarId=self.calendar_id, eventId=event_id, sendUpdates='all')
+
+    def _execute_batch(self, requests: Dict[str, Any]) -> Dict[str, Tuple[Any, Optional[Exception]]]:
+        """Send {request_id: request} as one batch HTTP call; returns {request_id: (response, error)}."""
+        results: Dict[str, Tuple[Any, Optional[Exception]]] = {}
+
+        def callback(request_id, response, exception):
+            results[request_id] = (response, exception)
+
+        batch = self.service.new_batch_http_request(callback=callback)
+        for request_id, request in requests.items():
+            batch.add(request, request_id=request_id)
+        batch.execute()
+        return results
+
+    def run_once(self) -> int:
+        """Drain one batch of due outbox rows; returns the number of appointments handled."""
+        if self.service is None:
+            return 0
+        db = self._session()
+        try:
+            claimed = self._claim(db, datetime.utcnow())
+            if not claimed:
+                return 0
+
+            appointments = {
+                appt.id: appt for appt in db.scalars(
+                    select(Appointment).where(Appointment.id.in_(claimed))
+                )
+            }
+            plans: Dict[int, Tuple[str, str, Optional[Dict[str, Any]]]] = {}
+            for appointment_id, (max_id, _) in claimed.items():
+                plan = self._plan(appointments.get(appointment_id))
+                if plan is None:
+                    self._settle(db, appointment_id, max_id, {"status": "done"})
+                else:
+                    plans[appointment_id] = plan
+
+            started = time.perf_counter()
+            try:
+                results = self._execute_batch({
+                    str(appointment_id): self._request(*plan) for appointment_id, plan in plans.items()
+                }) if plans else {}
+            except Exception as e:
+                # The whole batch failed (transport, auth); every row retries
+                logger.error("Calendar batch failed: %s", str(e))
+                results = {str(appointment_id): (None, e) for appointment_id in plans}
+            self.stats["batches"] += 1
+            self.stats["last_batch_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+            for appointment_id, (operation, event_id, _) in plans.items():
+                max_id, attempts = claimed[appointment_id]
+                response, error = results.get(str(appointment_id), (None, RuntimeError("no batch response")))
+                self._apply(db, appointments[appointment_id], max_id, attempts, operation, event_id, response, error)
+            db.commit()
+            return len(claimed)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _apply(self, db: Session, appointment: Appointment, max_id: int, attempts: int,
+               operation: str, event_id: str, response: Any, error: Optional[Exception]) -> None:
+        """Record one batch result on the appointment and its outbox rows."""
+        if error is None:
+            if operation == "delete":
+                appointment.google_event_id = None
+            elif response and response.get("id"):
+                appointment.google_event_id = response["id"]
+            self.stats["synced"] += 1
+            self._settle(db, appointment.id, max_id, {"status": "done"})
+            return
+
+        status = _http_status(error)
+        if operation == "insert" and status == 409:
+            # Our id already exists: an earlier insert went through (or the
+            # event was deleted in Google). Adopt it; the next pass updates it.
+            self.stats["conflicts"] += 1
+            appointment.google_event_id = event_id
+            self._retry_later(db, appointment.id, max_id, attempts, f"409 on insert of {event_id}", delay=0)
+        elif operation == "update" and status in (404, 410):
+            # Event is gone from Google (or never existed there); re-create it
+            self.stats["conflicts"] += 1
+            appointment.google_event_id = None
+            self._retry_later(db, appointment.id, max_id, attempts, f"{status} on update of {event_id}", delay=0)
+        elif operation == "delete" and status in (404, 410):
+            appointment.google_event_id = None
+            self.stats["synced"] += 1
+            self._settle(db, appointment.id, max_id, {"status": "done"})
+        elif status == 400:
+            self.stats["dead"] += 1
+            logger.error("Google rejected %s for appointment %s: %s", operation, appointment.id, error)
+            self._settle(db, appointment.id, max_id, {
+                "status": "dead", "attempts": attempts + 1, "last_error": str(error)[:1000],
+            })
+        else:
+            self._retry_later(db, appointment.id, max_id, attempts, str(error)[:1000])
+
+    # ---- reconciliation -----------------------------------------------------
+
+    def _list_events(self, time_min: str, time_max: str) -> List[Dict[str, Any]]:
+        events: List[Dict[str, Any]] = []
+        page_token = None
+        while True:
+            page = self.service.events().list(
+                calendarId=self.calendar_id,
+                timeMin=time_min,
+                timeMax=time_max,
+                privateExtendedProperty=f"source={EVENT_SOURCE}",
+                singleEvents=True,
+                maxResults=250,
+                pageToken=page_token,
+            ).execute()
+            events.extend(page.get("items", []))
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                return events
+
+    @staticmethod
+    def _event_start(event: Dict[str, Any], timezone: str) -> Optional[datetime]:
+        try:
+            start = datetime.fromisoformat(event["start"]["dateTime"])
+        except (KeyError, ValueError):
+            return None
+        if start.tzinfo is not None:
+            start = start.astimezone(ZoneInfo(timezone)).replace(tzinfo=None)
+        return start
+
+    def reconcile(self) -> Dict[str, int]:
+        """
+        Compare Google with the database over the reconcile window.
+
+        Queues a sync for every appointment whose event is missing, moved or
+        should not exist, adopts events whose id we lost, and deletes events
+        whose appointment no longer exists.
+        """
+        if self.service is None:
+            return {"events": 0, "drift": 0, "orphans_deleted": 0}
+        tz = ZoneInfo(CALENDAR_TIMEZONE)
+        first = datetime.now(tz).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+        last = first + timedelta(days=self.reconcile_days + 1)
+
+        by_appointment: Dict[int, Dict[str, Any]] = {}
+        for event in self._list_events(first.isoformat(), last.isoformat()):
+            private = event.get("extendedProperties", {}).get("private", {})
+            try:
+                by_appointment[int(private["hvac_appointment_id"])] = event
+            except (KeyError, ValueError):
+                continue
+
+        db = self._session()
+        drift = 0
+        try:
+            pending = set(db.scalars(
+                select(CalendarOutbox.appointment_id).where(CalendarOutbox.status == "pending")
+            ))
+            appointments = {
+                appt.id: appt for appt in db.scalars(
+                    select(Appointment)
+                    .where(or_(
+                        Appointment.date.between(first.date(), last.date()),
+                        Appointment.id.in_(list(by_appointment)),
+                    ))
+                )
+            }
+            for appt in appointments.values():
+                if appt.id in pending:
+                    continue  # Already on its way
+                event = by_appointment.get(appt.id)
+                if event is not None and appt.google_event_id != event["id"]:
+                    appt.google_event_id = event["id"]
+                if appt.is_cancelled:
+                    needs_sync = event is not None
+                elif event is None:
+                    needs_sync = first.date() <= appt.date <= last.date()
+                else:
+                    timezone = (appt.location.timezone if appt.location else None) or CALENDAR_TIMEZONE
+                    needs_sync = self._event_start(event, timezone) != datetime.combine(appt.date, appt.time)
+                if needs_sync:
+                    drift += 1
+                    enqueue_calendar_sync(db, appt)
+            db.commit()
+        finally:
+            db.close()
+
+        orphans = {
+            str(appointment_id): self._request("delete", event["id"], None)
+            for appointment_id, event in by_appointment.items() if appointment_id not in appointments
+        }
+        orphans_deleted = 0
+        for start in range(0, len(orphans), self.batch_size):
+            chunk = dict(list(orphans.items())[start:start + self.batch_size])
+            for _, error in self._execute_batch(chunk).values():
+                if error is None or _http_status(error) in (404, 410):
+                    orphans_deleted += 1
+
+        self._last_reconcile = time.monotonic()
+        self.stats["reconciles"] += 1
+        self.stats["drift"] += drift
+        self.stats["orphans_deleted"] += orphans_deleted
+        logger.info("Calendar reconcile: %d events, %d drifted, %d orphans deleted",
+                    len(by_appointment), drift, orphans_deleted)
+        return {"events": len(by_appointment), "drift": drift, "orphans_deleted": orphans_deleted}
+
+    # ---- background loop ------------------------------------------------------
+
+    def run(self) -> None:
+        """Drain the outbox until stopped, reconciling every reconcile_seconds."""
+        while not self._stop.is_set():
+            handled = 0
+            try:
+                if self._last_reconcile is None or time.monotonic() - self._last_reconcile >= self.reconcile_seconds:
+                    self.reconcile()
+                handled = self.run_once()
+            except Exception as e:
+                logger.error("Calendar sync pass failed: %s", str(e), exc_info=True)
+            if not handled:
+                self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        """Start the background sync thread (idempotent)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.run, name="calendar-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {**self.stats, "running": self._thread is not None}
+        try:
+            db = self._session()
+            try:
+                counts = dict(db.execute(
+                    select(CalendarOutbox.status, func.count()).group_by(CalendarOutbox.status)
+                ).all())
+                oldest = db.scalar(
+                    select(func.min(CalendarOutbox.created_at)).where(CalendarOutbox.status == "pending")
+                )
+            finally:
+                db.close()
+            stats["outbox"] = counts
+            stats["lag_seconds"] = round((datetime.utcnow() - oldest).total_seconds(), 1) if oldest else 0.0
+        except Exception as e:
+            stats["outbox_error"] = str(e)
+        return stats
+
+
+def _google_service():
+    """Raw Google Calendar API resource, or None when sync is disabled"""
+    if not calendar_sync_enabled():
+        return None
+    from app.services.google_calendar_service import get_google_calendar_service
+    return get_google_calendar_service().service
+
+
+# Singleton instance
+_sync_worker: Optional[CalendarSyncWorker] = None
+_sync_lock = threading.Lock()
+
+
+def get_calendar_sync_worker() -> CalendarSyncWorker:
+    """Get or create the calendar sync worker (not started)."""
+    global _sync_worker
+    with _sync_lock:
+        if _sync_worker is None:
+            from app.core.config import settings
+            _sync_worker = CalendarSyncWorker(_google_service, settings.GOOGLE_CALENDAR_ID or "primary")
+            register_stats("hvac_calendar_sync", _sync_worker.get_stats,
+                           counters=("batches", "synced", "retried", "dead", "conflicts", "reconciles",
+                                     "drift", "orphans_deleted"),
+                           labels={"outbox": "status"}, documentation="Calendar outbox sync")
+        return _sync_worker
+
+
+def start_calendar_sync() -> Optional[CalendarSyncWorker]:
+    """Start the background sync thread if Google Calendar is configured."""
+    if not calendar_sync_enabled():
+        logger.info("Google Calendar not configured, calendar sync worker not started")
+        return None
+    worker = get_calendar_sync_worker()
+    worker.start()
+    return worker
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HVAC Google Calendar sync worker")
+    parser.add_argument("--once", action="store_true", help="Drain one batch and exit")
+    parser.add_argument("--reconcile", action="store_true", help="Run a full reconciliation and exit")
+    parser.add_argument("--stats", action="store_true", help="Print outbox stats and exit")
+    args = parser.parse_args()
+
+    worker = get_calendar_sync_worker()
+    if args.stats:
+        print(json.dumps(worker.get_stats(), indent=2, default=str))
+    elif args.reconcile:
+        print(json.dumps(worker.reconcile(), indent=2))
+    elif args.once:
+        print(json.dumps({"handled": worker.run_once()}))
+    else:
+        worker.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,13 @@ Supports SQLite (development) and PostgreSQL (production).
 import os
 from typing import Generator
 
-from sqlalchemy import create_engine, select, text
+from sqlalchemy import create_engine, event, select, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.models.db_models import Base, Location
 from app.utils.logging import get_logger
+from app.utils.tracing import span
 
 logger = get_logger("db")
 
@@ -33,6 +34,19 @@ engine = create_engine(
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+@event.listens_for(engine, "before_cursor_execute")
+def _trace_query_start(conn, cursor, statement, parameters, context, executemany):
+    """Time each statement as a "db" span of the current call."""
+    context._trace_span = span("db", statement=statement.split(None, 1)[0].upper() if statement else "")
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _trace_query_end(conn, cursor, statement, parameters, context, executemany):
+    trace_span = getattr(context, "_trace_span", None)
+    if trace_span is not None:
+        trace_span.end()
+
+
 def get_db() -> Generator[Session, None, None]:
     """
     Dependency that provides a database session.
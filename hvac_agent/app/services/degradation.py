@@ -26,9 +26,15 @@ from dataclasses import dataclass, field
 
 from app.utils.logging import get_logger
 from app.utils.circuit_breaker import CircuitBreakerManager
+from app.utils.metrics import counter, gauge
 
 logger = get_logger("degradation")
 
+_LEVEL = gauge("hvac_degradation_level", "Current degradation level (0 = full AI ... 3 = human transfer)")
+_CALLS = counter("hvac_degradation_calls_total", "Successful operations, by degradation level", ("level",))
+_FAILURES = counter("hvac_degradation_failures_total", "Failed operations recorded")
+_LEVEL_CHANGES = counter("hvac_degradation_level_changes_total", "Degradation level transitions")
+
 
 class DegradationLevel(IntEnum):
     """Degradation levels from best to worst."""
@@ -93,10 +99,6 @@ class DegradationState:
     reason: Optional[str] = None
     since: float = field(default_factory=time.time)
     manual_override: bool = False
-    
-    # Metrics
-    calls_at_level: Dict[int, int] = field(default_factory=dict)
-    level_changes: int = 0
 
 
 class GracefulDegradation:
@@ -123,6 +125,7 @@ class GracefulDegradation:
     
     def __init__(self):
         self._state = DegradationState()
+        _LEVEL.set(int(self._state.level))
         self._failure_count = 0
         self._success_count = 0
         self._last_check = time.time()
@@ -147,10 +150,7 @@ class GracefulDegradation:
         self._failure_count = 0
         
         # Track calls at this level
-        level_int = int(self._state.level)
-        self._state.calls_at_level[level_int] = (
-            self._state.calls_at_level.get(level_int, 0) + 1
-        )
+        _CALLS.labels(int(self._state.level)).inc()
         
         # Check for recovery
         self._check_recovery()
@@ -159,6 +159,7 @@ class GracefulDegradation:
         """Record failed operation."""
         self._failure_count += 1
         self._success_count = 0
+        _FAILURES.inc()
         
         logger.warning(
             "Degradation failure recorded: %s (count=%d)",
@@ -228,7 +229,8 @@ class GracefulDegradation:
         self._state.level = level
         self._state.reason = reason
         self._state.since = time.time()
-        self._state.level_changes += 1
+        _LEVEL.set(int(level))
+        _LEVEL_CHANGES.inc()
         self._failure_count = 0
         
         logger.warning(
@@ -267,8 +269,8 @@ class GracefulDegradation:
             "manual_override": self._state.manual_override,
             "failure_count": self._failure_count,
             "success_count": self._success_count,
-            "level_changes": self._state.level_changes,
-            "calls_per_level": self._state.calls_at_level,
+            "level_changes": int(_LEVEL_CHANGES.value),
+            "calls_per_level": {int(level): int(c.value) for (level,), c in _CALLS.children()},
             "openai_model": config.openai_model,
             "tts_provider": config.tts_provider,
             "use_llm": config.use_llm,
@@ -209,6 +209,31 @@ class GoogleCalendarService:
             logger.error(f"Error deleting Google Calendar event: {error}")
             return False
     
+    def get_busy_intervals(self, calendar_id: str, time_min: str, time_max: str,
+                           time_zone: str = 'America/Chicago') -> List[Dict]:
+        """Get busy intervals from Google Calendar's free/busy API.
+        
+        Args:
+            calendar_id: ID of the calendar to check
+            time_min: Start of time range in RFC3339 format
+            time_max: End of time range in RFC3339 format
+            time_zone: Time zone for the time range
+            
+        Returns:
+            List of {'start', 'end'} RFC3339 busy intervals
+            
+        Raises:
+            HttpError: If the API call fails (callers keep their last good data)
+        """
+        body = {
+            "timeMin": time_min,
+            "timeMax": time_max,
+            "timeZone": time_zone,
+            "items": [{"id": calendar_id}]
+        }
+        events_result = self.service.freebusy().query(body=body).execute()
+        return events_result.get('calendars', {}).get(calendar_id, {}).get('busy', [])
+    
     def get_available_slots(self, calendar_id: str, time_min: str, time_max: str, 
                           time_zone: str = 'America/Chicago') -> List[Dict]:
         """Get available time slots from Google Calendar.
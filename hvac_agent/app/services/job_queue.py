@@ -0,0 +1,687 @@
+"""
+Durable background job queue for HVAC Voice Agent.
+
+Work that used to run in-process after a request (booking confirmations,
+SMS, lead emails) is enqueued here and executed by separate worker
+processes, so it survives restarts and never competes with live call audio
+for the event loop.
+
+Provides:
+- Redis backend (REDIS_URL) or a local SQLite file (JOB_QUEUE_PATH)
+- Priorities: lower runs first (emergency SMS before marketing)
+- Retries with exponential backoff + jitter, then a dead state
+- Idempotency keys: enqueueing the same key twice is a no-op
+- Leases: a job claimed by a crashed worker runs again after its lease
+- Per-queue counts and wait/run latency percentiles
+
+Usage:
+    from app.services.job_queue import get_job_queue, PRIORITY_EMERGENCY
+
+    get_job_queue().enqueue(
+        "notifications.sms", {"to_phone": phone, "message": text},
+        queue="notifications", priority=PRIORITY_EMERGENCY,
+        idempotency_key=f"sms:{call_sid}",
+    )
+
+Workers (handlers are registered in app/services/jobs.py):
+    python -m app.services.job_queue --processes 2 --concurrency 8
+    python -m app.services.job_queue --metrics
+
+Unless JOB_WORKER_EMBEDDED=false, the web app also runs one worker on a
+background thread (see start_embedded_worker), so a single-container deploy
+still sends what it enqueues.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import signal
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+from app.utils.logging import get_logger
+
+logger = get_logger("job_queue")
+
+# Try to import Redis, but make it optional
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Configuration
+REDIS_URL = os.getenv("REDIS_URL")
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "redis" if REDIS_URL else "sqlite")
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "jobs.sqlite3")
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+# Run a worker thread inside the web process (set false when dedicated workers run)
+JOB_WORKER_EMBEDDED = os.getenv("JOB_WORKER_EMBEDDED", "true").lower() == "true"
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "4"))
+# Modules that register handlers; imported by workers
+JOB_HANDLER_MODULES = os.getenv("JOB_HANDLER_MODULES", "app.services.jobs").split(",")
+
+# Priorities (lower runs first)
+PRIORITY_EMERGENCY = 0
+PRIORITY_TRANSACTIONAL = 10
+PRIORITY_DEFAULT = 50
+PRIORITY_MARKETING = 90
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help (bad input, not configured)"""
+
+
+@dataclass
+class Job:
+    """One unit of background work."""
+    name: str
+    payload: Dict[str, Any]
+    queue: str = "default"
+    priority: int = PRIORITY_DEFAULT
+    max_attempts: int = 5
+    idempotency_key: Optional[str] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"  # queued, running, done, dead
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+    run_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    last_error: Optional[str] = None
+
+    def __post_init__(self):
+        self.run_at = self.run_at or self.enqueued_at
+
+
+def backoff_seconds(attempts: int, base: float = 2.0, cap: float = 600.0) -> float:
+    """Delay before retry number `attempts` (1-based), with up to 25% jitter"""
+    return min(cap, base * 2 ** (attempts - 1)) * (1 + random.random() * 0.25)
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 1)
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class SQLiteJobBackend:
+    """Jobs in one SQLite table; safe across threads and worker processes."""
+
+    def __init__(self, path: str = JOB_QUEUE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                queue TEXT NOT NULL,
+                name TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                idempotency_key TEXT UNIQUE,
+                enqueued_at REAL NOT NULL,
+                run_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                lease_until REAL,
+                last_error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, priority, run_at);
+            CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (queue, finished_at);
+        """)
+
+    def _row_to_job(self, row: sqlite3.Row) -> Job:
+        data = dict(row)
+        data["payload"] = json.loads(data["payload"])
+        data.pop("lease_until", None)
+        return Job(**data)
+
+    def enqueue(self, job: Job) -> bool:
+        data = asdict(job)
+        data["payload"] = json.dumps(job.payload, default=str)
+        columns = ", ".join(data)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"INSERT OR IGNORE INTO jobs ({columns}) VALUES ({', '.join('?' for _ in data)})",
+                tuple(data.values()),
+            )
+        return cursor.rowcount == 1
+
+    def claim(self, lease_seconds: int = JOB_LEASE_SECONDS) -> Optional[Job]:
+        now = time.time()
+        with self._lock:
+            # IMMEDIATE takes the write lock, so two processes never claim the same row
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = self._conn.execute(
+                        "SELECT * FROM jobs WHERE (status = 'queued' AND run_at <= ?) "
+                        "OR (status = 'running' AND lease_until < ?) "
+                        "ORDER BY priority, run_at LIMIT 1",
+                        (now, now),
+                    ).fetchone()
+                    if row is None:
+                        self._conn.execute("COMMIT")
+                        return None
+                    if row["status"] == "running" and row["attempts"] >= row["max_attempts"]:
+                        # Lease expired on the last attempt (worker crashed)
+                        self._conn.execute(
+                            "UPDATE jobs SET status = 'dead', finished_at = ?, last_error = ? WHERE id = ?",
+                            (now, "lease expired", row["id"]),
+                        )
+                        continue
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?, "
+                        "lease_until = ? WHERE id = ?",
+                        (now, now + lease_seconds, row["id"]),
+                    )
+                    self._conn.execute("COMMIT")
+                    job = self._row_to_job(row)
+                    job.status, job.attempts, job.started_at = "running", job.attempts + 1, now
+                    return job
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def complete(self, job: Job) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', finished_at = ?, lease_until = NULL, last_error = NULL "
+                "WHERE id = ?",
+                (time.time(), job.id),
+            )
+
+    def fail(self, job: Job, error: str, retry_at: Optional[float]) -> None:
+        with self._lock:
+            if retry_at is None:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'dead', finished_at = ?, lease_until = NULL, last_error = ? "
+                    "WHERE id = ?",
+                    (time.time(), error, job.id),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', run_at = ?, lease_until = NULL, last_error = ? "
+                    "WHERE id = ?",
+                    (retry_at, error, job.id),
+                )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def metrics(self, window_seconds: int = 3600) -> Dict[str, Dict[str, Any]]:
+        since = time.time() - window_seconds
+        with self._lock:
+            counts = self._conn.execute(
+                "SELECT queue, status, COUNT(*) AS n FROM jobs GROUP BY queue, status"
+            ).fetchall()
+            finished = self._conn.execute(
+                "SELECT queue, started_at - run_at AS wait, finished_at - started_at AS run "
+                "FROM jobs WHERE status = 'done' AND finished_at >= ?",
+                (since,),
+            ).fetchall()
+        result: Dict[str, Dict[str, Any]] = {}
+        for row in counts:
+            result.setdefault(row["queue"], {})[row["status"]] = row["n"]
+        waits: Dict[str, List[float]] = {}
+        runs: Dict[str, List[float]] = {}
+        for row in finished:
+            waits.setdefault(row["queue"], []).append(row["wait"] * 1000)
+            runs.setdefault(row["queue"], []).append(row["run"] * 1000)
+        for queue, stats in result.items():
+            stats.update(_latency_stats(waits.get(queue, []), runs.get(queue, [])))
+        return result
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished jobs (frees their idempotency keys)"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'dead') AND finished_at < ?", (older_than,)
+            )
+        return cursor.rowcount
+
+
+class RedisJobBackend:
+    """
+    Jobs as Redis hashes with a priority-ordered ready set.
+
+    Keys (prefix `jobq:`): job:<id> hash, ready zset (score = priority, then
+    enqueue time), delayed zset (score = run_at), running zset (score = lease
+    expiry), idem:<key>, counts:<queue> hash, wait:<queue> / run:<queue> lists.
+    """
+
+    # Move due delayed jobs and expired leases to ready, then pop the best job
+    _CLAIM = """
+    local now = tonumber(ARGV[1])
+    for _, src in ipairs({KEYS[2], KEYS[3]}) do
+        local due = redis.call('ZRANGEBYSCORE', src, '-inf', now, 'LIMIT', 0, 100)
+        for _, id in ipairs(due) do
+            local score = redis.call('HGET', ARGV[3] .. id, 'score')
+            redis.call('ZREM', src, id)
+            if score then redis.call('ZADD', KEYS[1], score, id) end
+        end
+    end
+    local popped = redis.call('ZPOPMIN', KEYS[1])
+    if #popped == 0 then return false end
+    redis.call('ZADD', KEYS[3], ARGV[2], popped[1])
+    return popped[1]
+    """
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = "jobq:", client=None):
+        self.prefix = prefix
+        self.client = client or redis.from_url(url, decode_responses=True, socket_timeout=5)
+        self._claim_script = self.client.register_script(self._CLAIM)
+
+    def _key(self, *parts: str) -> str:
+        return self.prefix + ":".join(parts)
+
+    @staticmethod
+    def _score(job: Job) -> float:
+        # Priority first, then FIFO (epoch seconds < 1e10)
+        return job.priority * 1e10 + job.enqueued_at
+
+    def _save(self, job: Job) -> None:
+        data = asdict(job)
+        data["payload"] = json.dumps(job.payload, default=str)
+        data["score"] = self._score(job)
+        self.client.hset(self._key("job", job.id), mapping={k: json.dumps(v) for k, v in data.items()})
+
+    def _load(self, job_id: str) -> Optional[Job]:
+        raw = self.client.hgetall(self._key("job", job_id))
+        if not raw:
+            return None
+        data = {k: json.loads(v) for k, v in raw.items()}
+        data.pop("score", None)
+        data["payload"] = json.loads(data["payload"])
+        return Job(**data)
+
+    def enqueue(self, job: Job) -> bool:
+        if job.idempotency_key and not self.client.set(
+            self._key("idem", job.idempotency_key), job.id, nx=True, ex=JOB_RETENTION_SECONDS
+        ):
+            return False
+        self._save(job)
+        pipe = self.client.pipeline()
+        if job.run_at > time.time():
+            pipe.zadd(self._key("delayed"), {job.id: job.run_at})
+        else:
+            pipe.zadd(self._key("ready"), {job.id: self._score(job)})
+        pipe.hincrby(self._key("counts", job.queue), "enqueued", 1)
+        pipe.execute()
+        return True
+
+    def claim(self, lease_seconds: int = JOB_LEASE_SECONDS) -> Optional[Job]:
+        while True:
+            now = time.time()
+            job_id = self._claim_script(
+                keys=[self._key("ready"), self._key("delayed"), self._key("running")],
+                args=[now, now + lease_seconds, self._key("job", "")],
+            )
+            if not job_id:
+                return None
+            job = self._load(job_id)
+            if job is None:
+                self.client.zrem(self._key("running"), job_id)
+                continue
+            if job.status == "running" and job.attempts >= job.max_attempts:
+                # Lease expired on the last attempt (worker crashed)
+                self.fail(job, "lease expired", None)
+                continue
+            job.status, job.attempts, job.started_at = "running", job.attempts + 1, now
+            self.client.hset(self._key("job", job.id), mapping={
+                "status": json.dumps(job.status),
+                "attempts": json.dumps(job.attempts),
+                "started_at": json.dumps(now),
+            })
+            return job
+
+    def _finish(self, job: Job, status: str, error: Optional[str]) -> None:
+        now = time.time()
+        pipe = self.client.pipeline()
+        pipe.zrem(self._key("running"), job.id)
+        pipe.hset(self._key("job", job.id), mapping={
+            "status": json.dumps(status), "finished_at": json.dumps(now), "last_error": json.dumps(error),
+        })
+        pipe.expire(self._key("job", job.id), JOB_RETENTION_SECONDS)
+        pipe.hincrby(self._key("counts", job.queue), status, 1)
+        if status == "done" and job.started_at:
+            for name, value in (("wait", job.started_at - job.run_at), ("run", now - job.started_at)):
+                pipe.lpush(self._key(name, job.queue), round(value * 1000, 1))
+                pipe.ltrim(self._key(name, job.queue), 0, 999)
+        pipe.execute()
+
+    def complete(self, job: Job) -> None:
+        self._finish(job, "done", None)
+
+    def fail(self, job: Job, error: str, retry_at: Optional[float]) -> None:
+        if retry_at is None:
+            self._finish(job, "dead", error)
+            return
+        pipe = self.client.pipeline()
+        pipe.zrem(self._key("running"), job.id)
+        pipe.hset(self._key("job", job.id), mapping={
+            "status": json.dumps("queued"), "run_at": json.dumps(retry_at), "last_error": json.dumps(error),
+        })
+        pipe.zadd(self._key("delayed"), {job.id: retry_at})
+        pipe.hincrby(self._key("counts", job.queue), "retried", 1)
+        pipe.execute()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._load(job_id)
+
+    def metrics(self, window_seconds: int = 3600) -> Dict[str, Dict[str, Any]]:
+        result: Dict[str, Dict[str, Any]] = {}
+        for key in self.client.scan_iter(self._key("counts", "*")):
+            queue = key[len(self._key("counts", "")):]
+            stats = {k: int(v) for k, v in self.client.hgetall(key).items()}
+            waits = [float(v) for v in self.client.lrange(self._key("wait", queue), 0, -1)]
+            runs = [float(v) for v in self.client.lrange(self._key("run", queue), 0, -1)]
+            stats.update(_latency_stats(waits, runs))
+            result[queue] = stats
+        for name in ("ready", "delayed", "running"):
+            result.setdefault("_all", {})[name] = self.client.zcard(self._key(name))
+        return result
+
+    def purge(self, older_than: float) -> int:
+        return 0  # Finished job hashes expire on their own
+
+
+def _latency_stats(waits: List[float], runs: List[float]) -> Dict[str, Any]:
+    return {
+        "wait_ms_p50": _percentile(waits, 0.50),
+        "wait_ms_p95": _percentile(waits, 0.95),
+        "run_ms_p50": _percentile(runs, 0.50),
+        "run_ms_p95": _percentile(runs, 0.95),
+    }
+
+
+# =============================================================================
+# QUEUE + HANDLERS
+# =============================================================================
+
+JobHandler = Callable[..., Any]
+_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(name: str) -> Callable[[JobHandler], JobHandler]:
+    """Register a function (sync or async, payload as kwargs) as the handler for `name`"""
+    def decorator(func: JobHandler) -> JobHandler:
+        _HANDLERS[name] = func
+        return func
+    return decorator
+
+
+def get_handler(name: str) -> Optional[JobHandler]:
+    return _HANDLERS.get(name)
+
+
+class JobQueue:
+    """Enqueue/claim facade over a backend."""
+
+    def __init__(self, backend=None):
+        self.backend = backend or _default_backend()
+
+    def enqueue(
+        self,
+        name: str,
+        payload: Dict[str, Any],
+        queue: str = "default",
+        priority: int = PRIORITY_DEFAULT,
+        idempotency_key: Optional[str] = None,
+        delay_seconds: float = 0.0,
+        max_attempts: int = 5,
+    ) -> Optional[str]:
+        """
+        Add a job; returns its id, or None when `idempotency_key` was already used.
+        """
+        job = Job(
+            name=name, payload=payload, queue=queue, priority=priority,
+            idempotency_key=idempotency_key, max_attempts=max_attempts,
+        )
+        if delay_seconds:
+            job.run_at = job.enqueued_at + delay_seconds
+        if not self.backend.enqueue(job):
+            logger.info("Job %s skipped: idempotency key %s already queued", name, idempotency_key)
+            return None
+        return job.id
+
+    async def aenqueue(self, name: str, payload: Dict[str, Any], **kwargs) -> Optional[str]:
+        """enqueue() off the event loop (for call-handling coroutines)"""
+        return await asyncio.to_thread(self.enqueue, name, payload, **kwargs)
+
+    def claim(self, lease_seconds: int = JOB_LEASE_SECONDS) -> Optional[Job]:
+        return self.backend.claim(lease_seconds)
+
+    def complete(self, job: Job) -> None:
+        self.backend.complete(job)
+
+    def fail(self, job: Job, error: str, permanent: bool = False) -> Optional[float]:
+        """Schedule a retry (returns its time) or mark the job dead (returns None)"""
+        retry_at = None
+        if not permanent and job.attempts < job.max_attempts:
+            retry_at = time.time() + backoff_seconds(job.attempts)
+        self.backend.fail(job, error, retry_at)
+        return retry_at
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.backend.get(job_id)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return self.backend.metrics()
+
+
+def _default_backend():
+    if JOB_QUEUE_BACKEND == "redis":
+        if REDIS_AVAILABLE and REDIS_URL:
+            try:
+                backend = RedisJobBackend(REDIS_URL)
+                backend.client.ping()
+                logger.info("Job queue using Redis: %s", REDIS_URL)
+                return backend
+            except Exception as e:
+                logger.warning("Failed to connect to Redis (%s), using SQLite job queue", str(e))
+        else:
+            logger.warning("Redis not available, using SQLite job queue")
+    logger.info("Job queue using SQLite: %s", JOB_QUEUE_PATH)
+    return SQLiteJobBackend(JOB_QUEUE_PATH)
+
+
+# Singleton instance
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Get or create the job queue."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
+
+
+# =============================================================================
+# WORKERS
+# =============================================================================
+
+class JobWorker:
+    """Claims and runs jobs, `concurrency` at a time, in one process."""
+
+    def __init__(
+        self,
+        queue: Optional[JobQueue] = None,
+        concurrency: int = 4,
+        poll_interval: float = 0.5,
+        lease_seconds: int = JOB_LEASE_SECONDS,
+    ):
+        self.queue = queue or get_job_queue()
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.processed = 0
+        self._stop = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    async def run(self, max_jobs: Optional[int] = None) -> None:
+        """Run until stop() (or `max_jobs` processed)."""
+        slots = asyncio.Semaphore(self.concurrency)
+        running = set()
+        while not self._stop.is_set() and (max_jobs is None or self.processed < max_jobs):
+            await slots.acquire()
+            job = await asyncio.to_thread(self.queue.claim, self.lease_seconds)
+            if job is None:
+                slots.release()
+                if max_jobs is not None and not running:
+                    break
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = asyncio.create_task(self._execute(job))
+            running.add(task)
+            task.add_done_callback(lambda t: (running.discard(t), slots.release()))
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    async def _execute(self, job: Job) -> None:
+        handler = get_handler(job.name)
+        try:
+            if handler is None:
+                raise PermanentJobError(f"No handler registered for {job.name}")
+            if asyncio.iscoroutinefunction(handler):
+                await asyncio.wait_for(handler(**job.payload), timeout=self.lease_seconds)
+            else:
+                await asyncio.wait_for(asyncio.to_thread(handler, **job.payload), timeout=self.lease_seconds)
+        except Exception as e:
+            permanent = isinstance(e, PermanentJobError)
+            retry_at = await asyncio.to_thread(self.queue.fail, job, f"{type(e).__name__}: {e}", permanent)
+            if retry_at is None:
+                logger.error("Job %s (%s) dead after %d attempt(s): %s", job.id, job.name, job.attempts, e)
+            else:
+                logger.warning("Job %s (%s) failed, retry in %.0fs: %s",
+                               job.id, job.name, retry_at - time.time(), e)
+        else:
+            await asyncio.to_thread(self.queue.complete, job)
+            logger.info("Job %s (%s) done in %.0f ms (waited %.0f ms)",
+                        job.id, job.name, (time.time() - job.started_at) * 1000,
+                        (job.started_at - job.run_at) * 1000)
+        finally:
+            self.processed += 1
+
+
+class EmbeddedJobWorker:
+    """A JobWorker on its own thread and event loop, inside the web process."""
+
+    def __init__(self, queue: Optional[JobQueue] = None, concurrency: int = JOB_WORKER_CONCURRENCY):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.worker: Optional[JobWorker] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="job-worker", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5)
+
+    def _run(self) -> None:
+        async def main():
+            self._loop = asyncio.get_running_loop()
+            self.worker = JobWorker(self.queue, concurrency=self.concurrency)
+            self._ready.set()
+            await self.worker.run()
+
+        asyncio.run(main())
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop claiming jobs and wait for the running ones to finish."""
+        if self._loop is not None and self.worker is not None:
+            self._loop.call_soon_threadsafe(self.worker.stop)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def start_embedded_worker() -> Optional[EmbeddedJobWorker]:
+    """Start the in-process job worker unless external workers are configured."""
+    if not JOB_WORKER_EMBEDDED:
+        logger.info("JOB_WORKER_EMBEDDED=false, leaving jobs to external workers")
+        return None
+    load_handlers()
+    worker = EmbeddedJobWorker()
+    worker.start()
+    logger.info("Embedded job worker started (%d concurrent jobs)", worker.concurrency)
+    return worker
+
+
+def load_handlers(modules: List[str] = JOB_HANDLER_MODULES) -> None:
+    for module in modules:
+        if module.strip():
+            importlib.import_module(module.strip())
+
+
+def _worker_process(concurrency: int) -> None:
+    load_handlers()
+    worker = JobWorker(concurrency=concurrency)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, worker.stop)
+        await worker.run()
+
+    asyncio.run(main())
+
+
+def run_worker_processes(processes: int = 2, concurrency: int = 4) -> None:
+    """Run `processes` worker processes until they exit (SIGTERM/SIGINT stops them)."""
+    workers = [
+        multiprocessing.Process(target=_worker_process, args=(concurrency,), name=f"job-worker-{i}")
+        for i in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    logger.info("Started %d job worker process(es), %d jobs each", processes, concurrency)
+    for process in workers:
+        process.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--processes", type=int, default=int(os.getenv("JOB_WORKER_PROCESSES", "2")))
+    parser.add_argument("--concurrency", type=int, default=JOB_WORKER_CONCURRENCY)
+    parser.add_argument("--metrics", action="store_true", help="print per-queue metrics and exit")
+    args = parser.parse_args()
+
+    if args.metrics:
+        print(json.dumps(get_job_queue().metrics(), indent=2))
+    else:
+        run_worker_processes(args.processes, args.concurrency)
@@ -0,0 +1,231 @@
+"""
+Background job handlers.
+
+Imported by job workers (python -m app.services.job_queue). Request and
+call-handling code only enqueues these by name; the work (SMTP/SendGrid,
+Twilio, Resend) runs in the worker processes with retries.
+
+Payloads must be JSON-serializable: dates and times travel as ISO strings.
+"""
+
+import os
+from dataclasses import asdict
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.services.job_queue import (
+    PermanentJobError,
+    PRIORITY_EMERGENCY,
+    PRIORITY_TRANSACTIONAL,
+    get_job_queue,
+    job_handler,
+)
+from app.services.notification_service import (
+    AppointmentDetails,
+    send_booking_confirmation,
+    send_reschedule_notification,
+    send_sms_twilio,
+)
+from app.utils.logging import get_logger
+
+logger = get_logger("jobs")
+
+RESEND_API_KEY = os.getenv("RESEND_API_KEY")
+LEAD_NOTIFICATION_EMAIL = os.getenv("LEAD_NOTIFICATION_EMAIL", "subodh.kc@haiec.com")
+# Reminder SMS for tomorrow's appointments go out daily at this local hour
+NEXT_DAY_REMINDERS_ENABLED = os.getenv("NEXT_DAY_REMINDERS_ENABLED", "true").lower() == "true"
+NEXT_DAY_REMINDER_HOUR = int(os.getenv("NEXT_DAY_REMINDER_HOUR", "17"))
+
+# send_sms_twilio errors that a retry cannot fix, besides Twilio 4xx (other than 429)
+_PERMANENT_SMS_ERRORS = {"Twilio not configured", "Invalid phone number"}
+
+
+def _details_payload(details: AppointmentDetails) -> Dict[str, Any]:
+    payload = asdict(details)
+    payload["appointment_date"] = details.appointment_date.isoformat()
+    payload["appointment_time"] = details.appointment_time.isoformat()
+    return payload
+
+
+def _details_from_payload(payload: Dict[str, Any]) -> AppointmentDetails:
+    return AppointmentDetails(**{
+        **payload,
+        "appointment_date": date.fromisoformat(payload["appointment_date"]),
+        "appointment_time": time.fromisoformat(payload["appointment_time"]),
+    })
+
+
+def _raise_on_failure(results: Dict[str, Any]) -> None:
+    """Retry when every attempted channel failed"""
+    attempted = [r for r in results.values() if r]
+    if attempted and not any(r.get("success") for r in attempted):
+        raise RuntimeError("; ".join(str(r.get("error", "send failed")) for r in attempted))
+
+
+# =============================================================================
+# ENQUEUE HELPERS
+# =============================================================================
+
+def enqueue_booking_confirmation(details: AppointmentDetails) -> Optional[str]:
+    """Queue the confirmation email/SMS for a new appointment (once per appointment)."""
+    return get_job_queue().enqueue(
+        "notifications.booking_confirmation",
+        {"details": _details_payload(details)},
+        queue="notifications",
+        priority=PRIORITY_TRANSACTIONAL,
+        idempotency_key=f"booking_confirmation:{details.confirmation_id}",
+    )
+
+
+def enqueue_reschedule_notification(details: AppointmentDetails, old_date: date, old_time: time) -> Optional[str]:
+    """Queue the reschedule email/SMS (once per appointment and new slot)."""
+    return get_job_queue().enqueue(
+        "notifications.reschedule",
+        {
+            "details": _details_payload(details),
+            "old_date": old_date.isoformat(),
+            "old_time": old_time.isoformat(),
+        },
+        queue="notifications",
+        priority=PRIORITY_TRANSACTIONAL,
+        idempotency_key=(
+            f"reschedule:{details.confirmation_id}:"
+            f"{details.appointment_date.isoformat()}T{details.appointment_time.isoformat()}"
+        ),
+    )
+
+
+def enqueue_sms(to_phone: str, message: str, emergency: bool = False,
+                idempotency_key: Optional[str] = None) -> Optional[str]:
+    """Queue an SMS; emergency messages jump ahead of everything else."""
+    return get_job_queue().enqueue(
+        "notifications.sms",
+        {"to_phone": to_phone, "message": message},
+        queue="emergency" if emergency else "notifications",
+        priority=PRIORITY_EMERGENCY if emergency else PRIORITY_TRANSACTIONAL,
+        idempotency_key=idempotency_key,
+    )
+
+
+def schedule_next_day_reminders(now: Optional[datetime] = None) -> Optional[str]:
+    """
+    Queue the next daily reminder batch for NEXT_DAY_REMINDER_HOUR.
+
+    Keyed by the appointment day, so every process (and every restart) can
+    call this and the batch for a day is still queued once. Each run
+    schedules the following day's, keeping the chain going.
+    """
+    if not NEXT_DAY_REMINDERS_ENABLED:
+        return None
+    now = now or datetime.now()
+    run_at = now.replace(hour=NEXT_DAY_REMINDER_HOUR, minute=0, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    day = (run_at + timedelta(days=1)).date().isoformat()
+    return get_job_queue().enqueue(
+        "notifications.next_day_reminders",
+        {"day": day},
+        queue="notifications",
+        priority=PRIORITY_TRANSACTIONAL,
+        idempotency_key=f"next_day_reminders:{day}",
+        delay_seconds=(run_at - now).total_seconds(),
+    )
+
+
+# =============================================================================
+# HANDLERS
+# =============================================================================
+
+@job_handler("notifications.booking_confirmation")
+def booking_confirmation(details: Dict[str, Any]) -> None:
+    _raise_on_failure(send_booking_confirmation(_details_from_payload(details)))
+
+
+@job_handler("notifications.reschedule")
+def reschedule_notification(details: Dict[str, Any], old_date: str, old_time: str) -> None:
+    _raise_on_failure(send_reschedule_notification(
+        details=_details_from_payload(details),
+        old_date=date.fromisoformat(old_date),
+        old_time=time.fromisoformat(old_time),
+    ))
+
+
+@job_handler("notifications.sms")
+def sms(to_phone: str, message: str) -> None:
+    result = send_sms_twilio(to_phone, message)
+    if not result.get("success"):
+        error = result.get("error", "SMS failed")
+        status = result.get("http_status")
+        # Twilio rejected the message (e.g. 21211 bad number, 21610 opted out)
+        if error in _PERMANENT_SMS_ERRORS or (status is not None and 400 <= status < 500 and status != 429):
+            code = result.get("error_code")
+            raise PermanentJobError(f"{error} (Twilio {code})" if code else error)
+        raise RuntimeError(error)
+
+
+@job_handler("notifications.next_day_reminders")
+async def next_day_reminders(day: Optional[str] = None) -> Dict[str, Any]:
+    """Batch reminder SMS for one day's appointments (scheduled daily)."""
+    # Imported here: calendar_service imports this module's enqueue helpers
+    from app.services.calendar_service import send_next_day_reminders
+    from app.services.db import SessionLocal
+
+    # Queue tomorrow's run first so a failing batch doesn't end the chain
+    schedule_next_day_reminders()
+    db = SessionLocal()
+    try:
+        result = await send_next_day_reminders(db, date.fromisoformat(day) if day else None)
+    finally:
+        db.close()
+    if result["failed"] and not result["sent"]:
+        raise RuntimeError(f"All {result['failed']} reminders failed")
+    return result
+
+
+@job_handler("leads.email")
+async def lead_email(lead: Dict[str, Any]) -> None:
+    """Send lead notification email via Resend API."""
+    if not RESEND_API_KEY:
+        raise PermanentJobError("RESEND_API_KEY not configured")
+
+    email_html = f"""
+    <h2>🎯 New Lead from AI Demo Line</h2>
+    <table style="border-collapse: collapse; width: 100%;">
+        <tr><td style="padding: 8px; border: 1px solid #ddd;"><strong>Lead ID</strong></td><td style="padding: 8px; border: 1px solid #ddd;">{lead['id']}</td></tr>
+        <tr><td style="padding: 8px; border: 1px solid #ddd;"><strong>Name</strong></td><td style="padding: 8px; border: 1px solid #ddd;">{lead['customer_name']}</td></tr>
+        <tr><td style="padding: 8px; border: 1px solid #ddd;"><strong>Company</strong></td><td style="padding: 8px; border: 1px solid #ddd;">{lead['company_name']}</td></tr>
+        <tr><td style="padding: 8px; border: 1px solid #ddd;"><strong>Phone</strong></td><td style="padding: 8px; border: 1px solid #ddd;">{lead['phone_number']}</td></tr>
+        <tr><td style="padding: 8px; border: 1px solid #ddd;"><strong>Email</strong></td><td style="padding: 8px; border: 1px solid #ddd;">{lead['email'] or 'Not provided'}</td></tr>
+        <tr><td style="padding: 8px; border: 1px solid #ddd;"><strong>Notes</strong></td><td style="padding: 8px; border: 1px solid #ddd;">{lead['issue_description']}</td></tr>
+        <tr><td style="padding: 8px; border: 1px solid #ddd;"><strong>Preferred Contact</strong></td><td style="padding: 8px; border: 1px solid #ddd;">{lead['preferred_date']} - {lead['preferred_time']}</td></tr>
+        <tr><td style="padding: 8px; border: 1px solid #ddd;"><strong>Captured At</strong></td><td style="padding: 8px; border: 1px solid #ddd;">{lead['timestamp']}</td></tr>
+    </table>
+    <p style="margin-top: 20px; color: #666;">This lead was captured by the AI Demo Line. Follow up ASAP!</p>
+    """
+
+    async with httpx.AsyncClient() as client:
+        resp = await client.post(
+            "https://api.resend.com/emails",
+            headers={
+                "Authorization": f"Bearer {RESEND_API_KEY}",
+                "Content-Type": "application/json",
+                # Resend drops a repeat of the same key, so a retried job sends once
+                "Idempotency-Key": f"lead-{lead.get('call_sid')}-{lead['id']}",
+            },
+            json={
+                "from": "AI Demo <leads@haiec.com>",
+                "to": [LEAD_NOTIFICATION_EMAIL],
+                "subject": f"🎯 New Lead: {lead['customer_name']} - {lead['company_name']}",
+                "html": email_html
+            },
+            timeout=10.0
+        )
+
+    if resp.status_code in (200, 201):
+        logger.info("✅ Lead email sent to %s", LEAD_NOTIFICATION_EMAIL)
+    elif resp.status_code in (400, 401, 403, 422):
+        raise PermanentJobError(f"{resp.status_code} - {resp.text}")
+    else:
+        raise RuntimeError(f"{resp.status_code} - {resp.text}")
@@ -40,12 +40,13 @@ import os
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime, date, time
 from dataclasses import dataclass
 from enum import Enum
 
 from app.utils.logging import get_logger
+from app.services.sms_service import get_messaging_service
 
 logger = get_logger("notifications")
 
@@ -543,21 +544,14 @@ def send_email_smtp(
 
 def send_sms_twilio(to_phone: str, message: str) -> Dict[str, Any]:
     """
-    Send SMS via Twilio.
+    Send SMS via Twilio (shared messaging service, pooled connection).
+    
+    Failures carry Twilio's "http_status" and "error_code" when it answered.
     
     Requires: TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER in .env
     """
-    try:
-        from twilio.rest import Client
-    except ImportError:
-        logger.error("Twilio not installed. Run: pip install twilio")
-        return {"success": False, "error": "Twilio not installed"}
-    
-    account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-    auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-    from_phone = os.getenv("TWILIO_PHONE_NUMBER")
-    
-    if not account_sid or not auth_token or not from_phone:
+    service = get_messaging_service()
+    if not service.is_configured:
         logger.warning("Twilio not configured. Set TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER")
         return {"success": False, "error": "Twilio not configured"}
     
@@ -566,25 +560,7 @@ def send_sms_twilio(to_phone: str, message: str) -> Dict[str, Any]:
     if not to_phone:
         return {"success": False, "error": "Invalid phone number"}
     
-    try:
-        client = Client(account_sid, auth_token)
-        
-        sms = client.messages.create(
-            body=message,
-            from_=from_phone,
-            to=to_phone
-        )
-        
-        logger.info("SMS sent to %s, SID: %s", to_phone, sms.sid)
-        return {
-            "success": True,
-            "message_sid": sms.sid,
-            "status": sms.status
-        }
-        
-    except Exception as e:
-        logger.error("Failed to send SMS: %s", str(e))
-        return {"success": False, "error": str(e)}
+    return service.send(to_phone, message)
 
 
 def _normalize_phone(phone: str) -> Optional[str]:
@@ -744,6 +720,44 @@ def send_reminder(
     return results
 
 
+async def send_reminders(appointments: List[AppointmentDetails]) -> Dict[str, Any]:
+    """
+    Send reminder SMS for many appointments in one batch.
+    
+    Messages share the pooled Twilio session and go out concurrently,
+    paced to the sender number's throughput.
+    
+    Returns:
+        Counts plus per-appointment results keyed by confirmation_id
+    """
+    service = get_messaging_service()
+    if not service.is_configured:
+        logger.warning("Twilio not configured - skipping %d reminders", len(appointments))
+        return {"sent": 0, "failed": 0, "skipped": len(appointments), "results": {}}
+    
+    batch = []
+    skipped = 0
+    for details in appointments:
+        phone = _normalize_phone(details.customer_phone) if details.customer_phone else None
+        if phone:
+            batch.append((details, phone))
+        else:
+            skipped += 1
+    
+    results = await service.send_many(
+        [(phone, _get_sms_reminder(details)) for details, phone in batch]
+    )
+    sent = sum(1 for r in results if r.get("success"))
+    logger.info("Reminders sent: %d, failed: %d, skipped: %d", sent, len(results) - sent, skipped)
+    
+    return {
+        "sent": sent,
+        "failed": len(results) - sent,
+        "skipped": skipped,
+        "results": {details.confirmation_id: r for (details, _), r in zip(batch, results)},
+    }
+
+
 def send_tech_on_way(
     details: AppointmentDetails,
     tech_name: Optional[str] = None,
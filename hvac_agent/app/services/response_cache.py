@@ -19,9 +19,13 @@ from typing import Optional, Dict, Any, List, Tuple
 from cachetools import TTLCache
 
 from app.utils.logging import get_logger
+from app.utils.metrics import counter, gauge
 
 logger = get_logger("response_cache")
 
+_LOOKUPS = counter("hvac_response_cache_lookups_total", "Response cache lookups, by result", ("result",))
+_SIZE = gauge("hvac_response_cache_size", "Cached dynamic responses")
+
 # Cache configuration
 CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "3600"))  # 1 hour default
 CACHE_MAX_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "500"))
@@ -112,9 +116,9 @@ class ResponseCache:
     
     def __init__(self, max_size: int = CACHE_MAX_SIZE, ttl: int = CACHE_TTL):
         self._cache: TTLCache = TTLCache(maxsize=max_size, ttl=ttl)
-        self._hits = 0
-        self._misses = 0
-        self._faq_hits = 0
+        self._faq_hits = _LOOKUPS.labels("faq_hit")
+        self._cache_hits = _LOOKUPS.labels("hit")
+        self._misses = _LOOKUPS.labels("miss")
     
     def get(self, query: str) -> Optional[str]:
         """
@@ -131,19 +135,18 @@ class ResponseCache:
         # Check FAQ first (instant)
         faq_response = self._check_faq(query)
         if faq_response:
-            self._faq_hits += 1
-            self._hits += 1
+            self._faq_hits.inc()
             logger.debug("FAQ hit for: %s", query[:50])
             return faq_response
         
         # Check dynamic cache
         cache_key = self._get_cache_key(query)
         if cache_key in self._cache:
-            self._hits += 1
+            self._cache_hits.inc()
             logger.debug("Cache hit for: %s", query[:50])
             return self._cache[cache_key]
         
-        self._misses += 1
+        self._misses.inc()
         return None
     
     def set(self, query: str, response: str) -> None:
@@ -185,13 +188,15 @@ class ResponseCache:
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        total = self._hits + self._misses
-        hit_rate = self._hits / total if total > 0 else 0
+        hits = int(self._faq_hits.value + self._cache_hits.value)
+        misses = int(self._misses.value)
+        total = hits + misses
+        hit_rate = hits / total if total > 0 else 0
         
         return {
-            "hits": self._hits,
-            "misses": self._misses,
-            "faq_hits": self._faq_hits,
+            "hits": hits,
+            "misses": misses,
+            "faq_hits": int(self._faq_hits.value),
             "hit_rate": round(hit_rate, 3),
             "cache_size": len(self._cache),
             "max_size": self._cache.maxsize,
@@ -207,6 +212,7 @@ def get_response_cache() -> ResponseCache:
     global _response_cache
     if _response_cache is None:
         _response_cache = ResponseCache()
+        _SIZE.set_function(lambda: len(_response_cache._cache))
     return _response_cache
 
 
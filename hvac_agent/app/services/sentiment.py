@@ -19,9 +19,17 @@ from dataclasses import dataclass, field
 from datetime import datetime
 
 from app.utils.logging import get_logger
+from app.utils.metrics import counter, gauge, histogram
 
 logger = get_logger("sentiment")
 
+_TURNS = counter("hvac_sentiment_turns_total", "Analyzed caller turns, by sentiment", ("sentiment",))
+_ESCALATIONS = counter("hvac_sentiment_escalations_total", "Turns that recommended escalation to a human")
+_FRUSTRATION = histogram(
+    "hvac_sentiment_frustration_score", "Per-turn frustration score",
+    buckets=(0, 1, 2, 3, 4, 5, 6, 8, 10, 15),
+)
+
 # Frustration indicators organized by severity
 FRUSTRATION_INDICATORS = {
     # Explicit frustration (high weight)
@@ -190,6 +198,10 @@ class SentimentAnalyzer:
         # Store for history
         self._history.append(text)
         self._last_analysis = result
+        _TURNS.labels(result.sentiment).inc()
+        _FRUSTRATION.observe(result.frustration_score)
+        if result.should_escalate:
+            _ESCALATIONS.inc()
         
         # Log if significant
         if result.frustration_score >= FRUSTRATION_THRESHOLD_LOW:
@@ -287,6 +299,7 @@ class SentimentAnalyzer:
 
 # Global instance per call (should be created per call session)
 _analyzers: Dict[str, SentimentAnalyzer] = {}
+gauge("hvac_sentiment_active_analyzers", "Calls with a live sentiment analyzer").set_function(lambda: len(_analyzers))
 
 
 def get_analyzer(call_sid: str) -> SentimentAnalyzer:
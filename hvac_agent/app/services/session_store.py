@@ -22,9 +22,15 @@ from datetime import datetime
 from cachetools import TTLCache
 
 from app.utils.logging import get_logger
+from app.utils.metrics import counter, gauge
 
 logger = get_logger("session_store")
 
+_LOOKUPS = counter("hvac_session_lookups_total", "Session reads, by the layer that served them", ("layer",))
+_REDIS_ERRORS = counter("hvac_session_redis_errors_total", "Failed Redis session operations", ("op",))
+_SIZE = gauge("hvac_session_store_size", "Sessions held in process, by layer", ("layer",))
+_REDIS_HEALTHY = gauge("hvac_session_redis_healthy", "1 while the Redis session backend is reachable")
+
 # Try to import Redis, but make it optional
 try:
     import redis
@@ -64,6 +70,9 @@ class SessionStore:
         self._redis_healthy = False
         
         self._init_redis()
+        _SIZE.labels("local").set_function(lambda: len(self.local_cache))
+        _SIZE.labels("fallback").set_function(lambda: len(self.in_memory_fallback))
+        _REDIS_HEALTHY.set_function(lambda: self._redis_healthy)
     
     def _init_redis(self):
         """Initialize Redis connection if available."""
@@ -134,6 +143,7 @@ class SessionStore:
         """
         # Check local cache first (sub-millisecond)
         if call_sid in self.local_cache:
+            _LOOKUPS.labels("local").inc()
             return self.local_cache[call_sid]
         
         # Try Redis
@@ -145,17 +155,21 @@ class SessionStore:
                     session = self._deserialize(data)
                     # Populate local cache
                     self.local_cache[call_sid] = session
+                    _LOOKUPS.labels("redis").inc()
                     return session
             except RedisError as e:
                 logger.error("Redis get failed: %s", str(e))
+                _REDIS_ERRORS.labels("get").inc()
                 self._redis_healthy = False
         
         # Check in-memory fallback
         if call_sid in self.in_memory_fallback:
             session = self.in_memory_fallback[call_sid]
             self.local_cache[call_sid] = session
+            _LOOKUPS.labels("fallback").inc()
             return session
         
+        _LOOKUPS.labels("miss").inc()
         return None
     
     def set(self, call_sid: str, session: Dict[str, Any]) -> None:
@@ -174,6 +188,7 @@ class SessionStore:
                 return
             except RedisError as e:
                 logger.error("Redis set failed: %s", str(e))
+                _REDIS_ERRORS.labels("set").inc()
                 self._redis_healthy = False
         
         # Fallback to in-memory
@@ -192,6 +207,7 @@ class SessionStore:
                 self.redis_client.delete(key)
             except RedisError as e:
                 logger.error("Redis delete failed: %s", str(e))
+                _REDIS_ERRORS.labels("delete").inc()
         
         # Remove from in-memory fallback
         if call_sid in self.in_memory_fallback:
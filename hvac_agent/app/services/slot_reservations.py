@@ -0,0 +1,184 @@
+"""
+Short-lived slot holds for HVAC Voice Agent.
+
+When the agent tells a caller a slot is open, the slot is held for that
+call for SLOT_HOLD_SECONDS while the caller confirms, so a second caller
+is not offered the same hour. The hold is advisory: the booking commit is
+still guarded by the unique index on active (location_id, date, time),
+so an expired or lost hold can never produce a double booking.
+
+Provides:
+- Redis backend (SET NX PX) shared by every instance when REDIS_URL is set
+- In-memory fallback (per process)
+- reserve() is re-entrant for the same holder and refreshes the TTL
+- release() only removes the caller's own hold
+
+Usage:
+    from app.services.slot_reservations import get_slot_reservations
+
+    holds = get_slot_reservations()
+    if holds.reserve(location_id, day, hour, holder=call_sid):
+        ...
+    holds.release(location_id, day, hour, holder=call_sid)
+"""
+
+import os
+import threading
+import time
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from app.utils.logging import get_logger
+from app.utils.metrics import register_stats
+
+logger = get_logger("slot_reservations")
+
+# Try to import Redis, but make it optional
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Configuration
+REDIS_URL = os.getenv("REDIS_URL")
+SLOT_HOLD_SECONDS = float(os.getenv("SLOT_HOLD_SECONDS", "120"))
+
+# Set the hold when it is free or already ours (refreshing the TTL)
+_RESERVE_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if (not current) or current == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# Delete the hold only when it is ours
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SlotReservations:
+    """Per-slot holds with a TTL, keyed by (location_id, day, hour)."""
+
+    def __init__(self, ttl: float = SLOT_HOLD_SECONDS, redis_url: Optional[str] = REDIS_URL):
+        self.ttl = ttl
+        self.redis_client = None
+        self._holds: Dict[Tuple[int, date, int], Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"reserved": 0, "conflicts": 0, "released": 0}
+
+        if REDIS_AVAILABLE and redis_url:
+            try:
+                self.redis_client = redis.from_url(
+                    redis_url,
+                    decode_responses=True,
+                    socket_connect_timeout=2,
+                    socket_timeout=2,
+                )
+                self.redis_client.ping()
+                self._reserve_script = self.redis_client.register_script(_RESERVE_SCRIPT)
+                self._release_script = self.redis_client.register_script(_RELEASE_SCRIPT)
+                logger.info("Slot holds in Redis: %s", redis_url)
+            except Exception as e:
+                logger.warning("Failed to connect to Redis (%s), using in-memory slot holds", str(e))
+                self.redis_client = None
+
+    @staticmethod
+    def _key(location_id: int, day: date, hour: int) -> str:
+        return f"slot_hold:{location_id}:{day.isoformat()}:{hour:02d}"
+
+    def reserve(self, location_id: int, day: date, hour: int, holder: str,
+                ttl: Optional[float] = None) -> bool:
+        """
+        Hold the slot for `holder`. Returns False when someone else holds it.
+
+        Holding a slot you already hold succeeds and restarts its TTL.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if self.redis_client is not None:
+            try:
+                ok = bool(self._reserve_script(
+                    keys=[self._key(location_id, day, hour)], args=[holder, int(ttl * 1000)]
+                ))
+                self.stats["reserved" if ok else "conflicts"] += 1
+                return ok
+            except Exception as e:
+                # The unique index still protects the commit; don't block bookings on Redis
+                logger.error("Slot hold failed in Redis, allowing: %s", str(e))
+                return True
+
+        slot = (location_id, day, hour)
+        now = time.monotonic()
+        with self._lock:
+            current = self._holds.get(slot)
+            if current and current[0] != holder and current[1] > now:
+                self.stats["conflicts"] += 1
+                return False
+            self._holds[slot] = (holder, now + ttl)
+            self.stats["reserved"] += 1
+            if len(self._holds) > 10000:
+                self._purge(now)
+        return True
+
+    def release(self, location_id: int, day: date, hour: int, holder: str) -> bool:
+        """Drop `holder`'s hold on the slot (no-op if it is not theirs)."""
+        if self.redis_client is not None:
+            try:
+                released = bool(self._release_script(keys=[self._key(location_id, day, hour)], args=[holder]))
+            except Exception as e:
+                logger.error("Slot release failed in Redis: %s", str(e))
+                return False
+        else:
+            slot = (location_id, day, hour)
+            with self._lock:
+                released = self._holds.get(slot, ("",))[0] == holder
+                if released:
+                    del self._holds[slot]
+        if released:
+            self.stats["released"] += 1
+        return released
+
+    def holder(self, location_id: int, day: date, hour: int) -> Optional[str]:
+        """Current holder of the slot, if the hold has not expired."""
+        if self.redis_client is not None:
+            try:
+                return self.redis_client.get(self._key(location_id, day, hour))
+            except Exception as e:
+                logger.error("Slot hold lookup failed in Redis: %s", str(e))
+                return None
+        with self._lock:
+            current = self._holds.get((location_id, day, hour))
+        return current[0] if current and current[1] > time.monotonic() else None
+
+    def _purge(self, now: float) -> None:
+        for slot in [s for s, (_, expires) in self._holds.items() if expires <= now]:
+            del self._holds[slot]
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            **self.stats,
+            "backend": "redis" if self.redis_client is not None else "memory",
+            "hold_seconds": self.ttl,
+        }
+
+
+# Singleton instance
+_slot_reservations: Optional[SlotReservations] = None
+_reservations_lock = threading.Lock()
+
+
+def get_slot_reservations() -> SlotReservations:
+    """Get or create the slot hold store."""
+    global _slot_reservations
+    with _reservations_lock:
+        if _slot_reservations is None:
+            _slot_reservations = SlotReservations()
+            register_stats("hvac_slot_holds", _slot_reservations.get_stats,
+                           counters=("reserved", "conflicts", "released"), documentation="Slot holds")
+        return _slot_reservations
@@ -0,0 +1,368 @@
+"""
+Shared Twilio messaging service for HVAC Voice Agent.
+
+One pooled HTTP session to the Twilio Messages API for the whole process,
+instead of a new twilio.rest.Client (and TLS handshake) per SMS.
+
+Provides:
+- Sync and async sends over keep-alive connection pools
+- Per-sender rate governor (carrier throughput: ~1 msg/s for a long code,
+  3 for toll-free, 100+ for short codes)
+- Retries on 429/5xx honouring Retry-After
+- Batched dispatch with bounded concurrency (reminders)
+- Delivery-status callback aggregation for metrics (send_ms_* covers
+  pacing and retries, i.e. time from send() to Twilio accepting the message)
+
+Usage:
+    from app.services.sms_service import get_messaging_service
+
+    result = get_messaging_service().send("+15551234567", "Your tech is on the way")
+    results = await get_messaging_service().send_many([(phone, text), ...])
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from app.utils.logging import get_logger
+from app.utils.metrics import register_stats
+
+logger = get_logger("sms")
+
+# Configuration
+TWILIO_API_BASE = os.getenv("TWILIO_API_BASE", "https://api.twilio.com")
+TWILIO_SMS_PER_SECOND = float(os.getenv("TWILIO_SMS_PER_SECOND", "1"))
+TWILIO_SMS_STATUS_CALLBACK_URL = os.getenv("TWILIO_SMS_STATUS_CALLBACK_URL")
+TWILIO_SMS_CONCURRENCY = int(os.getenv("TWILIO_SMS_CONCURRENCY", "4"))
+
+# Final delivery states reported to the status callback
+FINAL_STATUSES = {"delivered", "undelivered", "failed"}
+
+
+class RateGovernor:
+    """
+    Spaces sends from each sender number `1 / rate` seconds apart.
+
+    Slots are reserved under a lock and waited out afterwards, so threads and
+    coroutines share one schedule per number.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, sender: str) -> float:
+        """Reserve the next slot for `sender`; returns seconds to wait for it."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(sender, 0.0))
+            self._next[sender] = slot + self.interval
+        return slot - now
+
+    def wait(self, sender: str) -> float:
+        delay = self.reserve(sender)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def await_slot(self, sender: str) -> float:
+        delay = self.reserve(sender)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class TwilioMessagingService:
+    """Twilio Messages API client shared by every SMS sender in the app."""
+
+    def __init__(
+        self,
+        account_sid: Optional[str],
+        auth_token: Optional[str],
+        from_number: Optional[str],
+        base_url: str = TWILIO_API_BASE,
+        messages_per_second: float = TWILIO_SMS_PER_SECOND,
+        status_callback_url: Optional[str] = TWILIO_SMS_STATUS_CALLBACK_URL,
+        max_retries: int = 2,
+        timeout: float = 10.0,
+        transport: Optional[httpx.MockTransport] = None,
+    ):
+        self.account_sid = account_sid
+        self.auth_token = auth_token
+        self.from_number = from_number
+        self.base_url = base_url.rstrip("/")
+        self.status_callback_url = status_callback_url
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.transport = transport  # Tests only: replaces the network
+        self.governor = RateGovernor(messages_per_second)
+
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._stats: Counter = Counter()
+        self._latencies_ms: Deque[float] = deque(maxlen=1000)
+        self._statuses: Counter = Counter()
+        self._error_codes: Counter = Counter()
+        self._message_status: Dict[str, str] = {}
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.account_sid and self.auth_token and self.from_number)
+
+    @property
+    def messages_url(self) -> str:
+        return f"{self.base_url}/2010-04-01/Accounts/{self.account_sid}/Messages.json"
+
+    # ---- pooled clients ---------------------------------------------------
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60)
+
+    def _sync_client(self) -> httpx.Client:
+        with self._client_lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    auth=(self.account_sid, self.auth_token), timeout=self.timeout, limits=self._limits(),
+                    transport=self.transport,
+                )
+            return self._client
+
+    def _aclient(self) -> httpx.AsyncClient:
+        # An AsyncClient is tied to the loop it first ran on
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._drop_async_client()
+            self._async_client = httpx.AsyncClient(
+                auth=(self.account_sid, self.auth_token), timeout=self.timeout, limits=self._limits(),
+                transport=self.transport,
+            )
+            self._async_loop = loop
+        return self._async_client
+
+    def _drop_async_client(self) -> None:
+        """Close the AsyncClient on the loop that owns its connections."""
+        client, loop = self._async_client, self._async_loop
+        self._async_client, self._async_loop = None, None
+        if client is None or loop is None or loop.is_closed():
+            return  # A closed loop has already torn down its connections
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+
+        # Idle loop: drive it from a helper thread (this one may be inside another loop)
+        def run_close():
+            try:
+                loop.run_until_complete(client.aclose())
+            except RuntimeError as e:
+                logger.debug("Could not close previous Twilio AsyncClient: %s", str(e))
+
+        closer = threading.Thread(target=run_close, name="sms-client-close", daemon=True)
+        closer.start()
+        closer.join(timeout=5)
+
+    def close(self) -> None:
+        """Close both connection pools."""
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+        self._drop_async_client()
+
+    async def aclose(self) -> None:
+        """close() from a coroutine; awaits the async pool when it belongs to this loop."""
+        if self._async_client is not None and self._async_loop is asyncio.get_running_loop():
+            client, self._async_client, self._async_loop = self._async_client, None, None
+            await client.aclose()
+        self.close()
+
+    # ---- sending ----------------------------------------------------------
+
+    def _form(self, to_phone: str, body: str, from_number: str) -> Dict[str, str]:
+        form = {"To": to_phone, "From": from_number, "Body": body}
+        if self.status_callback_url:
+            form["StatusCallback"] = self.status_callback_url
+        return form
+
+    def _not_configured(self) -> Dict[str, Any]:
+        logger.warning("Twilio not configured. Set TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER")
+        return {"success": False, "error": "Twilio not configured"}
+
+    def _retry_delay(self, response: Optional[httpx.Response], attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, or None when the failure is final"""
+        if attempt >= self.max_retries:
+            return None
+        if response is not None and response.status_code != 429 and response.status_code < 500:
+            return None
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        return float(retry_after) if retry_after else min(10.0, 0.5 * 2 ** attempt)
+
+    def _result(self, to_phone: str, response: Optional[httpx.Response], error: Optional[str],
+                started: float) -> Dict[str, Any]:
+        latency_ms = (time.perf_counter() - started) * 1000
+        if response is not None and response.status_code in (200, 201):
+            data = response.json()
+            self._record("sent", latency_ms, data.get("sid"), data.get("status"))
+            logger.info("SMS sent to %s, SID: %s", to_phone, data.get("sid"))
+            return {"success": True, "message_sid": data.get("sid"), "status": data.get("status")}
+
+        result: Dict[str, Any] = {"success": False}
+        if response is not None:
+            try:
+                payload = response.json()
+            except ValueError:
+                payload = {}
+            error = payload.get("message") or f"HTTP {response.status_code}"
+            result["http_status"] = response.status_code
+            if payload.get("code"):
+                result["error_code"] = payload["code"]
+                with self._stats_lock:
+                    self._error_codes[str(payload["code"])] += 1
+        self._record("failed", latency_ms)
+        logger.error("Failed to send SMS: %s", error)
+        return {**result, "error": error}
+
+    def send(self, to_phone: str, body: str, from_number: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Send one SMS (blocking). Returns {"success", "message_sid", "status"} or
+        {"success", "error"}, plus "http_status"/"error_code" when Twilio answered.
+        """
+        if not self.is_configured:
+            return self._not_configured()
+        sender = from_number or self.from_number
+        form = self._form(to_phone, body, sender)
+        started = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            self._add_wait(self.governor.wait(sender))
+            response, error = None, None
+            try:
+                response = self._sync_client().post(self.messages_url, data=form)
+            except httpx.TransportError as e:
+                error = str(e)
+            delay = None if response is not None and response.status_code in (200, 201) \
+                else self._retry_delay(response, attempt)
+            if delay is None:
+                return self._result(to_phone, response, error, started)
+            self._count("retries")
+            time.sleep(delay)
+
+    async def asend(self, to_phone: str, body: str, from_number: Optional[str] = None) -> Dict[str, Any]:
+        """Send one SMS without blocking the event loop."""
+        if not self.is_configured:
+            return self._not_configured()
+        sender = from_number or self.from_number
+        form = self._form(to_phone, body, sender)
+        started = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            self._add_wait(await self.governor.await_slot(sender))
+            response, error = None, None
+            try:
+                response = await self._aclient().post(self.messages_url, data=form)
+            except httpx.TransportError as e:
+                error = str(e)
+            delay = None if response is not None and response.status_code in (200, 201) \
+                else self._retry_delay(response, attempt)
+            if delay is None:
+                return self._result(to_phone, response, error, started)
+            self._count("retries")
+            await asyncio.sleep(delay)
+
+    async def send_many(
+        self,
+        messages: Iterable[Tuple[str, str]],
+        concurrency: int = TWILIO_SMS_CONCURRENCY,
+        from_number: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Send (to_phone, body) pairs over the shared session, `concurrency` in
+        flight and paced by the rate governor. Results are in input order.
+        """
+        slots = asyncio.Semaphore(max(1, concurrency))
+
+        async def send_one(to_phone: str, body: str) -> Dict[str, Any]:
+            async with slots:
+                return await self.asend(to_phone, body, from_number)
+
+        return await asyncio.gather(*(send_one(to, body) for to, body in messages))
+
+    # ---- metrics ----------------------------------------------------------
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += n
+
+    def _add_wait(self, seconds: float) -> None:
+        with self._stats_lock:
+            self._stats["requests"] += 1
+            if seconds > 0:
+                self._stats["rate_limited_waits"] += 1
+                self._stats["rate_wait_ms"] += int(seconds * 1000)
+
+    def _record(self, outcome: str, latency_ms: float, sid: Optional[str] = None,
+                status: Optional[str] = None) -> None:
+        with self._stats_lock:
+            self._stats[outcome] += 1
+            self._latencies_ms.append(latency_ms)
+            if sid and status:
+                self._message_status[sid] = status
+
+    def record_status(self, message_sid: str, status: str, error_code: Optional[str] = None) -> None:
+        """Apply a delivery-status callback (MessageSid, MessageStatus, ErrorCode)."""
+        with self._stats_lock:
+            if self._message_status.get(message_sid) in FINAL_STATUSES:
+                return  # Callbacks can arrive out of order; keep the final state
+            self._message_status[message_sid] = status
+            if status in FINAL_STATUSES:
+                self._statuses[status] += 1
+                if error_code:
+                    self._error_codes[str(error_code)] += 1
+            if len(self._message_status) > 10000:
+                self._message_status.pop(next(iter(self._message_status)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            latencies = sorted(self._latencies_ms)
+            final = sum(self._statuses.values())
+            return {
+                "configured": self.is_configured,
+                "messages_per_second": round(1 / self.governor.interval, 2) if self.governor.interval else None,
+                **dict(self._stats),
+                "send_ms_p50": round(latencies[len(latencies) // 2], 1) if latencies else None,
+                "send_ms_p95": round(latencies[int(len(latencies) * 0.95)], 1) if latencies else None,
+                "delivery": dict(self._statuses),
+                "delivery_rate": round(self._statuses["delivered"] / final, 3) if final else None,
+                "error_codes": dict(self._error_codes),
+            }
+
+
+# Singleton instance
+_messaging_service: Optional[TwilioMessagingService] = None
+_messaging_lock = threading.Lock()
+
+
+def get_messaging_service() -> TwilioMessagingService:
+    """Get or create the shared messaging service (configured from env)."""
+    global _messaging_service
+    with _messaging_lock:
+        if _messaging_service is None:
+            _messaging_service = TwilioMessagingService(
+                account_sid=os.getenv("TWILIO_ACCOUNT_SID"),
+                auth_token=os.getenv("TWILIO_AUTH_TOKEN"),
+                from_number=os.getenv("TWILIO_PHONE_NUMBER"),
+            )
+            register_stats("hvac_sms", _messaging_service.get_stats,
+                           counters=("requests", "rate_limited_waits", "rate_wait_ms", "sent", "failed",
+                                     "retries", "delivery", "error_codes"),
+                           labels={"delivery": "status", "error_codes": "code"}, documentation="Outbound SMS")
+        return _messaging_service
@@ -6,10 +6,13 @@ Provides abstraction over multiple TTS providers with fallback support.
 
 from app.services.tts.elevenlabs import ElevenLabsTTS, stream_tts
 from app.services.tts.factory import get_tts_provider, TTSProvider
+from app.services.tts.pipeline import SentenceChunker, stream_speech
 
 __all__ = [
     "ElevenLabsTTS",
     "stream_tts",
     "get_tts_provider",
     "TTSProvider",
+    "SentenceChunker",
+    "stream_speech",
 ]
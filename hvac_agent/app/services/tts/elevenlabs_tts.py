@@ -27,6 +27,8 @@ from datetime import datetime, timedelta
 import httpx
 
 from app.utils.logging import get_logger
+from app.utils.metrics import counter, gauge
+from app.utils.tracing import traced
 
 logger = get_logger("tts.elevenlabs")
 
@@ -59,11 +61,18 @@ MAX_CACHE_SIZE = 500  # Max cached audio files
 # =============================================================================
 # AUDIO CACHE
 # =============================================================================
+_CACHE_LOOKUPS = counter("hvac_tts_audio_cache_lookups_total", "ElevenLabs audio cache lookups, by result", ("result",))
+_CACHE_EVICTIONS = counter("hvac_tts_audio_cache_evictions_total", "Audio entries evicted to make room")
+_CACHE_SIZE = gauge("hvac_tts_audio_cache_size", "Cached ElevenLabs audio clips")
+
+
 class AudioCache:
     """Thread-safe in-memory audio cache."""
     
     def __init__(self):
         self._cache: Dict[str, Dict] = {}
+        self._hits = _CACHE_LOOKUPS.labels("hit")
+        self._misses = _CACHE_LOOKUPS.labels("miss")
     
     def _hash_text(self, text: str) -> str:
         """Generate deterministic hash from text."""
@@ -76,9 +85,11 @@ class AudioCache:
             entry = self._cache[key]
             if datetime.now() < entry["expires"]:
                 logger.debug("Cache HIT: %s", text[:30])
+                self._hits.inc()
                 return (key, entry["audio"])
             else:
                 del self._cache[key]
+        self._misses.inc()
         return None
     
     def set(self, text: str, audio: bytes) -> str:
@@ -117,6 +128,7 @@ class AudioCache:
         to_remove = max(1, len(sorted_keys) // 10)
         for key in sorted_keys[:to_remove]:
             del self._cache[key]
+        _CACHE_EVICTIONS.inc(to_remove)
         logger.info("Evicted %d cache entries", to_remove)
     
     def stats(self) -> Dict:
@@ -124,11 +136,14 @@ class AudioCache:
         return {
             "size": len(self._cache),
             "max_size": MAX_CACHE_SIZE,
+            "hits": int(self._hits.value),
+            "misses": int(self._misses.value),
         }
 
 
 # Global cache instance
 _audio_cache = AudioCache()
+_CACHE_SIZE.set_function(lambda: len(_audio_cache._cache))
 
 
 # =============================================================================
@@ -211,6 +226,7 @@ def get_audio_url(hash_key: str, host: str) -> str:
     return f"{host}/audio/{hash_key}.mp3"
 
 
+@traced("tts", provider="elevenlabs")
 async def generate_audio_url(text: str, host: str) -> Optional[str]:
     """
     Generate audio and return public URL.
@@ -13,18 +13,25 @@ Features:
 - Health tracking per provider
 - Circuit breaker integration
 - Quality preference modes (best, fast, reliable)
+- Latency-aware routing: providers are ranked by their live
+  time-to-first-audio (TTFA) distribution, weighted by preference
+- Hedging: if the leading provider hasn't produced audio within its p95
+  TTFA, the next provider is started too; the first to produce audio
+  wins and the other is cancelled
 """
 
 import os
 import asyncio
 import time
-from typing import Optional, Callable, Any, Dict, List
+from collections import Counter, deque
+from typing import Optional, Callable, Any, Awaitable, Deque, Dict, List
 from enum import Enum
 from dataclasses import dataclass, field
 
 import aiohttp
 
 from app.utils.logging import get_logger
+from app.utils.metrics import register_stats
 from app.utils.circuit_breaker import CircuitBreakerManager, CircuitBreakerOpen
 from app.services.audio.converter import convert_mp3_to_ulaw
 from app.services.audio.buffer import MP3FrameBuffer
@@ -36,6 +43,14 @@ ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 ELEVENLABS_VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID", "DLsHlh26Ugcm6ELvS0qi")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Latency-aware routing / hedging
+TTS_HEDGE_ENABLED = os.getenv("TTS_HEDGE_ENABLED", "true").lower() == "true"
+TTS_HEDGE_DEFAULT_MS = float(os.getenv("TTS_HEDGE_DEFAULT_MS", "800"))  # Until a provider has enough samples
+TTS_HEDGE_MIN_MS = float(os.getenv("TTS_HEDGE_MIN_MS", "150"))
+TTS_HEDGE_MAX_MS = float(os.getenv("TTS_HEDGE_MAX_MS", "3000"))
+TTS_LATENCY_WINDOW = int(os.getenv("TTS_LATENCY_WINDOW", "200"))
+TTS_MIN_SAMPLES = int(os.getenv("TTS_MIN_SAMPLES", "5"))
+
 
 class QualityPreference(Enum):
     """TTS quality preference modes."""
@@ -44,6 +59,20 @@ class QualityPreference(Enum):
     RELIABLE = "reliable"  # Prioritize reliability (multiple fallbacks)
 
 
+# Base order per preference, and how many ms of expected TTFA one step down
+# that order is worth (a later provider must be this much faster to move up)
+PREFERENCE_ORDER = {
+    QualityPreference.BEST: ["elevenlabs", "openai", "polly"],
+    QualityPreference.FAST: ["polly", "openai", "elevenlabs"],
+    QualityPreference.RELIABLE: ["polly", "elevenlabs", "openai"],
+}
+PREFERENCE_PENALTY_MS = {
+    QualityPreference.BEST: 300.0,
+    QualityPreference.FAST: 0.0,
+    QualityPreference.RELIABLE: 150.0,
+}
+
+
 @dataclass
 class ProviderHealth:
     """Health status for a TTS provider."""
@@ -54,6 +83,25 @@ class ProviderHealth:
     failure_count: int = 0
     success_count: int = 0
     avg_latency_ms: float = 0.0
+    # Rolling time-to-first-audio samples (ms)
+    ttfa_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=TTS_LATENCY_WINDOW))
+    # Attempts cancelled before their first audio (TTFA unknown, only bounded below)
+    ttfa_censored: int = 0
+    
+    def record_first_audio(self, latency_ms: float):
+        self.ttfa_ms.append(latency_ms)
+    
+    def record_censored(self):
+        # Not a TTFA sample: a hedge loser cut off early would drag the
+        # percentiles down and make routing flip between providers
+        self.ttfa_censored += 1
+    
+    def ttfa_percentile(self, q: float) -> Optional[float]:
+        """TTFA percentile over the rolling window, None until TTS_MIN_SAMPLES samples"""
+        if len(self.ttfa_ms) < TTS_MIN_SAMPLES:
+            return None
+        samples = sorted(self.ttfa_ms)
+        return samples[min(len(samples) - 1, int(len(samples) * q))]
     
     def record_success(self, latency_ms: float):
         self.healthy = True
@@ -84,9 +132,21 @@ class ProviderHealth:
         return False
 
 
+class _LostRace(Exception):
+    """Raised inside a hedged provider that produced audio after another one won."""
+
+
+@dataclass
+class _Race:
+    """Shared state for one hedged speak() call."""
+    winner: Optional[str] = None
+    first_audio: asyncio.Event = field(default_factory=asyncio.Event)
+    started: Dict[str, float] = field(default_factory=dict)
+
+
 class HybridTTSEngine:
     """
-    Multi-provider TTS engine with automatic failover.
+    Multi-provider TTS engine with latency-aware routing and hedged failover.
     
     Usage:
         engine = HybridTTSEngine()
@@ -97,19 +157,30 @@ class HybridTTSEngine:
         success = await engine.speak("Hello!", send_audio)
     """
     
-    def __init__(self):
+    def __init__(self, hedge_enabled: bool = TTS_HEDGE_ENABLED):
         self._session: Optional[aiohttp.ClientSession] = None
         self._providers: Dict[str, ProviderHealth] = {
             "elevenlabs": ProviderHealth(name="elevenlabs"),
             "openai": ProviderHealth(name="openai"),
             "polly": ProviderHealth(name="polly"),
         }
+        self._speakers: Dict[str, Callable[[str, Callable[[bytes], Any]], Awaitable[bool]]] = {
+            "elevenlabs": self._speak_elevenlabs,
+            "openai": self._speak_openai,
+            "polly": self._speak_polly,
+        }
+        self.hedge_enabled = hedge_enabled
         
         # Circuit breakers for each provider
         self._circuits = {
             "elevenlabs": CircuitBreakerManager.get("elevenlabs", failure_threshold=3, recovery_timeout=30),
             "openai": CircuitBreakerManager.get("openai_tts", failure_threshold=3, recovery_timeout=30),
         }
+        
+        # Routing decisions
+        self._decisions: Counter = Counter()
+        self._wins: Counter = Counter()
+        self._last_decision: Optional[Dict[str, Any]] = None
     
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session."""
@@ -124,14 +195,74 @@ class HybridTTSEngine:
         if self._session and not self._session.closed:
             await self._session.close()
     
+    def _expected_ttfa(self, provider_name: str) -> float:
+        """Median TTFA, or the default hedge budget while samples are scarce"""
+        p50 = self._providers[provider_name].ttfa_percentile(0.5)
+        return TTS_HEDGE_DEFAULT_MS if p50 is None else p50
+    
+    def _hedge_delay_ms(self, provider_name: str) -> float:
+        """How long to wait for a provider's first audio before starting the next one"""
+        p95 = self._providers[provider_name].ttfa_percentile(0.95)
+        delay = TTS_HEDGE_DEFAULT_MS if p95 is None else p95
+        return min(TTS_HEDGE_MAX_MS, max(TTS_HEDGE_MIN_MS, delay))
+    
     def _get_provider_order(self, preference: QualityPreference) -> List[str]:
-        """Get provider order based on preference."""
-        if preference == QualityPreference.BEST:
-            return ["elevenlabs", "openai", "polly"]
-        elif preference == QualityPreference.FAST:
-            return ["polly", "openai", "elevenlabs"]
-        else:  # RELIABLE
-            return ["polly", "elevenlabs", "openai"]
+        """
+        Get provider order from live TTFA, weighted by preference.
+        
+        Score = expected TTFA + PREFERENCE_PENALTY_MS per step down the
+        preference order; with no samples this is the preference order.
+        """
+        base = PREFERENCE_ORDER.get(preference, PREFERENCE_ORDER[QualityPreference.BEST])
+        penalty = PREFERENCE_PENALTY_MS.get(preference, 0.0)
+        return sorted(
+            base,
+            key=lambda name: self._expected_ttfa(name) + penalty * base.index(name),
+        )
+    
+    def _can_use(self, provider_name: str) -> bool:
+        health = self._providers[provider_name]
+        if not health.should_retry():
+            logger.debug("Skipping unhealthy provider: %s", provider_name)
+            return False
+        circuit = self._circuits.get(provider_name)
+        if circuit and not circuit.can_execute():
+            logger.debug("Circuit open for provider: %s", provider_name)
+            return False
+        return True
+    
+    def _record(self, provider_name: str, ok: bool, latency_ms: float = 0.0) -> None:
+        health = self._providers[provider_name]
+        circuit = self._circuits.get(provider_name)
+        if ok:
+            health.record_success(latency_ms)
+            if circuit:
+                circuit.record_success()
+        else:
+            health.record_failure()
+            if circuit:
+                circuit.record_failure()
+    
+    async def _attempt(
+        self,
+        provider_name: str,
+        text: str,
+        send_audio: Callable[[bytes], Any],
+        race: _Race,
+    ) -> bool:
+        """Run one provider; only the first provider to produce audio reaches send_audio."""
+        started = race.started[provider_name]
+        
+        async def gated_send(chunk: bytes):
+            if race.winner is None:
+                race.winner = provider_name
+                self._providers[provider_name].record_first_audio((time.monotonic() - started) * 1000)
+                race.first_audio.set()
+            if race.winner != provider_name:
+                raise _LostRace()
+            await send_audio(chunk)
+        
+        return await self._speakers[provider_name](text, gated_send)
     
     async def speak(
         self,
@@ -142,6 +273,11 @@ class HybridTTSEngine:
         """
         Convert text to speech and send via callback.
         
+        Providers are tried in latency-aware order. A failure starts the next
+        provider at once; a provider that is merely slow (no audio within its
+        p95 TTFA) gets the next provider started alongside it, and whichever
+        produces audio first wins while the other is cancelled.
+        
         Args:
             text: Text to convert to speech
             send_audio: Async callback to send audio chunks
@@ -153,60 +289,116 @@ class HybridTTSEngine:
         if not text or not text.strip():
             return True
         
-        providers = self._get_provider_order(preference)
-        last_error = None
+        order = self._get_provider_order(preference)
+        queue = [name for name in order if self._can_use(name)]
+        self._decisions["requests"] += 1
+        if not queue:
+            self._decisions["no_provider"] += 1
+            logger.error("No TTS provider available (all unhealthy or circuits open)")
+            return False
+        
+        race = _Race()
+        tasks: Dict[asyncio.Task, str] = {}
+        launched: List[str] = []
+        hedged: List[str] = []
+        last_error: Optional[BaseException] = None
         
-        for provider_name in providers:
-            health = self._providers[provider_name]
+        def launch(hedge: bool = False) -> None:
+            name = queue.pop(0)
+            race.started[name] = time.monotonic()
+            launched.append(name)
+            if hedge:
+                hedged.append(name)
+            tasks[asyncio.ensure_future(self._attempt(name, text, send_audio, race))] = name
+        
+        launch()
+        first_audio = asyncio.ensure_future(race.first_audio.wait())
+        try:
+            while race.winner is None:
+                running = [t for t in tasks if not t.done()]
+                if not running:
+                    if not queue:
+                        break
+                    self._decisions["failovers"] += 1
+                    launch()
+                    continue
+                
+                timeout = None
+                if queue and self.hedge_enabled:
+                    leader = tasks[running[-1]]
+                    elapsed_ms = (time.monotonic() - race.started[leader]) * 1000
+                    timeout = max(0.0, self._hedge_delay_ms(leader) - elapsed_ms) / 1000
+                
+                done, _ = await asyncio.wait(
+                    running + [first_audio], timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if race.winner is not None:
+                    break
+                if not done:
+                    # Leader is past its p95 TTFA: hedge with the next provider
+                    self._decisions["hedges"] += 1
+                    launch(hedge=True)
+                    continue
+                
+                for task in done:
+                    if task is first_audio:
+                        continue
+                    name = tasks[task]
+                    try:
+                        ok = task.result()
+                    except Exception as e:
+                        ok, last_error = False, e
+                        logger.warning("TTS provider %s failed: %s", name, str(e))
+                    if ok and race.winner is None:
+                        race.winner = name  # Finished without sending audio
+                    elif not ok:
+                        self._record(name, ok=False)
             
-            if not health.should_retry():
-                logger.debug("Skipping unhealthy provider: %s", provider_name)
-                continue
+            if race.winner is None:
+                self._decisions["all_failed"] += 1
+                logger.error("All TTS providers failed. Last error: %s", last_error)
+                return False
             
-            # Check circuit breaker
-            circuit = self._circuits.get(provider_name)
-            if circuit and not circuit.can_execute():
-                logger.debug("Circuit open for provider: %s", provider_name)
-                continue
+            # Cancel the losers; their TTFA is unknown, so they are only counted
+            winner_task = next(t for t, name in tasks.items() if name == race.winner)
+            for task, name in tasks.items():
+                if task is not winner_task and not task.done():
+                    task.cancel()
+                    self._providers[name].record_censored()
+                    self._decisions["losers_cancelled"] += 1
             
             try:
-                start_time = time.time()
-                
-                if provider_name == "elevenlabs":
-                    success = await self._speak_elevenlabs(text, send_audio)
-                elif provider_name == "openai":
-                    success = await self._speak_openai(text, send_audio)
-                else:
-                    success = await self._speak_polly(text, send_audio)
-                
-                if success:
-                    latency = (time.time() - start_time) * 1000
-                    health.record_success(latency)
-                    if circuit:
-                        circuit.record_success()
-                    logger.debug(
-                        "TTS success with %s: %.0fms",
-                        provider_name, latency
-                    )
-                    return True
-                else:
-                    health.record_failure()
-                    if circuit:
-                        circuit.record_failure()
-                    
+                ok = await winner_task
             except Exception as e:
-                last_error = e
-                health.record_failure()
-                if circuit:
-                    circuit.record_failure()
-                logger.warning(
-                    "TTS provider %s failed: %s",
-                    provider_name, str(e)
-                )
-                continue
-        
-        logger.error("All TTS providers failed. Last error: %s", last_error)
-        return False
+                ok, last_error = False, e
+                logger.warning("TTS provider %s failed mid-stream: %s", race.winner, str(e))
+            latency = (time.monotonic() - race.started[race.winner]) * 1000
+            self._record(race.winner, ok=ok, latency_ms=latency)
+            
+            self._wins[race.winner] += 1
+            if race.winner in hedged:
+                self._decisions["hedge_wins"] += 1
+            elif race.winner == launched[0]:
+                self._decisions["primary_wins"] += 1
+            self._last_decision = {
+                "order": order,
+                "launched": launched,
+                "winner": race.winner,
+                "hedged": bool(hedged),
+                "ttfa_ms": round(self._providers[race.winner].ttfa_ms[-1], 1)
+                if self._providers[race.winner].ttfa_ms else None,
+                "success": ok,
+            }
+            logger.debug("TTS %s with %s: %.0fms (launched %s)",
+                         "success" if ok else "failure", race.winner, latency, launched)
+            return ok
+        finally:
+            first_audio.cancel()
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            # Collect cancelled/failed attempts so no exception goes unretrieved
+            await asyncio.gather(*tasks, return_exceptions=True)
     
     async def _speak_elevenlabs(
         self,
@@ -334,6 +526,9 @@ class HybridTTSEngine:
     
     def get_stats(self) -> Dict[str, Any]:
         """Get engine statistics."""
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return round(value, 1) if value is not None else None
+        
         return {
             "providers": {
                 name: {
@@ -341,9 +536,24 @@ class HybridTTSEngine:
                     "success_count": health.success_count,
                     "failure_count": health.failure_count,
                     "avg_latency_ms": round(health.avg_latency_ms, 1),
+                    "ttfa_samples": len(health.ttfa_ms),
+                    "ttfa_censored": health.ttfa_censored,
+                    "ttfa_p50_ms": rounded(health.ttfa_percentile(0.5)),
+                    "ttfa_p95_ms": rounded(health.ttfa_percentile(0.95)),
+                    "hedge_after_ms": round(self._hedge_delay_ms(name), 1),
+                    "wins": self._wins[name],
                 }
                 for name, health in self._providers.items()
             },
+            "routing": {
+                "hedge_enabled": self.hedge_enabled,
+                "order": {
+                    preference.value: self._get_provider_order(preference)
+                    for preference in QualityPreference
+                },
+                **dict(self._decisions),
+                "last_decision": self._last_decision,
+            },
             "circuits": {
                 name: circuit.get_stats()
                 for name, circuit in self._circuits.items()
@@ -360,6 +570,15 @@ def get_hybrid_engine() -> HybridTTSEngine:
     global _hybrid_engine
     if _hybrid_engine is None:
         _hybrid_engine = HybridTTSEngine()
+        # Circuits are exported by the breakers themselves
+        register_stats(
+            "hvac_tts",
+            lambda: {k: v for k, v in _hybrid_engine.get_stats().items() if k != "circuits"},
+            counters=("success_count", "failure_count", "wins", "ttfa_censored", "requests", "no_provider",
+                      "failovers", "hedges", "all_failed", "losers_cancelled", "hedge_wins", "primary_wins"),
+            labels={"providers": "provider"},
+            documentation="Hybrid TTS routing",
+        )
     return _hybrid_engine
 
 
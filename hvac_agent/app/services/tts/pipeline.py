@@ -0,0 +1,239 @@
+"""
+Streaming LLM -> TTS pipeline.
+
+Instead of waiting for the full LLM completion and synthesizing it in one
+request, tokens are split into speakable chunks (sentences, or a clause for
+the very first chunk) as they arrive, and synthesis of each chunk starts
+immediately - while later chunks are still being generated. Audio is
+emitted strictly in chunk order: chunk 1 streams straight through, later
+chunks buffer until their turn.
+
+Usage:
+    async def send_audio(chunk: bytes):
+        await enqueue_audio(ctx, chunk)
+
+    ok = await stream_speech(llm_tokens(), tts.stream_to_twilio, send_audio)
+
+Cancelling the task running stream_speech() (barge-in) cancels every
+in-flight synthesis and closes the token stream.
+"""
+
+import os
+import re
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Any, List, Optional
+
+from app.utils.logging import get_logger
+from app.utils.tracing import record_span
+
+logger = get_logger("tts.pipeline")
+
+# Configuration
+TTS_PIPELINE_LOOKAHEAD = int(os.getenv("TTS_PIPELINE_LOOKAHEAD", "2"))  # Chunks synthesized ahead of playback
+TTS_FIRST_CHUNK_MIN_CHARS = int(os.getenv("TTS_FIRST_CHUNK_MIN_CHARS", "24"))
+TTS_CHUNK_MIN_CHARS = int(os.getenv("TTS_CHUNK_MIN_CHARS", "12"))
+TTS_CHUNK_MAX_CHARS = int(os.getenv("TTS_CHUNK_MAX_CHARS", "200"))
+
+# Words ending in "." that don't end a sentence
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "st", "ave", "blvd", "rd", "ln", "apt", "ste",
+    "no", "vs", "etc", "approx", "est", "jr", "sr", "inc", "co", "a.m", "p.m",
+    "e.g", "i.e", "u.s",
+}
+
+SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*(?=\s)|\n+")
+CLAUSE_END = re.compile(r"[,;:—]+(?=\s)|\s[–-]\s")
+
+Synthesize = Callable[[str, Callable[[bytes], Any]], Awaitable[bool]]
+
+
+class SentenceChunker:
+    """
+    Split a stream of LLM tokens into chunks that can be spoken on their own.
+
+    - A chunk ends at a sentence boundary (". ", "! ", "? ", newline),
+      ignoring abbreviations ("Dr. ", "a.m. ") and decimals ("3.5")
+    - The first chunk may also end at a clause boundary (", ", "; ") once it
+      has first_min_chars, so the caller hears something sooner
+    - Chunks shorter than min_chars are merged with the next one
+    - Chunks longer than max_chars are split at the last clause or space
+
+    Usage:
+        chunker = SentenceChunker()
+        async for token in tokens:
+            for chunk in chunker.feed(token):
+                speak(chunk)
+        tail = chunker.flush()
+    """
+
+    def __init__(
+        self,
+        first_min_chars: int = TTS_FIRST_CHUNK_MIN_CHARS,
+        min_chars: int = TTS_CHUNK_MIN_CHARS,
+        max_chars: int = TTS_CHUNK_MAX_CHARS,
+    ):
+        self.first_min_chars = first_min_chars
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+        self._chunks_emitted = 0
+
+    def feed(self, text: str) -> List[str]:
+        """Add text; return the chunks it completed (possibly none)."""
+        self._buffer += text
+        chunks = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            chunk, self._buffer = self._buffer[:cut].strip(), self._buffer[cut:].lstrip()
+            if chunk:
+                chunks.append(chunk)
+                self._chunks_emitted += 1
+        return chunks
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is left once the token stream has ended."""
+        chunk, self._buffer = self._buffer.strip(), ""
+        if chunk:
+            self._chunks_emitted += 1
+        return chunk or None
+
+    def _find_cut(self) -> Optional[int]:
+        """Index to cut the buffer at, or None to wait for more text."""
+        buffer = self._buffer
+        for match in SENTENCE_END.finditer(buffer):
+            if match.group().startswith(".") and self._is_abbreviation(buffer, match.start()):
+                continue
+            if len(buffer[:match.end()].strip()) >= self.min_chars:
+                return match.end()
+
+        if self._chunks_emitted == 0 and len(buffer) >= self.first_min_chars:
+            cut = self._last_match_end(CLAUSE_END, buffer, self.first_min_chars)
+            if cut is not None:
+                return cut
+
+        if len(buffer) > self.max_chars:
+            window = buffer[:self.max_chars]
+            cut = self._last_match_end(CLAUSE_END, window, self.min_chars)
+            if cut is None:
+                space = window.rfind(" ", self.min_chars)
+                cut = space if space > 0 else self.max_chars
+            return cut
+        return None
+
+    @staticmethod
+    def _last_match_end(pattern: re.Pattern, text: str, min_end: int) -> Optional[int]:
+        ends = [m.end() for m in pattern.finditer(text) if m.end() >= min_end]
+        return ends[-1] if ends else None
+
+    @staticmethod
+    def _is_abbreviation(text: str, dot: int) -> bool:
+        word = re.search(r"(\S+)$", text[:dot])
+        if not word:
+            return False
+        token = word.group(1).lower().lstrip("(\"'")
+        # Single initials ("J. Smith") don't end a sentence either
+        return token in ABBREVIATIONS or (len(token) == 1 and token.isalpha())
+
+
+@dataclass
+class _Segment:
+    """One chunk of text being synthesized, with its audio buffered in order."""
+    text: str
+    audio: asyncio.Queue = field(default_factory=asyncio.Queue)
+    task: Optional[asyncio.Task] = None
+    ok: bool = False
+
+
+async def _synthesize(segment: _Segment, synthesize: Synthesize) -> None:
+    started = time.perf_counter()
+    first_chunk = True
+
+    async def collect(chunk: bytes):
+        nonlocal first_chunk
+        if first_chunk:
+            first_chunk = False
+            record_span("tts_first_byte", (time.perf_counter() - started) * 1000, chars=len(segment.text))
+        segment.audio.put_nowait(chunk)
+
+    try:
+        segment.ok = bool(await synthesize(segment.text, collect))
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning("TTS failed for chunk '%s': %s", segment.text[:30], str(e))
+    finally:
+        segment.audio.put_nowait(None)
+
+
+async def stream_speech(
+    tokens: AsyncIterator[str],
+    synthesize: Synthesize,
+    send_audio: Callable[[bytes], Any],
+    chunker: Optional[SentenceChunker] = None,
+    lookahead: int = TTS_PIPELINE_LOOKAHEAD,
+) -> bool:
+    """
+    Speak an LLM token stream, synthesizing chunk by chunk as it is generated.
+
+    Args:
+        tokens: Async iterator of LLM text deltas
+        synthesize: TTS call taking (text, send_audio) -> success,
+            e.g. ElevenLabsTTS.stream_to_twilio or HybridTTSEngine.speak
+        send_audio: Async callback receiving audio in playback order
+        chunker: Chunking rules (default SentenceChunker())
+        lookahead: How many chunks may be synthesized ahead of the one playing
+
+    Returns:
+        True if every chunk was synthesized, False if any failed
+    """
+    chunker = chunker or SentenceChunker()
+    pending: asyncio.Queue = asyncio.Queue()
+    # Segments allowed to wait behind the one currently playing (backpressure)
+    ahead = asyncio.Semaphore(max(1, lookahead))
+    segments: List[_Segment] = []
+
+    async def start(text: str):
+        await ahead.acquire()
+        segment = _Segment(text=text)
+        pending.put_nowait(segment)
+        segment.task = asyncio.ensure_future(_synthesize(segment, synthesize))
+        segments.append(segment)
+
+    async def produce():
+        try:
+            async for token in tokens:
+                for text in chunker.feed(token):
+                    await start(text)
+            tail = chunker.flush()
+            if tail:
+                await start(tail)
+        finally:
+            pending.put_nowait(None)
+            aclose = getattr(tokens, "aclose", None)
+            if aclose:
+                await aclose()
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            segment = await pending.get()
+            if segment is None:
+                break
+            ahead.release()
+            while True:
+                chunk = await segment.audio.get()
+                if chunk is None:
+                    break
+                await send_audio(chunk)
+        await producer  # Surface token stream errors
+        return all(segment.ok for segment in segments)
+    finally:
+        pending_tasks = [producer] + [s.task for s in segments if s.task]
+        for task in pending_tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*pending_tasks, return_exceptions=True)
@@ -34,9 +34,21 @@ from functools import wraps
 from dataclasses import dataclass, field
 
 from app.utils.logging import get_logger
+from app.utils.metrics import counter, gauge
 
 logger = get_logger("circuit_breaker")
 
+_CALLS = counter(
+    "hvac_circuit_breaker_calls_total",
+    "Calls through each circuit breaker, by result (success, failure, rejected)",
+    ("breaker", "result"),
+)
+_STATE = gauge(
+    "hvac_circuit_breaker_state",
+    "Circuit breaker state (0 = closed, 1 = half open, 2 = open)",
+    ("breaker",),
+)
+
 
 class CircuitState(Enum):
     """Circuit breaker states."""
@@ -45,6 +57,9 @@ class CircuitState(Enum):
     HALF_OPEN = "half_open"  # Testing recovery
 
 
+_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
 class CircuitBreakerOpen(Exception):
     """Raised when circuit is open and request is rejected."""
     
@@ -79,10 +94,25 @@ class CircuitBreaker:
     last_failure_time: Optional[float] = field(default=None)
     last_state_change: float = field(default_factory=time.time)
     
-    # Metrics
-    total_calls: int = field(default=0)
-    total_failures: int = field(default=0)
-    total_rejections: int = field(default=0)
+    def __post_init__(self):
+        # Metrics live in the registry (scraped at /metrics), keyed by breaker name
+        self._successes = _CALLS.labels(self.name, "success")
+        self._failures = _CALLS.labels(self.name, "failure")
+        self._rejections = _CALLS.labels(self.name, "rejected")
+        self._state_gauge = _STATE.labels(self.name)
+        self._state_gauge.set(_STATE_VALUES[self.state.value])
+    
+    @property
+    def total_calls(self) -> int:
+        return int(self._successes.value + self._failures.value)
+    
+    @property
+    def total_failures(self) -> int:
+        return int(self._failures.value)
+    
+    @property
+    def total_rejections(self) -> int:
+        return int(self._rejections.value)
     
     def can_execute(self) -> bool:
         """Check if request can proceed."""
@@ -103,7 +133,7 @@ class CircuitBreaker:
     
     def record_success(self) -> None:
         """Record successful call."""
-        self.total_calls += 1
+        self._successes.inc()
         
         if self.state == CircuitState.HALF_OPEN:
             self.success_count += 1
@@ -115,8 +145,7 @@ class CircuitBreaker:
     
     def record_failure(self) -> None:
         """Record failed call."""
-        self.total_calls += 1
-        self.total_failures += 1
+        self._failures.inc()
         self.failure_count += 1
         self.last_failure_time = time.time()
         
@@ -129,13 +158,14 @@ class CircuitBreaker:
     
     def record_rejection(self) -> None:
         """Record rejected call (circuit open)."""
-        self.total_rejections += 1
+        self._rejections.inc()
     
     def _transition_to(self, new_state: CircuitState) -> None:
         """Transition to new state."""
         old_state = self.state
         self.state = new_state
         self.last_state_change = time.time()
+        self._state_gauge.set(_STATE_VALUES[new_state.value])
         
         if new_state == CircuitState.CLOSED:
             self.failure_count = 0
@@ -2,16 +2,43 @@
 Logging configuration for HVAC Voice Agent.
 
 Provides structured logging with configurable levels and formats.
+
+Records are handed to a background writer thread through a bounded queue
+(LOG_ASYNC=true, the default), so a slow stdout never stalls the audio
+loops. If the queue is full the record is dropped and counted rather than
+blocking. High-frequency events (per frame, per realtime event) should
+also go through a LogSampler so each call logs a bounded number of lines.
 """
 
+import atexit
+import json
 import logging
 import os
+import queue
 import sys
-from typing import Optional
-from datetime import datetime
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Dict, Optional, Tuple
+from datetime import datetime, timezone
+
+from app.utils.metrics import counter, gauge
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 LOG_FORMAT = os.getenv("LOG_FORMAT", "standard")  # standard, json
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() == "true"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+_DROPPED = counter("hvac_log_records_dropped_total", "Log records dropped because the writer queue was full")
+_SAMPLED_OUT = counter("hvac_log_sampled_out_total", "High-frequency log events skipped by sampling", ("event",))
+
+# Set by app.utils.tracing so records pick up the call bound to the current task
+_call_sid_provider: Optional[Callable[[], Optional[str]]] = None
+
+
+def set_call_sid_provider(provider: Callable[[], Optional[str]]) -> None:
+    """Use provider() for records logged without an explicit call_sid."""
+    global _call_sid_provider
+    _call_sid_provider = provider
 
 
 class CallContextFilter(logging.Filter):
@@ -22,10 +49,66 @@ class CallContextFilter(logging.Filter):
         self.call_sid = call_sid
     
     def filter(self, record):
-        record.call_sid = getattr(record, 'call_sid', self.call_sid or 'N/A')
+        if not hasattr(record, 'call_sid'):
+            call_sid = self.call_sid
+            if call_sid is None and _call_sid_provider is not None:
+                call_sid = _call_sid_provider()
+            record.call_sid = call_sid or 'N/A'
         return True
 
 
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never waits: the caller only merges the message
+    arguments; formatting and I/O happen on the writer thread.
+    """
+
+    def prepare(self, record):
+        # Resolve args now (they may be mutated after this call returns),
+        # leave timestamp/JSON/traceback formatting to the writer
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DROPPED.inc()
+
+
+def _build_formatter() -> logging.Formatter:
+    if LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter(
+        fmt="%(asctime)s [%(levelname)s] %(name)s [%(call_sid)s] – %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+
+# Shared writer for every logger (started on first get_logger)
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_listener: Optional[QueueListener] = None
+gauge("hvac_log_queue_depth", "Log records waiting for the writer thread").set_function(_log_queue.qsize)
+
+
+def _ensure_listener() -> None:
+    global _listener
+    if _listener is None:
+        writer = logging.StreamHandler(sys.stdout)
+        writer.setFormatter(_build_formatter())
+        _listener = QueueListener(_log_queue, writer)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+def flush_logs(timeout: float = 5.0) -> None:
+    """Wait until the writer thread has written everything queued so far."""
+    deadline = time.monotonic() + timeout
+    while _listener is not None and _log_queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
 def get_logger(name: str, call_sid: Optional[str] = None) -> logging.Logger:
     """
     Get a configured logger instance.
@@ -42,18 +125,13 @@ def get_logger(name: str, call_sid: Optional[str] = None) -> logging.Logger:
     if not logger.handlers:
         logger.setLevel(LOG_LEVEL)
         
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setLevel(LOG_LEVEL)
-        
-        if LOG_FORMAT == "json":
-            formatter = JsonFormatter()
+        if LOG_ASYNC:
+            _ensure_listener()
+            handler = NonBlockingQueueHandler(_log_queue)
         else:
-            formatter = logging.Formatter(
-                fmt="%(asctime)s [%(levelname)s] %(name)s [%(call_sid)s] – %(message)s",
-                datefmt="%Y-%m-%d %H:%M:%S",
-            )
-        
-        handler.setFormatter(formatter)
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(_build_formatter())
+        handler.setLevel(LOG_LEVEL)
         handler.addFilter(CallContextFilter(call_sid))
         logger.addHandler(handler)
         
@@ -63,14 +141,15 @@ def get_logger(name: str, call_sid: Optional[str] = None) -> logging.Logger:
     return logger
 
 
+_json_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str).encode
+
+
 class JsonFormatter(logging.Formatter):
     """JSON log formatter for structured logging."""
     
     def format(self, record):
-        import json
-        
         log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -80,7 +159,67 @@ class JsonFormatter(logging.Formatter):
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
         
-        return json.dumps(log_data)
+        return _json_encode(log_data)
+
+
+class LogSampler:
+    """
+    Per-call sampling and rate limiting for high-frequency log events.
+
+    Each (call, event) pair logs its first `first` occurrences, then every
+    `every`-th occurrence, at most `per_second` lines a second:
+
+        FRAME_LOG = LogSampler(first=5, per_second=1)
+
+        if FRAME_LOG.allow("frame_sent", ctx.call_sid):
+            logger.info("Sent frame #%d", ctx.frames_sent)
+
+    Checking before the call also skips building the message.
+    """
+
+    MAX_KEYS = 10000
+
+    def __init__(self, first: int = 0, every: int = 1, per_second: Optional[float] = None):
+        self.first = first
+        self.every = max(1, every)
+        self.per_second = per_second
+        # (call_sid, event) -> [occurrences, tokens, last refill]
+        self._state: Dict[Tuple[Optional[str], str], list] = {}
+
+    def allow(self, event: str, call_sid: Optional[str] = None) -> bool:
+        """True if this occurrence of event should be logged."""
+        if call_sid is None and _call_sid_provider is not None:
+            call_sid = _call_sid_provider()
+        key = (call_sid, event)
+        state = self._state.get(key)
+        if state is None:
+            if len(self._state) >= self.MAX_KEYS:
+                self._state.clear()
+            burst = max(1.0, self.per_second or 0.0)
+            state = self._state[key] = [0, burst, time.monotonic()]
+        state[0] += 1
+        n = state[0]
+        if n <= self.first:
+            return True
+
+        if (n - self.first) % self.every:
+            _SAMPLED_OUT.labels(event).inc()
+            return False
+
+        if self.per_second is not None:
+            now = time.monotonic()
+            state[1] = min(max(1.0, self.per_second), state[1] + (now - state[2]) * self.per_second)
+            state[2] = now
+            if state[1] < 1.0:
+                _SAMPLED_OUT.labels(event).inc()
+                return False
+            state[1] -= 1.0
+        return True
+
+    def forget(self, call_sid: Optional[str]) -> None:
+        """Drop the counters for a finished call."""
+        for key in [k for k in self._state if k[0] == call_sid]:
+            del self._state[key]
 
 
 def log_call_event(
@@ -0,0 +1,415 @@
+"""
+Call-level latency tracing for HVAC Voice Agent.
+
+Spans time the stages of a turn (STT, intent analysis, LLM, tool calls, DB,
+TTS first byte, Twilio send) and are tagged with the call they belong to.
+The call comes from a context variable, so tasks spawned while handling a
+call inherit it; code that runs elsewhere (executor threads, tasks created
+before the call was known) passes call_sid explicitly.
+
+Finished spans go to:
+- an in-memory ring buffer (GET /health/traces)
+- optionally an exporter thread writing JSONL or OTLP/HTTP JSON
+  (TRACE_EXPORT=jsonl|otlp); no collector or SDK is needed
+- measurement sinks: spans for stages LatencyPerformanceEngine tracks are
+  passed to sink.record_measurement() (see add_measurement_sink)
+
+Recording a span is a few microseconds; export and sinks run off the call
+path, on the exporter thread.
+
+Usage:
+    with call_context(call_sid, "elevenlabs"):
+        with span("llm", model="gpt-4o-mini"):
+            ...
+    record_span("tts_first_byte", 180.0)     # already-measured durations
+
+    @traced("intent")
+    async def analyze_speech(...): ...
+"""
+
+import functools
+import hashlib
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from app.utils.logging import get_logger, set_call_sid_provider
+from app.utils.metrics import histogram, register_stats
+
+logger = get_logger("tracing")
+
+# Configuration
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "true").lower() == "true"
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "4096"))
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "").lower()  # "", "jsonl" or "otlp"
+TRACE_JSONL_PATH = os.getenv("TRACE_JSONL_PATH", "traces.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACE_EXPORT_INTERVAL = float(os.getenv("TRACE_EXPORT_INTERVAL", "2.0"))  # Seconds
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "hvac-agent")
+
+# Spans waiting for the exporter thread; the oldest are dropped if it falls behind
+EXPORT_QUEUE_SIZE = 20000
+
+# Stage -> LatencyPerformanceEngine metric (demand-engine PerformanceMetric values).
+# A span can also name its metric explicitly: span("tool", metric="booking_execution")
+STAGE_METRICS = {
+    "answer": "answer_latency",        # Call connected -> greeting audio
+    "turn": "speech_to_response",      # Caller stopped talking -> response audio
+    "stt": "transcription_latency",
+    "llm": "llm_response_time",
+}
+
+_EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+_span_ids = itertools.count(1)
+
+# (call_sid, router) of the call being handled
+_call: ContextVar[Tuple[Optional[str], Optional[str]]] = ContextVar("trace_call", default=(None, None))
+# Innermost open span, for parent links
+_parent: ContextVar[Optional["Span"]] = ContextVar("trace_parent", default=None)
+
+_buffer: Deque["Span"] = deque(maxlen=TRACE_BUFFER_SIZE)
+_export_queue: Deque["Span"] = deque(maxlen=EXPORT_QUEUE_SIZE)
+_sinks: List[Any] = []
+_exporter: Optional["_Exporter"] = None
+
+
+class Span:
+    """
+    One timed stage. Started when created; ended by end() or by leaving
+    the `with` block (which also makes it the parent of nested spans).
+    """
+
+    __slots__ = ("name", "call_sid", "router", "span_id", "parent_id",
+                 "start_ns", "end_ns", "attrs", "error", "_token")
+
+    def __init__(self, name: str, call_sid: Optional[str] = None, attrs: Optional[Dict[str, Any]] = None):
+        bound_sid, router = _call.get()
+        parent = _parent.get()
+        self.name = name
+        self.call_sid = call_sid or bound_sid
+        self.router = router
+        self.span_id = next(_span_ids)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attrs = attrs
+        self.error: Optional[str] = None
+        self.end_ns = 0
+        self._token = None
+        self.start_ns = time.perf_counter_ns()
+
+    def set(self, key: str, value: Any) -> None:
+        """Attach an attribute (before the span ends)."""
+        if self.attrs is None:
+            self.attrs = {}
+        self.attrs[key] = value
+
+    def end(self, error: Optional[str] = None) -> None:
+        if self.end_ns:
+            return
+        self.end_ns = time.perf_counter_ns()
+        if error:
+            self.error = error
+        _finish(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.perf_counter_ns()) - self.start_ns) / 1e6
+
+    @property
+    def metric(self) -> Optional[str]:
+        if self.attrs and self.attrs.get("metric"):
+            return self.attrs["metric"]
+        return STAGE_METRICS.get(self.name)
+
+    def __enter__(self) -> "Span":
+        self._token = _parent.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _parent.reset(self._token)
+        self.end(exc_type.__name__ if exc_type else None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "call_sid": self.call_sid,
+            "router": self.router,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": datetime.fromtimestamp((self.start_ns + _EPOCH_OFFSET_NS) / 1e9, timezone.utc).isoformat(),
+            "duration_ms": round(self.duration_ms, 3),
+            "metric": self.metric,
+            "error": self.error,
+            "attrs": self.attrs or {},
+        }
+
+
+class _NoopSpan:
+    """Returned when tracing is disabled."""
+
+    __slots__ = ()
+    duration_ms = 0.0
+
+    def set(self, key, value):
+        pass
+
+    def end(self, error=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, call_sid: Optional[str] = None, **attrs) -> Span:
+    """Start a span for a stage of the current call."""
+    if not TRACE_ENABLED:
+        return _NOOP
+    return Span(name, call_sid, attrs or None)
+
+
+def record_span(name: str, duration_ms: float, call_sid: Optional[str] = None, **attrs) -> None:
+    """Record a stage whose duration was measured elsewhere (ending now)."""
+    if not TRACE_ENABLED:
+        return
+    s = Span(name, call_sid, attrs or None)
+    s.end_ns = s.start_ns
+    s.start_ns -= int(duration_ms * 1e6)
+    _finish(s)
+
+
+def traced(name: str, **attrs):
+    """Decorator: run the (sync or async) function inside a span."""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, **attrs):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, **attrs):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def call_context(call_sid: Optional[str], router: str) -> Iterator[None]:
+    """Tag spans started inside the block (and tasks created in it) with a call."""
+    token = _call.set((call_sid, router))
+    try:
+        yield
+    finally:
+        _call.reset(token)
+
+
+def bind_call(call_sid: Optional[str], router: str) -> None:
+    """Tag the rest of the current task (e.g. a media stream handler) with a call."""
+    _call.set((call_sid, router))
+
+
+def current_call_sid() -> Optional[str]:
+    return _call.get()[0]
+
+
+# Log records from inside a call carry its CallSid without passing extra=
+set_call_sid_provider(current_call_sid)
+
+
+_STAGE_SECONDS = histogram("hvac_call_stage_duration_seconds", "Duration of traced call stages", ("stage",))
+
+
+def _finish(s: Span) -> None:
+    _buffer.append(s)
+    _STAGE_SECONDS.labels(s.name).observe(s.duration_ms / 1000.0)
+    if _exporter is not None:
+        _export_queue.append(s)
+
+
+# =============================================================================
+# RING BUFFER QUERIES
+# =============================================================================
+def get_recent_spans(call_sid: Optional[str] = None, limit: int = 200) -> List[Dict[str, Any]]:
+    """Most recent finished spans, newest last."""
+    spans = list(_buffer)
+    if call_sid:
+        spans = [s for s in spans if s.call_sid == call_sid]
+    return [s.to_dict() for s in spans[-limit:]]
+
+
+def get_stage_summary() -> Dict[str, Dict[str, Any]]:
+    """Count and latency percentiles per stage over the ring buffer."""
+    by_stage: Dict[str, List[float]] = {}
+    for s in list(_buffer):
+        by_stage.setdefault(s.name, []).append(s.duration_ms)
+    summary = {}
+    for name, durations in sorted(by_stage.items()):
+        durations.sort()
+        n = len(durations)
+        summary[name] = {
+            "count": n,
+            "p50_ms": round(durations[n // 2], 1),
+            "p95_ms": round(durations[min(n - 1, int(n * 0.95))], 1),
+            "max_ms": round(durations[-1], 1),
+        }
+    return summary
+
+
+def clear_spans() -> None:
+    _buffer.clear()
+
+
+# =============================================================================
+# EXPORT AND MEASUREMENT SINKS
+# =============================================================================
+def add_measurement_sink(sink: Any) -> None:
+    """
+    Feed spans for tracked stages to `sink.record_measurement(metric_type,
+    value_ms, call_id=..., time_of_day=...)` - the LatencyPerformanceEngine
+    signature. Called on the exporter thread.
+    """
+    _sinks.append(sink)
+    _ensure_exporter()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _trace_id(call_sid: Optional[str]) -> str:
+    return hashlib.md5((call_sid or "no-call").encode()).hexdigest()
+
+
+def to_otlp(spans: List[Span]) -> Dict[str, Any]:
+    """OTLP/HTTP JSON (ExportTraceServiceRequest) for a batch of spans."""
+    otlp_spans = []
+    for s in spans:
+        attributes = {"call_sid": s.call_sid, "router": s.router, "metric": s.metric, **(s.attrs or {})}
+        item = {
+            "traceId": _trace_id(s.call_sid),
+            "spanId": f"{s.span_id:016x}",
+            "name": s.name,
+            "kind": 1,
+            "startTimeUnixNano": str(s.start_ns + _EPOCH_OFFSET_NS),
+            "endTimeUnixNano": str(s.end_ns + _EPOCH_OFFSET_NS),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None],
+        }
+        if s.parent_id:
+            item["parentSpanId"] = f"{s.parent_id:016x}"
+        if s.error:
+            item["status"] = {"code": 2, "message": s.error}
+        otlp_spans.append(item)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "hvac_agent.tracing"}, "spans": otlp_spans}],
+        }]
+    }
+
+
+class _Exporter(threading.Thread):
+    """Drains finished spans to the configured exporter and measurement sinks."""
+
+    def __init__(self, mode: str):
+        super().__init__(name="trace-exporter", daemon=True)
+        self.mode = mode
+        self.exported = 0
+        self.failed_batches = 0
+        self._wake = threading.Event()
+
+    def run(self):
+        while True:
+            self._wake.wait(TRACE_EXPORT_INTERVAL)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning("Trace export failed: %s", str(e))
+
+    def flush(self):
+        batch = []
+        while _export_queue:
+            batch.append(_export_queue.popleft())
+        if batch:
+            self.export(batch)
+
+    def export(self, batch: List[Span]):
+        for sink in list(_sinks):
+            self._feed_sink(sink, batch)
+        if self.mode == "jsonl":
+            with open(TRACE_JSONL_PATH, "a") as f:
+                f.writelines(json.dumps(s.to_dict()) + "\n" for s in batch)
+        elif self.mode == "otlp":
+            import httpx
+            try:
+                httpx.post(TRACE_OTLP_ENDPOINT, json=to_otlp(batch), timeout=5.0).raise_for_status()
+            except Exception as e:
+                self.failed_batches += 1
+                logger.warning("OTLP export of %d spans failed: %s", len(batch), str(e))
+                return
+        self.exported += len(batch)
+
+    @staticmethod
+    def _feed_sink(sink: Any, batch: List[Span]):
+        for s in batch:
+            metric = s.metric
+            if not metric or s.error:
+                continue
+            hour = datetime.fromtimestamp((s.start_ns + _EPOCH_OFFSET_NS) / 1e9).hour
+            try:
+                sink.record_measurement(metric, s.duration_ms, call_id=s.call_sid, time_of_day=hour)
+            except Exception as e:
+                logger.warning("Measurement sink failed for %s: %s", metric, str(e))
+
+
+def _ensure_exporter() -> None:
+    global _exporter
+    if _exporter is None and TRACE_ENABLED:
+        _exporter = _Exporter(TRACE_EXPORT)
+        _exporter.start()
+
+
+def flush_exports() -> None:
+    """Export everything finished so far (tests, shutdown)."""
+    if _exporter is not None:
+        _exporter.flush()
+
+
+def get_tracing_stats() -> Dict[str, Any]:
+    return {
+        "enabled": TRACE_ENABLED,
+        "buffered_spans": len(_buffer),
+        "export": TRACE_EXPORT or None,
+        "export_backlog": len(_export_queue),
+        "exported": _exporter.exported if _exporter else 0,
+        "failed_batches": _exporter.failed_batches if _exporter else 0,
+        "measurement_sinks": len(_sinks),
+    }
+
+
+register_stats("hvac_tracing", get_tracing_stats, counters=("exported", "failed_batches"),
+               documentation="Span tracing and export")
+
+if TRACE_EXPORT in ("jsonl", "otlp"):
+    _ensure_exporter()
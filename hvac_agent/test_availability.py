@@ -0,0 +1,186 @@
+"""
+Test script for the availability index and the Google free/busy cache.
+
+Uses a scratch SQLite database and a fake free/busy fetch to check the
+interval-to-hour-bitmap conversion (partial hours, midnight-spanning and
+offset intervals), the staleness cutoff, range widening and TTL reloads
+of the booked-hour index, and in-place patching on book/release.
+
+Run: python test_availability.py
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, time as datetime_time, timedelta
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.db_models import Appointment, Base, Location
+from app.services.availability import AvailabilityIndex, FreeBusyCache, hours_mask
+
+DAY = date.today() + timedelta(days=2)
+NEXT = DAY + timedelta(days=1)
+
+
+def make_db():
+    """Scratch database with one location (open 8-18); returns (session, location)."""
+    path = os.path.join(tempfile.mkdtemp(), "availability.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    loc = Location(name="Dallas", code="DAL", opening_hour=8, closing_hour=18)
+    db.add(loc)
+    db.commit()
+    return db, loc
+
+
+def add_appointment(db, loc, day, hour, cancelled=False):
+    db.add(Appointment(
+        customer_name="Pat", date=day, time=datetime_time(hour, 0), issue="No cooling",
+        location_id=loc.id, is_cancelled=cancelled,
+    ))
+    db.commit()
+
+
+def iso(day, hh_mm, offset="+00:00"):
+    return f"{day.isoformat()}T{hh_mm}:00{offset}"
+
+
+def hours(mask):
+    return [h for h in range(24) if mask >> h & 1]
+
+
+def test_freebusy_conversion():
+    print("\n=== Free/busy intervals to hour bitmaps ===")
+    intervals = [
+        {"start": iso(DAY, "09:30"), "end": iso(DAY, "11:15")},   # Partial hours at both ends
+        {"start": iso(DAY, "13:00"), "end": iso(DAY, "14:00")},   # Exactly one hour
+        {"start": iso(DAY, "22:30"), "end": iso(NEXT, "01:00")},  # Spans midnight
+        {"start": iso(NEXT, "04:00", "-05:00"), "end": iso(NEXT, "04:45", "-05:00")},  # 09:00-09:45 UTC
+        {"start": "not a time", "end": iso(DAY, "10:00")},        # Skipped
+        {"end": iso(DAY, "10:00")},                               # Skipped
+    ]
+    requested = []
+
+    def fetch(time_min, time_max):
+        requested.append((time_min, time_max))
+        return intervals
+
+    cache = FreeBusyCache(fetch, horizon_days=3, timezone="UTC")
+    cache.refresh()
+    assert hours(cache.busy_mask(DAY)) == [9, 10, 11, 13, 22, 23]
+    assert hours(cache.busy_mask(NEXT)) == [0, 9]
+    assert cache.busy_mask(NEXT + timedelta(days=1)) == 0
+    assert requested[0][0].startswith(date.today().isoformat()) and "T00:00:00" in requested[0][0]
+
+    # A failed refresh keeps the last good bitmaps
+    def failing(time_min, time_max):
+        raise TimeoutError("google")
+
+    cache.fetch = failing
+    cache.refresh()
+    assert cache.stats["refresh_errors"] == 1 and cache.stats["refreshes"] == 1
+    assert hours(cache.busy_mask(DAY)) == [9, 10, 11, 13, 22, 23]
+    print("✅ partial hours rounded out, midnight interval split across days, offsets converted")
+
+
+def test_freebusy_staleness():
+    print("\n=== Staleness cutoff ===")
+    cache = FreeBusyCache(lambda a, b: [{"start": iso(DAY, "10:00"), "end": iso(DAY, "12:00")}],
+                          max_staleness=0.05, timezone="UTC")
+    assert cache.busy_mask(DAY) == 0  # Never fetched
+    cache.refresh()
+    assert hours(cache.busy_mask(DAY)) == [10, 11]
+    time.sleep(0.1)
+    assert cache.busy_mask(DAY) == 0  # Too old to trust; no inline fetch either
+    assert cache.stats == {"refreshes": 1, "refresh_errors": 0, "stale_reads": 2}
+
+    db, loc = make_db()
+    index = AvailabilityIndex(horizon_days=3, freebusy=cache)
+    assert index.is_free(db, loc, DAY, 10)
+    cache.refresh()
+    assert not index.is_free(db, loc, DAY, 10) and index.is_free(db, loc, DAY, 12)
+    print("✅ stale free/busy ignored, fresh free/busy blocks slots")
+
+
+def test_ensure_loaded_widening_and_ttl():
+    print("\n=== Loading, widening and TTL ===")
+    db, loc = make_db()
+    far = DAY + timedelta(days=10)
+    add_appointment(db, loc, DAY, 9)
+    add_appointment(db, loc, DAY, 10, cancelled=True)
+    add_appointment(db, loc, far, 15)
+
+    index = AvailabilityIndex(horizon_days=3, ttl=0.2)
+    index.ensure_loaded(db, loc.id, DAY, DAY)
+    assert index._loaded[loc.id][:2] == (DAY, DAY + timedelta(days=3))  # Whole horizon in one query
+    assert hours(index._booked[loc.id][DAY]) == [9]  # Cancelled appointment not counted
+
+    index.ensure_loaded(db, loc.id, NEXT, DAY + timedelta(days=2))
+    assert index.stats["loads"] == 1  # Covered
+
+    # Past the loaded range: one reload, widened so the earlier days stay loaded
+    index.ensure_loaded(db, loc.id, far, far)
+    assert index.stats["loads"] == 2
+    assert index._loaded[loc.id][:2] == (DAY, far)
+    assert DAY in index._booked[loc.id] and hours(index._booked[loc.id][far]) == [15]
+
+    # Another instance books directly in the database; seen once the TTL passes
+    add_appointment(db, loc, DAY, 11)
+    assert index.is_free(db, loc, DAY, 11)
+    time.sleep(0.25)
+    assert not index.is_free(db, loc, DAY, 11)
+    assert index.stats["loads"] == 3
+    # An expired load is not widened: the new range starts at the request
+    assert index._loaded[loc.id][:2] == (DAY, DAY + timedelta(days=3))
+
+    index.invalidate(loc.id)
+    index.ensure_loaded(db, loc.id, DAY, DAY)
+    assert index.stats["loads"] == 4
+    print(f"✅ {index.stats['loads']} loads: horizon-wide, widened, TTL-expired, invalidated")
+
+
+def test_book_release_patching():
+    print("\n=== Book/release patching ===")
+    db, loc = make_db()
+    index = AvailabilityIndex(horizon_days=3)
+
+    # Not loaded yet: patches are no-ops, the first query loads from the database
+    index.book(loc.id, DAY, 9)
+    assert loc.id not in index._booked
+
+    assert index.next_free(db, loc, DAY, 2, max_days=1) == [(DAY, 8), (DAY, 9)]
+    index.book(loc.id, DAY, 8)
+    index.book(loc.id, DAY, 9)
+    assert index.next_free(db, loc, DAY, 2, max_days=1) == [(DAY, 10), (DAY, 11)]
+
+    # Reschedule: cancel 9:00, rebook at 14:00
+    index.release(loc.id, DAY, 9)
+    index.book(loc.id, DAY, 14)
+    assert index.is_free(db, loc, DAY, 9)
+    assert not index.is_free(db, loc, DAY, 8) and not index.is_free(db, loc, DAY, 14)
+
+    # Cancel, then the same slot is booked again
+    index.release(loc.id, DAY, 14)
+    assert index.is_free(db, loc, DAY, 14)
+    index.book(loc.id, DAY, 14)
+    assert not index.is_free(db, loc, DAY, 14)
+
+    # Releasing a day that was never booked does nothing
+    index.release(loc.id, NEXT, 9)
+    assert index._booked[loc.id].get(NEXT, 0) == 0
+    assert index.free_mask(loc, DAY) == hours_mask(8, 18) & ~(1 << 8 | 1 << 14)
+    assert index.stats["loads"] == 1
+    print("✅ bookings and cancellations patched in place without reloading")
+
+
+if __name__ == "__main__":
+    test_freebusy_conversion()
+    test_freebusy_staleness()
+    test_ensure_loaded_widening_and_ttl()
+    test_book_release_patching()
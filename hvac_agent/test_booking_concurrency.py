@@ -0,0 +1,187 @@
+"""
+Concurrency test and latency benchmark for the booking engine.
+
+Fires 100 simultaneous bookings at the same slot against a scratch SQLite
+database and checks that exactly one wins, then times bookings with and
+without contention.
+
+Run: python test_booking_concurrency.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, time as datetime_time, timedelta
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.db_models import Appointment, Base, Location
+from app.services import calendar_service
+from app.services.availability import get_availability_index
+from app.services.calendar_service import create_booking, reschedule_booking
+from app.services.slot_reservations import SlotReservations
+
+CALLERS = 100
+
+
+def make_db():
+    """Scratch database with one location; returns a session factory."""
+    path = os.path.join(tempfile.mkdtemp(), "bookings.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    with Session() as db:
+        db.add(Location(name="Dallas", code="DAL", opening_hour=7, closing_hour=19))
+        db.commit()
+    get_availability_index().invalidate()
+    return Session
+
+
+def next_weekday(offset_days: int = 7) -> str:
+    day = date.today() + timedelta(days=offset_days)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day.isoformat()
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+def race(Session, book, callers=CALLERS):
+    """Run `book(db, i)` from `callers` threads released at once; returns (results, latencies_ms)."""
+    barrier = threading.Barrier(callers)
+    results, latencies = [None] * callers, [0.0] * callers
+
+    def caller(i):
+        db = Session()
+        try:
+            barrier.wait()
+            started = time.perf_counter()
+            results[i] = book(db, i)
+            latencies[i] = (time.perf_counter() - started) * 1000
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(callers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, latencies
+
+
+def time_of(hh_mm):
+    hour, minute = hh_mm.split(":")
+    return datetime_time(int(hour), int(minute))
+
+
+def active_in_slot(Session, day, hh_mm):
+    with Session() as db:
+        return db.scalar(
+            select(func.count()).select_from(Appointment)
+            .where(Appointment.date == date.fromisoformat(day))
+            .where(Appointment.time == time_of(hh_mm))
+            .where(Appointment.is_cancelled == False)
+        )
+
+
+def test_simultaneous_bookings_same_slot():
+    """100 callers book the same slot at once: one success, 99 taken, one row."""
+    print("\n=== 100 simultaneous bookings for one slot ===")
+    Session = make_db()
+    day = next_weekday()
+
+    results, latencies = race(Session, lambda db, i: create_booking(
+        db, name=f"Caller {i}", date_str=day, time_str="10:00", issue="AC not cooling",
+        location_code="DAL", call_sid=f"CA{i:032d}", send_confirmation=False,
+    ))
+    statuses = [r["status"] for r in results]
+    print(f"success={statuses.count('success')} taken={statuses.count('taken')} "
+          f"p50={percentile(latencies, 0.5):.1f}ms p95={percentile(latencies, 0.95):.1f}ms")
+
+    assert statuses.count("success") == 1, statuses
+    assert statuses.count("taken") == CALLERS - 1, statuses
+    assert active_in_slot(Session, day, "10:00") == 1
+    print("✅ Exactly one booking won the slot")
+
+
+def test_unique_index_without_holds():
+    """With holds and the pre-insert check bypassed, the unique index alone still decides."""
+    print("\n=== 100 simultaneous bookings, slot holds and pre-check disabled ===")
+    Session = make_db()
+    day = next_weekday(8)
+    original = calendar_service.get_slot_reservations, calendar_service._slot_taken
+    permissive = SlotReservations(redis_url=None)
+    permissive.reserve = lambda *args, **kwargs: True
+    calendar_service.get_slot_reservations = lambda: permissive
+    calendar_service._slot_taken = lambda *args: False
+    try:
+        results, _ = race(Session, lambda db, i: create_booking(
+            db, name=f"Caller {i}", date_str=day, time_str="11:00", issue="Furnace noise",
+            location_code="DAL", send_confirmation=False,
+        ))
+    finally:
+        calendar_service.get_slot_reservations, calendar_service._slot_taken = original
+
+    statuses = [r["status"] for r in results]
+    assert statuses.count("success") == 1, statuses
+    assert statuses.count("taken") == CALLERS - 1, statuses
+    assert active_in_slot(Session, day, "11:00") == 1
+    print("✅ Unique index rejected every concurrent duplicate")
+
+
+def test_reschedule_into_contested_slot():
+    """Reschedules racing a booking for the same slot never double-book it."""
+    print("\n=== Reschedules racing bookings for one slot ===")
+    Session = make_db()
+    day, target = next_weekday(9), next_weekday(10)
+    with Session() as db:
+        for i in range(10):
+            create_booking(db, name=f"Existing {i}", date_str=day, time_str=f"{8 + i:02d}:00",
+                           issue="Maintenance", location_code="DAL", send_confirmation=False)
+
+    def book(db, i):
+        if i < 10:
+            return reschedule_booking(db, name=f"Existing {i}", new_date=target, new_time="14:00",
+                                      location_code="DAL")
+        return create_booking(db, name=f"Caller {i}", date_str=target, time_str="14:00",
+                              issue="AC leak", location_code="DAL", send_confirmation=False)
+
+    results, _ = race(Session, book, callers=40)
+    statuses = [r["status"] for r in results]
+    assert statuses.count("success") == 1, statuses
+    assert active_in_slot(Session, target, "14:00") == 1
+    print("✅ One caller got the slot")
+
+
+def benchmark_booking_latency(n=200):
+    """Sequential bookings into distinct slots (no contention)."""
+    print(f"\n=== Booking latency, {n} uncontended bookings ===")
+    Session = make_db()
+    latencies = []
+    with Session() as db:
+        for i in range(n):
+            day = next_weekday(7 + i // 10 * 7)
+            started = time.perf_counter()
+            result = create_booking(db, name=f"Bench {i}", date_str=day, time_str=f"{8 + i % 10:02d}:00",
+                                    issue="Tune-up", location_code="DAL", call_sid=f"BENCH{i}",
+                                    send_confirmation=False)
+            latencies.append((time.perf_counter() - started) * 1000)
+            assert result["status"] == "success", result
+    print(f"p50={percentile(latencies, 0.5):.2f}ms p95={percentile(latencies, 0.95):.2f}ms "
+          f"max={max(latencies):.2f}ms")
+    return latencies
+
+
+if __name__ == "__main__":
+    test_simultaneous_bookings_same_slot()
+    test_unique_index_without_holds()
+    test_reschedule_into_contested_slot()
+    benchmark_booking_latency()
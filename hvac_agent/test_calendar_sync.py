@@ -0,0 +1,343 @@
+"""
+Test script for the write-behind Google Calendar sync.
+
+Runs bookings, reschedules and cancellations against a scratch SQLite
+database and drains the calendar outbox into a local fake of the Google
+Calendar API client (events().insert/update/delete/list and batch HTTP),
+including failures, conflicts and a full reconciliation.
+
+Run: python test_calendar_sync.py
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.models.db_models import Appointment, Base, CalendarOutbox, Location
+from app.services import calendar_sync
+from app.services.availability import get_availability_index
+from app.services.calendar_service import cancel_booking, create_booking, reschedule_booking
+from app.services.calendar_sync import CalendarSyncWorker, event_id_for
+
+calendar_sync.CALENDAR_SYNC_ENABLED = "true"
+
+
+class FakeRequest:
+    def __init__(self, api, method, **kwargs):
+        self.api, self.method, self.kwargs = api, method, kwargs
+
+    def execute(self):
+        self.api.http_calls += 1
+        return self.api.handle(self)
+
+
+class FakeBatch:
+    def __init__(self, api, callback):
+        self.api, self.callback, self.requests = api, callback, []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.api.http_calls += 1
+        self.api.batches.append(len(self.requests))
+        if self.api.fail_batches:
+            raise HttpError(httplib2.Response({"status": self.api.fail_batches.pop(0)}), b"batch failed")
+        for request_id, request in self.requests:
+            try:
+                self.callback(request_id, self.api.handle(request), None)
+            except HttpError as e:
+                self.callback(request_id, None, e)
+
+
+class FakeEvents:
+    def __init__(self, api):
+        self.api = api
+
+    def insert(self, **kwargs):
+        return FakeRequest(self.api, "insert", **kwargs)
+
+    def update(self, **kwargs):
+        return FakeRequest(self.api, "update", **kwargs)
+
+    def delete(self, **kwargs):
+        return FakeRequest(self.api, "delete", **kwargs)
+
+    def list(self, **kwargs):
+        return FakeRequest(self.api, "list", **kwargs)
+
+
+class FakeCalendarAPI:
+    """In-memory stand-in for googleapiclient's calendar v3 resource."""
+
+    def __init__(self):
+        self.events_by_id = {}     # live events
+        self.cancelled = set()     # ids Google remembers after a delete
+        self.http_calls = 0
+        self.batches = []
+        self.fail_batches = []     # HTTP statuses for the next batch calls
+        self.lose_responses = 0    # apply the next N writes but answer 500
+
+    def events(self):
+        return FakeEvents(self)
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+    @staticmethod
+    def _error(status):
+        return HttpError(httplib2.Response({"status": status}), b"{}")
+
+    def handle(self, request):
+        kwargs = request.kwargs
+        if request.method == "list":
+            return {"items": list(self.events_by_id.values())}
+        if request.method == "insert":
+            event_id = kwargs["body"]["id"]
+            if event_id in self.events_by_id or event_id in self.cancelled:
+                raise self._error(409)
+            self.events_by_id[event_id] = dict(kwargs["body"])
+            result = self.events_by_id[event_id]
+        elif request.method == "update":
+            event_id = kwargs["eventId"]
+            if event_id not in self.events_by_id and event_id not in self.cancelled:
+                raise self._error(404)
+            self.cancelled.discard(event_id)
+            self.events_by_id[event_id] = {**kwargs["body"], "id": event_id}
+            result = self.events_by_id[event_id]
+        else:
+            event_id = kwargs["eventId"]
+            if event_id not in self.events_by_id:
+                raise self._error(410 if event_id in self.cancelled else 404)
+            del self.events_by_id[event_id]
+            self.cancelled.add(event_id)
+            result = ""
+        if self.lose_responses:
+            self.lose_responses -= 1
+            raise self._error(500)
+        return result
+
+
+def make_db():
+    """Scratch database with one location; returns a session factory."""
+    path = os.path.join(tempfile.mkdtemp(), "calendar_sync.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    with Session() as db:
+        db.add(Location(name="Dallas", code="DAL", timezone="America/Chicago",
+                        address="123 Main St, Dallas, TX 75201", opening_hour=7, closing_hour=19))
+        db.commit()
+    get_availability_index().invalidate()
+    return Session
+
+
+def make_worker(Session, api):
+    return CalendarSyncWorker(lambda: api, "primary", session_factory=Session, max_attempts=3)
+
+
+def next_weekday(offset_days=7):
+    day = date.today() + timedelta(days=offset_days)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day.isoformat()
+
+
+def book(db, name, day, hhmm):
+    result = create_booking(db, name=name, date_str=day, time_str=hhmm, issue="AC not cooling",
+                            location_code="DAL", send_confirmation=False)
+    assert result["status"] == "success", result
+    return result["appointment_id"]
+
+
+def make_due(Session):
+    with Session() as db:
+        db.execute(update(CalendarOutbox).values(next_attempt_at=datetime.utcnow()))
+        db.commit()
+
+
+def assert_in_sync(Session, api):
+    """Every active appointment has exactly one event at its time; nothing else exists."""
+    with Session() as db:
+        active = db.scalars(select(Appointment).where(Appointment.is_cancelled == False)).all()
+        expected = {a.google_event_id: datetime.combine(a.date, a.time).isoformat() for a in active}
+        assert None not in expected, "active appointment without an event"
+        pending = db.scalars(select(CalendarOutbox).where(CalendarOutbox.status == "pending")).all()
+        assert not pending, pending
+    actual = {eid: ev["start"]["dateTime"] for eid, ev in api.events_by_id.items()}
+    assert actual == expected, (actual, expected)
+
+
+def test_booking_path_makes_no_google_calls():
+    print("\n=== Booking path is write-behind ===")
+    Session, api = make_db(), FakeCalendarAPI()
+    worker = make_worker(Session, api)
+    with Session() as db:
+        appointment_id = book(db, "Jane Doe", next_weekday(), "10:00")
+    assert api.http_calls == 0
+
+    assert worker.run_once() == 1
+    assert api.batches == [1]
+    assert event_id_for(appointment_id) in api.events_by_id
+    assert_in_sync(Session, api)
+    print("✅ Event created by the worker, none on the call path")
+
+
+def test_changes_collapse_into_one_batch():
+    print("\n=== Bookings, reschedules and cancels in one batch ===")
+    Session, api = make_db(), FakeCalendarAPI()
+    worker = make_worker(Session, api)
+    day, other = next_weekday(), next_weekday(8)
+    with Session() as db:
+        for i in range(30):
+            book(db, f"Customer {i:02d}", day if i < 10 else next_weekday(9 + i // 10), f"{8 + i % 10:02d}:00")
+        for i in range(5):
+            assert reschedule_booking(db, name=f"Customer {i:02d}", new_date=other,
+                                      new_time=f"{8 + i:02d}:00", location_code="DAL")["status"] == "success"
+        for i in range(5, 10):
+            assert cancel_booking(db, name=f"Customer {i:02d}", location_code="DAL")["status"] == "success"
+
+    assert worker.run_once() == 30
+    # Cancelled-before-sync appointments never reach Google
+    assert api.batches == [25], api.batches
+    assert_in_sync(Session, api)
+    print(f"✅ 40 changes -> {api.http_calls} HTTP call")
+
+
+def test_retry_backoff_and_dead_letter():
+    print("\n=== Retry with backoff, then dead ===")
+    Session, api = make_db(), FakeCalendarAPI()
+    worker = make_worker(Session, api)
+    with Session() as db:
+        book(db, "Retry Me", next_weekday(), "11:00")
+
+    api.fail_batches = [503]
+    worker.run_once()
+    with Session() as db:
+        row = db.scalar(select(CalendarOutbox))
+        assert (row.status, row.attempts) == ("pending", 1)
+        assert row.next_attempt_at > datetime.utcnow()
+    assert worker.run_once() == 0  # still backing off
+
+    make_due(Session)
+    worker.run_once()
+    assert_in_sync(Session, api)
+
+    with Session() as db:
+        book(db, "Give Up", next_weekday(), "12:00")
+    api.fail_batches = [503, 503, 503]
+    for _ in range(3):
+        make_due(Session)
+        worker.run_once()
+    with Session() as db:
+        statuses = [r.status for r in db.scalars(select(CalendarOutbox).order_by(CalendarOutbox.id))]
+    assert statuses == ["done", "dead"], statuses
+    print("✅ Backed off, recovered, and dead-lettered after max attempts")
+
+
+def test_conflicts_resolve_to_database_state():
+    print("\n=== Conflict reconciliation ===")
+    Session, api = make_db(), FakeCalendarAPI()
+    worker = make_worker(Session, api)
+    day = next_weekday()
+    with Session() as db:
+        lost = book(db, "Lost Response", day, "09:00")
+        gone = book(db, "Deleted In Google", day, "10:00")
+
+    # Insert applied but the response was lost: the retry gets 409 and adopts the event
+    api.lose_responses = 1
+    worker.run_once()
+    make_due(Session)
+    while worker.run_once():
+        pass
+    assert_in_sync(Session, api)
+    assert len(api.events_by_id) == 2
+    with Session() as db:
+        assert db.get(Appointment, lost).google_event_id == event_id_for(lost)
+
+    # Someone deleted an event in Google; the next change restores it
+    api.events_by_id.pop(event_id_for(gone))
+    api.cancelled.discard(event_id_for(gone))
+    with Session() as db:
+        reschedule_booking(db, name="Deleted In Google", new_date=day, new_time="15:00", location_code="DAL")
+    while worker.run_once():
+        pass
+    assert_in_sync(Session, api)
+    assert worker.stats["conflicts"] >= 2, worker.stats
+    print("✅ 409 adopted, 404 re-created, no duplicates")
+
+
+def test_full_reconciliation():
+    print("\n=== Full reconciliation ===")
+    Session, api = make_db(), FakeCalendarAPI()
+    worker = make_worker(Session, api)
+    day = next_weekday()
+    with Session() as db:
+        ids = [book(db, f"Recon {i}", day, f"{9 + i:02d}:00") for i in range(4)]
+    worker.run_once()
+    assert_in_sync(Session, api)
+
+    # Drift: an event moved by hand, one deleted, one orphan with no appointment
+    moved = api.events_by_id[event_id_for(ids[0])]
+    moved["start"] = {"dateTime": f"{day}T16:00:00-06:00", "timeZone": "America/Chicago"}
+    del api.events_by_id[event_id_for(ids[1])]
+    api.events_by_id["hvacappt999999"] = {
+        "id": "hvacappt999999",
+        "start": {"dateTime": f"{day}T17:00:00", "timeZone": "America/Chicago"},
+        "extendedProperties": {"private": {"source": "hvac_agent", "hvac_appointment_id": "999999"}},
+    }
+
+    result = worker.reconcile()
+    assert result["drift"] == 2 and result["orphans_deleted"] == 1, result
+    while worker.run_once():
+        pass
+    assert_in_sync(Session, api)
+    assert worker.reconcile()["drift"] == 0
+    print("✅ Drift queued, orphan deleted, second pass clean")
+
+
+def benchmark_booking_latency(n=100, google_ms=150):
+    """Booking latency no longer includes Google's (simulated) latency."""
+    print(f"\n=== Booking latency with a {google_ms}ms Google API ===")
+    Session, api = make_db(), FakeCalendarAPI()
+    slow_handle = api.handle
+
+    def handle(request):
+        time.sleep(google_ms / 1000)
+        return slow_handle(request)
+
+    api.handle = handle
+    worker = make_worker(Session, api)
+    latencies = []
+    with Session() as db:
+        for i in range(n):
+            started = time.perf_counter()
+            book(db, f"Bench {i}", next_weekday(7 + i // 10 * 7), f"{8 + i % 10:02d}:00")
+            latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    started = time.perf_counter()
+    while worker.run_once():
+        pass
+    print(f"booking p50={latencies[n // 2]:.1f}ms p95={latencies[int(n * 0.95)]:.1f}ms; "
+          f"sync of {n} events: {api.http_calls} batch calls, {time.perf_counter() - started:.1f}s")
+    assert latencies[n // 2] < google_ms
+    return latencies
+
+
+if __name__ == "__main__":
+    test_booking_path_makes_no_google_calls()
+    test_changes_collapse_into_one_batch()
+    test_retry_backoff_and_dead_letter()
+    test_conflicts_resolve_to_database_state()
+    test_full_reconciliation()
+    benchmark_booking_latency()
@@ -0,0 +1,157 @@
+"""
+Test script for the background job queue.
+
+Runs the SQLite backend against a temp file and checks priority ordering,
+retry with backoff until the job is dead, re-claiming a job whose lease
+expired, idempotency-key dedupe, and that the embedded worker thread runs
+what the web app enqueues.
+
+Run: python test_job_queue.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.job_queue import (
+    PRIORITY_EMERGENCY,
+    PRIORITY_MARKETING,
+    EmbeddedJobWorker,
+    JobQueue,
+    SQLiteJobBackend,
+    job_handler,
+)
+
+
+def make_queue():
+    directory = tempfile.mkdtemp(prefix="jobq-")
+    return JobQueue(SQLiteJobBackend(os.path.join(directory, "jobs.sqlite3")))
+
+
+def make_due(queue, job_id):
+    """Skip the backoff delay of a queued retry."""
+    queue.backend._conn.execute("UPDATE jobs SET run_at = 0 WHERE id = ?", (job_id,))
+
+
+def test_priority_ordering():
+    print("\n=== Priority ordering ===")
+    queue = make_queue()
+    low = queue.enqueue("lead_email", {"n": 1}, priority=PRIORITY_MARKETING)
+    first_default = queue.enqueue("lead_email", {"n": 2})
+    urgent = queue.enqueue("booking_confirmation", {"n": 3}, priority=PRIORITY_EMERGENCY)
+    second_default = queue.enqueue("lead_email", {"n": 4})
+    delayed = queue.enqueue("lead_email", {"n": 5}, priority=PRIORITY_EMERGENCY, delay_seconds=60)
+
+    claimed = []
+    while True:
+        job = queue.claim()
+        if job is None:
+            break
+        claimed.append(job.id)
+    assert claimed == [urgent, first_default, second_default, low]
+    assert delayed not in claimed
+    print("✅ claimed by priority, FIFO within a priority, delayed job held back")
+
+
+def test_retry_backoff_then_dead():
+    print("\n=== Retry and dead-letter ===")
+    queue = make_queue()
+    job_id = queue.enqueue("sms_send", {"to": "+15555550100"}, max_attempts=3)
+
+    delays = []
+    for attempt in (1, 2):
+        job = queue.claim()
+        assert job.id == job_id and job.attempts == attempt
+        retry_at = queue.fail(job, "TimeoutError: twilio")
+        delays.append(retry_at - time.time())
+        stored = queue.get(job_id)
+        assert stored.status == "queued" and stored.last_error == "TimeoutError: twilio"
+        assert queue.claim() is None  # Not due until the backoff has passed
+        make_due(queue, job_id)
+
+    # base 2s doubling, with up to 25% jitter
+    assert 1.9 <= delays[0] <= 2.5 and 3.9 <= delays[1] <= 5.0
+
+    job = queue.claim()
+    assert job.attempts == 3
+    assert queue.fail(job, "TimeoutError: twilio") is None
+    assert queue.get(job_id).status == "dead"
+    assert queue.claim() is None
+
+    # A permanent error skips the remaining attempts
+    job_id = queue.enqueue("sms_send", {"to": ""}, max_attempts=5)
+    assert queue.fail(queue.claim(), "PermanentJobError: no number", permanent=True) is None
+    assert queue.get(job_id).status == "dead"
+    print(f"✅ retried after {delays[0]:.1f}s and {delays[1]:.1f}s, dead after 3 attempts")
+
+
+def test_lease_expiry_reclaim():
+    print("\n=== Lease expiry ===")
+    queue = make_queue()
+    job_id = queue.enqueue("lead_email", {"lead": "abc"}, max_attempts=2)
+
+    job = queue.claim(lease_seconds=60)
+    assert job.attempts == 1
+    assert queue.claim(lease_seconds=60) is None  # Leased to the first worker
+
+    # The worker dies mid-job; once the lease lapses another worker takes it
+    queue.backend._conn.execute("UPDATE jobs SET lease_until = ? WHERE id = ?", (time.time() - 1, job_id))
+    job = queue.claim(lease_seconds=60)
+    assert job.id == job_id and job.attempts == 2
+
+    # Out of attempts: an expired lease makes the job dead instead of running it again
+    queue.backend._conn.execute("UPDATE jobs SET lease_until = ? WHERE id = ?", (time.time() - 1, job_id))
+    assert queue.claim(lease_seconds=60) is None
+    assert queue.get(job_id).status == "dead"
+    print("✅ expired lease re-claimed, then dead once max_attempts is used up")
+
+
+def test_idempotency_dedupe():
+    print("\n=== Idempotency keys ===")
+    queue = make_queue()
+    first = queue.enqueue("booking_confirmation", {"appointment_id": 7}, idempotency_key="confirm:7")
+    again = queue.enqueue("booking_confirmation", {"appointment_id": 7}, idempotency_key="confirm:7")
+    other = queue.enqueue("booking_confirmation", {"appointment_id": 8}, idempotency_key="confirm:8")
+    assert first and again is None and other
+
+    job = queue.claim()
+    queue.complete(job)
+    # Still deduped after the first one ran
+    assert queue.enqueue("booking_confirmation", {"appointment_id": 7}, idempotency_key="confirm:7") is None
+    assert queue.metrics()["default"]["done"] == 1
+    print("✅ second enqueue with the same key skipped, before and after completion")
+
+
+def test_embedded_worker():
+    print("\n=== Embedded worker ===")
+    queue = make_queue()
+    seen = []
+
+    @job_handler("test_embedded_job")
+    async def run_job(value):
+        seen.append(value)
+
+    worker = EmbeddedJobWorker(queue, concurrency=2)
+    worker.start()
+    try:
+        job_ids = [queue.enqueue("test_embedded_job", {"value": n}) for n in range(3)]
+        deadline = time.time() + 5
+        while len(seen) < 3 and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        worker.stop()
+    assert sorted(seen) == [0, 1, 2]
+    assert all(queue.get(job_id).status == "done" for job_id in job_ids)
+    assert not worker._thread.is_alive()
+    print("✅ jobs enqueued by the app ran on the worker thread, stop() joined it")
+
+
+if __name__ == "__main__":
+    test_priority_ordering()
+    test_retry_backoff_then_dead()
+    test_lease_expiry_reclaim()
+    test_idempotency_dedupe()
+    test_embedded_worker()
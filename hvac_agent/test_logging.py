@@ -0,0 +1,183 @@
+"""
+Test script for the non-blocking logging pipeline.
+
+Checks that records keep their arguments and call context when formatted on
+the writer thread, that a full queue drops instead of blocking, per-call
+sampling and rate limits, the JSON formatter, and benchmarks frame-send
+jitter of a 20ms audio loop with logging off, synchronous, and queued while
+stdout keeps stalling.
+
+Run: python test_logging.py
+"""
+import asyncio
+import io
+import json
+import logging
+import os
+import queue
+import sys
+import time
+from logging.handlers import QueueListener
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.logging import CallContextFilter, JsonFormatter, LogSampler, NonBlockingQueueHandler
+from app.utils.metrics import render_metrics
+from app.utils.tracing import call_context
+
+
+class StallingStream(io.StringIO):
+    """stdout that blocks for `stall` seconds on every `every`-th write (full pipe, slow collector)."""
+
+    def __init__(self, every=10, stall=0.04):
+        super().__init__()
+        self.every, self.stall, self.writes = every, stall, 0
+
+    def write(self, text):
+        self.writes += 1
+        if self.writes % self.every == 0:
+            time.sleep(self.stall)
+        return super().write(text)
+
+
+def make_logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.handlers[:] = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler.addFilter(CallContextFilter())
+    return logger
+
+
+def test_records_formatted_on_writer():
+    """Arguments are merged on the caller; the call comes from the bound context."""
+    print("\n=== Queued records ===")
+    q = queue.Queue()
+    logger = make_logger("test.queued", NonBlockingQueueHandler(q))
+    state = {"frames": 1}
+
+    with call_context("CA_log", "elevenlabs"):
+        logger.info("sent %(frames)d frames", state)
+    state["frames"] = 99  # Mutated before the writer gets to it
+    logger.info("outside %s", "call", extra={"call_sid": "CA_explicit"})
+
+    inside, outside = q.get_nowait(), q.get_nowait()
+    assert inside.getMessage() == "sent 1 frames" and inside.args is None
+    assert inside.call_sid == "CA_log"
+    assert outside.call_sid == "CA_explicit"
+    print("✅ message frozen at log time, CallSid picked up from the call context")
+
+
+def test_full_queue_drops():
+    print("\n=== Full queue ===")
+    logger = make_logger("test.full", NonBlockingQueueHandler(queue.Queue(maxsize=2)))
+
+    def dropped():
+        for line in render_metrics().splitlines():
+            if line.startswith("hvac_log_records_dropped_total "):
+                return float(line.split()[1])
+        return 0.0
+
+    before = dropped()
+    started = time.perf_counter()
+    for i in range(5):
+        logger.warning("burst %d", i)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    assert dropped() - before == 3
+    assert elapsed_ms < 50
+    print(f"✅ 3 of 5 records dropped in {elapsed_ms:.2f}ms, nothing blocked")
+
+
+def test_sampler():
+    print("\n=== Sampling and rate limits ===")
+    frames = LogSampler(first=5, every=25)
+    allowed = [n for n in range(1, 101) if frames.allow("frame_sent", "CA1")]
+    assert allowed == [1, 2, 3, 4, 5, 30, 55, 80]
+    # Each call is sampled on its own
+    assert frames.allow("frame_sent", "CA2")
+
+    events = LogSampler(per_second=2)
+    burst = sum(events.allow("response.audio_transcript.delta", "CA1") for _ in range(100))
+    assert burst == 2
+    assert events.allow("response.done", "CA1")  # Other events have their own budget
+    time.sleep(0.6)
+    assert events.allow("response.audio_transcript.delta", "CA1")  # Refilled
+
+    events.forget("CA1")
+    assert not any(key[0] == "CA1" for key in events._state)
+    print(f"✅ frames logged at {allowed}, 100-event burst capped at {burst}")
+
+
+def test_json_formatter():
+    print("\n=== JSON formatter ===")
+    record = logging.LogRecord("twilio.realtime", logging.INFO, __file__, 1, "AI said %s", ("héllo",), None)
+    record.call_sid = "CA_json"
+    line = JsonFormatter().format(record)
+    data = json.loads(line)
+    assert data["message"] == "AI said héllo" and data["call_sid"] == "CA_json"
+    assert data["timestamp"].startswith(time.strftime("%Y-%m-%d", time.gmtime(record.created)))
+
+    n = 20000
+    started = time.perf_counter()
+    for _ in range(n):
+        JsonFormatter().format(record)
+    us = (time.perf_counter() - started) / n * 1e6
+    print(f"✅ {line}  ({us:.1f} µs/record)")
+
+
+def benchmark_frame_jitter(frames=150, interval=0.02):
+    """Lateness of a paced 20ms frame loop that logs every frame to a stalling stdout."""
+    print("\n=== Frame-send jitter ===")
+
+    async def sender(logger):
+        lateness, log_cost = [], []
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        for n in range(frames):
+            deadline += interval
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            lateness.append((loop.time() - deadline) * 1000)
+            if logger is not None:
+                started = time.perf_counter()
+                logger.info(">>> SENT frame #%d to Twilio (160 bytes)", n)
+                log_cost.append((time.perf_counter() - started) * 1000)
+        return lateness, log_cost
+
+    def pct(values, p):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+    results = {}
+    for mode in ("off", "sync", "queued"):
+        listener = None
+        logger = None
+        if mode == "sync":
+            logger = make_logger("bench.sync", logging.StreamHandler(StallingStream()))
+        elif mode == "queued":
+            q = queue.Queue(maxsize=10000)
+            listener = QueueListener(q, logging.StreamHandler(StallingStream()))
+            listener.start()
+            logger = make_logger("bench.queued", NonBlockingQueueHandler(q))
+        lateness, log_cost = asyncio.run(sender(logger))
+        if listener is not None:
+            listener.stop()
+        results[mode] = {
+            "late_p50_ms": round(pct(lateness, 0.5), 2),
+            "late_p99_ms": round(pct(lateness, 0.99), 2),
+            "late_max_ms": round(max(lateness), 2),
+            "log_p99_ms": round(pct(log_cost, 0.99), 3),
+        }
+        print(f"{mode:>7}: {results[mode]}")
+
+    assert results["queued"]["log_p99_ms"] < 1.0
+    assert results["queued"]["late_p99_ms"] < results["sync"]["late_p99_ms"]
+    return results
+
+
+if __name__ == "__main__":
+    test_records_formatted_on_writer()
+    test_full_queue_drops()
+    test_sampler()
+    test_json_formatter()
+    benchmark_frame_jitter()
@@ -0,0 +1,135 @@
+"""
+Test script for the Prometheus-style metrics registry.
+
+Checks the text exposition format, that the ported stats sources (circuit
+breakers, degradation, response cache) still report the same
+get_stats() values while feeding /metrics, and the per-update overhead
+(must stay under 1 µs).
+
+Run: python test_metrics.py
+"""
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.metrics import MetricsRegistry, render_metrics
+
+
+def sample(text, line_prefix):
+    """Value of the first exposition line starting with line_prefix."""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} not in metrics output")
+
+
+def test_exposition_format():
+    print("\n=== Exposition format ===")
+    registry = MetricsRegistry()
+    lookups = registry.counter("lookups_total", "Cache lookups", ("result",))
+    depth = registry.gauge("queue_depth", "Queued frames")
+    stt = registry.histogram("stt_seconds", "Transcription latency", buckets=(0.1, 0.25, 0.5))
+
+    lookups.labels("hit").inc()
+    lookups.labels("hit").inc(2)
+    depth.set(4)
+    depth.dec()
+    for seconds in (0.08, 0.2, 0.3, 0.9):
+        stt.observe(seconds)
+
+    text = registry.render()
+    assert "# HELP lookups_total Cache lookups" in text
+    assert "# TYPE stt_seconds histogram" in text
+    assert sample(text, 'lookups_total{result="hit"}') == 3
+    assert sample(text, "queue_depth") == 3
+    assert sample(text, 'stt_seconds_bucket{le="0.25"}') == 2
+    assert sample(text, 'stt_seconds_bucket{le="+Inf"}') == 4
+    assert abs(sample(text, "stt_seconds_sum") - 1.48) < 1e-9
+    assert text.endswith("\n")
+    print("✅ counters, gauges and cumulative histogram buckets rendered")
+
+
+def test_ported_stats():
+    """Components keep their get_stats() shape; the numbers come from the registry."""
+    print("\n=== Ported stats sources ===")
+    from app.utils.circuit_breaker import CircuitBreaker
+    from app.services.degradation import GracefulDegradation
+    from app.services.response_cache import ResponseCache
+
+    breaker = CircuitBreaker(name="test_metrics_breaker", failure_threshold=2)
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_rejection()
+    stats = breaker.get_stats()
+    assert (stats["total_calls"], stats["total_failures"], stats["total_rejections"]) == (3, 2, 1)
+    assert stats["state"] == "open"
+
+    cache = ResponseCache()
+    cache.set("my furnace makes a weird rattling noise", "Let's get a tech out.")
+    assert cache.get("my furnace makes a weird rattling noise") == "Let's get a tech out."
+    assert cache.get("something nobody asked") is None
+
+    degradation = GracefulDegradation()
+    degradation.record_success()
+
+    text = render_metrics()
+    assert sample(text, 'hvac_circuit_breaker_calls_total{breaker="test_metrics_breaker",result="failure"}') == 2
+    assert sample(text, 'hvac_circuit_breaker_state{breaker="test_metrics_breaker"}') == 2
+    assert sample(text, 'hvac_response_cache_lookups_total{result="miss"}') >= 1
+    assert degradation.get_stats()["calls_per_level"][0] >= 1
+    print(f"✅ breaker {stats['total_calls']} calls, cache {cache.get_stats()['hit_rate']:.0%} hit rate, /metrics agrees")
+
+
+def test_collectors():
+    print("\n=== Stats collectors ===")
+    from app.services.slot_reservations import get_slot_reservations
+
+    get_slot_reservations()
+    registry = MetricsRegistry()
+    registry.register_stats(
+        "tts", lambda: {"providers": {"polly": {"healthy": True, "wins": 5}}, "routing": {"hedges": 2}},
+        counters=("wins", "hedges"), labels={"providers": "provider"},
+    )
+    registry.register_stats("broken", lambda: 1 / 0)
+    text = registry.render()
+    assert sample(text, 'tts_providers_healthy{provider="polly"}') == 1
+    assert sample(text, 'tts_providers_wins_total{provider="polly"}') == 5
+    assert sample(text, "tts_routing_hedges_total") == 2
+    assert "broken" not in text
+    assert "hvac_slot_holds_reserved_total" in render_metrics()
+    print("✅ nested get_stats() dicts flattened with labels, failing collector skipped")
+
+
+def benchmark_update_overhead(n=200000):
+    """Cost of a metric update on the event loop."""
+    print("\n=== Update overhead ===")
+    registry = MetricsRegistry()
+    hits = registry.counter("bench_total", "Bench", ("result",)).labels("hit")
+    latency = registry.histogram("bench_seconds", "Bench")
+    results = {}
+
+    started = time.perf_counter()
+    for _ in range(n):
+        hits.inc()
+    results["counter.inc()"] = (time.perf_counter() - started) / n * 1e6
+
+    started = time.perf_counter()
+    for _ in range(n):
+        latency.observe(0.18)
+    results["histogram.observe()"] = (time.perf_counter() - started) / n * 1e6
+
+    for name, us in results.items():
+        print(f"{name:>20}: {us:.3f} µs/update")
+    assert max(results.values()) < 1
+    return results
+
+
+if __name__ == "__main__":
+    test_exposition_format()
+    test_ported_stats()
+    test_collectors()
+    benchmark_update_overhead()
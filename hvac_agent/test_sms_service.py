@@ -0,0 +1,235 @@
+"""
+Test script for the shared Twilio messaging service.
+
+Serves the Messages API from an httpx.MockTransport and checks per-sender
+rate-governor spacing, retries on 429 with Retry-After, send_many result
+ordering, out-of-order delivery callbacks, that both connection pools are
+closed, which SMS job failures are retried, and the daily reminder schedule.
+
+Run: python test_sms_service.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from urllib.parse import parse_qs
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from app.services import jobs
+from app.services.job_queue import JobQueue, SQLiteJobBackend
+from app.services.sms_service import TwilioMessagingService
+
+SENDER = "+15555550000"
+
+
+class FakeTwilio:
+    """Messages API: records (time, form) per request and answers from `responses` first."""
+
+    def __init__(self, responses=(), delays=None):
+        self.requests = []
+        self.responses = list(responses)
+        self.delays = delays or {}
+
+    def _answer(self, request):
+        form = {k: v[0] for k, v in parse_qs(request.content.decode()).items()}
+        self.requests.append((time.monotonic(), form))
+        if self.responses:
+            return self.responses.pop(0)
+        return httpx.Response(201, json={"sid": f"SM-{form['To']}", "status": "queued"})
+
+    def handler(self, request):
+        return self._answer(request)
+
+    async def async_handler(self, request):
+        form = {k: v[0] for k, v in parse_qs(request.content.decode()).items()}
+        await asyncio.sleep(self.delays.get(form["To"], 0))
+        return self._answer(request)
+
+    def sent_from(self, sender):
+        return [at for at, form in self.requests if form["From"] == sender]
+
+
+def make_service(handler, rate=0.0, **kwargs):
+    return TwilioMessagingService(
+        "AC123", "token", SENDER, base_url="https://twilio.test", messages_per_second=rate,
+        transport=httpx.MockTransport(handler), **kwargs,
+    )
+
+
+def test_rate_governor_per_sender():
+    print("\n=== Rate governor ===")
+    twilio = FakeTwilio()
+    service = make_service(twilio.handler, rate=20)  # 50ms apart per number
+    other = "+15555550001"
+
+    async def burst():
+        await asyncio.gather(*(
+            service.asend(f"+1555000{i:04d}", "Reminder", from_number=sender)
+            for i, sender in enumerate([SENDER, SENDER, SENDER, other, other])
+        ))
+
+    started = time.monotonic()
+    asyncio.run(burst())
+    gaps = [b - a for a, b in zip(twilio.sent_from(SENDER), twilio.sent_from(SENDER)[1:])]
+    assert all(gap >= 0.045 for gap in gaps), gaps
+    # The second number has its own schedule; it does not queue behind the first
+    assert twilio.sent_from(other)[0] - started < 0.03
+    stats = service.get_stats()
+    assert stats["sent"] == 5 and stats["rate_limited_waits"] == 3
+    print(f"✅ {SENDER} gaps {[round(g * 1000) for g in gaps]} ms, second sender unpaced")
+
+
+def test_retry_after_on_429():
+    print("\n=== 429 Retry-After ===")
+    twilio = FakeTwilio(responses=[
+        httpx.Response(429, headers={"Retry-After": "0.2"}, json={"code": 20429, "message": "Too Many Requests"}),
+    ])
+    service = make_service(twilio.handler)
+    result = service.send("+15551230000", "Your tech is on the way")
+    assert result["success"] and result["message_sid"] == "SM-+15551230000"
+    assert twilio.requests[1][0] - twilio.requests[0][0] >= 0.2
+    assert service.get_stats()["retries"] == 1
+
+    # 4xx other than 429 is final
+    twilio = FakeTwilio(responses=[httpx.Response(400, json={"code": 21211, "message": "Invalid 'To' Phone Number"})])
+    service = make_service(twilio.handler)
+    result = service.send("+1555", "Hello")
+    assert not result["success"] and result["error"] == "Invalid 'To' Phone Number"
+    assert result["http_status"] == 400 and result["error_code"] == 21211
+    assert len(twilio.requests) == 1 and service.get_stats()["error_codes"] == {"21211": 1}
+
+    # Out of retries on 5xx
+    twilio = FakeTwilio(responses=[httpx.Response(503, headers={"Retry-After": "0"})] * 3)
+    service = make_service(twilio.handler, max_retries=2)
+    assert not service.send("+15551230000", "Hello")["success"]
+    assert len(twilio.requests) == 3
+    print("✅ waited out Retry-After, 400 not retried, 503 retried max_retries times")
+
+
+def test_send_many_keeps_input_order():
+    print("\n=== send_many ordering ===")
+    phones = [f"+1555100{i:04d}" for i in range(8)]
+    # Earlier messages take longest, so responses come back in reverse
+    twilio = FakeTwilio(delays={phone: 0.08 - i * 0.01 for i, phone in enumerate(phones)})
+    service = make_service(twilio.async_handler)
+
+    results = asyncio.run(service.send_many([(phone, "Reminder") for phone in phones], concurrency=8))
+    assert [r["message_sid"] for r in results] == [f"SM-{phone}" for phone in phones]
+    assert [form["To"] for _, form in twilio.requests] != phones  # They really finished out of order
+    print("✅ results in input order although Twilio answered in reverse")
+
+
+def test_out_of_order_status_callbacks():
+    print("\n=== Delivery callbacks ===")
+    service = make_service(FakeTwilio().handler)
+    service.send("+15551230001", "a")
+    service.send("+15551230002", "b")
+
+    service.record_status("SM-+15551230001", "delivered")
+    service.record_status("SM-+15551230001", "sent")       # Late intermediate callback
+    service.record_status("SM-+15551230001", "delivered")  # Duplicate final
+    service.record_status("SM-+15551230002", "sending")
+    service.record_status("SM-+15551230002", "undelivered", error_code="30003")
+    service.record_status("SM-+15551230002", "delivered")  # A final state never changes
+
+    stats = service.get_stats()
+    assert service._message_status == {"SM-+15551230001": "delivered", "SM-+15551230002": "undelivered"}
+    assert stats["delivery"] == {"delivered": 1, "undelivered": 1}
+    assert stats["delivery_rate"] == 0.5 and stats["error_codes"] == {"30003": 1}
+    print(f"✅ {stats['delivery']}, late callbacks ignored")
+
+
+def test_clients_closed():
+    print("\n=== Closing pools ===")
+    service = make_service(FakeTwilio().handler)
+    service.send("+15551230000", "sync")
+
+    first_loop = asyncio.new_event_loop()
+    first_loop.run_until_complete(service.asend("+15551230000", "loop 1"))
+    first_client = service._async_client
+
+    # Used from another loop: the first loop's client is closed, not leaked
+    asyncio.run(service.asend("+15551230000", "loop 2"))
+    second_client = service._async_client
+    assert first_client.is_closed and second_client is not None and second_client is not first_client
+    first_loop.close()
+
+    sync_client = service._client
+    service.close()
+    assert sync_client.is_closed and service._client is None and service._async_client is None
+
+    async def use_and_aclose():
+        await service.asend("+15551230000", "loop 3")
+        client = service._async_client
+        await service.aclose()
+        return client
+
+    assert asyncio.run(use_and_aclose()).is_closed
+    print("✅ replaced and shut-down AsyncClients closed, sync pool closed")
+
+
+def test_sms_job_gives_up_on_rejected_messages():
+    print("\n=== SMS job errors ===")
+    from app.services import notification_service
+    from app.services.job_queue import PermanentJobError
+
+    def outcome(response):
+        service = make_service(FakeTwilio(responses=[response] * 4).handler, max_retries=0)
+        original = notification_service.get_messaging_service
+        notification_service.get_messaging_service = lambda: service
+        try:
+            jobs.sms("5551230000", "Your tech is on the way")
+        except PermanentJobError as e:
+            return "permanent", str(e)
+        except RuntimeError as e:
+            return "retry", str(e)
+        finally:
+            notification_service.get_messaging_service = original
+        return "sent", None
+
+    opted_out = httpx.Response(400, json={"code": 21610, "message": "Attempt to send to unsubscribed recipient"})
+    assert outcome(opted_out) == ("permanent", "Attempt to send to unsubscribed recipient (Twilio 21610)")
+    assert outcome(httpx.Response(404, json={}))[0] == "permanent"
+    assert outcome(httpx.Response(429, json={"code": 20429, "message": "Too Many Requests"}))[0] == "retry"
+    assert outcome(httpx.Response(503))[0] == "retry"
+    assert outcome(httpx.Response(201, json={"sid": "SM1", "status": "queued"}))[0] == "sent"
+    print("✅ Twilio 4xx rejections are permanent, 429/5xx are retried")
+
+
+def test_next_day_reminders_scheduled_daily():
+    print("\n=== Reminder schedule ===")
+    queue = JobQueue(SQLiteJobBackend(os.path.join(tempfile.mkdtemp(), "jobs.sqlite3")))
+    original = jobs.get_job_queue
+    jobs.get_job_queue = lambda: queue
+    try:
+        morning = datetime(2026, 3, 2, 9, 30)
+        first = jobs.schedule_next_day_reminders(morning)
+        assert jobs.schedule_next_day_reminders(morning) is None  # Another process/restart: deduped
+        job = queue.get(first)
+        assert job.payload == {"day": "2026-03-03"}
+        run_at = morning.timestamp() + (job.run_at - job.enqueued_at)
+        assert abs(run_at - datetime(2026, 3, 2, jobs.NEXT_DAY_REMINDER_HOUR).timestamp()) < 1
+
+        # Past today's hour: the next batch is tomorrow evening's, for the day after
+        evening = datetime(2026, 3, 2, 23, 0)
+        second = jobs.schedule_next_day_reminders(evening)
+        assert queue.get(second).payload == {"day": "2026-03-04"}
+    finally:
+        jobs.get_job_queue = original
+    print(f"✅ reminders queued for {jobs.NEXT_DAY_REMINDER_HOUR}:00 the day before, once per day")
+
+
+if __name__ == "__main__":
+    test_rate_governor_per_sender()
+    test_retry_after_on_429()
+    test_send_many_keeps_input_order()
+    test_out_of_order_status_callbacks()
+    test_clients_closed()
+    test_sms_job_gives_up_on_rejected_messages()
+    test_next_day_reminders_scheduled_daily()
@@ -0,0 +1,195 @@
+"""
+Test script for the sentence-level LLM -> TTS pipeline.
+
+Uses local stub providers (an LLM that streams tokens with a fixed
+time-to-first-token and per-token delay, and a TTS with a fixed first-byte
+latency) to check chunking, audio ordering and barge-in cancellation, and
+to compare time-to-first-audio with the old complete-then-speak flow.
+
+Run: python test_streaming_pipeline.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.tts.pipeline import SentenceChunker, stream_speech
+
+RESPONSE = (
+    "I'm sorry to hear your AC isn't cooling. Dr. Patel's team can come out tomorrow at 9 a.m. "
+    "or 2 p.m., whichever works better. The diagnostic visit is $89.50, and it's waived if you "
+    "go ahead with the repair. Which time would you prefer?"
+)
+
+
+def tokenize(text):
+    """Split roughly like an LLM tokenizer: words with their leading space."""
+    tokens, word = [], ""
+    for ch in text:
+        if ch == " " and word:
+            tokens.append(word)
+            word = ""
+        word += ch
+    return tokens + [word] if word else tokens
+
+
+class StubLLM:
+    def __init__(self, first_token_ms=350, token_ms=25):
+        self.first_token_ms, self.token_ms = first_token_ms, token_ms
+        self.closed = False
+
+    async def stream(self, text=RESPONSE):
+        try:
+            await asyncio.sleep(self.first_token_ms / 1000)
+            for token in tokenize(text):
+                yield token
+                await asyncio.sleep(self.token_ms / 1000)
+        finally:
+            self.closed = True
+
+    async def complete(self, text=RESPONSE):
+        return "".join([token async for token in self.stream(text)])
+
+
+class StubTTS:
+    """First audio after first_byte_ms, then one 20ms chunk per 3 characters."""
+
+    def __init__(self, first_byte_ms=250, chunk_ms=5):
+        self.first_byte_ms, self.chunk_ms = first_byte_ms, chunk_ms
+        self.started, self.cancelled = [], 0
+
+    async def stream_to_twilio(self, text, send_audio):
+        self.started.append(text)
+        index = len(self.started)
+        try:
+            await asyncio.sleep(self.first_byte_ms / 1000)
+            for i in range(0, len(text), 3):
+                await send_audio(f"{index}:{text[i:i + 3]}".encode())
+                await asyncio.sleep(self.chunk_ms / 1000)
+            return True
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+def chunk_all(text, **kwargs):
+    chunker = SentenceChunker(**kwargs)
+    chunks = [c for token in tokenize(text) for c in chunker.feed(token)]
+    tail = chunker.flush()
+    return chunks + ([tail] if tail else [])
+
+
+def test_chunker():
+    print("\n=== Sentence chunking ===")
+    chunks = chunk_all(RESPONSE)
+    for chunk in chunks:
+        print(f"  {chunk!r}")
+    assert " ".join(chunks) == RESPONSE
+    # Abbreviations and decimals don't split
+    assert chunks[0] == "I'm sorry to hear your AC isn't cooling."
+    assert any("Dr. Patel's" in c for c in chunks)
+    assert any("9 a.m." in c and "2 p.m.," in c for c in chunks)
+    assert any("$89.50" in c for c in chunks)
+
+    assert chunk_all("Sure. I can help with that today.") == ["Sure. I can help with that today."]
+    # The first chunk may end at a clause so speech starts sooner
+    assert chunk_all("Let me check the schedule for you, one moment while I pull it up.") == [
+        "Let me check the schedule for you,", "one moment while I pull it up."]
+    long = chunk_all("word " * 100, max_chars=60)
+    assert all(len(c) <= 60 for c in long) and len(long) > 1
+    print("✅ Chunks split at sentences, merge short ones, respect abbreviations")
+
+
+async def _test_ordering():
+    tts = StubTTS(first_byte_ms=50)
+    # Later chunks synthesize faster than the first: audio must still come out in order
+    original = tts.stream_to_twilio
+
+    async def uneven(text, send_audio):
+        if len(tts.started) >= 1:
+            tts.first_byte_ms = 1
+        return await original(text, send_audio)
+
+    audio = []
+
+    async def send(chunk):
+        audio.append(chunk)
+
+    ok = await stream_speech(StubLLM(first_token_ms=0, token_ms=0).stream(), uneven, send)
+    order = [int(chunk.split(b":")[0]) for chunk in audio]
+    assert ok and order == sorted(order), order
+    assert b"".join(c.split(b":", 1)[1] for c in audio).decode() == "".join(chunk_all(RESPONSE))
+
+
+def test_audio_order():
+    print("\n=== Audio stays in chunk order ===")
+    asyncio.run(_test_ordering())
+    print("✅ Audio emitted in order despite out-of-order synthesis")
+
+
+async def _test_barge_in():
+    llm, tts = StubLLM(), StubTTS()
+    audio = []
+
+    async def send(chunk):
+        audio.append(chunk)
+
+    task = asyncio.ensure_future(stream_speech(llm.stream(), tts.stream_to_twilio, send))
+    while not audio:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    sent = len(audio)
+    await asyncio.sleep(0.3)
+    assert len(audio) == sent, "audio after barge-in"
+    assert llm.closed, "token stream left open"
+    assert asyncio.all_tasks() == {asyncio.current_task()}, "synthesis still running"
+    return tts
+
+
+def test_barge_in():
+    print("\n=== Barge-in cancels synthesis and the token stream ===")
+    tts = asyncio.run(_test_barge_in())
+    print(f"✅ Stopped cleanly ({len(tts.started)} chunk(s) started, {tts.cancelled} cancelled)")
+
+
+async def _time_to_first_audio(streaming, runs=5):
+    samples = []
+    for _ in range(runs):
+        llm, tts = StubLLM(), StubTTS()
+        first = []
+        started = time.perf_counter()
+
+        async def send(chunk):
+            if not first:
+                first.append((time.perf_counter() - started) * 1000)
+
+        if streaming:
+            await stream_speech(llm.stream(), tts.stream_to_twilio, send)
+        else:
+            await tts.stream_to_twilio(await llm.complete(), send)
+        samples.append(first[0])
+    return sorted(samples)[len(samples) // 2]
+
+
+def benchmark_time_to_first_audio():
+    """350ms to first token, 25ms/token, 250ms TTS first byte."""
+    print("\n=== Time to first audio: complete-then-speak vs streaming ===")
+    before = asyncio.run(_time_to_first_audio(streaming=False))
+    after = asyncio.run(_time_to_first_audio(streaming=True))
+    print(f"complete-then-speak: {before:.0f}ms  streaming: {after:.0f}ms  ({before - after:.0f}ms saved)")
+    assert after < before
+    return before, after
+
+
+if __name__ == "__main__":
+    test_chunker()
+    test_audio_order()
+    test_barge_in()
+    benchmark_time_to_first_audio()
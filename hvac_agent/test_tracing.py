@@ -0,0 +1,250 @@
+"""
+Test script for call-level latency tracing.
+
+Checks span nesting and call propagation across asyncio tasks, the ring
+buffer summary, JSONL and OTLP export (against a fake HTTP endpoint), the
+LatencyPerformanceEngine-style measurement sink, and the per-span overhead
+(must stay under 50 µs).
+
+Run: python test_tracing.py
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils import tracing
+from app.utils.tracing import call_context, get_recent_spans, get_stage_summary, record_span, span, traced
+
+
+class FakeEngine:
+    """Records what LatencyPerformanceEngine.record_measurement would receive."""
+
+    def __init__(self):
+        self.measurements = []
+
+    def record_measurement(self, metric_type, value_ms, call_id=None, pilot_id=None, **kwargs):
+        self.measurements.append((metric_type, value_ms, call_id, kwargs))
+
+
+def spans_named(name, call_sid=None):
+    return [s for s in get_recent_spans(call_sid, limit=10000) if s["name"] == name]
+
+
+def test_nesting_and_call_propagation():
+    """Spans pick up the call and their parent, including in spawned tasks."""
+    print("\n=== Nesting and propagation ===")
+    tracing.clear_spans()
+
+    async def stt():
+        await asyncio.sleep(0.01)
+        with span("stt"):
+            await asyncio.sleep(0.02)
+
+    async def call():
+        with call_context("CA_nest", "elevenlabs"):
+            with span("turn") as turn:
+                await asyncio.create_task(stt())
+                with span("llm", model="gpt-4o-mini"):
+                    await asyncio.sleep(0.01)
+            # Explicit call_sid wins (tasks started before the call was known)
+            record_span("tts_first_byte", 123.0, "CA_other")
+        return turn
+
+    turn = asyncio.run(call())
+    stt_span, = spans_named("stt", "CA_nest")
+    llm_span, = spans_named("llm", "CA_nest")
+    assert stt_span["parent_id"] == turn.span_id
+    assert llm_span["parent_id"] == turn.span_id
+    assert llm_span["attrs"]["model"] == "gpt-4o-mini"
+    assert stt_span["router"] == "elevenlabs"
+    assert 15 < stt_span["duration_ms"] < 200
+    assert turn.duration_ms >= stt_span["duration_ms"] + llm_span["duration_ms"]
+    assert spans_named("tts_first_byte", "CA_other")[0]["duration_ms"] == 123.0
+    # Outside the call nothing is bound
+    with span("db") as orphan:
+        pass
+    assert orphan.call_sid is None
+    print(f"✅ turn {turn.duration_ms:.0f}ms = stt {stt_span['duration_ms']:.0f}ms + llm {llm_span['duration_ms']:.0f}ms + gaps")
+
+
+def test_traced_decorator_and_errors():
+    print("\n=== traced() ===")
+    tracing.clear_spans()
+
+    @traced("intent")
+    async def analyze(text):
+        await asyncio.sleep(0.005)
+        return text.upper()
+
+    @traced("tool", tool="create_booking", metric="booking_execution")
+    def book():
+        raise TimeoutError("calendar")
+
+    with call_context("CA_dec", "gather"):
+        assert asyncio.run(analyze("hi")) == "HI"
+        try:
+            book()
+        except TimeoutError:
+            pass
+
+    intent, = spans_named("intent", "CA_dec")
+    tool, = spans_named("tool", "CA_dec")
+    assert intent["error"] is None and intent["metric"] is None
+    assert tool["error"] == "TimeoutError" and tool["metric"] == "booking_execution"
+    assert analyze.__name__ == "analyze"
+    print("✅ async and sync functions traced, exceptions recorded")
+
+
+def test_stage_summary():
+    print("\n=== Stage summary ===")
+    tracing.clear_spans()
+    for ms in range(1, 101):
+        record_span("llm", float(ms), "CA_sum")
+    summary = get_stage_summary()["llm"]
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == 51.0 and summary["p95_ms"] == 96.0 and summary["max_ms"] == 100.0
+    print(f"✅ {summary}")
+
+
+def test_measurement_sink():
+    """Spans for tracked stages feed record_measurement, others don't."""
+    print("\n=== Measurement sink ===")
+    engine = FakeEngine()
+    tracing.add_measurement_sink(engine)
+    try:
+        with call_context("CA_sink", "realtime"):
+            record_span("answer", 240.0)
+            record_span("turn", 310.0)
+            record_span("stt", 95.0)
+            record_span("tool", 800.0, tool="create_booking", metric="booking_execution")
+            record_span("db", 2.0)
+            record_span("tts_first_byte", 150.0)
+            try:
+                with span("llm"):
+                    raise RuntimeError("rate limited")
+            except RuntimeError:
+                pass
+        tracing.flush_exports()
+    finally:
+        tracing._sinks.remove(engine)
+
+    got = {metric: (round(value), call_id) for metric, value, call_id, _ in engine.measurements}
+    assert got == {
+        "answer_latency": (240, "CA_sink"),
+        "speech_to_response": (310, "CA_sink"),
+        "transcription_latency": (95, "CA_sink"),
+        "booking_execution": (800, "CA_sink"),
+    }, got
+    assert all(0 <= kwargs["time_of_day"] < 24 for *_, kwargs in engine.measurements)
+    print(f"✅ {len(engine.measurements)} measurements: {sorted(got)}")
+
+
+def test_jsonl_export():
+    print("\n=== JSONL export ===")
+    path = os.path.join(tempfile.mkdtemp(), "traces.jsonl")
+    tracing.TRACE_JSONL_PATH = path
+    exporter = tracing._Exporter("jsonl")
+    with call_context("CA_jsonl", "gather"):
+        with span("turn"):
+            record_span("llm", 420.0)
+    exporter.export(list(tracing._buffer)[-2:])
+
+    with open(path) as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["name"] for line in lines] == ["llm", "turn"]
+    assert lines[0]["call_sid"] == "CA_jsonl" and lines[0]["metric"] == "llm_response_time"
+    assert lines[0]["parent_id"] == lines[1]["span_id"]
+    print(f"✅ {len(lines)} spans written to JSONL")
+
+
+def test_otlp_export():
+    print("\n=== OTLP export ===")
+    import httpx
+
+    posted = []
+
+    class FakeResponse:
+        def raise_for_status(self):
+            pass
+
+    def fake_post(url, json=None, timeout=None):
+        posted.append((url, json))
+        return FakeResponse()
+
+    real_post = httpx.post
+    httpx.post = fake_post
+    try:
+        exporter = tracing._Exporter("otlp")
+        with call_context("CA_otlp", "elevenlabs"):
+            with span("turn"):
+                record_span("stt", 88.5, backend="WhisperBackend")
+        exporter.export(list(tracing._buffer)[-2:])
+    finally:
+        httpx.post = real_post
+
+    url, body = posted[0]
+    assert url == tracing.TRACE_OTLP_ENDPOINT
+    resource = body["resourceSpans"][0]
+    assert resource["resource"]["attributes"][0]["value"]["stringValue"] == tracing.TRACE_SERVICE_NAME
+    stt, turn = resource["scopeSpans"][0]["spans"]
+    assert stt["traceId"] == turn["traceId"] and len(stt["traceId"]) == 32
+    assert stt["parentSpanId"] == turn["spanId"] and len(stt["spanId"]) == 16
+    duration_ms = (int(stt["endTimeUnixNano"]) - int(stt["startTimeUnixNano"])) / 1e6
+    assert abs(duration_ms - 88.5) < 0.01
+    assert abs(int(stt["endTimeUnixNano"]) / 1e9 - time.time()) < 5
+    attrs = {a["key"]: a["value"] for a in stt["attributes"]}
+    assert attrs["metric"] == {"stringValue": "transcription_latency"}
+    assert attrs["call_sid"] == {"stringValue": "CA_otlp"}
+    assert exporter.exported == 2
+    print("✅ OTLP/HTTP JSON payload posted")
+
+
+def benchmark_span_overhead(n=100000):
+    """Per-span cost on the call path (the exporter thread does the rest)."""
+    print("\n=== Span overhead ===")
+    engine = FakeEngine()
+    tracing.add_measurement_sink(engine)  # Exporter active: spans are also queued
+    results = {}
+    try:
+        with call_context("CA_bench", "elevenlabs"):
+            with span("turn"):
+                started = time.perf_counter()
+                for _ in range(n):
+                    with span("db", statement="SELECT"):
+                        pass
+                results["with span()"] = (time.perf_counter() - started) / n * 1e6
+
+                started = time.perf_counter()
+                for _ in range(n):
+                    record_span("tts_first_byte", 1.0)
+                results["record_span()"] = (time.perf_counter() - started) / n * 1e6
+
+                started = time.perf_counter()
+                for _ in range(n):
+                    s = span("llm")
+                    s.end()
+                results["span().end()"] = (time.perf_counter() - started) / n * 1e6
+    finally:
+        tracing._sinks.remove(engine)
+        tracing._export_queue.clear()
+
+    for name, us in results.items():
+        print(f"{name:>15}: {us:.2f} µs/span")
+    assert max(results.values()) < 50
+    return results
+
+
+if __name__ == "__main__":
+    test_nesting_and_call_propagation()
+    test_traced_decorator_and_errors()
+    test_stage_summary()
+    test_measurement_sink()
+    test_jsonl_export()
+    test_otlp_export()
+    benchmark_span_overhead()
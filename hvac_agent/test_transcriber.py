@@ -0,0 +1,334 @@
+"""
+Test script and benchmark for the streaming transcriber.
+
+Builds a seeded, replayable corpus of 8kHz telephone utterances whose words
+can be recognised offline: each word of a small vocabulary is a voiced
+segment with its own pitch and length. A local backend decodes words (with
+timestamps) back out of whatever audio it is sent - so words cut at a
+window edge come back as fragments, just like a real model hearing half a
+word - and waits a modelled request latency (fixed overhead plus a cost
+per second of audio) before answering.
+
+Clips are replayed at SPEED x real time through three pipelines:
+- utterance: endpoint, then transcribe the whole utterance (old bridge)
+- buffer_1s: independent request per 1s buffer (old transcribe_streaming)
+- streaming: StreamingTranscriber (overlapping windows, stitched)
+and compared on word error rate and time from end of speech to final text.
+
+Run: python test_transcriber.py
+"""
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+import numpy as np
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.audio.transcriber import (
+    StreamingTranscriber, TranscriptionBackend, WindowResult, Word,
+)
+from app.services.audio.vad import Endpointer, pcm16_to_ulaw, ulaw_to_pcm16
+
+RATE = 8000
+SPEED = 20  # Replay (and modelled latencies) this many times faster than real time
+CHUNK_MS = 100
+
+# Modelled STT request latency
+REQUEST_BASE_MS = 350
+REQUEST_PER_AUDIO_S_MS = 150
+
+VOCAB = ["my", "air", "conditioner", "is", "not", "cooling", "furnace", "noise",
+         "tomorrow", "morning", "please", "schedule"]
+PITCH = {w: 100 * 2.5 ** (i / (len(VOCAB) - 1)) for i, w in enumerate(VOCAB)}
+LENGTH = {w: min(0.16 + 0.03 * len(w), 0.45) for w in VOCAB}
+
+
+# =============================================================================
+# CORPUS
+# =============================================================================
+def _word_audio(word):
+    n = int(LENGTH[word] * RATE)
+    f0 = PITCH[word]
+    phase = 2 * np.pi * f0 * np.arange(n) / RATE
+    out = np.zeros(n)
+    for k in range(1, int(3400 / f0) + 1):
+        gain = sum(1 / (1 + ((k * f0 - f) / bw) ** 2) for f, bw in ((500, 150), (1500, 250), (2500, 300)))
+        out += gain / k ** 0.5 * np.sin(k * phase)
+    ramp = int(0.02 * RATE)
+    out[:ramp] *= np.linspace(0, 1, ramp)
+    out[-ramp:] *= np.linspace(1, 0, ramp)
+    return out / np.sqrt(np.mean(out ** 2))
+
+
+def make_corpus(count=24, seed=11):
+    """[(ulaw, words, speech_end_s)]: 1s of line noise, an utterance, 1.5s of line noise."""
+    rng = np.random.default_rng(seed)
+    corpus = []
+    for _ in range(count):
+        words = list(rng.choice(VOCAB, size=int(rng.integers(3, 19))))
+        parts = [np.zeros(RATE)]
+        for word in words:
+            parts.append(_word_audio(word) * 10 ** (rng.uniform(-23, -17) / 20))
+            parts.append(np.zeros(int(rng.uniform(0.06, 0.12) * RATE)))
+        speech_end_s = (sum(len(p) for p in parts) - len(parts[-1])) / RATE
+        parts.append(np.zeros(int(1.5 * RATE)))
+        audio = np.concatenate(parts) + rng.normal(0, 10 ** (-60 / 20), sum(len(p) for p in parts))
+        pcm = np.clip(audio * 32767, -32768, 32767).astype(np.int16)
+        corpus.append((pcm16_to_ulaw(pcm), words, speech_end_s))
+    return corpus
+
+
+def _pitch(x, rate):
+    x = x - x.mean()
+    spectrum = np.fft.rfft(x, 2 * len(x))
+    corr = np.fft.irfft(spectrum * np.conj(spectrum))[:len(x)]
+    low, high = int(rate / 270), int(rate / 90)
+    lags = corr[low:high + 1]
+    # Smallest lag near the best peak, to avoid picking a multiple of the period
+    best = lags.max()
+    for i in range(1, len(lags) - 1):
+        if lags[i] >= 0.85 * best and lags[i] >= lags[i - 1] and lags[i] >= lags[i + 1]:
+            a, b, c = lags[i - 1], lags[i], lags[i + 1]
+            shift = 0.5 * (a - c) / (a - 2 * b + c) if a - 2 * b + c else 0.0
+            return rate / (low + i + shift)
+    return rate / (low + int(np.argmax(lags)))
+
+
+def recognise(pcm: bytes, sample_rate: int) -> List[Word]:
+    """Decode corpus words (with timings) from PCM16 audio."""
+    x = np.frombuffer(pcm, dtype="<i2").astype(np.float64) / 32768
+    hop = sample_rate // 100
+    frames = x[:len(x) // hop * hop].reshape(-1, hop)
+    voiced = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-12) > -40
+    words, i = [], 0
+    while i < len(voiced):
+        if not voiced[i]:
+            i += 1
+            continue
+        j = i
+        while j < len(voiced) and (voiced[j] or voiced[j:j + 3].any()):
+            j += 1
+        if j - i >= 6:  # Under 60ms: too little of the word to recognise
+            f0 = _pitch(x[i * hop:j * hop], sample_rate)
+            word = min(VOCAB, key=lambda w: abs(np.log(PITCH[w] / f0)))
+            words.append(Word(" " + word, i / 100, j / 100))
+        i = j
+    return words
+
+
+class ReplayBackend(TranscriptionBackend):
+    """Offline recogniser for the corpus with a modelled request latency."""
+
+    name = "replay"
+
+    def __init__(self, fail_windows=()):
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.fail_windows = set(fail_windows)
+
+    async def transcribe(self, pcm: bytes, sample_rate: int) -> WindowResult:
+        call = self.calls
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            seconds = len(pcm) / 2 / sample_rate
+            await asyncio.sleep((REQUEST_BASE_MS + REQUEST_PER_AUDIO_S_MS * seconds) / 1000 / SPEED)
+            if call in self.fail_windows:
+                raise ConnectionError("simulated 500")
+            words = recognise(pcm, sample_rate)
+            return WindowResult("".join(w.text for w in words).strip(), words)
+        finally:
+            self.in_flight -= 1
+
+
+def wer(reference, hypothesis):
+    ref, hyp = list(reference), hypothesis.split()
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (r != h))
+    return row[-1] / len(ref)
+
+
+# =============================================================================
+# REPLAY
+# =============================================================================
+async def _play(ulaw, speech_end_s, on_chunk):
+    """Feed the clip in real time (scaled); returns the wall time speech ended."""
+    step = RATE * CHUNK_MS // 1000
+    speech_end_at = None
+    for i in range(0, len(ulaw), step):
+        on_chunk(ulaw[i:i + step])
+        if speech_end_at is None and (i + step) / RATE >= speech_end_s:
+            speech_end_at = time.perf_counter()
+        await asyncio.sleep(CHUNK_MS / 1000 / SPEED)
+    return speech_end_at
+
+
+async def _timed(awaitable):
+    text = await awaitable
+    return text, time.perf_counter()
+
+
+async def run_streaming(ulaw, speech_end_s, backend=None, **kwargs):
+    transcriber = StreamingTranscriber(backend or ReplayBackend(), Endpointer(), **kwargs)
+    pending = []
+
+    def on_chunk(chunk):
+        for event in transcriber.feed(chunk):
+            if event.kind == "end":
+                pending.append(asyncio.ensure_future(_timed(event.transcript.text())))
+
+    speech_end_at = await _play(ulaw, speech_end_s, on_chunk)
+    results = [await task for task in pending]
+    text = " ".join(t for t, _ in results)
+    return text, (results[-1][1] - speech_end_at) * SPEED * 1000, transcriber
+
+
+async def run_utterance(ulaw, speech_end_s):
+    endpointer, backend, pending = Endpointer(), ReplayBackend(), []
+
+    def on_chunk(chunk):
+        for event in endpointer.feed(chunk):
+            if event.kind == "end":
+                pcm = ulaw_to_pcm16(event.audio).tobytes()
+                pending.append(asyncio.ensure_future(_timed(backend.transcribe(pcm, RATE))))
+
+    speech_end_at = await _play(ulaw, speech_end_s, on_chunk)
+    results = [await task for task in pending]
+    text = " ".join(r.text for r, _ in results)
+    return text, (results[-1][1] - speech_end_at) * SPEED * 1000, backend
+
+
+async def run_buffer_1s(ulaw, speech_end_s):
+    backend, queue = ReplayBackend(), asyncio.Queue()
+
+    async def stream():
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                return
+            yield chunk
+
+    async def consume():
+        # The old transcribe_streaming loop: one request per 1s, sequentially
+        buffer, texts, fed = bytearray(), [], 0
+        async for chunk in stream():
+            buffer.extend(ulaw_to_pcm16(chunk).tobytes())
+            if len(buffer) >= RATE * 2:
+                fed += len(buffer) // 2
+                result = await backend.transcribe(bytes(buffer), RATE)
+                texts.append((result.text, fed / RATE, time.perf_counter()))
+                buffer.clear()
+        return texts
+
+    consumer = asyncio.ensure_future(consume())
+    speech_end_at = await _play(ulaw, speech_end_s, queue.put_nowait)
+    queue.put_nowait(None)
+    texts = await consumer
+    done_at = next(at for _, covered, at in texts if covered >= speech_end_s)
+    text = " ".join(t for t, _, _ in texts if t)
+    return text, (done_at - speech_end_at) * SPEED * 1000, backend
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_recogniser_on_whole_words():
+    print("\n=== Corpus recogniser ===")
+    for ulaw, words, _ in make_corpus(count=6):
+        decoded = [w.text.strip() for w in recognise(ulaw_to_pcm16(ulaw).tobytes(), RATE)]
+        assert decoded == words, (decoded, words)
+    print("✅ Whole clips decode to their reference words")
+
+
+def test_stitching_matches_reference():
+    print("\n=== Overlapping windows stitch without gaps or repeats ===")
+    corpus = make_corpus(count=8, seed=5)
+
+    async def run():
+        errors = []
+        for ulaw, words, end in corpus:
+            text, _, transcriber = await run_streaming(ulaw, end, window_ms=1500, overlap_ms=500)
+            errors.append(wer(words, text))
+        return errors, transcriber
+
+    errors, _ = asyncio.run(run())
+    assert max(errors) == 0, errors
+    print(f"✅ {len(corpus)} utterances cut into 1.5s windows, WER 0")
+
+
+def test_failed_window_falls_back():
+    print("\n=== Failed window -> whole-utterance retry ===")
+    ulaw, words, end = make_corpus(count=1, seed=3)[0]
+    backend = ReplayBackend(fail_windows={1})
+
+    text, _, transcriber = asyncio.run(run_streaming(ulaw, end, backend=backend, window_ms=1500, overlap_ms=500))
+    stats = transcriber.get_stats()
+    assert wer(words, text) == 0, (words, text)
+    assert stats["failures"] == 1 and stats["fallbacks"] == 1, stats
+    print(f"✅ Recovered: {stats}")
+
+
+def test_concurrency_limit_and_close():
+    print("\n=== In-flight limit and cancellation ===")
+
+    async def run():
+        backend = ReplayBackend()
+        transcriber = StreamingTranscriber(backend, Endpointer(), window_ms=600, overlap_ms=200, max_in_flight=2)
+        ulaw = max(make_corpus(count=6, seed=9), key=lambda c: len(c[0]))[0]
+        # Whole clip at once: every window is due immediately
+        transcriber.feed(ulaw[:len(ulaw) - RATE])
+        await asyncio.sleep(0)
+        transcriber.close()
+        await asyncio.sleep(0.05)
+        leftover = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        return backend, leftover
+
+    backend, leftover = asyncio.run(run())
+    assert backend.peak_in_flight <= 2, backend.peak_in_flight
+    assert not leftover, leftover
+    print(f"✅ Peak {backend.peak_in_flight} in flight, nothing left running after close()")
+
+
+def benchmark_corpus():
+    print(f"\n=== Corpus: end of speech -> final text (request = {REQUEST_BASE_MS}ms "
+          f"+ {REQUEST_PER_AUDIO_S_MS}ms/s of audio) ===")
+    corpus = make_corpus()
+    runners = {"utterance": run_utterance, "buffer_1s": run_buffer_1s, "streaming": run_streaming}
+    summary = {}
+
+    async def run(runner):
+        latencies, errors, words, calls = [], [], 0, 0
+        for ulaw, reference, end in corpus:
+            text, latency, backend = await runner(ulaw, end)
+            latencies.append(latency)
+            errors.append(wer(reference, text) * len(reference))
+            words += len(reference)
+            calls += backend.calls if hasattr(backend, "calls") else backend.backend.calls
+        return sorted(latencies), sum(errors) / words, calls
+
+    for name, runner in runners.items():
+        latencies, error_rate, calls = asyncio.run(run(runner))
+        p50, p95 = latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+        summary[name] = (p50, error_rate)
+        print(f"{name:>10}: p50 {p50:5.0f}ms  p95 {p95:5.0f}ms  WER {error_rate:6.1%}  requests {calls}")
+
+    assert summary["streaming"][1] <= summary["utterance"][1] + 0.01
+    assert summary["streaming"][0] < summary["utterance"][0]
+    return summary
+
+
+if __name__ == "__main__":
+    test_recogniser_on_whole_words()
+    test_stitching_matches_reference()
+    test_failed_window_falls_back()
+    test_concurrency_limit_and_close()
+    benchmark_corpus()
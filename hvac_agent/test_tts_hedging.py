@@ -0,0 +1,164 @@
+"""
+Test script for hedged, latency-aware TTS routing.
+
+Replaces the provider speakers of a HybridTTSEngine with fakes that wait,
+stream or fail on cue, and checks speak() when the primary wins, when a
+hedge wins, failover after an exception, that the loser is cancelled
+without its elapsed time becoming a TTFA sample, and that
+TTS_HEDGE_ENABLED=false never starts a second provider.
+
+Run: python test_tts_hedging.py
+"""
+import asyncio
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.tts import hybrid_engine
+from app.services.tts.hybrid_engine import HybridTTSEngine
+
+# Hedge after 60ms while providers have no samples (instead of 800ms)
+hybrid_engine.TTS_HEDGE_DEFAULT_MS = 60
+hybrid_engine.TTS_HEDGE_MIN_MS = 10
+
+
+class FakeSpeaker:
+    """Sends `chunks` after `delay` seconds, or raises `error` after the delay."""
+
+    def __init__(self, name, delay=0.0, chunks=3, error=None):
+        self.name, self.delay, self.chunks, self.error = name, delay, chunks, error
+        self.started = self.cancelled = False
+
+    async def __call__(self, text, send_audio):
+        self.started = True
+        try:
+            await asyncio.sleep(self.delay)
+            if self.error:
+                raise self.error
+            for i in range(self.chunks):
+                await send_audio(f"{self.name}-{i}".encode())
+                await asyncio.sleep(0.005)
+            return True
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+def make_engine(hedge_enabled=True, **speakers):
+    engine = HybridTTSEngine(hedge_enabled=hedge_enabled)
+    engine._circuits = {}  # Keep the process-wide breakers out of it
+    fakes = {name: speakers.get(name, FakeSpeaker(name)) for name in ("elevenlabs", "openai", "polly")}
+    engine._speakers = dict(fakes)
+    return engine, fakes
+
+
+async def speak(engine):
+    sent = []
+
+    async def send_audio(chunk):
+        sent.append(chunk)
+
+    ok = await engine.speak("Your technician arrives at 9am.", send_audio)
+    return ok, sent
+
+
+def test_primary_wins():
+    print("\n=== Primary wins ===")
+    engine, fakes = make_engine(elevenlabs=FakeSpeaker("elevenlabs", delay=0.01))
+    ok, sent = asyncio.run(speak(engine))
+    assert ok and sent == [b"elevenlabs-0", b"elevenlabs-1", b"elevenlabs-2"]
+    assert not fakes["openai"].started
+    stats = engine.get_stats()
+    assert stats["routing"]["primary_wins"] == 1 and "hedges" not in stats["routing"]
+    assert stats["providers"]["elevenlabs"]["ttfa_samples"] == 1
+    print(f"✅ {stats['routing']['last_decision']}")
+
+
+def test_hedge_wins_and_loser_cancelled():
+    print("\n=== Hedge wins ===")
+    engine, fakes = make_engine(
+        elevenlabs=FakeSpeaker("elevenlabs", delay=0.5),
+        openai=FakeSpeaker("openai", delay=0.01),
+    )
+    ok, sent = asyncio.run(speak(engine))
+    assert ok and sent == [b"openai-0", b"openai-1", b"openai-2"]
+    assert fakes["elevenlabs"].cancelled and not fakes["polly"].started
+
+    stats = engine.get_stats()
+    routing, loser = stats["routing"], stats["providers"]["elevenlabs"]
+    assert routing["hedges"] == 1 and routing["hedge_wins"] == 1 and routing["losers_cancelled"] == 1
+    # The loser's ~70ms is censored: counted, never a TTFA sample
+    assert loser["ttfa_samples"] == 0 and loser["ttfa_censored"] == 1
+    assert loser["failure_count"] == 0
+    assert stats["providers"]["openai"]["ttfa_samples"] == 1
+    print(f"✅ {routing['last_decision']}")
+
+
+def test_censored_samples_keep_estimates():
+    """A provider that keeps losing hedge races must not start to look fast."""
+    print("\n=== Censored samples ===")
+    engine, _ = make_engine(
+        elevenlabs=FakeSpeaker("elevenlabs", delay=0.5),
+        openai=FakeSpeaker("openai", delay=0.01),
+    )
+    launched = []
+    for _ in range(6):
+        ok, _ = asyncio.run(speak(engine))
+        assert ok
+        launched.append(engine.get_stats()["routing"]["last_decision"]["launched"])
+
+    # elevenlabs really takes 500ms; recording the ~70ms at which each loss
+    # was cut off would have given it a fast p50/p95 after five races
+    slow, fast = engine._providers["elevenlabs"], engine._providers["openai"]
+    assert slow.ttfa_percentile(0.5) is None and slow.ttfa_censored == 6
+    assert engine._hedge_delay_ms("elevenlabs") == hybrid_engine.TTS_HEDGE_DEFAULT_MS
+    assert fast.ttfa_percentile(0.5) < 50 and len(fast.ttfa_ms) == 6
+    assert launched == [["elevenlabs", "openai"]] * 6
+    print(f"✅ {slow.ttfa_censored} censored elevenlabs attempts, no TTFA samples from them")
+
+
+def test_failover_on_exception():
+    print("\n=== Failover ===")
+    engine, fakes = make_engine(
+        elevenlabs=FakeSpeaker("elevenlabs", error=ConnectionError("elevenlabs 503")),
+        openai=FakeSpeaker("openai", error=TimeoutError("openai timeout")),
+    )
+    ok, sent = asyncio.run(speak(engine))
+    assert ok and sent[0] == b"polly-0"
+    stats = engine.get_stats()
+    assert stats["routing"]["failovers"] == 2
+    assert stats["providers"]["elevenlabs"]["failure_count"] == 1
+    assert stats["providers"]["openai"]["failure_count"] == 1
+    assert stats["providers"]["polly"]["success_count"] == 1
+
+    # Every provider failing is reported, not raised
+    engine, _ = make_engine(**{
+        name: FakeSpeaker(name, error=RuntimeError("down")) for name in ("elevenlabs", "openai", "polly")
+    })
+    ok, sent = asyncio.run(speak(engine))
+    assert not ok and sent == [] and engine.get_stats()["routing"]["all_failed"] == 1
+    print(f"✅ {stats['routing']['last_decision']['launched']} -> polly")
+
+
+def test_hedging_disabled():
+    print("\n=== TTS_HEDGE_ENABLED=false ===")
+    engine, fakes = make_engine(
+        hedge_enabled=False,
+        elevenlabs=FakeSpeaker("elevenlabs", delay=0.3),
+        openai=FakeSpeaker("openai", delay=0.01),
+    )
+    ok, sent = asyncio.run(speak(engine))
+    assert ok and sent[0] == b"elevenlabs-0"
+    assert not fakes["openai"].started
+    assert "hedges" not in engine.get_stats()["routing"]
+    print("✅ slow primary waited out, no second provider started")
+
+
+if __name__ == "__main__":
+    test_primary_wins()
+    test_hedge_wins_and_loser_cancelled()
+    test_censored_samples_keep_estimates()
+    test_failover_on_exception()
+    test_hedging_disabled()